@@ -0,0 +1,34 @@
+"""Micro-benchmarks for PoEMarcut hot paths.
+
+Benchmarks only use the standard library and synthetic fixtures shaped like
+real API payloads, so they run offline. Every module is a suite in
+`poemarcut.bench.runner.SUITES`; suites run with percentile statistics and
+JSON regression baselines through ``python -m poemarcut.bench.runner [suite ...]``
+or ``poemarcut_cli.py bench``, or one at a time by running a module directly,
+for example ``python -m poemarcut.bench.cache_format``.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+@contextmanager
+def patched(target: object, **attrs: object) -> Iterator[None]:
+    """Temporarily replace attributes of a module or object, restoring them on exit.
+
+    Args:
+        target (object): The module or object to patch.
+        **attrs (object): Attribute names and their temporary values.
+
+    Yields:
+        None
+
+    """
+    saved = {name: getattr(target, name) for name in attrs}
+    try:
+        for name, value in attrs.items():
+            setattr(target, name, value)
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(target, name, value)
@@ -0,0 +1,78 @@
+"""Benchmark cold-start loading of several leagues: legacy YAML and JSON cache files vs one bundle file."""
+
+import tempfile
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import yaml
+
+from poemarcut import bundle, cache, currency
+from poemarcut.bench import runner
+from poemarcut.rates import RateTable
+from poemarcut.standin import currency_response
+
+
+@contextmanager
+def cases(leagues: int = 2, n_lines: int = 250) -> Iterator[dict[str, Callable[[], object]]]:
+    """Yield loads of `leagues` leagues per game, each with `n_lines` lines, up to ready rate tables.
+
+    Args:
+        leagues (int): Leagues per game.
+        n_lines (int): Response lines per league.
+
+    Yields:
+        dict[str, Callable[[], object]]: Cases keyed by name.
+
+    """
+    responses = {
+        (game, f"League{i}"): currency_response(n_lines, game=game, seed=i) for game in (1, 2) for i in range(leagues)
+    }
+    snapshots = {
+        (game, league): currency.CurrencySnapshot(
+            game=game, league=league, data=data, mtime=1.0, table=RateTable.from_response(data)
+        )
+        for (game, league), data in responses.items()
+    }
+    total = len(responses)
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        for (game, league), data in responses.items():
+            with (directory / f"{league}-{game}.yaml").open("w", encoding="utf-8") as f:
+                yaml.safe_dump(data, f)
+            cache.write_cache(directory / f"{league}-{game}.json", data)
+        bundle_path = directory / "economy.pmb"
+        cache.atomic_write_bytes(bundle_path, bundle.encode(bundle.Bundle(1.0, "bench", snapshots)))
+
+        def _load_yaml() -> list[RateTable]:
+            tables = []
+            for game, league in responses:
+                with (directory / f"{league}-{game}.yaml").open("r", encoding="utf-8") as f:
+                    tables.append(RateTable.from_response(yaml.safe_load(f)))
+            return tables
+
+        def _load_json() -> list[RateTable]:
+            return [
+                RateTable.from_response(cache.read_cache(directory / f"{league}-{game}.json") or {})
+                for game, league in responses
+            ]
+
+        yield {
+            f"yaml cache files ({total} leagues)": _load_yaml,
+            f"json cache files ({total} leagues)": _load_json,
+            f"bundle ({total} leagues)": lambda: bundle.read(bundle_path),
+        }
+
+
+def main() -> None:
+    """Run the suite and print results.
+
+    Returns:
+        None
+
+    """
+    runner.main(["bundle"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark loading and saving currency cache files: legacy YAML vs the JSON cache format."""
+
+import tempfile
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import yaml
+
+from poemarcut import cache
+from poemarcut.bench import runner
+from poemarcut.standin import currency_response
+
+
+@contextmanager
+def cases(sizes: tuple[int, ...] = (120, 500)) -> Iterator[dict[str, Callable[[], object]]]:
+    """Yield YAML and JSON cache saves and loads for responses of each size, in a temporary directory.
+
+    Args:
+        sizes (tuple[int, ...]): Response line counts to benchmark.
+
+    Yields:
+        dict[str, Callable[[], object]]: Cases keyed by name.
+
+    """
+    cases: dict[str, Callable[[], object]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            data = currency_response(n)
+            yaml_path = Path(tmp) / f"bench-{n}.yaml"
+            json_path = Path(tmp) / f"bench-{n}.json"
+
+            def _save_yaml(data: dict = data, path: Path = yaml_path) -> None:
+                with path.open("w", encoding="utf-8") as f:
+                    yaml.safe_dump(data, f)
+
+            def _load_yaml(path: Path = yaml_path) -> object:
+                with path.open("r", encoding="utf-8") as f:
+                    return yaml.safe_load(f)
+
+            _save_yaml()
+            cache.write_cache(json_path, data)
+            cases[f"yaml save ({n} lines)"] = _save_yaml
+            cases[f"json save ({n} lines)"] = lambda data=data, path=json_path: cache.write_cache(path, data)
+            cases[f"yaml load ({n} lines)"] = _load_yaml
+            cases[f"json load ({n} lines)"] = lambda path=json_path: cache.read_cache(path)
+        yield cases
+
+
+def main() -> None:
+    """Run the suite and print results.
+
+    Returns:
+        None
+
+    """
+    runner.main(["cache_format"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark currency fetch paths against the offline stand-in server.
+
+Measures a full download, a 304 revalidation and warming several leagues,
+with configurable injected latency, without touching the live APIs.
+"""
+
+import os
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from poemarcut import cache, currency
+from poemarcut.bench import patched, runner
+from poemarcut.constants import S_IN_HOUR
+from poemarcut.standin import Faults, StandinServer
+
+
+def _expire(game: int, league: str) -> None:
+    """Age a cache file past the freshness window so the next fetch revalidates it."""
+    old = time.time() - 2 * S_IN_HOUR
+    os.utime(cache.cache_path(game, league), (old, old))
+
+
+@contextmanager
+def cases(latency: float = 0.05) -> Iterator[dict[str, Callable[[], object]]]:
+    """Yield fetch paths against a stand-in server with `latency` seconds of injected latency.
+
+    Args:
+        latency (float): Seconds the stand-in waits before each response.
+
+    Yields:
+        dict[str, Callable[[], object]]: Cases keyed by name.
+
+    """
+    leagues = ["Standard", "Hardcore", "SSF Standard", "SSF Hardcore"]
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        StandinServer(faults=Faults(latency=latency)) as server,
+        server.redirect(),
+        patched(cache, manager=cache.CacheManager(tmp)),
+    ):
+
+        def _download() -> None:
+            cache.cache_path(1, "Standard").unlink(missing_ok=True)
+            currency._retrieve_currency_prices(1, "Standard")  # noqa: SLF001
+
+        def _revalidate() -> None:
+            _expire(1, "Standard")
+            currency._retrieve_currency_prices(1, "Standard")  # noqa: SLF001
+
+        def _warm(workers: int) -> None:
+            for league in leagues:
+                cache.cache_path(1, league).unlink(missing_ok=True)
+            currency.CurrencyStore().warm([(1, league) for league in leagues], update=True, max_workers=workers)
+
+        yield {
+            "download (200)": _download,
+            "revalidate (304)": _revalidate,
+            f"warm {len(leagues)} leagues, 1 worker": lambda: _warm(1),
+            f"warm {len(leagues)} leagues, {len(leagues)} workers": lambda: _warm(len(leagues)),
+        }
+
+
+def main() -> None:
+    """Run the suite and print results.
+
+    Returns:
+        None
+
+    """
+    runner.main(["fetch"])
+
+
+if __name__ == "__main__":
+    main()
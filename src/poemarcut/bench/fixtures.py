@@ -0,0 +1,186 @@
+"""Synthetic, realistically shaped inputs for benchmarks and tests."""
+
+# Copied item texts as produced by ctrl+c in PoE1 and PoE2, with trade notes.
+ITEM_TEXTS: dict[str, str] = {
+    "rare": """Item Class: Rings
+Rarity: Rare
+Storm Coil
+Sapphire Ring
+--------
+Requirements:
+Level: 64
+--------
+Item Level: 84
+--------
+{ Implicit Modifier — Elemental, Cold, Resistance }
++24(20-30)% to Cold Resistance (implicit)
+--------
+{ Prefix Modifier "Resplendent" (Tier: 1) — Life }
++74(70-79) to maximum Life
+{ Prefix Modifier "Flaring" (Tier: 2) — Damage, Physical, Attack }
+Adds 7(5-8) to 12(11-13) Physical Damage to Attacks
+{ Suffix Modifier "of the Rainbow" (Tier: 2) — Elemental, Fire, Cold, Lightning, Resistance }
++14(13-15)% to all Elemental Resistances
+{ Suffix Modifier "of the Polar Bear" (Tier: 3) — Elemental, Cold, Resistance }
++40(36-41)% to Cold Resistance
+--------
+Note: ~price 3 divine
+""",
+    "unique": """Item Class: Body Armours
+Rarity: Unique
+Kaom's Heart
+Glorious Plate
+--------
+Armour: 1060 (augmented)
+--------
+Requirements:
+Level: 68
+Str: 191
+--------
+Sockets: R-R-R-R
+--------
+Item Level: 86
+--------
+{ Unique Modifier — Life }
++1000 to maximum Life
+{ Unique Modifier — Damage, Elemental, Fire }
+40% increased Fire Damage
+--------
+Corrupted
+--------
+Note: ~b/o 1,250 chaos
+""",
+    "currency": """Item Class: Stackable Currency
+Rarity: Currency
+Exalted Orb
+--------
+Stack Size: 12/20
+--------
+Augments a Rare item with a new random modifier
+--------
+Note: ~b/o 18 exalted
+""",
+    "map": """Item Class: Maps
+Rarity: Normal
+Mesa Map
+--------
+Map Tier: 16
+--------
+Item Level: 83
+--------
+Travel to this Map by using it in a personal Map Device.
+--------
+Note: ~price 40 chaos
+""",
+    "rare map": """Item Class: Maps
+Rarity: Rare
+Hidden Precinct
+Pit of the Chimera Map
+--------
+Map Tier: 16
+Item Quantity: +75% (augmented)
+Item Rarity: +32% (augmented)
+Monster Pack Size: +21% (augmented)
+Quality: +20% (augmented)
+--------
+Item Level: 82
+--------
+Monster Level: 83
+--------
+Delirium Reward Type: Harbinger Items (enchant)
+Players in Area are 20% Delirious (enchant)
+--------
+{ Implicit Modifier }
+Area is influenced by The Shaper — Unscalable Value (implicit)
+--------
+{ Prefix Modifier "Multifarious" (Tier: 1) }
+Area has increased monster variety — Unscalable Value
+
+{ Prefix Modifier "Shocking" (Tier: 1) — Damage, Physical, Elemental, Lightning }
+Monsters deal 107(90-110)% extra Physical Damage as Lightning
+
+{ Suffix Modifier "of Venom" (Tier: 1) — Chaos, Ailment }
+Monsters Poison on Hit — Unscalable Value
+(Poison deals Chaos Damage over time, based on the base Physical and Chaos Damage of the Skill)
+
+--------
+Travel to this Map by using it in a personal Map Device. Maps can only be used once.
+--------
+Note: ~b/o 888 orb-of-binding
+""",
+    "heist": """Item Class: Heist Gear
+Rarity: Rare
+Behemoth Apparatus
+Aggregator Charm
+--------
+Any Heist member can equip this item.
+--------
+Requirements:
+Level 4 in Any Job
+--------
+Item Level: 83
+--------
+{ Implicit Modifier — Damage, Caster }
+23(21-25)% increased Spell Damage (implicit)
+--------
+{ Prefix Modifier "Masterful" (Tier: 1) — Speed }
+19(18-20)% increased Job speed
+
+{ Prefix Modifier "Frosted" (Tier: 4) — Damage, Elemental, Cold }
+12(11-15) to 20(18-21) added Cold Damage
+Players and their Minions have 12(11-15) to 20(18-21) added Cold Damage
+
+{ Suffix Modifier "of Coordination" (Tier: 2) — Aura }
+Grants Level 10 Malevolence Skill
+
+--------
+Can only be equipped to Heist members.
+--------
+Note: ~b/o 90 chaos
+""",
+    "poe2 rare": """Item Class: Body Armours
+Rarity: Rare
+Dusk Shell
+Expert Hexer's Robe
+--------
+Quality: +20% (augmented)
+Energy Shield: 412 (augmented)
+--------
+Requires: Level 65, 111 Int
+--------
+Sockets: S S
+--------
+Item Level: 81
+--------
++14% to Cold Resistance (rune)
++14% to Cold Resistance (rune)
+--------
+{ Prefix Modifier "Seraphim's" (Tier: 1) — Defences }
++86(84-89) to maximum Energy Shield
+{ Prefix Modifier "Resplendent" (Tier: 2) — Defences }
+92(80-93)% increased Energy Shield
+{ Suffix Modifier "of the Polar Bear" (Tier: 2) — Elemental, Cold, Resistance }
++34(31-35)% to Cold Resistance
+{ Suffix Modifier "of Haast" (Tier: 1) — Elemental, Lightning, Resistance }
++41(41-45)% to Lightning Resistance (fractured)
+--------
+Note: ~price 2 divine
+""",
+    "poe2 waystone": """Item Class: Waystones
+Rarity: Magic
+Mysterious Waystone of the Tempest
+--------
+Waystone Tier: 15
+Revives Available: 0
+Item Quantity: +18% (augmented)
+--------
+Item Level: 79
+--------
+{ Suffix Modifier "of the Tempest" }
+Area has patches of Shocked Ground
+--------
+Can be used in a Map Device, allowing you to enter a Map. Waystones can only be used once.
+--------
+Note: ~price 12 exalted
+""",
+}
@@ -0,0 +1,143 @@
+"""Benchmark `keyboard.on_release` end to end with fake input, clipboard and window backends.
+
+The fakes make every key press, clipboard access and sleep a no-op, so the cases
+measure the handler itself: reading settings, matching bindings, parsing the
+copied item and pricing it. Default settings are used, with a pinned rate
+snapshot for the active league so nothing is fetched.
+"""
+
+import time
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack, contextmanager
+from types import SimpleNamespace
+
+from pynput.keyboard import Key, KeyCode
+
+from poemarcut import currency, keyboard, ladder, settings
+from poemarcut.bench import patched, runner
+from poemarcut.bench.fixtures import ITEM_TEXTS
+from poemarcut.bench.settings import temporary_settings
+from poemarcut.rates import RateTable
+
+RATES = {"divine": 1.0, "exalted": 1 / 9.5, "chaos": 1 / 160.0}
+
+
+class _Clipboard:
+    """In-memory stand-in for `pyperclip`."""
+
+    PyperclipException = keyboard.pyperclip.PyperclipException
+
+    def __init__(self) -> None:
+        self.text = ""
+
+    def paste(self) -> str:
+        return self.text
+
+    def copy(self, text: str) -> None:
+        self.text = text
+
+
+def _noop(*_args: object, **_kwargs: object) -> None:
+    """Accept and ignore any arguments."""
+
+
+def _event_key(binding: tuple[str, object]) -> Key | KeyCode:
+    """Return a key event matching a parsed binding."""
+    kind, value = binding
+    if kind == "special":
+        return value  # type: ignore[return-value]
+    if kind == "char":
+        return KeyCode.from_char(str(value))
+    return KeyCode.from_vk(int(value))  # type: ignore[call-overload]
+
+
+def _pinned_store(game: int, league: str) -> currency.CurrencyStore:
+    """Return a store with a pinned snapshot for one league."""
+    lines = [{"id": cur_id, "primaryValue": value} for cur_id, value in RATES.items()]
+    snapshot = currency.CurrencySnapshot(
+        game=game,
+        league=league,
+        data={"core": {"primary": "divine"}, "lines": lines},
+        mtime=time.time(),
+        table=RateTable("divine", list(RATES), list(RATES.values())),
+    )
+    store = currency.CurrencyStore()
+    store.pin([snapshot])
+    return store
+
+
+@contextmanager
+def cases() -> Iterator[dict[str, Callable[[], object]]]:
+    """Yield key presses handled by `keyboard.on_release`.
+
+    Yields:
+        dict[str, Callable[[], object]]: Cases keyed by name.
+
+    """
+    clipboard = _Clipboard()
+    gui = SimpleNamespace(
+        hotkey=_noop,
+        press=_noop,
+        write=_noop,
+        rightClick=_noop,
+        FailSafeException=keyboard.pyautogui.FailSafeException,
+    )
+    with ExitStack() as stack:
+        manager = stack.enter_context(temporary_settings())
+        current = manager.settings.currency
+        stack.enter_context(patched(settings, settings_manager=manager))
+        stack.enter_context(patched(currency, store=_pinned_store(current.active_game, current.active_league)))
+        stack.enter_context(patched(ladder, cache=ladder.LadderCache()))
+        stack.enter_context(
+            patched(
+                keyboard,
+                pyperclip=clipboard,
+                pyautogui=gui,
+                time=SimpleNamespace(sleep=_noop),
+                is_poe_game_window=lambda: True,
+            )
+        )
+        keys = {name: _event_key(keyboard.keyorkeycode_from_str(value)) for name, value in manager.settings.keys}
+        copy_key, calc_key = keys["copyitem_key"], keys["calcprice_key"]
+
+        def _copy(text: str) -> Callable[[], object]:
+            def press() -> bool:
+                clipboard.text = text
+                return keyboard.on_release(copy_key)
+
+            return press
+
+        def _calc(text: str) -> Callable[[], object]:
+            copy = _copy(text)
+            price = keyboard.Item.from_text(text).note
+
+            def press() -> bool:
+                copy()
+                clipboard.text = str(price.price if price is not None else "")
+                return keyboard.on_release(calc_key)
+
+            return press
+
+        # Build the price ladder the copy press schedules, as it would be between presses.
+        _copy(ITEM_TEXTS["rare"])()
+        ladder.cache.join()
+        yield {
+            "on_release (unbound key)": lambda: keyboard.on_release(KeyCode.from_char("z")),
+            "on_release copy item (rare)": _copy(ITEM_TEXTS["rare"]),
+            "on_release copy + calc price (3 divine)": _calc(ITEM_TEXTS["rare"]),
+            "on_release copy + calc price (1,250 chaos)": _calc(ITEM_TEXTS["unique"]),
+        }
+
+
+def main() -> None:
+    """Run the suite and print results.
+
+    Returns:
+        None
+
+    """
+    runner.main(["hotkey"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark parsing poe.ninja responses: full `json.loads` vs field-projected ingestion.
+
+The suite times parsing and loading the resulting cache file for large
+multi-thousand-line payloads. Running the module also reports peak traced
+memory while parsing and the size of each cache file.
+"""
+
+import json
+import tempfile
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from poemarcut import cache, ingest
+from poemarcut.bench import runner
+from poemarcut.standin import currency_response
+
+SIZES = (1000, 5000)
+
+
+def peak_memory(func: Callable[[], object]) -> int:
+    """Return the peak bytes allocated while calling `func`, as traced by `tracemalloc`.
+
+    Args:
+        func (Callable[[], object]): Zero-argument callable to trace.
+
+    Returns:
+        int: Peak traced bytes, excluding memory already allocated before the call.
+
+    """
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        func()
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+
+@contextmanager
+def cases(sizes: tuple[int, ...] = SIZES) -> Iterator[dict[str, Callable[[], object]]]:
+    """Yield full and projected parsing of responses of each size, and loads of the resulting cache files.
+
+    Args:
+        sizes (tuple[int, ...]): Response line counts to benchmark.
+
+    Yields:
+        dict[str, Callable[[], object]]: Cases keyed by name.
+
+    """
+    cases: dict[str, Callable[[], object]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            payload = json.dumps(currency_response(n)).encode()
+            cases[f"json.loads ({n} lines)"] = lambda p=payload: json.loads(p)
+            cases[f"projected ({n} lines)"] = lambda p=payload: ingest.parse_currency_response(p)
+            for name, data in (("full", json.loads(payload)), ("projected", ingest.parse_currency_response(payload))):
+                path = Path(tmp) / f"bench-{name}-{n}.json"
+                cache.write_cache(path, data)
+                cases[f"{name} cache load ({n} lines)"] = lambda path=path: cache.read_cache(path)
+        yield cases
+
+
+def sizes(sizes: tuple[int, ...] = SIZES) -> dict[str, int]:
+    """Return payload sizes, peak parsing memory and cache file sizes for responses of each size.
+
+    Args:
+        sizes (tuple[int, ...]): Response line counts to measure.
+
+    Returns:
+        dict[str, int]: Byte counts keyed by name.
+
+    """
+    out: dict[str, int] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            payload = json.dumps(currency_response(n)).encode()
+            out[f"payload ({n} lines)"] = len(payload)
+            out[f"json.loads peak ({n} lines)"] = peak_memory(lambda p=payload: json.loads(p))
+            out[f"projected peak ({n} lines)"] = peak_memory(lambda p=payload: ingest.parse_currency_response(p))
+            for name, data in (("full", json.loads(payload)), ("projected", ingest.parse_currency_response(payload))):
+                path = Path(tmp) / f"bench-{name}-{n}.json"
+                cache.write_cache(path, data)
+                out[f"{name} cache file ({n} lines)"] = path.stat().st_size
+    return out
+
+
+def main() -> None:
+    """Run the suite and print results and byte counts.
+
+    Returns:
+        None
+
+    """
+    runner.main(["ingest"])
+    for name, size in sizes().items():
+        print(f"{name:<48} {size / 1024:11.1f} KiB")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Benchmark parsing copied item text with `Item.from_text` on PoE1 and PoE2 clipboard texts."""
+
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from poemarcut.bench import runner
+from poemarcut.bench.fixtures import ITEM_TEXTS
+from poemarcut.item import Item
+
+
+@contextmanager
+def cases() -> Iterator[dict[str, Callable[[], object]]]:
+    """Yield one case per fixture item text and one parsing the whole corpus.
+
+    Yields:
+        dict[str, Callable[[], object]]: Cases keyed by name.
+
+    """
+    texts = list(ITEM_TEXTS.values())
+    cases = {f"from_text ({kind})": (lambda text=text: Item.from_text(text)) for kind, text in ITEM_TEXTS.items()}
+    cases[f"from_text (corpus of {len(texts)})"] = lambda: [Item.from_text(text) for text in texts]
+    yield cases
+
+
+def main() -> None:
+    """Run the suite and print results.
+
+    Returns:
+        None
+
+    """
+    runner.main(["item"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark calc-price hotkey pricing: live conversion vs a precomputed price ladder."""
+
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from poemarcut import currency, ladder, logic
+from poemarcut.bench import runner
+from poemarcut.rates import RateTable
+
+CURRENCIES = ["divine", "exalted", "chaos", "alch"]
+VALUES = [1.0, 1 / 9.5, 1 / 160.0, 1 / 1400.0]
+
+
+@contextmanager
+def cases(cap: int = 1000) -> Iterator[dict[str, Callable[[], object]]]:
+    """Yield building a ladder and pricing one item live and from the ladder.
+
+    Args:
+        cap (int): Highest precomputed price.
+
+    Yields:
+        dict[str, Callable[[], object]]: Cases keyed by name.
+
+    """
+    table = RateTable("divine", CURRENCIES, VALUES)
+    key = ladder.LadderKey(
+        game=1,
+        league="Standard",
+        currencies=tuple(CURRENCIES),
+        discount_percent=10,
+        max_actual_discount=20,
+        minimum_discount=1,
+        minimum_discount_currency="chaos",
+        cap=cap,
+    )
+
+    def _get_rate(*, from_currency: str, to_currency: str) -> float:
+        return currency.table_rate(table, key.league, from_currency, to_currency)
+
+    def _live() -> tuple:
+        return logic.convert_and_compute_price(
+            1,
+            "divine",
+            CURRENCIES,
+            10,
+            20,
+            get_exchange_rate=_get_rate,
+            minimum_discount=1,
+            minimum_discount_currency="chaos",
+        )
+
+    built = ladder.build(key, table)
+    yield {
+        f"build ladder (cap {cap})": lambda: ladder.build(key, table),
+        "price 1 divine live": _live,
+        "price 1 divine from ladder": lambda: built.lookup(1, "divine"),
+    }
+
+
+def main() -> None:
+    """Run the suite and print results.
+
+    Returns:
+        None
+
+    """
+    runner.main(["ladder"])
+
+
+if __name__ == "__main__":
+    main()
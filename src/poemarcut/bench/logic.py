@@ -0,0 +1,51 @@
+"""Benchmark single-item pricing with `logic.convert_and_compute_price`."""
+
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from poemarcut import logic
+from poemarcut.bench import runner
+from poemarcut.rates import RateTable
+
+CURRENCIES = ["divine", "exalted", "chaos", "alch"]
+VALUES = [1.0, 1 / 9.5, 1 / 160.0, 1 / 1400.0]
+
+
+@contextmanager
+def cases() -> Iterator[dict[str, Callable[[], object]]]:
+    """Yield pricing cases: a plain discount, a conversion and a conversion with a minimum discount.
+
+    Yields:
+        dict[str, Callable[[], object]]: Cases keyed by name.
+
+    """
+    table = RateTable("divine", CURRENCIES, VALUES)
+
+    def get_rate(*, from_currency: str, to_currency: str) -> float:
+        return table.rate(from_currency, to_currency)
+
+    def price(units: int, cur: str, **settings: object) -> Callable[[], object]:
+        return lambda: logic.convert_and_compute_price(units, cur, CURRENCIES, 10, 20, get_rate, **settings)
+
+    yield {
+        "compute_discounted_price_and_actual": lambda: logic.compute_discounted_price_and_actual(90, 10),
+        "convert_and_compute_price (90 chaos)": price(90, "chaos"),
+        "convert_and_compute_price (1 divine)": price(1, "divine"),
+        "convert_and_compute_price (1 divine, minimum discount)": price(
+            1, "divine", minimum_discount=1, minimum_discount_currency="chaos"
+        ),
+    }
+
+
+def main() -> None:
+    """Run the suite and print results.
+
+    Returns:
+        None
+
+    """
+    runner.main(["logic"])
+
+
+if __name__ == "__main__":
+    main()
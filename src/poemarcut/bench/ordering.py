@@ -0,0 +1,101 @@
+"""Benchmark building a value-ordered chain of all PoE1 merchant currencies.
+
+Compares the previous approach, one `get_exchange_rate` store lookup per
+comparison and per adjacent pair, with `compute_new_order` and
+`compute_mapping_from_order` running against one pinned rate table.
+"""
+
+import tempfile
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from math import ceil
+
+from poemarcut import cache, constants, currency
+from poemarcut.bench import patched, runner
+from poemarcut.standin import currency_response
+
+LEAGUE = "bench"
+
+
+def _pairwise_new_order(order: list[str], chosen_key: str) -> list[str]:
+    """Insert `chosen_key` with one store lookup per comparison, as before pinning."""
+    for i, existing in enumerate(order):
+        try:
+            if currency.get_exchange_rate(1, LEAGUE, chosen_key, existing, autoupdate=False) > 1.0:
+                return [*order[:i], chosen_key, *order[i:]]
+        except (LookupError, ValueError):
+            continue
+    return [*order, chosen_key]
+
+
+def _pairwise_mapping(ordered: list[str]) -> dict[str, int]:
+    """Compute the mapping with one store lookup per adjacent pair, as before pinning."""
+    mapping: dict[str, int] = {}
+    cumulative = 1.0
+    for i, name in enumerate(ordered):
+        if i == 0:
+            mapping[name] = 1
+            continue
+        try:
+            cumulative *= currency.get_exchange_rate(1, LEAGUE, ordered[i - 1], name, autoupdate=False)
+            mapping[name] = max(1, ceil(cumulative))
+        except (LookupError, ValueError):
+            mapping[name] = 1
+    return mapping
+
+
+def _build_pairwise(ids: list[str]) -> dict[str, int]:
+    """Add each currency in turn and compute the mapping using pairwise lookups."""
+    order: list[str] = []
+    for cur_id in ids:
+        order = _pairwise_new_order(order, cur_id)
+    return _pairwise_mapping(order)
+
+
+def _build_pinned(ids: list[str]) -> dict[str, int]:
+    """Add each currency in turn and compute the mapping using the pinned-table implementation."""
+    order: list[str] = []
+    for cur_id in ids:
+        order = currency.compute_new_order(1, LEAGUE, order, cur_id, autoupdate=False)
+    return currency.compute_mapping_from_order(1, LEAGUE, order, autoupdate=False)
+
+
+@contextmanager
+def cases() -> Iterator[dict[str, Callable[[], object]]]:
+    """Yield adding every PoE1 merchant currency one by one and then computing the mapping.
+
+    Yields:
+        dict[str, Callable[[], object]]: Cases keyed by name.
+
+    Raises:
+        AssertionError: If the two implementations build different chains.
+
+    """
+    ids = list(constants.POE1_MERCHANT_CURRENCIES)
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        patched(cache, manager=cache.CacheManager(tmp)),
+        patched(currency, store=currency.CurrencyStore()),
+    ):
+        cache.write_cache(cache.cache_path(1, LEAGUE), currency_response(120))
+        if _build_pairwise(ids) != _build_pinned(ids):
+            msg = "pinned and pairwise chains differ"
+            raise AssertionError(msg)
+        yield {
+            f"pairwise lookups ({len(ids)} currencies)": lambda: _build_pairwise(ids),
+            f"pinned table ({len(ids)} currencies)": lambda: _build_pinned(ids),
+        }
+
+
+def main() -> None:
+    """Run the suite and print results.
+
+    Returns:
+        None
+
+    """
+    runner.main(["ordering"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark repricing many listed items: the scalar function per item vs the batch API."""
+
+import random
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from poemarcut import logic, reprice
+from poemarcut.bench import runner
+from poemarcut.rates import RateTable
+
+CURRENCIES = ["divine", "exalted", "chaos", "alch"]
+VALUES = {"divine": 1.0, "exalted": 1 / 9.5, "chaos": 1 / 160.0, "alch": 1 / 1400.0}
+
+
+@contextmanager
+def cases(n_items: int = 10000) -> Iterator[dict[str, Callable[[], object]]]:
+    """Yield repricing `n_items` items with realistic price distributions.
+
+    Args:
+        n_items (int): Number of items.
+
+    Yields:
+        dict[str, Callable[[], object]]: Cases keyed by name.
+
+    """
+    rng = random.Random(0)
+    table = RateTable("divine", list(VALUES), list(VALUES.values()))
+
+    def get_rate(*, from_currency: str, to_currency: str) -> float:
+        return table.rate(from_currency, to_currency)
+
+    units = [rng.choice((1, 1, 2, 3, 5, 10, rng.randint(1, 400))) for _ in range(n_items)]
+    cur_types = [rng.choice(CURRENCIES) for _ in range(n_items)]
+    settings = {"discount_percent": 10, "max_actual_discount": 20, "minimum_discount": 1}
+
+    def _scalar() -> list:
+        return [
+            logic.convert_and_compute_price(
+                u, c, CURRENCIES, get_exchange_rate=get_rate, minimum_discount_currency="chaos", **settings
+            )
+            for u, c in zip(units, cur_types, strict=True)
+        ]
+
+    def _batch(*, use_numpy: bool) -> reprice.PriceBatch:
+        return reprice.convert_and_compute_prices(
+            units,
+            cur_types,
+            CURRENCIES,
+            get_exchange_rate=get_rate,
+            minimum_discount_currency="chaos",
+            use_numpy=use_numpy,
+            **settings,
+        )
+
+    cases: dict[str, Callable[[], object]] = {
+        f"scalar loop ({n_items} items)": _scalar,
+        f"batch, pure Python ({n_items} items)": lambda: _batch(use_numpy=False),
+    }
+    if reprice.np is not None:
+        cases[f"batch, NumPy ({n_items} items)"] = lambda: _batch(use_numpy=True)
+    yield cases
+
+
+def main() -> None:
+    """Run the suite and print results.
+
+    Returns:
+        None
+
+    """
+    runner.main(["reprice"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+"""Run benchmark suites with percentile statistics and JSON regression baselines.
+
+A suite is a module in `SUITES` with a `cases()` context manager that sets up its
+fixtures and yields named zero-argument callables. Each case is warmed up and
+calibrated so one sample takes at least `min_sample_s`, then timed `samples`
+times with the garbage collector disabled. Results can be saved as a JSON
+baseline and later compared against, flagging cases whose chosen percentile got
+slower by more than a threshold.
+
+Usage: ``python -m poemarcut.bench.runner [suite ...] [--save PATH] [--compare PATH]``,
+or ``poemarcut_cli.py bench`` with the same arguments.
+"""
+
+import argparse
+import gc
+import importlib
+import json
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+# Suite name -> module with a `cases()` context manager.
+SUITES: dict[str, str] = {
+    "item": "poemarcut.bench.item",
+    "logic": "poemarcut.bench.logic",
+    "store": "poemarcut.bench.store",
+    "settings": "poemarcut.bench.settings",
+    "hotkey": "poemarcut.bench.hotkey",
+    "reprice": "poemarcut.bench.reprice",
+    "solver": "poemarcut.bench.solver",
+    "simulate": "poemarcut.bench.simulate",
+    "ladder": "poemarcut.bench.ladder",
+    "ordering": "poemarcut.bench.ordering",
+    "ingest": "poemarcut.bench.ingest",
+    "cache_format": "poemarcut.bench.cache_format",
+    "bundle": "poemarcut.bench.bundle",
+    "fetch": "poemarcut.bench.fetch",
+}
+METRICS = ("min", "p50", "p90", "p99", "mean")
+DEFAULT_SAMPLES = 30
+DEFAULT_MIN_SAMPLE_S = 0.005
+DEFAULT_THRESHOLD = 0.10
+
+BASELINE_FORMAT = 1
+
+
+class BaselineError(ValueError):
+    """Raised when a baseline file is not a valid baseline."""
+
+
+@dataclass(frozen=True)
+class Stats:
+    """Per-call timing statistics of one benchmark case, in seconds.
+
+    Attributes:
+        min: Fastest sample.
+        p50: Median sample.
+        p90: 90th percentile sample.
+        p99: 99th percentile sample.
+        mean: Mean of the samples.
+        samples: Number of samples.
+        number: Calls per sample.
+
+    """
+
+    min: float
+    p50: float
+    p90: float
+    p99: float
+    mean: float
+    samples: int
+    number: int
+
+    @classmethod
+    def from_samples(cls, samples: list[float], number: int) -> "Stats":
+        """Compute statistics from per-call sample times.
+
+        Args:
+            samples (list[float]): Mean seconds per call of each sample; at least one.
+            number (int): Calls per sample.
+
+        Returns:
+            Stats: The statistics.
+
+        """
+        cuts = samples * 99 if len(samples) == 1 else statistics.quantiles(samples, n=100, method="inclusive")
+        return cls(
+            min=min(samples),
+            p50=cuts[49],
+            p90=cuts[89],
+            p99=cuts[98],
+            mean=statistics.fmean(samples),
+            samples=len(samples),
+            number=number,
+        )
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """One case compared against its baseline.
+
+    Attributes:
+        name: The case name.
+        baseline: Baseline seconds of the compared metric.
+        current: Current seconds of the compared metric.
+        regressed: Whether the case got slower by more than the threshold.
+
+    """
+
+    name: str
+    baseline: float
+    current: float
+    regressed: bool
+
+    @property
+    def ratio(self) -> float:
+        """Return current time as a multiple of the baseline time."""
+        return self.current / self.baseline if self.baseline > 0 else float("inf")
+
+
+def _calibrate(func: Callable[[], object], min_sample_s: float) -> int:
+    """Return how many calls make one sample last at least `min_sample_s`; the calls also warm up `func`."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_sample_s:
+            return number
+        # Aim past the target so slow-starting functions don't take many rounds.
+        number = max(number * 2, int(number * min_sample_s * 1.2 / elapsed) if elapsed > 0 else number * 10)
+
+
+def time_case(
+    func: Callable[[], object], *, samples: int = DEFAULT_SAMPLES, min_sample_s: float = DEFAULT_MIN_SAMPLE_S
+) -> Stats:
+    """Time a zero-argument callable.
+
+    Args:
+        func (Callable[[], object]): The case to time.
+        samples (int): Number of timed samples.
+        min_sample_s (float): Minimum duration of one sample; calls are batched to reach it.
+
+    Returns:
+        Stats: Per-call statistics.
+
+    """
+    number = _calibrate(func, min_sample_s)
+    times: list[float] = []
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(max(1, samples)):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            times.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return Stats.from_samples(times, number)
+
+
+def run_suites(
+    names: Iterable[str] | None = None,
+    *,
+    samples: int = DEFAULT_SAMPLES,
+    min_sample_s: float = DEFAULT_MIN_SAMPLE_S,
+    progress: Callable[[str, Stats], None] | None = None,
+) -> dict[str, Stats]:
+    """Run benchmark suites.
+
+    Args:
+        names (Iterable[str] | None): Suite names from `SUITES`, or None for all of them.
+        samples (int): Number of timed samples per case.
+        min_sample_s (float): Minimum duration of one sample.
+        progress (Callable[[str, Stats], None] | None): Called with each case's name and statistics.
+
+    Returns:
+        dict[str, Stats]: Statistics keyed by "suite/case".
+
+    Raises:
+        ValueError: If a suite name is unknown.
+
+    """
+    names = list(SUITES) if names is None else list(names)
+    unknown = [name for name in names if name not in SUITES]
+    if unknown:
+        msg = f"Unknown benchmark suite(s): {', '.join(unknown)}"
+        raise ValueError(msg)
+    results: dict[str, Stats] = {}
+    for suite in names:
+        module = importlib.import_module(SUITES[suite])
+        with module.cases() as cases:
+            for case, func in cases.items():
+                name = f"{suite}/{case}"
+                results[name] = stats = time_case(func, samples=samples, min_sample_s=min_sample_s)
+                if progress is not None:
+                    progress(name, stats)
+    return results
+
+
+def save_baseline(path: Path, results: Mapping[str, Stats]) -> None:
+    """Write results to a JSON baseline file.
+
+    Args:
+        path (Path): The baseline file.
+        results (Mapping[str, Stats]): Statistics keyed by case name.
+
+    Returns:
+        None
+
+    """
+    payload = {
+        "format": BASELINE_FORMAT,
+        "created": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {name: asdict(stats) for name, stats in results.items()},
+    }
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load_baseline(path: Path) -> dict[str, Stats]:
+    """Read results from a JSON baseline file.
+
+    Args:
+        path (Path): The baseline file.
+
+    Returns:
+        dict[str, Stats]: Statistics keyed by case name.
+
+    Raises:
+        OSError: If the file cannot be read.
+        BaselineError: If the file is not a valid baseline.
+
+    """
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        msg = f"Invalid baseline JSON: {e}"
+        raise BaselineError(msg) from e
+    if not isinstance(payload, dict) or payload.get("format") != BASELINE_FORMAT:
+        msg = "Unsupported baseline format"
+        raise BaselineError(msg)
+    raw = payload.get("results")
+    if not isinstance(raw, dict):
+        msg = "Baseline has no results"
+        raise BaselineError(msg)
+    try:
+        return {str(name): Stats(**fields) for name, fields in raw.items()}
+    except TypeError as e:
+        msg = f"Invalid baseline results: {e}"
+        raise BaselineError(msg) from e
+
+
+def compare(
+    baseline: Mapping[str, Stats],
+    current: Mapping[str, Stats],
+    *,
+    threshold: float = DEFAULT_THRESHOLD,
+    metric: str = "p50",
+) -> list[Comparison]:
+    """Compare results against a baseline.
+
+    Args:
+        baseline (Mapping[str, Stats]): Baseline statistics keyed by case name.
+        current (Mapping[str, Stats]): Current statistics keyed by case name.
+        threshold (float): Allowed slowdown as a fraction, e.g. 0.1 for 10%.
+        metric (str): The statistic to compare, one of `METRICS`.
+
+    Returns:
+        list[Comparison]: One comparison per case present in both, in the order of `current`.
+
+    Raises:
+        ValueError: If `metric` is unknown.
+
+    """
+    if metric not in METRICS:
+        msg = f"Unknown metric '{metric}', expected one of {', '.join(METRICS)}"
+        raise ValueError(msg)
+    out: list[Comparison] = []
+    for name, stats in current.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        before, after = getattr(base, metric), getattr(stats, metric)
+        out.append(Comparison(name, before, after, regressed=after > before * (1 + threshold)))
+    return out
+
+
+def format_stats(name: str, stats: Stats) -> str:
+    """Format statistics as a single human-readable line.
+
+    Args:
+        name (str): Case name.
+        stats (Stats): The statistics.
+
+    Returns:
+        str: The formatted line with min, p50, p90 and p99 in microseconds.
+
+    """
+    return (
+        f"{name:<48} min {stats.min * 1e6:11.2f} us   p50 {stats.p50 * 1e6:11.2f} us   "
+        f"p90 {stats.p90 * 1e6:11.2f} us   p99 {stats.p99 * 1e6:11.2f} us"
+    )
+
+
+def format_comparison(comparison: Comparison) -> str:
+    """Format a comparison as a single human-readable line.
+
+    Args:
+        comparison (Comparison): The comparison.
+
+    Returns:
+        str: The formatted line, marked REGRESSION if the case regressed.
+
+    """
+    mark = "REGRESSION" if comparison.regressed else "ok"
+    return (
+        f"{comparison.name:<48} {comparison.baseline * 1e6:11.2f} us -> {comparison.current * 1e6:11.2f} us"
+        f"   x{comparison.ratio:5.2f}   {mark}"
+    )
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the benchmark runner's command line arguments to a parser.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser or subcommand parser.
+
+    Returns:
+        None
+
+    """
+    parser.add_argument("suites", nargs="*", metavar="suite", help=f"suites to run: {', '.join(SUITES)} (default all)")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="timed samples per case")
+    parser.add_argument(
+        "--min-sample-ms", type=float, default=DEFAULT_MIN_SAMPLE_S * 1000, help="minimum duration of one sample"
+    )
+    parser.add_argument("--save", type=Path, help="write the results to this JSON baseline file")
+    parser.add_argument("--compare", type=Path, help="compare the results against this JSON baseline file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD * 100, help="allowed slowdown in percent")
+    parser.add_argument("--metric", choices=METRICS, default="p50", help="statistic to compare")
+
+
+def run_from_args(args: argparse.Namespace) -> int:
+    """Run the benchmarks selected by parsed command line arguments and print the results.
+
+    Args:
+        args (argparse.Namespace): Arguments added by `add_arguments`.
+
+    Returns:
+        int: Process exit code: 0, 1 if any case regressed, or 2 on invalid input.
+
+    """
+    try:
+        baseline = load_baseline(args.compare) if args.compare is not None else None
+        results = run_suites(
+            args.suites or None,
+            samples=args.samples,
+            min_sample_s=args.min_sample_ms / 1000,
+            progress=lambda name, stats: print(format_stats(name, stats)),  # noqa: T201
+        )
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)  # noqa: T201
+        return 2
+    if args.save is not None:
+        save_baseline(args.save, results)
+        print(f"Saved {len(results)} result(s) to '{args.save}'.")  # noqa: T201
+    if baseline is None:
+        return 0
+    comparisons = compare(baseline, results, threshold=args.threshold / 100, metric=args.metric)
+    print(f"Compared {args.metric} against '{args.compare}' (threshold {args.threshold:g}%):")  # noqa: T201
+    for comparison in comparisons:
+        print(format_comparison(comparison))  # noqa: T201
+    return 1 if any(c.regressed for c in comparisons) else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Parse command line arguments and run the benchmarks.
+
+    Args:
+        argv (list[str] | None): The arguments, or None to use `sys.argv`.
+
+    Returns:
+        int: Process exit code, see `run_from_args`.
+
+    """
+    parser = argparse.ArgumentParser(description="Run PoEMarcut benchmarks.")
+    add_arguments(parser)
+    return run_from_args(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,53 @@
+"""Benchmark loading and saving settings with `SettingsManager`."""
+
+import tempfile
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from poemarcut import settings
+from poemarcut.bench import patched, runner
+
+
+@contextmanager
+def temporary_settings() -> Iterator[settings.SettingsManager]:
+    """Yield a settings manager with default settings, backed by a file in a temporary directory.
+
+    `settings.SETTINGS_FILE` points to that file until the context exits.
+
+    Yields:
+        settings.SettingsManager: The manager.
+
+    """
+    with tempfile.TemporaryDirectory() as tmp, patched(settings, SETTINGS_FILE=Path(tmp) / "settings.yaml"):
+        yield settings.SettingsManager()
+
+
+@contextmanager
+def cases() -> Iterator[dict[str, Callable[[], object]]]:
+    """Yield settings file round trips with default settings.
+
+    Yields:
+        dict[str, Callable[[], object]]: Cases keyed by name.
+
+    """
+    with temporary_settings() as manager:
+        current = manager.settings
+        yield {
+            "_load_settings": manager._load_settings,  # noqa: SLF001
+            "set_settings (unchanged)": lambda: manager.set_settings(current),
+        }
+
+
+def main() -> None:
+    """Run the suite and print results.
+
+    Returns:
+        None
+
+    """
+    runner.main(["settings"])
+
+
+if __name__ == "__main__":
+    main()
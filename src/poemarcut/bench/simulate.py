@@ -0,0 +1,71 @@
+"""Benchmark markdown simulation over an inventory and a grid of discount settings."""
+
+import random
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from poemarcut import simulate
+from poemarcut.bench import runner
+from poemarcut.rates import RateTable
+
+CURRENCIES = ["divine", "exalted", "chaos", "alch"]
+VALUES = [1.0, 1 / 9.5, 1 / 160.0, 1 / 1400.0]
+DISCOUNT_PERCENTS = [5, 10, 15, 20, 25]
+MAX_ACTUAL_DISCOUNTS = [10, 20, 30, 40, 50]
+
+
+def inventory(n_items: int, *, seed: int = 0) -> tuple[list[int], list[str]]:
+    """Return listed prices and currencies for a random inventory.
+
+    Args:
+        n_items (int): Number of items.
+        seed (int): Random seed.
+
+    Returns:
+        tuple[list[int], list[str]]: Prices and currencies, indexed by item.
+
+    """
+    rng = random.Random(seed)
+    return [rng.randint(1, 500) for _ in range(n_items)], [rng.choice(CURRENCIES[:3]) for _ in range(n_items)]
+
+
+@contextmanager
+def cases(n_items: int = 2000) -> Iterator[dict[str, Callable[[], object]]]:
+    """Yield one simulation with trajectories and a 5 x 5 settings sweep.
+
+    Args:
+        n_items (int): Number of items in the inventory.
+
+    Yields:
+        dict[str, Callable[[], object]]: Cases keyed by name.
+
+    """
+    table = RateTable("divine", CURRENCIES, VALUES)
+    units, cur_types = inventory(n_items)
+    policy = simulate.Policy(10, 20, 1, "chaos")
+    grid = f"{len(DISCOUNT_PERCENTS)}x{len(MAX_ACTUAL_DISCOUNTS)}"
+    cases: dict[str, Callable[[], object]] = {
+        f"simulate {n_items} items": lambda: simulate.simulate(units, cur_types, CURRENCIES, policy, table),
+        f"sweep {grid} over {n_items} items": lambda: simulate.sweep(
+            units, cur_types, CURRENCIES, table, DISCOUNT_PERCENTS, MAX_ACTUAL_DISCOUNTS, 1, "chaos"
+        ),
+    }
+    if simulate.np is not None:
+        cases[f"simulate {n_items} items (pure Python)"] = lambda: simulate.simulate(
+            units, cur_types, CURRENCIES, policy, table, use_numpy=False
+        )
+    yield cases
+
+
+def main() -> None:
+    """Run the suite and print results.
+
+    Returns:
+        None
+
+    """
+    runner.main(["simulate"])
+
+
+if __name__ == "__main__":
+    main()
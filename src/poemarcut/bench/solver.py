@@ -0,0 +1,220 @@
+"""Benchmark the currency conversion solver against a step-by-step walk down long currency chains.
+
+`stepwise_convert_and_compute_price` is the walk `logic.convert_and_compute_price`
+used before the chain solver: one rate lookup and up to two discount
+calculations per step, and a second walk for the minimum discount. It is kept
+as the reference the solver must match exactly.
+"""
+
+import math
+import random
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from poemarcut import currency, logic
+from poemarcut.bench import patched, runner
+from poemarcut.rates import RateTable
+
+LEAGUE = "Bench"
+
+
+def _stepwise_minimum_price(  # noqa: PLR0913
+    units: float,
+    current_currency: str,
+    currencies: list[str],
+    minimum_discount: int,
+    minimum_discount_currency: str,
+    get_exchange_rate: Callable[..., float],
+) -> tuple[int | None, str | None, float] | None:
+    """Walk down the chain until the price after the minimum discount is at least 1."""
+    try:
+        if current_currency == minimum_discount_currency:
+            min_amount_current = float(minimum_discount)
+        else:
+            min_amount_current = float(minimum_discount) * get_exchange_rate(
+                from_currency=minimum_discount_currency, to_currency=current_currency
+            )
+    except logic.RATE_ERRORS:
+        return None
+    target = units - min_amount_current
+    idx = currencies.index(current_currency)
+    rate_conversion = 1.0
+    while True:
+        if target >= 1.0 - 1e-9:
+            price = max(math.floor(target + 1e-9), 1)
+            original = units * rate_conversion
+            return price, current_currency, (original - price) * 100.0 / original
+        if idx == len(currencies) - 1:
+            original = units * rate_conversion
+            return 1, currencies[-1], (original - 1) * 100.0 / original
+        next_currency = currencies[idx + 1]
+        try:
+            rate = get_exchange_rate(from_currency=current_currency, to_currency=next_currency)
+        except logic.RATE_ERRORS:
+            return None
+        rate_conversion *= float(rate)
+        target *= float(rate)
+        current_currency = next_currency
+        idx += 1
+
+
+def stepwise_convert_and_compute_price(  # noqa: C901, PLR0911, PLR0913
+    original_units: int,
+    last_cur_type: str | None,
+    currencies: list[str],
+    discount_percent: int,
+    max_actual_discount: int,
+    get_exchange_rate: Callable[..., float],
+    minimum_discount: int | None = None,
+    minimum_discount_currency: str | None = None,
+) -> tuple[int | None, str | None, float]:
+    """Price an item by walking down the chain step by step, the reference for `logic.convert_and_compute_price`."""
+    calc = logic.compute_discounted_price_and_actual
+    units = int(original_units)
+    min_candidate = None
+    if (
+        minimum_discount is not None
+        and minimum_discount_currency is not None
+        and minimum_discount > 0
+        and last_cur_type
+        and last_cur_type in currencies
+        and minimum_discount_currency in currencies
+    ):
+        min_candidate = _stepwise_minimum_price(
+            float(units), last_cur_type, currencies, minimum_discount, minimum_discount_currency, get_exchange_rate
+        )
+
+    for percent in dict.fromkeys((discount_percent, max_actual_discount)):
+        discounted, actual = calc(units, percent)
+        if actual <= float(max_actual_discount):
+            if min_candidate is not None and min_candidate[2] > actual:
+                return min_candidate
+            return discounted, last_cur_type, actual
+    if min_candidate is not None:
+        return min_candidate
+    if not last_cur_type or last_cur_type not in currencies:
+        return None, None, actual
+
+    current_currency = last_cur_type
+    idx = currencies.index(current_currency)
+    cumulative_rate = 1.0
+    while idx < len(currencies) - 1:
+        next_currency = currencies[idx + 1]
+        try:
+            rate = get_exchange_rate(from_currency=current_currency, to_currency=next_currency)
+        except logic.RATE_ERRORS:
+            return None, None, actual
+        cumulative_rate *= float(rate)
+        price = int(units * cumulative_rate)
+        current_currency = next_currency
+        idx += 1
+        if price <= 0:
+            continue
+        discounted, actual = calc(price, discount_percent)
+        if actual <= float(max_actual_discount):
+            return discounted, next_currency, actual
+        if discount_percent != max_actual_discount:
+            discounted, actual = calc(price, max_actual_discount)
+            if actual <= float(max_actual_discount):
+                return discounted, next_currency, actual
+    return None, None, actual
+
+
+def chain_snapshot(length: int, *, seed: int = 0) -> currency.CurrencySnapshot:
+    """Return a snapshot with a currency chain of `length` currencies, in league `chain_league(length)`.
+
+    Adjacent currencies are worth 1.02x to 1.3x each other, like closely valued tiers, so a
+    low price needs many conversion steps before the discount fits within the maximum.
+
+    Args:
+        length (int): Number of currencies.
+        seed (int): Random seed for the values.
+
+    Returns:
+        currency.CurrencySnapshot: The snapshot; its table lists the currencies from highest to lowest.
+
+    """
+    rng = random.Random(seed)
+    names = [f"currency-{i}" for i in range(length)]
+    values = [1.0]
+    for _ in names[1:]:
+        values.append(values[-1] / rng.uniform(1.02, 1.3))
+    lines = [{"id": name, "primaryValue": value} for name, value in zip(names, values, strict=True)]
+    return currency.CurrencySnapshot(
+        game=1,
+        league=chain_league(length),
+        data={"lines": lines},
+        mtime=time.time(),
+        table=RateTable(names[0], names, values),
+    )
+
+
+def chain_league(length: int) -> str:
+    """Return the league name of the chain with `length` currencies."""
+    return f"{LEAGUE} {length}"
+
+
+def _pricers(names: list[str], league: str, settings: dict, n_items: int) -> dict[str, Callable[[], object]]:
+    """Return the step-by-step walk, the solver and the solver with a shared chain, each pricing 1..n_items."""
+
+    def get_rate(*, from_currency: str, to_currency: str) -> float:
+        return currency.get_exchange_rate(1, league, from_currency, to_currency)
+
+    def stepwise() -> None:
+        for units in range(1, n_items + 1):
+            stepwise_convert_and_compute_price(units, names[0], names, 10, 11, get_rate, **settings)
+
+    def solver() -> None:
+        for units in range(1, n_items + 1):
+            logic.convert_and_compute_price(units, names[0], names, 10, 11, get_rate, **settings)
+
+    def shared() -> None:
+        chain = logic.RateChain(names, names[0], get_rate).resolve()
+        for units in range(1, n_items + 1):
+            logic.convert_and_compute_price(units, names[0], names, 10, 11, get_rate, chain=chain, **settings)
+
+    return {"step-by-step": stepwise, "solver": solver, "shared chain": shared}
+
+
+@contextmanager
+def cases(n_items: int = 50) -> Iterator[dict[str, Callable[[], object]]]:
+    """Yield pricing items of the highest currency with a 10% discount capped at 11%.
+
+    Rates come from `currency.get_exchange_rate` on snapshots pinned in a fresh store, as on
+    the hotkey path, one league per chain length. Each chain is run without and with a minimum
+    discount of 1 of the lowest currency.
+
+    Args:
+        n_items (int): Items priced per call; their prices are 1..n_items.
+
+    Yields:
+        dict[str, Callable[[], object]]: Cases keyed by name.
+
+    """
+    snapshots = [chain_snapshot(length) for length in (4, 16, 64)]
+    cases: dict[str, Callable[[], object]] = {}
+    with patched(currency, store=currency.CurrencyStore()):
+        currency.store.pin(snapshots)
+        for snapshot in snapshots:
+            names = list(snapshot.table.ids)
+            for minimum in (None, names[-1]):
+                settings = {"minimum_discount": 1 if minimum else None, "minimum_discount_currency": minimum}
+                suffix = f"{len(names)} currencies{', minimum discount' if minimum else ''}, {n_items} items"
+                for label, func in _pricers(names, snapshot.league, settings, n_items).items():
+                    cases[f"{label} ({suffix})"] = func
+        yield cases
+
+
+def main() -> None:
+    """Run the suite and print results.
+
+    Returns:
+        None
+
+    """
+    runner.main(["solver"])
+
+
+if __name__ == "__main__":
+    main()
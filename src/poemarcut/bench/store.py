@@ -0,0 +1,52 @@
+"""Benchmark reading currency data and exchange rates through `CurrencyStore`."""
+
+import tempfile
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from poemarcut import cache, currency
+from poemarcut.bench import patched, runner
+from poemarcut.standin import currency_response
+
+LEAGUE = "Bench"
+
+
+@contextmanager
+def cases(n_lines: int = 1000) -> Iterator[dict[str, Callable[[], object]]]:
+    """Yield store lookups against a cache file in a temporary cache directory.
+
+    Nothing is fetched: every lookup passes `update=False`.
+
+    Args:
+        n_lines (int): Number of currency lines in the cached response.
+
+    Yields:
+        dict[str, Callable[[], object]]: Cases keyed by name.
+
+    """
+    with tempfile.TemporaryDirectory() as tmp, patched(cache, manager=cache.CacheManager(tmp)):
+        cache.write_cache(cache.cache_path(1, LEAGUE), currency_response(n_lines))
+        store = currency.CurrencyStore()
+        store.get_data(1, LEAGUE, update=False)
+        with patched(currency, store=store):
+            yield {
+                "get_data (memory)": lambda: store.get_data(1, LEAGUE, update=False),
+                f"get_data (disk, {n_lines} lines)": lambda: currency.CurrencyStore().get_data(1, LEAGUE, update=False),
+                "get_exchange_rate (divine -> chaos)": lambda: currency.get_exchange_rate(
+                    1, LEAGUE, "divine", "chaos", autoupdate=False
+                ),
+            }
+
+
+def main() -> None:
+    """Run the suite and print results.
+
+    Returns:
+        None
+
+    """
+    runner.main(["store"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""Portable economy snapshot bundles for PoEMarcut.
+
+A bundle is a single file holding the currency rate snapshots of several leagues,
+both games' league lists and a little metadata. Loading a bundle pins its
+snapshots in `currency.store`, so the app starts without any network requests
+and prices stay the same for the whole session, regardless of the cache files
+and of `autoupdate`.
+
+Each league snapshot is stored in the binary `sharedcache` snapshot format, so
+loading a bundle copies value vectors out instead of parsing JSON or YAML.
+The layout is a fixed header, a JSON manifest and the concatenated snapshots::
+
+    header | manifest (JSON) | snapshot 1 | snapshot 2 | ...
+"""
+
+import json
+import logging
+import struct
+import time
+import zlib
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from poemarcut import __version__, cache, currency, sharedcache
+
+MAGIC = b"PMEB"
+VERSION = 1
+# magic, version, flags, manifest bytes, manifest CRC32
+_HEADER = struct.Struct("<4sHHII")
+
+logger = logging.getLogger(__name__)
+
+
+class BundleError(ValueError):
+    """Raised when a bundle file is not a valid bundle."""
+
+
+@dataclass(frozen=True)
+class Bundle:
+    """An economy snapshot bundle.
+
+    Attributes:
+        created: Unix timestamp of when the bundle was exported.
+        app_version: The PoEMarcut version that exported the bundle.
+        snapshots: Currency snapshots by (game, league).
+        leagues: Trade league lists by game; games whose list was unavailable are missing.
+
+    """
+
+    created: float
+    app_version: str
+    snapshots: dict[tuple[int, str], currency.CurrencySnapshot]
+    leagues: dict[int, frozenset[str]] = field(default_factory=dict)
+
+
+def encode(bundle: Bundle) -> bytes:
+    """Encode a bundle as bundle file contents.
+
+    Args:
+        bundle (Bundle): The bundle to encode.
+
+    Returns:
+        bytes: The bundle file contents.
+
+    Raises:
+        ValueError: If a snapshot cannot be encoded.
+
+    """
+    entries: list[dict] = []
+    blobs: list[bytes] = []
+    offset = 0
+    for (game, league), snapshot in bundle.snapshots.items():
+        blob = sharedcache.encode(snapshot.data, mtime=snapshot.mtime, generation=0)
+        entries.append({"game": game, "league": league, "offset": offset, "length": len(blob)})
+        blobs.append(blob)
+        offset += len(blob)
+    manifest = json.dumps(
+        {
+            "created": bundle.created,
+            "app_version": bundle.app_version,
+            "leagues": {str(game): sorted(names) for game, names in bundle.leagues.items()},
+            "snapshots": entries,
+        },
+        separators=(",", ":"),
+        ensure_ascii=False,
+    ).encode("utf-8")
+    return _HEADER.pack(MAGIC, VERSION, 0, len(manifest), zlib.crc32(manifest)) + manifest + b"".join(blobs)
+
+
+def decode(payload: bytes) -> Bundle:
+    """Decode bundle file contents.
+
+    Args:
+        payload (bytes): The bundle file contents.
+
+    Returns:
+        Bundle: The decoded bundle.
+
+    Raises:
+        BundleError: If the header, manifest or any snapshot is invalid.
+
+    """
+    if len(payload) < _HEADER.size:
+        msg = "Not a PoEMarcut bundle: file is too short"
+        raise BundleError(msg)
+    magic, version, _, manifest_size, manifest_crc = _HEADER.unpack_from(payload)
+    if magic != MAGIC:
+        msg = "Not a PoEMarcut bundle"
+        raise BundleError(msg)
+    if version != VERSION:
+        msg = f"Unsupported bundle version {version}"
+        raise BundleError(msg)
+    body_start = _HEADER.size + manifest_size
+    manifest_bytes = payload[_HEADER.size : body_start]
+    if len(manifest_bytes) != manifest_size or zlib.crc32(manifest_bytes) != manifest_crc:
+        msg = "Bundle manifest is corrupt"
+        raise BundleError(msg)
+    try:
+        manifest = json.loads(manifest_bytes)
+        leagues = {int(game): frozenset(names) for game, names in manifest["leagues"].items()}
+        entries = [
+            (int(entry["game"]), str(entry["league"]), int(entry["offset"]), int(entry["length"]))
+            for entry in manifest["snapshots"]
+        ]
+        created, app_version = float(manifest["created"]), str(manifest["app_version"])
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        msg = "Bundle manifest is invalid"
+        raise BundleError(msg) from e
+
+    body = memoryview(payload)[body_start:]
+    snapshots: dict[tuple[int, str], currency.CurrencySnapshot] = {}
+    for game, league, offset, length in entries:
+        shared = sharedcache.decode(body[offset : offset + length]) if offset + length <= len(body) else None
+        if shared is None:
+            msg = f"Bundle snapshot for PoE{game} '{league}' is corrupt"
+            raise BundleError(msg)
+        snapshots[(game, league)] = currency.CurrencySnapshot(
+            game=game, league=league, data=shared.data, mtime=shared.mtime, table=shared.table
+        )
+    return Bundle(created=created, app_version=app_version, snapshots=snapshots, leagues=leagues)
+
+
+def collect(targets: Iterable[tuple[int, str]], *, update: bool = True) -> Bundle:
+    """Build a bundle from the current currency data of several leagues.
+
+    Leagues are loaded through `currency.store`, so cached data is reused and only
+    expired leagues are fetched. Leagues without valid data are left out.
+
+    Args:
+        targets (Iterable[tuple[int, str]]): (game, league) pairs to include.
+        update (bool): Whether to fetch fresh data from API if cache is stale.
+
+    Returns:
+        Bundle: The bundle.
+
+    """
+    results = currency.store.warm(targets, update=update)
+    snapshots = {key: result.snapshot for key, result in results.items() if result.ok and result.snapshot is not None}
+    for key in results:
+        if key not in snapshots:
+            logger.warning("Leaving PoE%s '%s' out of the bundle: no currency data", *key)
+    leagues: dict[int, frozenset[str]] = {}
+    for game in (1, 2):
+        try:
+            names = currency.get_leagues(game)
+        except (LookupError, TypeError, ValueError, OSError):
+            logger.exception("Error retrieving leagues for PoE%s", game)
+            names = None
+        if names:
+            leagues[game] = frozenset(names)
+    return Bundle(created=time.time(), app_version=__version__, snapshots=snapshots, leagues=leagues)
+
+
+def export(path: Path, targets: Iterable[tuple[int, str]], *, update: bool = True) -> Bundle:
+    """Collect the current data of several leagues and write it to a bundle file.
+
+    Args:
+        path (Path): The bundle file path.
+        targets (Iterable[tuple[int, str]]): (game, league) pairs to include.
+        update (bool): Whether to fetch fresh data from API if cache is stale.
+
+    Returns:
+        Bundle: The exported bundle.
+
+    Raises:
+        OSError: If the file cannot be written.
+
+    """
+    bundle = collect(targets, update=update)
+    cache.atomic_write_bytes(path, encode(bundle))
+    logger.info("Exported %d league snapshot(s) to bundle '%s'", len(bundle.snapshots), path)
+    return bundle
+
+
+def read(path: Path) -> Bundle:
+    """Read a bundle file.
+
+    Args:
+        path (Path): The bundle file path.
+
+    Returns:
+        Bundle: The bundle.
+
+    Raises:
+        OSError: If the file cannot be read.
+        BundleError: If the file is not a valid bundle.
+
+    """
+    return decode(path.read_bytes())
+
+
+def pin(bundle: Bundle) -> None:
+    """Pin a bundle's snapshots and league lists in `currency.store` for the rest of the session.
+
+    Args:
+        bundle (Bundle): The bundle to pin.
+
+    Returns:
+        None
+
+    """
+    currency.store.pin(bundle.snapshots.values(), leagues=bundle.leagues)
+
+
+def load(path: Path) -> Bundle:
+    """Read a bundle file and pin it.
+
+    Args:
+        path (Path): The bundle file path.
+
+    Returns:
+        Bundle: The pinned bundle.
+
+    Raises:
+        OSError: If the file cannot be read.
+        BundleError: If the file is not a valid bundle.
+
+    """
+    bundle = read(path)
+    pin(bundle)
+    logger.info(
+        "Loaded bundle '%s' (exported %s) with %d league snapshot(s)",
+        path,
+        time.ctime(bundle.created),
+        len(bundle.snapshots),
+    )
+    return bundle
@@ -0,0 +1,466 @@
+"""Currency cache file handling for PoEMarcut.
+
+Cache files hold poe.ninja responses as compact, versioned JSON documents.
+Writes are atomic (write to a temporary file, then rename), and legacy
+`{league}-{game}.yaml` cache files are migrated transparently.
+
+Cache files live in a dedicated `poemarcut` subdirectory of the configured cache
+directory, and every file that may be evicted carries the `FILE_PREFIX` prefix.
+How many are kept is controlled by the module-level `manager`, which evicts files
+for leagues that are no longer used and never touches files it did not write.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import yaml
+
+from poemarcut.constants import CURRENCY_CATEGORY, S_IN_HOUR
+
+CACHE_FORMAT = "poemarcut-currency-cache"
+CACHE_FORMAT_VERSION = 1
+
+# Cache files not refreshed for this long belong to leagues that are no longer used.
+DEFAULT_MAX_AGE_S = 14 * 24 * S_IN_HOUR
+# Upper bound on the total size of all currency cache files.
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+# Temporary files left behind by an interrupted write are removed after this long.
+STALE_TEMP_AGE_S = S_IN_HOUR
+
+# Subdirectory of the cache directory that holds all of PoEMarcut's cache files.
+APP_DIRNAME = "poemarcut"
+# Prefix of every cache file name that eviction may remove.
+FILE_PREFIX = "pmc-"
+
+# Cache file names are `pmc-{league}-{game}.json`, with shared snapshots in `pmc-{league}-{game}.snap`
+# and their writer locks in `pmc-{league}-{game}.lock`; eviction only ever touches files matching these.
+_CACHE_GLOBS = tuple(f"{FILE_PREFIX}*-{game}.{ext}" for ext in ("json", "snap", "lock") for game in (1, 2))
+_TEMP_GLOB = f".{FILE_PREFIX}*.tmp"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """Cached currency data together with the HTTP validators of the response it came from.
+
+    Attributes:
+        data: The poe.ninja currency API response dict.
+        etag: The response ETag, if the server sent one.
+        last_modified: The response Last-Modified header, if the server sent one.
+
+    """
+
+    data: dict
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class CacheManager:
+    """Location and size limits of the currency cache directory.
+
+    Files are kept in the `APP_DIRNAME` subdirectory of the configured directory. The configured
+    directory defaults to the current working directory, resolved on each use so that it follows
+    `os.chdir` like the original relative cache paths did.
+    """
+
+    def __init__(
+        self,
+        directory: Path | str | None = None,
+        *,
+        max_age: float = DEFAULT_MAX_AGE_S,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        """Initialize the manager.
+
+        Args:
+            directory (Path | str | None): Cache directory, or None for the current working directory.
+            max_age (float): Seconds after its last refresh that a cache file is evicted.
+            max_bytes (int): Maximum total size of all cache files in bytes.
+
+        Returns:
+            None
+
+        """
+        self._directory: Path | None = None
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.configure(directory)
+
+    @property
+    def root(self) -> Path:
+        """Return the configured cache directory, which holds the app subdirectory and legacy cache files."""
+        return self._directory if self._directory is not None else Path.cwd()
+
+    @property
+    def directory(self) -> Path:
+        """Return the app subdirectory that holds the cache files."""
+        return self.root / APP_DIRNAME
+
+    def file(self, name: str) -> Path:
+        """Return the path of an evictable cache file.
+
+        Args:
+            name (str): The file name without `FILE_PREFIX`.
+
+        Returns:
+            Path: The prefixed file path in the app subdirectory.
+
+        """
+        return self.directory / f"{FILE_PREFIX}{name}"
+
+    def configure(
+        self, directory: Path | str | None = None, *, max_age: float | None = None, max_bytes: int | None = None
+    ) -> None:
+        """Change the cache directory and, optionally, the eviction limits.
+
+        Args:
+            directory (Path | str | None): Cache directory, or None/empty for the current working directory.
+            max_age (float | None): New maximum age in seconds, or None to keep the current one.
+            max_bytes (int | None): New maximum total size in bytes, or None to keep the current one.
+
+        Returns:
+            None
+
+        """
+        self._directory = Path(directory).expanduser() if directory else None
+        if max_age is not None:
+            self.max_age = max_age
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+
+    def path(self, game: int, league: str, category: str = CURRENCY_CATEGORY) -> Path:
+        """Return the cache file path for the specified game, league and poe.ninja category.
+
+        Currency is stored as `pmc-{league}-{game}.json` and other categories as
+        `pmc-{league}.{category}-{game}.json`, so that eviction covers them as well.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name.
+            category (str): The poe.ninja overview type.
+
+        Returns:
+            Path: The cache file path.
+
+        """
+        if category == CURRENCY_CATEGORY:
+            return self.file(f"{league}-{game}.json")
+        return self.file(f"{league}.{category.lower()}-{game}.json")
+
+    def legacy_path(self, game: int, league: str) -> Path:
+        """Return the pre-JSON YAML cache file path for the specified game and league.
+
+        Legacy cache files were written directly in the configured directory.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name.
+
+        Returns:
+            Path: The legacy YAML cache file path.
+
+        """
+        return self.root / f"{league}-{game}.yaml"
+
+    def evict(self, *, keep: frozenset[Path] | set[Path] = frozenset(), now: float | None = None) -> list[Path]:
+        """Remove cache files that are too old, then the least recently refreshed ones until under the size limit.
+
+        Leftover temporary files from interrupted writes are removed as well.
+
+        Args:
+            keep (frozenset[Path] | set[Path]): Cache files that must not be evicted, e.g. the active league.
+            now (float | None): The current Unix timestamp, or None to use the current time.
+
+        Returns:
+            list[Path]: The files that were removed.
+
+        """
+        directory = self.directory
+        now = time.time() if now is None else now
+        removed: list[Path] = []
+
+        for tmp in directory.glob(_TEMP_GLOB):
+            try:
+                if now - tmp.stat().st_mtime > STALE_TEMP_AGE_S:
+                    tmp.unlink()
+                    removed.append(tmp)
+            except OSError:
+                logger.debug("Could not remove temporary cache file '%s'", tmp)
+
+        files: list[tuple[float, int, Path]] = []
+        for pattern in _CACHE_GLOBS:
+            for path in directory.glob(pattern):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+        files.sort()  # least recently refreshed first
+
+        keep = {Path(p) for p in keep}
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            if path in keep:
+                continue
+            if now - mtime <= self.max_age and total <= self.max_bytes:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                logger.warning("Could not evict cache file '%s'", path)
+                continue
+            total -= size
+            removed.append(path)
+
+        if removed:
+            logger.info("Evicted %d currency cache file(s) from '%s'", len(removed), directory)
+        return removed
+
+
+# Module-level cache manager used by `currency`. Reconfigure it with `manager.configure(...)`.
+manager = CacheManager()
+
+
+def cache_path(game: int, league: str, category: str = CURRENCY_CATEGORY) -> Path:
+    """Return the cache file path for the specified game, league and poe.ninja category.
+
+    Args:
+        game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+        league (str): The league name.
+        category (str): The poe.ninja overview type.
+
+    Returns:
+        Path: The cache file path.
+
+    """
+    return manager.path(game, league, category)
+
+
+def legacy_cache_path(game: int, league: str) -> Path:
+    """Return the pre-JSON YAML cache file path for the specified game and league.
+
+    Args:
+        game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+        league (str): The league name.
+
+    Returns:
+        Path: The legacy YAML cache file path.
+
+    """
+    return manager.legacy_path(game, league)
+
+
+def league_cache_path(game: int) -> Path:
+    """Return the league list cache file path for the specified game.
+
+    The name deliberately has no `FILE_PREFIX`, so league lists are never evicted as stale
+    currency data.
+
+    Args:
+        game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+
+    Returns:
+        Path: The league list cache file path.
+
+    """
+    return manager.directory / f"leagues-poe{game}.json"
+
+
+def atomic_write_bytes(path: Path, payload: bytes) -> None:
+    """Write `payload` to `path` atomically.
+
+    The payload is written to a temporary file in the same directory and then
+    renamed over `path`, so readers never observe a partially written file.
+
+    Args:
+        path (Path): Destination file path.
+        payload (bytes): The bytes to write.
+
+    Returns:
+        None
+
+    Raises:
+        OSError: If the file cannot be written or renamed.
+
+    """
+    directory = path.parent
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        Path(tmp_name).replace(path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def encode_cache(data: dict, *, etag: str | None = None, last_modified: str | None = None) -> bytes:
+    """Encode currency data as a versioned cache document.
+
+    Args:
+        data (dict): The poe.ninja currency API response dict.
+        etag (str | None): The response ETag, kept for conditional requests.
+        last_modified (str | None): The response Last-Modified header, kept for conditional requests.
+
+    Returns:
+        bytes: The encoded cache document.
+
+    """
+    document = {
+        "format": CACHE_FORMAT,
+        "version": CACHE_FORMAT_VERSION,
+        "etag": etag,
+        "last_modified": last_modified,
+        "data": data,
+    }
+    return json.dumps(document, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def decode_cache(payload: bytes) -> CacheEntry | None:
+    """Decode a versioned cache document.
+
+    Args:
+        payload (bytes): The raw cache file contents.
+
+    Returns:
+        CacheEntry | None: The cache entry, or None if the document is invalid or an unknown version.
+
+    """
+    try:
+        document = json.loads(payload)
+    except (ValueError, UnicodeDecodeError):
+        logger.exception("Error decoding cache file")
+        return None
+    if (
+        not isinstance(document, dict)
+        or document.get("format") != CACHE_FORMAT
+        or document.get("version") != CACHE_FORMAT_VERSION
+        or not isinstance(document.get("data"), dict)
+    ):
+        logger.warning("Ignoring cache file with unknown format or version")
+        return None
+    etag = document.get("etag")
+    last_modified = document.get("last_modified")
+    return CacheEntry(
+        data=document["data"],
+        etag=etag if isinstance(etag, str) else None,
+        last_modified=last_modified if isinstance(last_modified, str) else None,
+    )
+
+
+def read_entry(path: Path) -> CacheEntry | None:
+    """Read a cache entry from a cache file.
+
+    Args:
+        path (Path): The cache file path.
+
+    Returns:
+        CacheEntry | None: The cache entry, or None if the file is missing or invalid.
+
+    """
+    try:
+        payload = path.read_bytes()
+    except OSError:
+        logger.exception("Error reading cache file")
+        return None
+    return decode_cache(payload)
+
+
+def read_cache(path: Path) -> dict | None:
+    """Read currency data from a cache file.
+
+    Args:
+        path (Path): The cache file path.
+
+    Returns:
+        dict | None: The cached currency data, or None if the file is missing or invalid.
+
+    """
+    entry = read_entry(path)
+    return entry.data if entry is not None else None
+
+
+def write_cache(path: Path, data: dict, *, etag: str | None = None, last_modified: str | None = None) -> None:
+    """Atomically write currency data to a cache file.
+
+    Args:
+        path (Path): The cache file path.
+        data (dict): The poe.ninja currency API response dict.
+        etag (str | None): The response ETag, kept for conditional requests.
+        last_modified (str | None): The response Last-Modified header, kept for conditional requests.
+
+    Returns:
+        None
+
+    Raises:
+        OSError: If the file cannot be written.
+
+    """
+    atomic_write_bytes(path, encode_cache(data, etag=etag, last_modified=last_modified))
+
+
+def touch(path: Path) -> float:
+    """Mark a cache file as freshly validated by updating its mtime to now.
+
+    Args:
+        path (Path): The cache file path.
+
+    Returns:
+        float: The new mtime.
+
+    Raises:
+        OSError: If the file does not exist or cannot be updated.
+
+    """
+    os.utime(path)
+    return path.stat().st_mtime
+
+
+def migrate_legacy_cache(game: int, league: str) -> bool:
+    """Convert a legacy YAML cache file to the JSON cache format, if one exists.
+
+    The converted file keeps the legacy file's mtime so cache freshness is unaffected.
+    The legacy file is removed after a successful conversion.
+
+    Args:
+        game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+        league (str): The league name.
+
+    Returns:
+        bool: True if a legacy cache file was migrated.
+
+    """
+    legacy = legacy_cache_path(game, league)
+    target = cache_path(game, league)
+    if target.exists() or not legacy.exists():
+        return False
+
+    try:
+        mtime = legacy.stat().st_mtime
+        with legacy.open("r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError):
+        logger.exception("Error reading legacy cache file '%s'", legacy)
+        return False
+    if not isinstance(data, dict):
+        logger.warning("Legacy cache file '%s' does not contain a mapping; not migrating", legacy)
+        return False
+
+    try:
+        write_cache(target, data)
+        os.utime(target, (mtime, mtime))
+        legacy.unlink()
+    except OSError:
+        logger.exception("Error migrating legacy cache file '%s'", legacy)
+        return False
+    logger.info("Migrated legacy cache file '%s' to '%s'", legacy, target)
+    return True
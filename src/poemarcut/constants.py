@@ -4,6 +4,10 @@ from types import MappingProxyType
 
 S_IN_HOUR = 3600
 
+# poe.ninja exchange overview `type` for currency. Other categories (e.g. "Fragment", "Essence",
+# "Scarab", "Omen") use the same endpoint and response layout and can be enabled in the settings.
+CURRENCY_CATEGORY = "Currency"
+
 BOLD = "\033[1m"  # ANSI escape bold
 RESET = "\033[0m"  # ANSI escape reset
 
@@ -1,20 +1,28 @@
 """Currency economy data handling functions for PoEMarcut."""
 
 import logging
+import threading
 import time
-from math import ceil
-from pathlib import Path
-from typing import TypeGuard
+from bisect import bisect_right
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from enum import Enum
+from itertools import pairwise
+from math import ceil, isnan
+from threading import Lock
+from typing import Any, TypeGuard
 
 import requests
-import yaml
 
-from poemarcut import __version__
-from poemarcut.constants import S_IN_HOUR
+from poemarcut import cache, history, net, providers, sharedcache
+from poemarcut.constants import CURRENCY_CATEGORY, S_IN_HOUR
+from poemarcut.rates import PriceIndex, RateTable
 
 YamlDict = dict[str, object]
 
-USER_AGENT = "poemarcut/" + __version__ + " (+https://github.com/cdrg/poemarcut)"
+USER_AGENT = net.USER_AGENT
 
 # poe.ninja has custom aliases for currently active leagues and events.
 # These are not official and will not work on pathofexile.com endpoints.
@@ -76,24 +84,558 @@ def _has_primary_price_line(data: object) -> bool:
     return any(isinstance(line, dict) and line.get("id") == primary for line in lines)
 
 
+def _is_valid_response(data: dict) -> bool:
+    """Return True if provider data has the expected schema and a primary price line or no lines at all."""
+    return _response_has_expected_schema(data) and (_has_primary_price_line(data) or _is_empty_market_response(data))
+
+
+def _poe_ninja_url(game: int) -> str:
+    """Return the poe.ninja exchange overview URL for a game."""
+    if game == 1:
+        return POE1_CURRENCY_API_URL
+    if game == 2:  # noqa: PLR2004
+        return POE2_CURRENCY_API_URL
+    msg = f"Invalid game '{game}', must be 1 or 2"
+    raise ValueError(msg)
+
+
+def provider_from_spec(spec: str) -> providers.Provider:
+    """Create a provider from a settings entry.
+
+    Args:
+        spec (str): "poeninja", "ggg", or "file:<path>" where the path may contain
+            `{game}`, `{league}` and `{category}` placeholders.
+
+    Returns:
+        providers.Provider: The provider.
+
+    Raises:
+        ValueError: If the spec is not recognized.
+
+    """
+    if spec == providers.PoeNinjaProvider.name:
+        return providers.PoeNinjaProvider(_poe_ninja_url)
+    if spec == providers.GGGExchangeProvider.name:
+        return providers.GGGExchangeProvider()
+    if spec.startswith("file:") and len(spec) > len("file:"):
+        return providers.FileProvider(spec.removeprefix("file:"))
+    msg = f"Unknown price provider '{spec}'"
+    raise ValueError(msg)
+
+
+def configure_providers(specs: Iterable[str], *, hedge_delay: float | None = None) -> None:
+    """Configure the providers currency data is fetched from, in order of preference.
+
+    Args:
+        specs (Iterable[str]): Provider specs, see `provider_from_spec`.
+        hedge_delay (float | None): Seconds to wait for a provider before also asking the next one,
+            or None to keep the current delay.
+
+    Returns:
+        None
+
+    """
+    fetcher.configure([provider_from_spec(spec) for spec in specs], hedge_delay=hedge_delay)
+
+
+# Fetches currency data from the configured providers. Defaults to poe.ninja only.
+fetcher = providers.HedgedFetcher([providers.PoeNinjaProvider(_poe_ninja_url)])
+
+
+# Cached league lists younger than this are used without asking the trade API.
+LEAGUES_TTL_S = 6 * S_IN_HOUR
+# Maximum number of leagues fetched concurrently by `CurrencyStore.warm`.
+DEFAULT_WARM_WORKERS = 4
+# In-memory snapshot limits: at most this many leagues, each dropped after this long without a lookup.
+DEFAULT_MAX_SNAPSHOTS = 8
+DEFAULT_SNAPSHOT_MAX_IDLE_S = 6 * S_IN_HOUR
+
 logger = logging.getLogger(__name__)
 
 
-class CurrencyStore:
-    """Store of currency economy data by official league name.
+@dataclass(frozen=True)
+class CurrencySnapshot:
+    """Parsed currency data for one game and league.
+
+    Snapshots are never mutated after creation; a refresh publishes a new snapshot instead.
+
+    Attributes:
+        game: The game version, either 1 (PoE1) or 2 (PoE2).
+        league: The official league name.
+        data: The poe.ninja currency API response dict, including the added `mtime` key.
+        mtime: The cache file mtime (or fetch time) the data corresponds to.
+        table: Indexed rate table built once from `data`.
+        stale: True if the API could not be reached and this is older data served as a fallback.
+
+    """
+
+    game: int
+    league: str
+    data: dict
+    mtime: float
+    table: RateTable
+    stale: bool = False
+
+
+@dataclass(frozen=True)
+class WarmResult:
+    """Outcome of warming one league in `CurrencyStore.warm`.
+
+    Attributes:
+        game: The game version, either 1 (PoE1) or 2 (PoE2).
+        league: The league name.
+        snapshot: The loaded snapshot, or None if no valid data could be retrieved.
+        error: The exception raised while loading, if any.
+
+    """
+
+    game: int
+    league: str
+    snapshot: CurrencySnapshot | None
+    error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the league was loaded without error and has data."""
+        return self.error is None and self.snapshot is not None
+
+
+@dataclass(frozen=True)
+class PriceSnapshot:
+    """Unified price index over several poe.ninja categories for one game and league.
+
+    Attributes:
+        game: The game version, either 1 (PoE1) or 2 (PoE2).
+        league: The official league name.
+        categories: The categories that were requested, currency first.
+        mtimes: The data mtime of each category that was loaded; failed categories are missing.
+        index: The price index built from the loaded categories.
 
-    GGG only updates the currency exchange API once per hour.
     """
 
+    game: int
+    league: str
+    categories: tuple[str, ...]
+    mtimes: dict[str, float]
+    index: PriceIndex
+
+
+class _Flight:
+    """An in-flight snapshot load that concurrent callers for the same league wait on."""
+
+    __slots__ = ("done", "error", "result")
+
     def __init__(self) -> None:
+        """Initialize the flight.
+
+        Returns:
+            None
+
+        """
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class _SnapshotState(Enum):
+    """Freshness of an in-memory snapshot relative to its cache file and the one-hour rule."""
+
+    CURRENT = "current"
+    CHANGED = "changed"
+    EXPIRED = "expired"
+
+
+class CurrencyStore:
+    """Store of currency economy data by game and official league name.
+
+    GGG only updates the currency exchange API once per hour, so parsed data is kept in memory
+    and only revalidated against the one-hour freshness rule and the cache file mtime.
+
+    With stale-while-revalidate enabled, an expired snapshot is still returned immediately and
+    refreshed on a background thread, so lookups on the hotkey path never wait for the network.
+
+    Memory is bounded: the least recently used snapshots are dropped beyond `max_snapshots`,
+    and snapshots not looked up for `max_idle` seconds are dropped as well.
+
+    Besides currency, other poe.ninja categories configured with `set_categories` are fetched
+    in parallel and merged into one `PriceIndex` per league by `get_price_index`. Only the
+    index is kept in memory (at most `max_snapshots` of them); the category responses are
+    discarded once it is built, and their cache files are evicted with the currency ones.
+
+    The store is safe to use from several threads. Loads are single-flight per (game, league):
+    concurrent callers that need the same league wait on one fetch instead of each downloading
+    and writing the same cache file.
+
+    With `shared` enabled (it is off by default), loads are also single-flight across processes:
+    fetched rate tables are published to `sharedcache.snapshots`, and a process that finds a current
+    shared snapshot uses it without fetching or parsing the JSON cache. A load waits only briefly
+    for another process's fetch before fetching privately.
+
+    Snapshots can also be pinned with `pin`, e.g. from an exported bundle: pinned leagues are
+    served as is for the rest of the session, never revalidated or fetched, so prices stay stable
+    and lookups need no network.
+    """
+
+    def __init__(
+        self,
+        *,
+        stale_while_revalidate: bool = True,
+        max_snapshots: int = DEFAULT_MAX_SNAPSHOTS,
+        max_idle: float = DEFAULT_SNAPSHOT_MAX_IDLE_S,
+        shared: bool = False,
+    ) -> None:
         """Initialize the store.
 
+        Args:
+            stale_while_revalidate (bool): Serve expired snapshots while refreshing them in the background.
+            max_snapshots (int): Maximum number of league snapshots kept in memory.
+            max_idle (float): Seconds without a lookup after which a snapshot is dropped from memory.
+            shared (bool): Share fetched snapshots with other PoEMarcut processes.
+
         Returns:
             None
 
         """
-        self.currency_data_by_league: dict[str, dict] = {}
-        self.last_updated: float = 0.0
+        # Ordered from least to most recently used.
+        self._snapshots: OrderedDict[tuple[int, str], CurrencySnapshot] = OrderedDict()
+        self._last_used: dict[tuple[int, str], float] = {}
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_snapshots = max_snapshots
+        self.max_idle = max_idle
+        self.shared = shared
+        self.evictions: int = 0
+        self.shared_hits: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.stale_hits: int = 0
+        self.coalesced: int = 0
+        # Guards `_snapshots`, `_inflight` and the counters. Never held while fetching.
+        self._lock = Lock()
+        self._inflight: dict[tuple, _Flight] = {}
+        self._indexes: OrderedDict[tuple[int, str], PriceSnapshot] = OrderedDict()
+        self._categories: dict[int, tuple[str, ...]] = {1: (CURRENCY_CATEGORY,), 2: (CURRENCY_CATEGORY,)}
+        self._refresh_lock = Lock()
+        self._refreshing: set[tuple[int, str]] = set()
+        self._pinned: dict[tuple[int, str], CurrencySnapshot] = {}
+        self._pinned_leagues: dict[int, frozenset[str]] = {}
+
+    def get_snapshot(self, game: int, league: str, *, update: bool) -> CurrencySnapshot | None:
+        """Return the current snapshot for the specified game and league, loading it if needed.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name to fetch currency prices for.
+            update (bool): Whether to fetch fresh data from API if cache is stale.
+
+        Returns:
+            CurrencySnapshot | None: The current snapshot, or None if no valid data could be retrieved.
+
+        """
+        if game not in (1, 2):
+            msg = "Invalid game, must be 1 or 2"
+            raise ValueError(msg)
+
+        key = (game, league)
+        with self._lock:
+            pinned = self._pinned.get(key)
+            if pinned is not None:
+                self.hits += 1
+                return pinned
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None:
+                self._touch_locked(key)
+        if snapshot is not None:
+            state = _snapshot_state(snapshot, update=update)
+            if state is _SnapshotState.CURRENT:
+                with self._lock:
+                    self.hits += 1
+                return snapshot
+            if state is _SnapshotState.EXPIRED and self.stale_while_revalidate:
+                with self._lock:
+                    self.stale_hits += 1
+                self.refresh_in_background(game, league)
+                return snapshot
+
+        return self._load(game, league, update=update)
+
+    def warm(
+        self, targets: Iterable[tuple[int, str]], *, update: bool, max_workers: int = DEFAULT_WARM_WORKERS
+    ) -> dict[tuple[int, str], WarmResult]:
+        """Load snapshots for several leagues in parallel through a bounded thread pool.
+
+        Startup latency is then roughly the slowest single fetch rather than the sum of all fetches.
+
+        Args:
+            targets (Iterable[tuple[int, str]]): (game, league) pairs to load. Duplicates are loaded once.
+            update (bool): Whether to fetch fresh data from API if cache is stale.
+            max_workers (int): Maximum number of concurrent fetches.
+
+        Returns:
+            dict[tuple[int, str], WarmResult]: Per-league results, in the order of `targets`.
+
+        """
+        keys = list(dict.fromkeys(targets))
+        if not keys:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(keys))), thread_name_prefix="warm") as pool:
+            futures = {key: pool.submit(self.get_snapshot, key[0], key[1], update=update) for key in keys}
+            wait(futures.values())
+        results: dict[tuple[int, str], WarmResult] = {}
+        for (game, league), future in futures.items():
+            error = future.exception()
+            if error is not None:
+                logger.error("Failed to load currency prices for PoE%s '%s': %s", game, league, error)
+            results[(game, league)] = WarmResult(
+                game=game, league=league, snapshot=None if error is not None else future.result(), error=error
+            )
+        return results
+
+    def refresh(self, game: int, league: str) -> CurrencySnapshot | None:
+        """Revalidate the snapshot for the specified game and league against the API now.
+
+        Unlike `get_snapshot`, this ignores the one-hour freshness window. The request is
+        conditional, so an unchanged market only costs a 304.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name to fetch currency prices for.
+
+        Returns:
+            CurrencySnapshot | None: The refreshed snapshot, the previous one if the refresh failed,
+                or None if no valid data is available.
+
+        """
+        return self._load(game, league, update=True, force=True)
+
+    def refresh_in_background(self, game: int, league: str) -> bool:
+        """Start a background refresh of an expired snapshot unless one is already running.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name to fetch currency prices for.
+
+        Returns:
+            bool: True if a new background refresh was started.
+
+        """
+        key = (game, league)
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+        try:
+            threading.Thread(
+                target=self._background_refresh, args=(game, league), name=f"refresh-{league}-{game}", daemon=True
+            ).start()
+        except RuntimeError:
+            logger.exception("Failed to start background refresh for PoE%s '%s'", game, league)
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+            return False
+        return True
+
+    def _background_refresh(self, game: int, league: str) -> None:
+        """Refresh a snapshot on a background thread.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name to fetch currency prices for.
+
+        Returns:
+            None
+
+        """
+        try:
+            self._load(game, league, update=True)
+        except (LookupError, ValueError, TypeError, OSError):
+            logger.exception("Background refresh failed for PoE%s '%s'", game, league)
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard((game, league))
+
+    def _load(self, game: int, league: str, *, update: bool, force: bool = False) -> CurrencySnapshot | None:
+        """Load a snapshot from the cache file or API and publish it, coalescing concurrent loads.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name to fetch currency prices for.
+            update (bool): Whether to fetch fresh data from API if cache is stale.
+            force (bool): Revalidate against the API even if the cache file is fresh.
+
+        Returns:
+            CurrencySnapshot | None: The new snapshot, the previous one if loading failed, or None.
+
+        """
+        with self._lock:
+            pinned = self._pinned.get((game, league))
+        if pinned is not None:
+            return pinned
+        return self._single_flight((game, league), lambda: self._fetch(game, league, update=update, force=force))
+
+    def _single_flight(self, key: tuple, load: Callable[[], Any]) -> Any:
+        """Run `load` once for concurrent callers with the same key.
+
+        The first caller for a key performs the load; callers arriving while it is
+        in flight wait for it and share its result or exception.
+
+        Args:
+            key (tuple): Identifies the load, e.g. (game, league).
+            load (Callable[[], Any]): Performs the load and publishes its result.
+
+        Returns:
+            Any: The result of `load`.
+
+        """
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = load()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+        return flight.result
+
+    def _fetch(self, game: int, league: str, *, update: bool, force: bool) -> CurrencySnapshot | None:
+        """Load the league's snapshot from the shared snapshot cache or by retrieving currency data.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name to fetch currency prices for.
+            update (bool): Whether to fetch fresh data from API if cache is stale.
+            force (bool): Revalidate against the API even if the cache file is fresh.
+
+        Returns:
+            CurrencySnapshot | None: The new snapshot, the previous one if loading failed, or None.
+
+        """
+        if not self.shared:
+            return self._fetch_and_publish(game, league, update=update, force=force)
+        if not force and (snapshot := self._from_shared(game, league, update=update)) is not None:
+            return snapshot
+        with sharedcache.snapshots.writer_lock(game, league) as locked:
+            # Another process may have published the league while this one waited for the lock.
+            if not force and (snapshot := self._from_shared(game, league, update=update)) is not None:
+                return snapshot
+            # Only the lock holder publishes; without the lock this is a private fetch.
+            return self._fetch_and_publish(game, league, update=update, force=force, share=locked)
+
+    def _from_shared(self, game: int, league: str, *, update: bool) -> CurrencySnapshot | None:
+        """Publish the league's shared snapshot if it is current.
+
+        A shared snapshot is current if it matches the JSON cache file and, when updating is
+        enabled, is within the one-hour freshness window.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name.
+            update (bool): Whether fetching fresh data from the API is enabled.
+
+        Returns:
+            CurrencySnapshot | None: The published snapshot, or None if there is no current shared snapshot.
+
+        """
+        try:
+            shared = sharedcache.snapshots.read(game, league)
+            file_mtime = cache.cache_path(game, league).stat().st_mtime
+        except OSError:
+            return None
+        if shared is None or shared.mtime != file_mtime or (update and shared.mtime <= time.time() - S_IN_HOUR):
+            return None
+        logger.info("Currency prices for PoE%s '%s' loaded from shared snapshot %d", game, league, shared.generation)
+        snapshot = CurrencySnapshot(game=game, league=league, data=shared.data, mtime=shared.mtime, table=shared.table)
+        with self._lock:
+            self.shared_hits += 1
+            self._snapshots[(game, league)] = snapshot
+            self._touch_locked((game, league))
+        return snapshot
+
+    def _fetch_and_publish(
+        self, game: int, league: str, *, update: bool, force: bool, share: bool = False
+    ) -> CurrencySnapshot | None:
+        """Retrieve currency data, publish it as the league's snapshot and optionally share it with other processes.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name to fetch currency prices for.
+            update (bool): Whether to fetch fresh data from API if cache is stale.
+            force (bool): Revalidate against the API even if the cache file is fresh.
+            share (bool): Publish the fetched data to `sharedcache.snapshots`.
+
+        Returns:
+            CurrencySnapshot | None: The new snapshot, the previous one if loading failed, or None.
+
+        """
+        key = (game, league)
+        data = _retrieve_currency_prices(game, league, update=update, force=force)
+        stale = bool(data.pop("stale", False))
+        mtime = data.get("mtime")
+        if not isinstance(mtime, (int, float)):
+            # Invalid or missing data is never cached so the next call retries,
+            # but a previously loaded snapshot is better than nothing.
+            with self._lock:
+                previous = self._snapshots.get(key)
+            return replace(previous, stale=True) if previous is not None and update else previous
+
+        snapshot = CurrencySnapshot(
+            game=game,
+            league=league,
+            data=data,
+            mtime=float(mtime),
+            table=RateTable.from_response(data),
+            stale=stale,
+        )
+        with self._lock:
+            self._snapshots[key] = snapshot
+            self._touch_locked(key)
+        if share and not stale:
+            try:
+                sharedcache.snapshots.publish(game, league, data, mtime=snapshot.mtime)
+            except (OSError, ValueError):
+                logger.exception("Error publishing shared currency snapshot")
+        return snapshot
+
+    def _touch_locked(self, key: tuple[int, str]) -> None:
+        """Mark a snapshot as most recently used and evict snapshots over the count or idle limits.
+
+        Must be called with `_lock` held.
+
+        Args:
+            key (tuple[int, str]): The (game, league) that was just used.
+
+        Returns:
+            None
+
+        """
+        now = time.monotonic()
+        self._snapshots.move_to_end(key)
+        self._last_used[key] = now
+        while self._snapshots:
+            oldest = next(iter(self._snapshots))
+            if oldest == key:
+                break
+            if len(self._snapshots) <= self.max_snapshots and now - self._last_used[oldest] <= self.max_idle:
+                break
+            del self._snapshots[oldest]
+            del self._last_used[oldest]
+            self.evictions += 1
+            logger.debug("Evicted in-memory currency snapshot for PoE%s '%s'", *oldest)
 
     def get_data(self, game: int, league: str, *, update: bool) -> dict:
         """Return the currency data for the specified game and league.
@@ -104,19 +646,350 @@ class CurrencyStore:
             update (bool): Whether to fetch fresh data from API if cache is stale.
 
         Returns:
-            dict: The currency data dict stored for the league.
+            dict: The currency data dict stored for the league. Must not be mutated by callers.
+
+        """
+        snapshot = self.get_snapshot(game, league, update=update)
+        return snapshot.data if snapshot is not None else {}
+
+    def get_table(self, game: int, league: str, *, update: bool) -> RateTable | None:
+        """Return the indexed rate table for the specified game and league.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name to fetch currency prices for.
+            update (bool): Whether to fetch fresh data from API if cache is stale.
+
+        Returns:
+            RateTable | None: The rate table, or None if no valid data could be retrieved.
+
+        """
+        snapshot = self.get_snapshot(game, league, update=update)
+        return snapshot.table if snapshot is not None else None
+
+    def loaded_table(self, game: int, league: str) -> RateTable | None:
+        """Return the rate table of a pinned or in-memory snapshot without loading anything.
+
+        Unlike `get_table`, this never reads a cache file or fetches, so it is safe on latency
+        sensitive threads. The snapshot may be expired.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name.
+
+        Returns:
+            RateTable | None: The rate table, or None if the league is not loaded.
+
+        """
+        key = (game, league)
+        with self._lock:
+            snapshot = self._pinned.get(key) or self._snapshots.get(key)
+        return snapshot.table if snapshot is not None else None
+
+    def set_categories(self, game: int, categories: Iterable[str]) -> None:
+        """Set the poe.ninja categories merged into the price index for a game.
+
+        Currency is always included and comes first. Indexes built for other categories are dropped.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            categories (Iterable[str]): poe.ninja overview types, e.g. "Fragment" or "Essence".
+
+        Returns:
+            None
 
         """
         if game not in (1, 2):
             msg = "Invalid game, must be 1 or 2"
             raise ValueError(msg)
+        categories = tuple(dict.fromkeys((CURRENCY_CATEGORY, *categories)))
+        for category in categories:
+            if not category.isalnum():
+                msg = f"Invalid category '{category}'"
+                raise ValueError(msg)
+        with self._lock:
+            self._categories[game] = categories
+            for key in [key for key in self._indexes if key[0] == game]:
+                del self._indexes[key]
+
+    def categories(self, game: int) -> tuple[str, ...]:
+        """Return the poe.ninja categories merged into the price index for a game.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
 
-        self.currency_data_by_league[league] = _retrieve_currency_prices(game, league, update=update)
+        Returns:
+            tuple[str, ...]: The categories, currency first.
+
+        """
+        with self._lock:
+            return self._categories[game]
+
+    def get_price_index(self, game: int, league: str, *, update: bool) -> PriceIndex | None:
+        """Return the unified price index for the configured categories of a game and league.
+
+        The index is rebuilt when the currency snapshot changes or any category is older than
+        one hour (with updating enabled). Non-currency categories are loaded in parallel.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name to fetch prices for.
+            update (bool): Whether to fetch fresh data from API if cache is stale.
 
-        return self.currency_data_by_league[league]
+        Returns:
+            PriceIndex | None: The index, or None if no category could be loaded.
 
+        """
+        snapshot = self.get_snapshot(game, league, update=update)
+        key = (game, league)
+        with self._lock:
+            categories = self._categories[game]
+            if key in self._pinned:
+                # Pinned leagues never fetch; other categories are not part of a pinned snapshot.
+                categories, update = (CURRENCY_CATEGORY,), False
+            price = self._indexes.get(key)
+            if price is not None:
+                self._indexes.move_to_end(key)
+        if (
+            price is not None
+            and price.categories == categories
+            and _price_snapshot_current(price, snapshot, update=update)
+        ):
+            return price.index
+        price = self._single_flight(
+            ("index", game, league), lambda: self._build_price_index(game, league, categories, snapshot, update=update)
+        )
+        return price.index if price is not None else None
+
+    def _build_price_index(
+        self,
+        game: int,
+        league: str,
+        categories: tuple[str, ...],
+        snapshot: CurrencySnapshot | None,
+        *,
+        update: bool,
+    ) -> PriceSnapshot | None:
+        """Load every category, build the price index and publish it.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name to fetch prices for.
+            categories (tuple[str, ...]): The categories to merge, currency first.
+            snapshot (CurrencySnapshot | None): The current currency snapshot.
+            update (bool): Whether to fetch fresh data from API if cache is stale.
+
+        Returns:
+            PriceSnapshot | None: The published index, or None if no category could be loaded.
+
+        """
+        responses: dict[str, dict] = {}
+        mtimes: dict[str, float] = {}
+        if snapshot is not None:
+            responses[CURRENCY_CATEGORY] = snapshot.data
+            mtimes[CURRENCY_CATEGORY] = snapshot.mtime
+        others = [category for category in categories if category != CURRENCY_CATEGORY]
+        if others:
+            workers = min(DEFAULT_WARM_WORKERS, len(others))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="index") as pool:
+                futures = {
+                    category: pool.submit(_retrieve_currency_prices, game, league, update=update, category=category)
+                    for category in others
+                }
+            for category, future in futures.items():
+                try:
+                    data = dict(future.result())
+                except (LookupError, ValueError, TypeError, OSError):
+                    logger.exception("Failed to load %s prices for PoE%s '%s'", category, game, league)
+                    continue
+                data.pop("stale", None)
+                mtime = data.pop("mtime", None)
+                if isinstance(mtime, (int, float)):
+                    responses[category] = data
+                    mtimes[category] = float(mtime)
+        if not responses:
+            return None
+
+        primary = snapshot.table.primary if snapshot is not None else ""
+        price = PriceSnapshot(
+            game=game,
+            league=league,
+            categories=categories,
+            mtimes=mtimes,
+            index=PriceIndex(primary or RateTable.from_response(next(iter(responses.values()))).primary, responses),
+        )
+        with self._lock:
+            self._indexes[(game, league)] = price
+            self._indexes.move_to_end((game, league))
+            while len(self._indexes) > self.max_snapshots:
+                self._indexes.popitem(last=False)
+                self.evictions += 1
+        return price
+
+    def pin(self, snapshots: Iterable[CurrencySnapshot], *, leagues: Mapping[int, Iterable[str]] | None = None) -> None:
+        """Serve the given snapshots as is for the rest of the session, replacing any earlier pins.
+
+        Args:
+            snapshots (Iterable[CurrencySnapshot]): The snapshots to pin, one per (game, league).
+            leagues (Mapping[int, Iterable[str]] | None): League lists to return from `get_leagues` instead
+                of the trade API, by game.
+
+        Returns:
+            None
 
-def _retrieve_currency_prices(game: int, league: str, *, update: bool = True) -> dict:  # noqa: C901, PLR0912, PLR0915
+        """
+        pinned = {(snapshot.game, snapshot.league): snapshot for snapshot in snapshots}
+        pinned_leagues = {game: frozenset(names) for game, names in (leagues or {}).items()}
+        with self._lock:
+            self._pinned = pinned
+            self._pinned_leagues = pinned_leagues
+            for key in [key for key in self._indexes if key in pinned]:
+                del self._indexes[key]
+        logger.info("Pinned currency prices for %d league(s)", len(pinned))
+
+    def unpin(self) -> None:
+        """Drop all pinned snapshots and league lists so lookups revalidate again.
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            for key in [key for key in self._indexes if key in self._pinned]:
+                del self._indexes[key]
+            self._pinned = {}
+            self._pinned_leagues = {}
+
+    def pinned(self) -> list[CurrencySnapshot]:
+        """Return the pinned snapshots.
+
+        Returns:
+            list[CurrencySnapshot]: The pinned snapshots, in the order they were pinned.
+
+        """
+        with self._lock:
+            return list(self._pinned.values())
+
+    def pinned_leagues(self, game: int) -> frozenset[str] | None:
+        """Return the pinned league list for a game.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+
+        Returns:
+            frozenset[str] | None: The pinned league names, or None if the game's league list is not pinned.
+
+        """
+        with self._lock:
+            return self._pinned_leagues.get(game)
+
+    def invalidate(self, game: int | None = None, league: str | None = None) -> None:
+        """Drop in-memory snapshots so the next lookup re-reads the cache file or API.
+
+        Pinned snapshots are kept; use `unpin` to drop them.
+
+        Args:
+            game (int | None): Only drop snapshots for this game, or all games if None.
+            league (str | None): Only drop snapshots for this league, or all leagues if None.
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            for key in list(self._snapshots):
+                if (game is None or key[0] == game) and (league is None or key[1] == league):
+                    del self._snapshots[key]
+                    del self._last_used[key]
+            for key in list(self._indexes):
+                if (game is None or key[0] == game) and (league is None or key[1] == league):
+                    del self._indexes[key]
+
+    def stats(self) -> dict[str, int]:
+        """Return snapshot cache hit/miss counters.
+
+        Returns:
+            dict[str, int]: Mapping with `hits`, `misses`, `stale_hits`, `coalesced` (callers that waited on
+                another caller's load), `evictions`, `shared_hits` (loads served from another process's
+                snapshot) and the number of cached `snapshots`, price `indexes` and `pinned` snapshots.
+
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_hits": self.stale_hits,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "shared_hits": self.shared_hits,
+                "snapshots": len(self._snapshots),
+                "indexes": len(self._indexes),
+                "pinned": len(self._pinned),
+            }
+
+
+def configured_targets(poe1leagues: Iterable[str], poe2leagues: Iterable[str]) -> list[tuple[int, str]]:
+    """Return (game, league) pairs for every configured league of both games.
+
+    Args:
+        poe1leagues (Iterable[str]): Configured PoE1 league names.
+        poe2leagues (Iterable[str]): Configured PoE2 league names.
+
+    Returns:
+        list[tuple[int, str]]: (game, league) pairs, PoE1 leagues first, each game sorted by name.
+
+    """
+    return [(1, league) for league in sorted(poe1leagues)] + [(2, league) for league in sorted(poe2leagues)]
+
+
+def _price_snapshot_current(price: PriceSnapshot, snapshot: CurrencySnapshot | None, *, update: bool) -> bool:
+    """Return whether a price index still matches the currency snapshot and the one-hour rule.
+
+    Args:
+        price (PriceSnapshot): The price index to check.
+        snapshot (CurrencySnapshot | None): The current currency snapshot.
+        update (bool): Whether fetching fresh data from the API is enabled.
+
+    Returns:
+        bool: True if the index can be served as is.
+
+    """
+    if snapshot is not None and price.mtimes.get(CURRENCY_CATEGORY) != snapshot.mtime:
+        return False
+    return not (update and min(price.mtimes.values()) <= time.time() - S_IN_HOUR)
+
+
+def _snapshot_state(snapshot: CurrencySnapshot, *, update: bool) -> _SnapshotState:
+    """Return whether an in-memory snapshot can be served without re-reading the cache file.
+
+    A snapshot is current if the cache file has not been rewritten since it was loaded and,
+    when updating is enabled, it is still within the one-hour freshness window. A rewritten
+    cache file that is itself within the window only needs a cheap reload from disk.
+
+    Args:
+        snapshot (CurrencySnapshot): The snapshot to check.
+        update (bool): Whether fetching fresh data from the API is enabled.
+
+    Returns:
+        _SnapshotState: The snapshot state.
+
+    """
+    expired_before = time.time() - S_IN_HOUR
+    try:
+        file_mtime = cache.cache_path(snapshot.game, snapshot.league).stat().st_mtime
+    except OSError:
+        # No cache file (e.g. it could not be written); rely on the freshness rule only.
+        file_mtime = snapshot.mtime
+    if file_mtime != snapshot.mtime and not (update and file_mtime <= expired_before):
+        return _SnapshotState.CHANGED
+    if update and snapshot.mtime <= expired_before:
+        return _SnapshotState.EXPIRED
+    return _SnapshotState.CURRENT
+
+
+def _retrieve_currency_prices(  # noqa: C901, PLR0912, PLR0915
+    game: int, league: str, *, update: bool = True, force: bool = False, category: str = CURRENCY_CATEGORY
+) -> dict:
     """Fetch currency prices from cache file or poe.ninja currency API.
 
     GGG only updates the currency exchange API once per hour, so there's no reason to fetch more often than that.
@@ -125,16 +998,26 @@ def _retrieve_currency_prices(game: int, league: str, *, update: bool = True) ->
         game (int): The game version, either 1 (PoE1) or 2 (PoE2).
         league (str): The league name to fetch currency prices for.
         update (bool): Whether to fetch new prices from API if cache file is older than one hour.
+        force (bool): Revalidate against the API even if the cache file is less than one hour old.
+        category (str): The poe.ninja overview type, e.g. "Currency" or "Fragment".
 
     Returns:
         dict: The poe.ninja currency API response as a dict. mtime is added to the response dict.
 
     """
-    cache_file = Path(f"{league}-{game}.yaml")
+    if game not in (1, 2):
+        msg = f"Invalid game '{game}', must be 1 or 2"
+        raise ValueError(msg)
+    if not category.isalnum():
+        msg = f"Invalid category '{category}'"
+        raise ValueError(msg)
+    cache_file = cache.cache_path(game, league, category)
+    if category == CURRENCY_CATEGORY:
+        cache.migrate_legacy_cache(game, league)
 
     data: dict = {}
 
-    logger.info("Fetching currency prices for PoE%s '%s' (update=%s)...", game, league, update)
+    logger.info("Fetching %s prices for PoE%s '%s' (update=%s)...", category, game, league, update)
     # Try cache file first. GGG currency exchange API data updates only hourly, so no need to fetch more often than that.
     try:
         cache_mtime: float = cache_file.stat().st_mtime if cache_file.exists() else 0
@@ -142,13 +1025,8 @@ def _retrieve_currency_prices(game: int, league: str, *, update: bool = True) ->
         cache_mtime = 0
 
     # Fetch from cache file if it exists and is less than one hour old, or if updating is disabled.
-    if cache_mtime and (cache_mtime > (time.time() - S_IN_HOUR) or update is False):
-        try:
-            with cache_file.open("r", encoding="utf-8") as f:
-                data = yaml.safe_load(f) or {}
-        except (yaml.YAMLError, FileNotFoundError):
-            logger.exception("Error reading cache file")
-            data = {}
+    if cache_mtime and ((cache_mtime > (time.time() - S_IN_HOUR) and not force) or update is False):
+        data = cache.read_cache(cache_file) or {}
 
         # Check if cache data is valid by verifying primary currency exists in lines.
         # If valid, add mtime to data and return.
@@ -178,37 +1056,45 @@ def _retrieve_currency_prices(game: int, league: str, *, update: bool = True) ->
             )
             return {}
 
-    # Fetch from API if not fetched from cache file
-    response: requests.Response | None = None
-    headers = {"User-Agent": USER_AGENT}
-    try:
-        if game == 1:
-            response = requests.get(
-                POE1_CURRENCY_API_URL,
-                params={"league": league, "type": "Currency"},
-                headers=headers,
-                timeout=5,
-            )
-        elif game == 2:  # noqa: PLR2004
-            response = requests.get(
-                POE2_CURRENCY_API_URL,
-                params={"league": league, "type": "Currency"},
-                headers=headers,
-                timeout=5,
-            )
-        else:
-            msg = f"Invalid game '{game}', must be 1 or 2"
-            raise ValueError(msg)
-        response.raise_for_status()
-    except requests.RequestException:
-        logger.exception("Error fetching prices from poe.ninja")
-        response = None
+    # Fetch from API if not fetched from cache file.
+    # Revalidate a stale but valid cache file with a conditional request, so an unchanged
+    # market costs a 304 with no body instead of a full download and parse.
+    stale: cache.CacheEntry | None = cache.read_entry(cache_file) if cache_mtime else None
+    if stale is not None and not (_has_primary_price_line(stale.data) or _is_empty_market_response(stale.data)):
+        stale = None
+    response = fetcher.fetch(
+        game,
+        league,
+        category,
+        etag=stale.etag if stale is not None else None,
+        last_modified=stale.last_modified if stale is not None else None,
+        validate=_is_valid_response,
+    )
 
-    try:
-        data = response.json() if response is not None else {}
-    except (ValueError, requests.exceptions.JSONDecodeError):
-        logger.exception("Error parsing JSON from poe.ninja response")
-        data = {}
+    if response is None and stale is not None:
+        # Every provider is unavailable: serve the last good data immediately, flagged as stale.
+        data = stale.data
+        data["mtime"] = cache_mtime
+        data["stale"] = True
+        logger.warning(
+            "Using stale currency prices for PoE%s '%s' (cache age: %.1f minutes)",
+            game,
+            league,
+            (time.time() - cache_mtime) / 60,
+        )
+        return data
+
+    if response is not None and stale is not None and response.not_modified:
+        data = stale.data
+        try:
+            data["mtime"] = cache.touch(cache_file)
+        except OSError:
+            logger.exception("Error updating cache file mtime")
+            data["mtime"] = time.time()
+        logger.info("Currency prices for PoE%s league '%s' not modified since last fetch", game, league)
+        return data
+
+    data = response.data if response is not None and response.data is not None else {}
 
     if not _response_has_expected_schema(data):
         logger.error("Invalid data received from API for PoE%s '%s': %s", game, league, data)
@@ -224,69 +1110,159 @@ def _retrieve_currency_prices(game: int, league: str, *, update: bool = True) ->
         logger.error("Invalid data received from API for PoE%s '%s': %s", game, league, data)
         return data
 
+    etag, last_modified = (response.etag, response.last_modified) if response is not None else (None, None)
     try:
-        with cache_file.open("w", encoding="utf-8") as f:
-            yaml.safe_dump(data, f)
-    except (yaml.YAMLError, UnicodeDecodeError):
+        cache.write_cache(cache_file, data, etag=etag, last_modified=last_modified)
+    except (OSError, TypeError, ValueError):
         logger.exception("Error writing to cache file")
 
     data["mtime"] = cache_file.stat().st_mtime if cache_file.exists() else time.time()
-    logger.info("Currency prices for PoE%s league '%s' retrieved from poe.ninja API and cached", game, league)
+    logger.info(
+        "Currency prices for PoE%s league '%s' retrieved from %s and cached",
+        game,
+        league,
+        response.provider if response is not None else "API",
+    )
+    if category == CURRENCY_CATEGORY:
+        try:
+            history.record(game, league, data, timestamp=data["mtime"])
+        except (OSError, ValueError):
+            logger.exception("Error recording currency price history")
+    try:
+        cache.manager.evict(keep={cache_file})
+    except OSError:
+        logger.exception("Error evicting old cache files")
     return data
 
 
-def get_leagues(game: int) -> set[str] | None:
+def get_leagues(game: int, *, max_age: float = LEAGUES_TTL_S) -> set[str] | None:
     """Get the list of available trade leagues for the specified game.
 
+    The league list changes only a few times a year, so the API response is cached on disk.
+    A cached list younger than `max_age` is returned without a request; an older one is
+    revalidated with a conditional request. If the API is unavailable the cached list is
+    returned regardless of its age.
+
     API response is in the format:
     {"result":[{"id":"Standard","realm":"pc","text":"Standard"},...]}
 
+    A league list pinned with `CurrencyStore.pin` is returned as is.
+
     Args:
         game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+        max_age (float): Maximum age in seconds of a cached list to use without revalidating. 0 always revalidates.
 
     Returns:
         set[str]: A set of available trade leagues for the specified game.
 
     """
+    if game == 1:
+        url = POE1_LEAGUES_API_URL
+    elif game == 2:  # noqa: PLR2004
+        url = POE2_LEAGUES_API_URL
+    else:
+        msg = f"Invalid game '{game}', must be 1 or 2"
+        raise ValueError(msg)
+    pinned = store.pinned_leagues(game)
+    if pinned is not None:
+        return set(pinned)
+
+    cache_file = cache.league_cache_path(game)
+    try:
+        cache_mtime: float = cache_file.stat().st_mtime if cache_file.exists() else 0
+    except OSError:
+        cache_mtime = 0
+    cached: cache.CacheEntry | None = cache.read_entry(cache_file) if cache_mtime else None
+    if cached is not None and "result" not in cached.data:
+        cached = None
+    if cached is not None and time.time() - cache_mtime < max_age:
+        logger.info("Leagues for PoE%s retrieved from cache", game)
+        return _leagues_from_response(game, cached.data)
+
     logger.info("Fetching list of leagues for PoE%s from GGG trade API...", game)
     response: requests.Response | None = None
-    headers = {"User-Agent": USER_AGENT}
     try:
-        if game == 1:
-            response = requests.get(
-                POE1_LEAGUES_API_URL,
-                headers=headers,
-                timeout=5,
-            )
-        elif game == 2:  # noqa: PLR2004
-            response = requests.get(
-                POE2_LEAGUES_API_URL,
-                headers=headers,
-                timeout=5,
-            )
-        else:
-            msg = f"Invalid game '{game}', must be 1 or 2"
-            raise ValueError(msg)
+        response = net.get(
+            url,
+            etag=cached.etag if cached is not None else None,
+            last_modified=cached.last_modified if cached is not None else None,
+        )
         response.raise_for_status()
     except requests.RequestException:
-        logger.exception("Error fetching prices from poe.ninja")
+        logger.exception("Error fetching leagues from GGG trade API")
         response = None
 
+    if response is not None and cached is not None and net.is_not_modified(response):
+        try:
+            cache.touch(cache_file)
+        except OSError:
+            logger.exception("Error updating league cache file mtime")
+        logger.info("Leagues for PoE%s not modified since last fetch", game)
+        return _leagues_from_response(game, cached.data)
+
     try:
         data = response.json() if response is not None else {}
     except (ValueError, requests.exceptions.JSONDecodeError):
-        logger.exception("Error parsing JSON from poe.ninja response")
+        logger.exception("Error parsing JSON from GGG trade API response")
         data = {}
 
-    if "result" not in data:
+    if not isinstance(data, dict) or "result" not in data:
+        if cached is not None:
+            logger.warning("Using cached leagues for PoE%s; the trade API is unavailable", game)
+            return _leagues_from_response(game, cached.data)
         logger.error("Invalid data received from API for PoE%s: %s", game, data)
         return None
 
-    logger.info("Successfully fetched leagues for PoE%s: %s", game, {item.get("id") for item in data.get("result", [])})
+    etag, last_modified = net.validators(response) if response is not None else (None, None)
+    try:
+        cache.write_cache(cache_file, data, etag=etag, last_modified=last_modified)
+    except (OSError, TypeError, ValueError):
+        logger.exception("Error writing league cache file")
+    leagues = _leagues_from_response(game, data)
+    logger.info("Successfully fetched leagues for PoE%s: %s", game, leagues)
+    return leagues
+
+
+def _leagues_from_response(game: int, data: dict) -> set[str]:
+    """Return the trade league ids for a game from a GGG trade API leagues response.
+
+    Args:
+        game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+        data (dict): The API response dict.
+
+    Returns:
+        set[str]: The league ids.
+
+    """
     # Only return ids of 'pc' (PoE1)/'poe2' leagues, we are not interested in realm or full text
-    if game == 1:
-        return {item.get("id") for item in data.get("result", []) if item.get("realm") == "pc"}
-    return {item.get("id") for item in data.get("result", []) if item.get("realm") == "poe2"}
+    realm = "pc" if game == 1 else "poe2"
+    return {item.get("id") for item in data.get("result", []) if isinstance(item, dict) and item.get("realm") == realm}
+
+
+def refresh_leagues_in_background(callback: Callable[[int, set[str] | None], None]) -> threading.Thread:
+    """Fetch both games' league lists on a background thread.
+
+    Args:
+        callback (Callable[[int, set[str] | None], None]): Called on the background thread with
+            (game, leagues) for each game; leagues is None if no list could be retrieved.
+
+    Returns:
+        threading.Thread: The started thread.
+
+    """
+
+    def _run() -> None:
+        for game in (1, 2):
+            try:
+                leagues = get_leagues(game)
+            except (LookupError, TypeError, ValueError, OSError):
+                logger.exception("Background league refresh failed for PoE%s", game)
+                leagues = None
+            callback(game, leagues)
+
+    thread = threading.Thread(target=_run, name="league-refresh", daemon=True)
+    thread.start()
+    return thread
 
 
 def get_currency_value(game: int, league: str, currency_name: str, *, autoupdate: bool = True) -> tuple[float, str]:
@@ -302,15 +1278,15 @@ def get_currency_value(game: int, league: str, currency_name: str, *, autoupdate
         tuple[float, str]: A tuple containing the primary value and primary currency for the specified currency.
 
     """
-    data = store.get_data(game=game, league=league, update=autoupdate)
-    primary_value: float = next(
-        (float(cur.get("primaryValue")) for cur in data.get("lines", []) if cur.get("id") == currency_name), 0.0
-    )
+    table = store.get_table(game, league, update=autoupdate)
+    primary_value = table.primary_value(currency_name) if table is not None and currency_name in table else 0.0
     if primary_value == 0.0:
         msg = f"Currency '{currency_name}' not found for league '{league}'"
         raise LookupError(msg)
-    primary_currency: str = data.get("core", {}).get("primary", "")
-    return primary_value, primary_currency
+    if isnan(primary_value):
+        msg = f"Invalid primaryValue for {currency_name}"
+        raise ValueError(msg)
+    return primary_value, table.primary if table is not None else ""
 
 
 def get_exchange_rate(
@@ -325,6 +1301,7 @@ def get_exchange_rate(
 
     Each currency's poe.ninja `primaryValue` (value in the response primary
     currency) is used to compute: rate = primaryValue(from) / primaryValue(to).
+    Values are read from the league's indexed `RateTable`, not by scanning `lines`.
 
     Args:
         game: 1 or 2 for PoE1/PoE2.
@@ -340,41 +1317,55 @@ def get_exchange_rate(
         float: number of `to_currency` units equal to one `from_currency` unit.
 
     """
-    data = store.get_data(game, league, update=autoupdate)
-    lines: list[dict] | None = data.get("lines")
-    if not lines:
+    table = store.get_table(game, league, update=autoupdate)
+    return table_rate(table, league, from_currency, to_currency)
+
+
+def table_rate(table: RateTable | None, league: str, from_currency: str, to_currency: str) -> float:
+    """Return the exchange rate between two currencies from a pinned rate table.
+
+    Args:
+        table (RateTable | None): The rate table for the league, or None if no data is available.
+        league (str): The league name, used in error messages.
+        from_currency (str): Currency id for the source currency.
+        to_currency (str): Currency id for the target currency.
+
+    Raises:
+        LookupError: if there is no currency data for the league.
+        ValueError: if currencies are not found or values are invalid.
+
+    Returns:
+        float: number of `to_currency` units equal to one `from_currency` unit.
+
+    """
+    if table is None or len(table) == 0:
         msg = f"No currency data available for league '{league}'"
         raise LookupError(msg)
-
-    from_cur_data = next((cur for cur in lines if cur.get("id") == from_currency), None)
-    to_cur_data = next((cur for cur in lines if cur.get("id") == to_currency), None)
-    if from_cur_data is None:
+    if from_currency not in table:
         msg = f"Currency '{from_currency}' not found for league '{league}'"
         raise ValueError(msg)
-    if to_cur_data is None:
+    if to_currency not in table:
         msg = f"Currency '{to_currency}' not found for league '{league}'"
         raise ValueError(msg)
+    return table.rate(from_currency, to_currency)
 
-    from_primary_value = from_cur_data.get("primaryValue")
-    to_primary_value = to_cur_data.get("primaryValue")
-    if from_primary_value is None:
-        msg = f"Invalid primaryValue for {from_currency}"
-        raise ValueError(msg)
-    if to_primary_value is None:
-        msg = f"Invalid primaryValue for {to_currency}"
-        raise ValueError(msg)
-    try:
-        from_f = float(from_primary_value)
-        to_f = float(to_primary_value)
-    except (TypeError, ValueError):
-        msg = "Invalid primaryValue for one of the currencies"
-        raise ValueError(msg) from None
-
-    if to_f == 0:
-        msg = "Division by zero: target currency has primaryValue 0"
-        raise ValueError(msg)
 
-    return from_f / to_f
+def _pinned_table(game: int, league: str, *, autoupdate: bool) -> RateTable | None:
+    """Return the current rate table for a league, or None if it cannot be retrieved.
+
+    Args:
+        game (int): Game id, 1 or 2.
+        league (str): League name.
+        autoupdate (bool): Whether to refresh live rates.
+
+    Returns:
+        RateTable | None: The rate table, or None on error.
+
+    """
+    try:
+        return store.get_table(game, league, update=autoupdate)
+    except (LookupError, ValueError, TypeError):
+        return None
 
 
 def compute_new_order(
@@ -404,17 +1395,66 @@ def compute_new_order(
     if not current_order:
         return [chosen_key]
 
-    for i, existing in enumerate(current_order):
-        try:
-            rate = get_exchange_rate(game, league, chosen_key, existing, autoupdate=autoupdate)
-            if float(rate) > 1.0:
-                return [*current_order[:i], chosen_key, *current_order[i:]]
-        except (LookupError, ValueError, TypeError):
-            # If we can't compare, skip and try next existing
-            continue
+    # Compare against one pinned snapshot so all comparisons see consistent rates.
+    table = _pinned_table(game, league, autoupdate=autoupdate)
+    i = _insertion_index(table, current_order, chosen_key)
+    return [*current_order[:i], chosen_key, *current_order[i:]]
+
+
+def _primary_values(table: RateTable | None, ids: list[str]) -> list[float]:
+    """Return the `primaryValue` of each currency id, NaN where the table has no usable value.
+
+    Args:
+        table (RateTable | None): The pinned rate table, or None if no data is available.
+        ids (list[str]): Currency ids.
+
+    Returns:
+        list[float]: Values indexed like `ids`.
+
+    """
+    if table is None:
+        return [float("nan")] * len(ids)
+    return [table.primary_value(cur_id) if cur_id in table else float("nan") for cur_id in ids]
+
+
+def _insertion_index(table: RateTable | None, order: list[str], chosen_key: str) -> int:
+    """Return the index of the first currency in `order` that `chosen_key` is worth more than.
+
+    Equivalent to scanning `order` for the first currency whose exchange rate from `chosen_key`
+    is > 1, skipping currencies that cannot be compared. When the comparable values are in
+    descending order (the normal case for a value-ordered list) the position is found by
+    binary search; otherwise the precomputed values are scanned.
+
+    Args:
+        table (RateTable | None): The pinned rate table, or None if no data is available.
+        order (list[str]): Currency ids, normally most -> least valuable.
+        chosen_key (str): Currency id to insert.
+
+    Returns:
+        int: The insertion index, `len(order)` to append.
+
+    """
+    chosen = _primary_values(table, [chosen_key])[0]
+    if isnan(chosen):
+        return len(order)
+
+    # Only currencies with a nonzero value have a defined rate from chosen_key.
+    positions: list[int] = []
+    keys: list[float] = []  # negated values, ascending when `order` is most -> least valuable
+    for i, value in enumerate(_primary_values(table, order)):
+        if not isnan(value) and value != 0:
+            positions.append(i)
+            keys.append(-value)
 
-    # Not more valuable than any existing entry: append to end
-    return [*current_order, chosen_key]
+    if chosen > 0 and (not keys or keys[-1] < 0) and all(a <= b for a, b in pairwise(keys)):
+        # For positive values, rate(chosen -> existing) > 1 exactly when chosen > existing.
+        j = bisect_right(keys, -chosen)
+        return positions[j] if j < len(positions) else len(order)
+
+    for i, key in zip(positions, keys, strict=True):
+        if chosen / -key > 1.0:
+            return i
+    return len(order)
 
 
 def compute_mapping_from_order(
@@ -443,26 +1483,30 @@ def compute_mapping_from_order(
 
     """
     mapping: dict[str, int] = {}
-    prev: str | None = None
-    cumulative = 1.0
     existing_raw = existing_raw or {}
+    table = _pinned_table(game, league, autoupdate=autoupdate) if len(ordered) > 1 else None
 
+    # One cumulative-product pass over the pinned values. Each step multiplies in the rate
+    # between adjacent currencies; a step without a defined rate falls back to `existing_raw`.
+    values = _primary_values(table, ordered)
+    cumulative = 1.0
     for i, name in enumerate(ordered):
-        if i == 0 or prev is None:
+        if i == 0:
             mapping[name] = 1
-            prev = name
-            cumulative = 1.0
             continue
-        try:
-            rate = get_exchange_rate(game, league, prev, name, autoupdate=autoupdate)
-            cumulative *= float(rate)
-            mapping[name] = max(1, ceil(cumulative))
-        except (LookupError, ValueError, TypeError):
+        prev_value, value = values[i - 1], values[i]
+        rate = prev_value / value if value != 0 and not isnan(value) else float("nan")
+        if not isnan(rate):
+            cumulative *= rate
             try:
-                mapping[name] = int(existing_raw.get(name, 1))
-            except (TypeError, ValueError):
-                mapping[name] = 1
-        prev = name
+                mapping[name] = max(1, ceil(cumulative))
+                continue
+            except ValueError:
+                pass
+        try:
+            mapping[name] = int(existing_raw.get(name, 1))
+        except (TypeError, ValueError):
+            mapping[name] = 1
 
     return mapping
 
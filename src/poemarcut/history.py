@@ -0,0 +1,548 @@
+"""Historical currency exchange rates for PoEMarcut.
+
+Every poe.ninja currency response fetched from the API is appended to a
+per-league time series, so trends such as "divine -> chaos over the last
+7 days" can be answered locally without extra network calls.
+
+Storage is columnar and split into segments of up to `ROWS_PER_SEGMENT`
+hourly rows. Inside a segment every currency has a fixed-width column of
+64-bit words: row 0 holds the raw IEEE-754 bits of the currency's
+`primaryValue` and every later row holds the XOR with the previous row, so an
+unchanged price encodes as 0. The open segment is preallocated, updated in
+place and read through `mmap`. Full segments are compacted with zlib, which
+shrinks the mostly-zero deltas to a fraction of their size, and segments older
+than the retention window are deleted.
+"""
+
+import json
+import logging
+import math
+import mmap
+import struct
+import sys
+import time
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+
+from poemarcut import cache, sharedcache
+from poemarcut.constants import S_IN_HOUR
+from poemarcut.optional import np
+from poemarcut.rates import RateTable
+
+# One week of hourly rows per segment.
+ROWS_PER_SEGMENT = 168
+# Segments whose newest row is older than this are deleted.
+DEFAULT_RETENTION_S = 180 * 24 * S_IN_HOUR
+# History lives in this subdirectory of the cache directory.
+HISTORY_DIRNAME = "history"
+
+_MAGIC = b"PMHS"
+_VERSION = 1
+# magic, version, column count, row capacity, row count; padded to 32 bytes.
+_HEADER = struct.Struct("<4sHxxIII12x")
+_WORD = 8
+_COLUMNS_FILE = "columns.json"
+# Cross-process lock held while appending or compacting.
+_LOCK_FILE = "history.lock"
+_LOCK_TIMEOUT_S = 5.0
+_OPEN_SUFFIX = ".bin"
+_COMPACT_SUFFIX = ".z"
+# Number of decompressed compacted segments kept in memory per history.
+_DECOMPRESSED_CACHE_SIZE = 8
+
+NAN = float("nan")
+
+logger = logging.getLogger(__name__)
+
+
+def _from_le(buf: bytes | memoryview, typecode: str) -> array:
+    """Read a little-endian buffer into a native-order array."""
+    a = array(typecode)
+    a.frombytes(buf)
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a
+
+
+def _bits(value: float) -> int:
+    """Return the IEEE-754 bits of a float as an unsigned int."""
+    return struct.unpack("<Q", struct.pack("<d", value))[0]
+
+
+@dataclass
+class _Segment:
+    """Location and extent of one segment file."""
+
+    path: Path
+    columns: int
+    capacity: int
+    rows: int
+    first: float
+    last: float
+
+    @property
+    def compacted(self) -> bool:
+        """Return True if the segment has been compressed and is read-only."""
+        return self.path.suffix == _COMPACT_SUFFIX
+
+
+def _column_offset(capacity: int, column: int) -> int:
+    """Return the byte offset of a column within a segment."""
+    return _HEADER.size + capacity * _WORD + column * capacity * _WORD
+
+
+def _parse_header(buf: bytes | memoryview | mmap.mmap) -> tuple[int, int, int]:
+    """Return the (columns, capacity, rows) of a segment buffer.
+
+    Raises:
+        ValueError: If the buffer is not a segment of a supported version.
+
+    """
+    magic, version, columns, capacity, rows = _HEADER.unpack_from(buf, 0)
+    if magic != _MAGIC or version != _VERSION:
+        msg = "Not a rate history segment or unsupported version"
+        raise ValueError(msg)
+    return columns, capacity, rows
+
+
+def _decode_column(buf: bytes | memoryview | mmap.mmap, capacity: int, column: int, hi: int) -> Sequence[float]:
+    """Decode rows [0, hi) of a column from XOR deltas back to float values.
+
+    Args:
+        buf (bytes | memoryview | mmap.mmap): The segment buffer.
+        capacity (int): The segment row capacity.
+        column (int): The column index.
+        hi (int): Number of rows to decode.
+
+    Returns:
+        Sequence[float]: A NumPy float64 array when NumPy is available, otherwise an `array('d')`.
+
+    """
+    offset = _column_offset(capacity, column)
+    if np is not None:
+        words = np.frombuffer(buf, dtype="<u8", count=hi, offset=offset)
+        return np.bitwise_xor.accumulate(words).view("<f8").astype(np.float64)
+    words = _from_le(memoryview(buf)[offset : offset + hi * _WORD], "Q")
+    acc = 0
+    for i, word in enumerate(words):
+        acc ^= word
+        words[i] = acc
+    values = array("d")
+    values.frombytes(words.tobytes())
+    return values
+
+
+class RateHistory:
+    """Append-only, segmented time series of currency values for one game and league."""
+
+    def __init__(
+        self, directory: Path, *, rows_per_segment: int = ROWS_PER_SEGMENT, retention: float = DEFAULT_RETENTION_S
+    ) -> None:
+        """Initialize the history. Nothing is read until first use.
+
+        Args:
+            directory (Path): Directory holding this league's segment files.
+            rows_per_segment (int): Row capacity of new segments.
+            retention (float): Seconds after which a segment's data is deleted.
+
+        Returns:
+            None
+
+        """
+        self.directory = directory
+        self.rows_per_segment = rows_per_segment
+        self.retention = retention
+        self._lock = Lock()
+        self._loaded = False
+        self._columns: list[str] = []
+        self._column_index: dict[str, int] = {}
+        self._segments: list[_Segment] = []
+        # Segment files on disk when last loaded or written, to notice changes by other processes.
+        self._paths: list[Path] = []
+        # Decoded bits of the newest row in the open segment, the base for the next XOR delta.
+        self._last_bits: list[int] = []
+        self._decompressed: dict[Path, bytes] = {}
+
+    def __len__(self) -> int:
+        """Return the number of stored rows."""
+        with self._lock:
+            self._load()
+            return sum(seg.rows for seg in self._segments)
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        """Return the currency ids that have a column, in column order."""
+        with self._lock:
+            self._load()
+            return tuple(self._columns)
+
+    def _load(self) -> None:
+        """Read the column list and segment headers from disk on first use.
+
+        Must be called with `_lock` held.
+        """
+        if self._loaded:
+            return
+        self._loaded = True
+        self._columns = self._read_columns()
+        self._column_index = {c: i for i, c in enumerate(self._columns)}
+        self._segments = []
+        self._last_bits = []
+        self._paths = self._segment_paths()
+        for path in self._paths:
+            try:
+                with self._buffer_for(path) as buf:
+                    n_columns, capacity, rows = _parse_header(buf)
+                    if rows == 0 or n_columns > len(self._columns):
+                        continue
+                    times = _from_le(memoryview(buf)[_HEADER.size : _HEADER.size + rows * _WORD], "d")
+            except (OSError, ValueError, zlib.error, struct.error):
+                logger.exception("Skipping unreadable rate history segment '%s'", path)
+                continue
+            self._segments.append(_Segment(path, n_columns, capacity, rows, times[0], times[-1]))
+
+        last = self._segments[-1] if self._segments else None
+        if last is not None and not last.compacted and last.rows < last.capacity:
+            with self._buffer(last) as buf:
+                self._last_bits = [
+                    _bits(float(_decode_column(buf, last.capacity, c, last.rows)[-1])) for c in range(last.columns)
+                ]
+
+    def _read_columns(self) -> list[str]:
+        """Return the column list stored on disk, or an empty list if there is none."""
+        try:
+            columns = json.loads((self.directory / _COLUMNS_FILE).read_bytes())
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError):
+            logger.exception("Error reading rate history columns in '%s'; starting a new history", self.directory)
+            return []
+        if not isinstance(columns, list) or not all(isinstance(c, str) for c in columns):
+            return []
+        return columns
+
+    def _segment_paths(self) -> list[Path]:
+        """Return the segment files on disk in segment order."""
+        return sorted(p for p in self.directory.glob("seg-*") if p.suffix in (_OPEN_SUFFIX, _COMPACT_SUFFIX))
+
+    def _refresh(self) -> None:
+        """Load the history, re-reading it if another process has written since. Must be called with both locks held."""
+        if self._loaded:
+            stale = self._read_columns() != self._columns or self._segment_paths() != self._paths
+            last = self._segments[-1] if self._segments else None
+            if not stale and last is not None and not last.compacted:
+                try:
+                    with self._buffer(last) as buf:
+                        stale = _parse_header(buf)[2] != last.rows
+                except (OSError, ValueError, struct.error):
+                    stale = True
+            self._loaded = not stale
+        self._load()
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """Hold `_lock` and the history's cross-process lock, with the state re-read from disk.
+
+        Raises:
+            OSError: If the lock file cannot be opened, or TimeoutError if another process holds the lock too long.
+
+        """
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with (self.directory / _LOCK_FILE).open("a+b") as f:
+                locked = sharedcache.acquire_file_lock(f, _LOCK_TIMEOUT_S)
+                if not locked and (sharedcache.fcntl is not None or sharedcache.msvcrt is not None):
+                    msg = f"Timed out waiting for the rate history lock in '{self.directory}'"
+                    raise TimeoutError(msg)
+                done = False
+                try:
+                    self._refresh()
+                    yield
+                    done = True
+                finally:
+                    if done:
+                        self._paths = self._segment_paths()
+                    else:
+                        # Whatever was left half-written is re-read on next use.
+                        self._loaded = False
+                    if locked:
+                        sharedcache.release_file_lock(f)
+
+    @contextmanager
+    def _buffer_for(self, path: Path) -> Iterator[bytes | mmap.mmap]:
+        """Yield the contents of a segment file: memory-mapped if open, decompressed if compacted."""
+        if path.suffix == _COMPACT_SUFFIX:
+            payload = self._decompressed.get(path)
+            if payload is None:
+                payload = zlib.decompress(path.read_bytes())
+                if len(self._decompressed) >= _DECOMPRESSED_CACHE_SIZE:
+                    self._decompressed.pop(next(iter(self._decompressed)))
+                self._decompressed[path] = payload
+            yield payload
+            return
+        with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+    @contextmanager
+    def _buffer(self, segment: _Segment) -> Iterator[bytes | mmap.mmap]:
+        """Yield the contents of a segment."""
+        with self._buffer_for(segment.path) as buf:
+            yield buf
+
+    def _write_columns(self) -> None:
+        """Persist the column list. Must be called with `_lock` held."""
+        payload = json.dumps(self._columns, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        cache.atomic_write_bytes(self.directory / _COLUMNS_FILE, payload)
+
+    def _new_segment(self) -> _Segment:
+        """Create an empty, preallocated segment covering all current columns. Must be called with `_lock` held."""
+        number = int(self._paths[-1].stem.split("-")[1]) + 1 if self._paths else 0
+        path = self.directory / f"seg-{number:06d}{_OPEN_SUFFIX}"
+        capacity = self.rows_per_segment
+        columns = len(self._columns)
+        with path.open("wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, columns, capacity, 0))
+            f.truncate(_column_offset(capacity, columns))
+        segment = _Segment(path, columns, capacity, 0, NAN, NAN)
+        self._segments.append(segment)
+        self._last_bits = [0] * columns
+        return segment
+
+    def append(self, timestamp: float, table: RateTable) -> bool:
+        """Append one row of currency values.
+
+        Args:
+            timestamp (float): Unix timestamp of the data, e.g. the cache file mtime.
+            table (RateTable): The currency values to record.
+
+        Returns:
+            bool: True if a row was appended, False if `timestamp` is not newer than the latest row.
+
+        Raises:
+            OSError: If the history files cannot be written or locked.
+
+        """
+        with self._writing():
+            if self._segments and timestamp <= self._segments[-1].last:
+                return False
+
+            new_ids = [cur_id for cur_id in dict.fromkeys(table.ids) if cur_id not in self._column_index]
+            if new_ids:
+                for cur_id in new_ids:
+                    self._column_index[cur_id] = len(self._columns)
+                    self._columns.append(cur_id)
+                self._write_columns()
+
+            segment = self._segments[-1] if self._segments else None
+            if (
+                segment is None
+                or segment.compacted
+                or segment.rows >= segment.capacity
+                or segment.columns != len(self._columns)
+            ):
+                # A segment's column count is fixed, so a new currency also starts a new segment.
+                segment = self._new_segment()
+
+            row = segment.rows
+            with segment.path.open("r+b") as f:
+                for column, cur_id in enumerate(self._columns[: segment.columns]):
+                    bits = _bits(table.primary_value(cur_id) if cur_id in table else NAN)
+                    f.seek(_column_offset(segment.capacity, column) + row * _WORD)
+                    f.write(struct.pack("<Q", bits ^ self._last_bits[column]))
+                    self._last_bits[column] = bits
+                f.seek(_HEADER.size + row * _WORD)
+                f.write(struct.pack("<d", timestamp))
+                f.flush()
+                # Publish the row only after its values are written.
+                f.seek(0)
+                f.write(_HEADER.pack(_MAGIC, _VERSION, segment.columns, segment.capacity, row + 1))
+
+            segment.rows = row + 1
+            segment.last = timestamp
+            if row == 0:
+                segment.first = timestamp
+            if segment.rows == segment.capacity:
+                self._compact(now=timestamp)
+            return True
+
+    def compact(self, *, now: float | None = None) -> int:
+        """Compress full segments and delete segments past the retention window.
+
+        Args:
+            now (float | None): The current Unix timestamp, or None to use the current time.
+
+        Returns:
+            int: The number of segments compressed or deleted.
+
+        Raises:
+            OSError: If a segment cannot be rewritten or the history cannot be locked.
+
+        """
+        with self._writing():
+            return self._compact(now=time.time() if now is None else now)
+
+    def _compact(self, *, now: float) -> int:
+        """Compact segments. Must be called with `_lock` held."""
+        changed = 0
+        kept: list[_Segment] = []
+        for segment in self._segments:
+            if segment.last < now - self.retention:
+                segment.path.unlink(missing_ok=True)
+                self._decompressed.pop(segment.path, None)
+                changed += 1
+                continue
+            if not segment.compacted and segment.rows >= segment.capacity:
+                target = segment.path.with_suffix(_COMPACT_SUFFIX)
+                cache.atomic_write_bytes(target, zlib.compress(segment.path.read_bytes(), 6))
+                segment.path.unlink()
+                segment.path = target
+                changed += 1
+            kept.append(segment)
+        self._segments = kept
+        return changed
+
+    def values(self, currency_id: str, start: float, end: float) -> list[tuple[float, float]]:
+        """Return the recorded `primaryValue`s of a currency in a time range.
+
+        Args:
+            currency_id (str): The currency id.
+            start (float): Range start as a Unix timestamp, inclusive.
+            end (float): Range end as a Unix timestamp, inclusive.
+
+        Returns:
+            list[tuple[float, float]]: (timestamp, value) pairs in time order. Rows where the value is
+                missing are skipped.
+
+        """
+        return [(t, a) for t, a, _ in self._scan(currency_id, None, start, end)]
+
+    def rates(self, from_currency: str, to_currency: str, start: float, end: float) -> list[tuple[float, float]]:
+        """Return the recorded exchange rate between two currencies in a time range.
+
+        Args:
+            from_currency (str): The source currency id.
+            to_currency (str): The target currency id.
+            start (float): Range start as a Unix timestamp, inclusive.
+            end (float): Range end as a Unix timestamp, inclusive.
+
+        Returns:
+            list[tuple[float, float]]: (timestamp, rate) pairs in time order, where rate is how many
+                `to_currency` one `from_currency` was worth. Rows where the rate is undefined are skipped.
+
+        """
+        return [(t, a / b) for t, a, b in self._scan(from_currency, to_currency, start, end) if b != 0]
+
+    def _scan(self, first_id: str, second_id: str | None, start: float, end: float) -> list[tuple[float, float, float]]:
+        """Return (timestamp, first value, second value) rows in a time range where both values are valid."""
+        with self._lock:
+            self._load()
+            first_col = self._column_index.get(first_id)
+            second_col = self._column_index.get(second_id) if second_id is not None else None
+            if first_col is None or (second_id is not None and second_col is None):
+                return []
+
+            out: list[tuple[float, float, float]] = []
+            for segment in self._segments:
+                if segment.last < start or segment.first > end:
+                    continue
+                if first_col >= segment.columns or (second_col is not None and second_col >= segment.columns):
+                    continue
+                with self._buffer(segment) as buf:
+                    times = _from_le(memoryview(buf)[_HEADER.size : _HEADER.size + segment.rows * _WORD], "d")
+                    lo = bisect_left(times, start)
+                    hi = bisect_right(times, end)
+                    if lo >= hi:
+                        continue
+                    a = _decode_column(buf, segment.capacity, first_col, hi)
+                    b = _decode_column(buf, segment.capacity, second_col, hi) if second_col is not None else a
+                    for i in range(lo, hi):
+                        x, y = float(a[i]), float(b[i])
+                        if not (math.isnan(x) or math.isnan(y)):
+                            out.append((times[i], x, y))
+            return out
+
+
+_histories_lock = Lock()
+_histories: dict[Path, RateHistory] = {}
+
+
+def history_directory(game: int, league: str) -> Path:
+    """Return the history directory for the specified game and league.
+
+    Args:
+        game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+        league (str): The league name.
+
+    Returns:
+        Path: The directory holding the league's segment files.
+
+    """
+    return cache.manager.directory / HISTORY_DIRNAME / f"{league}-{game}"
+
+
+def get_history(game: int, league: str) -> RateHistory:
+    """Return the shared history for the specified game and league.
+
+    Args:
+        game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+        league (str): The league name.
+
+    Returns:
+        RateHistory: The league's history.
+
+    """
+    directory = history_directory(game, league)
+    with _histories_lock:
+        history = _histories.get(directory)
+        if history is None:
+            history = _histories[directory] = RateHistory(directory)
+        return history
+
+
+def record(game: int, league: str, data: Mapping, *, timestamp: float) -> bool:
+    """Append a poe.ninja currency response to the league's history.
+
+    Args:
+        game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+        league (str): The league name.
+        data (Mapping): The poe.ninja currency API response dict.
+        timestamp (float): Unix timestamp of the data.
+
+    Returns:
+        bool: True if a row was appended.
+
+    Raises:
+        OSError: If the history files cannot be written.
+
+    """
+    table = RateTable.from_response(data)
+    if not len(table):
+        return False
+    return get_history(game, league).append(timestamp, table)
+
+
+def exchange_rate_history(  # noqa: PLR0913
+    game: int, league: str, from_currency: str, to_currency: str, *, days: float = 7, now: float | None = None
+) -> list[tuple[float, float]]:
+    """Return the recorded exchange rate between two currencies over the last `days` days.
+
+    Args:
+        game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+        league (str): The league name.
+        from_currency (str): The source currency id.
+        to_currency (str): The target currency id.
+        days (float): How many days back to look.
+        now (float | None): The current Unix timestamp, or None to use the current time.
+
+    Returns:
+        list[tuple[float, float]]: (timestamp, rate) pairs in time order.
+
+    """
+    end = time.time() if now is None else now
+    return get_history(game, league).rates(from_currency, to_currency, end - days * 24 * S_IN_HOUR, end)
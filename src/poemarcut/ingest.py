@@ -0,0 +1,299 @@
+"""Field-projecting ingestion of poe.ninja currency responses.
+
+PoEMarcut only uses `core.primary`, `core.secondary`, `core.rates`, the `id`
+and `name` of each `core.items` entry, and each line's `id` and `primaryValue`.
+Responses also carry images, volumes and sparklines, which for item-category
+endpoints run to thousands of lines.
+
+`parse_currency_response` walks the top-level JSON object itself and decodes
+one `lines` element at a time, keeping only the used fields. The full object
+tree is never built, so peak memory stays close to the size of the response
+text, and only the projected data is kept in memory and written to the cache.
+"""
+
+import json
+import logging
+import re
+from collections.abc import Callable, Mapping
+
+# Fields kept from `core`; items keep only `id` and `name`, lines only `id` and `primaryValue`.
+CORE_FIELDS = ("primary", "secondary", "rates", "items")
+
+logger = logging.getLogger(__name__)
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class SchemaError(ValueError):
+    """Raised when a response is not a JSON object shaped like a poe.ninja currency response."""
+
+
+def _skip_ws(text: str, i: int) -> int:
+    """Return the index of the next non-whitespace character at or after `i`."""
+    match = _WHITESPACE.match(text, i)
+    return match.end() if match is not None else i
+
+
+def _expect(text: str, i: int, char: str) -> int:
+    """Skip whitespace, require `char` at the resulting position and return the index after it.
+
+    Raises:
+        SchemaError: If `char` is not found.
+
+    """
+    i = _skip_ws(text, i)
+    if not text.startswith(char, i):
+        msg = f"Expected {char!r} at offset {i}"
+        raise SchemaError(msg)
+    return i + 1
+
+
+def _decode_value(text: str, i: int) -> tuple[object, int]:
+    """Decode one JSON value starting at `i` and return it with the index after it.
+
+    Raises:
+        SchemaError: If the text at `i` is not valid JSON.
+
+    """
+    try:
+        return _decoder.raw_decode(text, _skip_ws(text, i))
+    except json.JSONDecodeError as e:
+        raise SchemaError(str(e)) from e
+
+
+def _scan_members(text: str, i: int, close: str, on_member: Callable[[int], int]) -> int:
+    """Walk the comma-separated members of a JSON object or array.
+
+    Args:
+        text (str): The JSON text.
+        i (int): Index just after the opening bracket.
+        close (str): The closing bracket, "}" or "]".
+        on_member (Callable[[int], int]): Called with the start index of each member; returns the index after it.
+
+    Returns:
+        int: The index after the closing bracket.
+
+    Raises:
+        SchemaError: If the text is malformed.
+
+    """
+    i = _skip_ws(text, i)
+    if text.startswith(close, i):
+        return i + 1
+    while True:
+        i = _skip_ws(text, on_member(_skip_ws(text, i)))
+        if text.startswith(",", i):
+            i += 1
+        elif text.startswith(close, i):
+            return i + 1
+        else:
+            msg = f"Expected ',' or {close!r} at offset {i}"
+            raise SchemaError(msg)
+
+
+def _scan_object(text: str, i: int, on_value: Callable[[str, int], int]) -> int:
+    """Walk a JSON object starting at `i`, calling `on_value(key, value_start)` for each member.
+
+    Returns:
+        int: The index after the closing brace.
+
+    """
+    i = _expect(text, i, "{")
+
+    def _member(j: int) -> int:
+        if not text.startswith('"', j):
+            msg = f"Expected an object key at offset {j}"
+            raise SchemaError(msg)
+        key, j = _decode_value(text, j)
+        j = _expect(text, j, ":")
+        return on_value(key, _skip_ws(text, j))
+
+    return _scan_members(text, i, "}", _member)
+
+
+def _scan_array(text: str, i: int, on_item: Callable[[int], int]) -> int:
+    """Walk a JSON array starting at `i`, calling `on_item(value_start)` for each element.
+
+    Returns:
+        int: The index after the closing bracket.
+
+    """
+    i = _expect(text, i, "[")
+    return _scan_members(text, i, "]", on_item)
+
+
+def _drop_value(text: str, i: int) -> int:
+    """Skip the JSON value starting at `i` and return the index after it.
+
+    Arrays are decoded and dropped one element at a time, so large unused arrays such as
+    item metadata never exist in memory as a whole.
+    """
+    if text.startswith("[", i):
+        return _scan_array(text, i, lambda j: _decode_value(text, j)[1])
+    return _decode_value(text, i)[1]
+
+
+def _project_rates(rates: object) -> dict[str, float]:
+    """Return the numeric entries of a `core.rates` mapping."""
+    if not isinstance(rates, Mapping):
+        return {}
+    return {
+        key: value
+        for key, value in rates.items()
+        if isinstance(key, str) and isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+
+
+def project_item(item: object) -> dict | None:
+    """Return the `id` and `name` of one `core.items` element, or None if either is not a string.
+
+    Args:
+        item (object): A decoded item.
+
+    Returns:
+        dict | None: `{"id": ..., "name": ...}`.
+
+    """
+    if not isinstance(item, Mapping) or not isinstance(item.get("id"), str) or not isinstance(item.get("name"), str):
+        return None
+    return {"id": item["id"], "name": item["name"]}
+
+
+def _project_core_field(key: str, value: object) -> object:
+    """Return the projected value of a kept `core` field."""
+    if key == "rates":
+        return _project_rates(value)
+    if key == "items":
+        return [p for p in map(project_item, value) if p is not None] if isinstance(value, list) else []
+    return value
+
+
+def project_line(line: object) -> dict | None:
+    """Return the used fields of one `lines` element, or None if it has no string id.
+
+    Args:
+        line (object): A decoded line.
+
+    Returns:
+        dict | None: `{"id": ..., "primaryValue": ...}`; `primaryValue` is omitted if missing or not numeric.
+
+    """
+    if not isinstance(line, Mapping) or not isinstance(line.get("id"), str):
+        return None
+    value = line.get("primaryValue")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {"id": line["id"], "primaryValue": value}
+    return {"id": line["id"]}
+
+
+def project_core(core: object) -> dict | None:
+    """Return the used fields of a `core` object, or None if it is not an object.
+
+    Args:
+        core (object): The decoded `core` value.
+
+    Returns:
+        dict | None: The projected `core`.
+
+    """
+    if not isinstance(core, Mapping):
+        return None
+    projected: dict = {}
+    for key in CORE_FIELDS:
+        if key in core:
+            projected[key] = _project_core_field(key, core[key])
+    return projected
+
+
+def project(data: Mapping) -> dict:
+    """Project an already decoded currency response down to the used fields.
+
+    Args:
+        data (Mapping): The decoded response.
+
+    Returns:
+        dict: The projected response with `core` and `lines` where present.
+
+    """
+    projected: dict = {}
+    core = project_core(data.get("core"))
+    if core is not None:
+        projected["core"] = core
+    lines = data.get("lines")
+    if isinstance(lines, list):
+        projected["lines"] = [p for p in map(project_line, lines) if p is not None]
+    return projected
+
+
+def parse_currency_response(payload: bytes | str) -> dict:
+    """Parse a poe.ninja currency response, keeping only the fields PoEMarcut uses.
+
+    Lines are decoded one at a time and projected immediately; unused top-level and
+    `core` members are dropped as they are reached.
+
+    Args:
+        payload (bytes | str): The raw response body.
+
+    Returns:
+        dict: The projected response with `core` and `lines` where present. Callers should still
+            check the result against the expected schema, as both keys may be missing.
+
+    Raises:
+        SchemaError: If the payload is not a JSON object or is malformed.
+
+    """
+    try:
+        text = payload.decode("utf-8") if isinstance(payload, (bytes, bytearray)) else payload
+    except UnicodeDecodeError as e:
+        raise SchemaError(str(e)) from e
+
+    result: dict = {}
+    dropped = 0
+
+    def _line(i: int) -> int:
+        nonlocal dropped
+        line, end = _decode_value(text, i)
+        projected = project_line(line)
+        if projected is None:
+            dropped += 1
+        else:
+            lines.append(projected)
+        return end
+
+    def _item(i: int) -> int:
+        item, end = _decode_value(text, i)
+        projected = project_item(item)
+        if projected is not None:
+            items.append(projected)
+        return end
+
+    def _core_member(key: str, i: int) -> int:
+        if key == "items" and text.startswith("[", i):
+            core["items"] = items
+            return _scan_array(text, i, _item)
+        if key not in CORE_FIELDS:
+            return _drop_value(text, i)
+        value, end = _decode_value(text, i)
+        core[key] = _project_core_field(key, value)
+        return end
+
+    def _top_member(key: str, i: int) -> int:
+        if key == "lines" and text.startswith("[", i):
+            result["lines"] = lines
+            return _scan_array(text, i, _line)
+        if key == "core" and text.startswith("{", i):
+            result["core"] = core
+            return _scan_object(text, i, _core_member)
+        return _drop_value(text, i)
+
+    lines: list[dict] = []
+    items: list[dict] = []
+    core: dict = {}
+    end = _scan_object(text, 0, _top_member)
+    if _skip_ws(text, end) != len(text):
+        msg = f"Extra data after the response object at offset {end}"
+        raise SchemaError(msg)
+    if dropped:
+        logger.warning("Dropped %d currency line(s) without an id", dropped)
+    return result
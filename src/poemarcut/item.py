@@ -9,6 +9,8 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any
 
+_NON_DIGIT_RE = re.compile(r"[^\d]")
+
 
 def parse_int_price(raw: str) -> int:
     """Parse a raw string into an integer price.
@@ -29,7 +31,7 @@ def parse_int_price(raw: str) -> int:
 
     """
     s = (raw or "").strip()
-    normalized = re.sub(r"[^\d]", "", s)
+    normalized = _NON_DIGIT_RE.sub("", s)
     if not normalized:
         msg = f"invalid price: '{raw}'"
         raise ValueError(msg)
@@ -89,11 +91,25 @@ class Item:
     requirements: dict[str, int] = field(default_factory=dict)
     item_level: int | None = None
     droplevel: int | None = None
-    enchantments: list[str] = field(default_factory=list)
+    quality: int | None = None
+    sockets: str | None = None
+    enchantments: list[Mod] = field(default_factory=list)
     implicit_mods: list[Mod] = field(default_factory=list)
     explicit_mods: list[Mod] = field(default_factory=list)
     note: Note | None = None
 
+    def add_enchantment(self, mod: Mod) -> None:
+        """Add an enchantment to the item.
+
+        Args:
+            mod (Item.Mod): The enchantment mod to append.
+
+        Returns:
+            None
+
+        """
+        self.enchantments.append(mod)
+
     def add_implicit(self, mod: Mod) -> None:
         """Add an implicit mod to the item.
 
@@ -135,20 +151,26 @@ class Item:
             "requirements": dict(self.requirements),
             "item_level": self.item_level,
             "droplevel": self.droplevel,
-            "enchantments": list(self.enchantments),
+            "quality": self.quality,
+            "sockets": self.sockets,
+            "enchantments": [m.__dict__ for m in self.enchantments],
             "implicit_mods": [m.__dict__ for m in self.implicit_mods],
             "explicit_mods": [m.__dict__ for m in self.explicit_mods],
             "note": self.note.__dict__ if self.note is not None else None,
         }
 
     @classmethod
-    def from_text(cls, text: str) -> "Item":  # noqa: C901, PLR0912, PLR0915
+    def from_text(cls, text: str) -> "Item":  # noqa: C901, PLR0912
         """Create an Item by parsing raw copied item text.
 
-        This implements a minimal, forgiving parser sufficient for tests
-        and basic workflows: it extracts `class_`, `rarity`, `name`,
-        `basetype`, `item_level`, `droplevel` (map tier), simple
-        `requirements` (level), and the trade `note` (with price/currency).
+        The text is read in a single pass. Lines are dispatched on their
+        section (the header with class, rarity, name and basetype, and the
+        requirements block) and on their `key:` prefix, using the module-level
+        precompiled patterns. Mods come from `{ ... Modifier }` blocks of
+        advanced item copies and from lines tagged `(enchant)`, `(implicit)`,
+        `(crafted)`, `(fractured)`, `(rune)` or `(desecrated)`; enchant mods go to
+        `enchantments`, implicit ones to `implicit_mods` and all others to
+        `explicit_mods`.
 
         Args:
             text (str): Raw item text copied from the game or clipboard.
@@ -157,109 +179,183 @@ class Item:
             Item: Parsed Item instance.
 
         """
-        lines_raw = text.splitlines()
-        lines = [raw.strip() for raw in lines_raw if raw.strip()]
-
-        class_ = ""
-        rarity = None
-        name = ""
-        basetype = ""
-        item_level = None
-        droplevel = None
-        requirements: dict[str, int] = {}
-        note_obj = None
-
-        # Helper to map rarity string to enum
-        def _map_rarity(rarity_str: str) -> "Item.Rarity | None":
-            """Map a rarity string to the `Item.Rarity` enum.
-
-            Args:
-                rarity_str (str): The rarity string parsed from item text.
-
-            Returns:
-                Item.Rarity | None: Matching enum member or None if unknown.
-
-            """
-            if not rarity_str:
-                return None
-            lr = rarity_str.strip().lower()
-            if lr == "normal":
-                return cls.Rarity.COMMON
-            for r in cls.Rarity:
-                if r.value.lower() == lr:
-                    return r
-            return None
-
-        # Find simple key/value lines and indices
-        for idx, line in enumerate(lines):
-            low = line.lower()
-            if low.startswith("item class:"):
-                class_ = line.split(":", 1)[1].strip()
-            elif low.startswith("rarity:"):
-                rarity = _map_rarity(line.split(":", 1)[1].strip())
-                # Collect following name/basetype lines until a separator or key-like line
-                j = idx + 1
-                name_lines: list[str] = []
-                while j < len(lines):
-                    nxt = lines[j]
-                    if nxt.startswith("--------") or ":" in nxt:
-                        break
-                    if nxt.startswith("{"):
-                        break
-                    name_lines.append(nxt)
-                    j += 1
-                if name_lines:
-                    name = name_lines[0]
-                    if len(name_lines) > 1:
-                        basetype = name_lines[1]
-            elif low.startswith("item level:"):
-                m = re.search(r"(\d+)", line)
-                if m:
-                    item_level = int(m.group(1))
-            elif low.startswith("map tier"):
-                m = re.search(r"(\d+)", line)
-                if m:
-                    droplevel = int(m.group(1))
-            elif low.startswith("requirements:"):
-                # scan subsequent lines until separator
-                j = idx + 1
-                while j < len(lines) and not lines[j].startswith("--------"):
-                    lvl_m = re.search(r"level\s*(\d+)", lines[j], flags=re.IGNORECASE)
-                    if lvl_m:
-                        requirements["level"] = int(lvl_m.group(1))
-                    j += 1
-            elif low.startswith("note:"):
-                note_text = line.split(":", 1)[1].strip()
-                # Attempt to extract price and currency from the note text
-                pattern = r"~\s*(?:b/o|price)\b[:\s]*([\d\.,\s]+)\s*([A-Za-z0-9]+(?:[-\s][A-Za-z0-9]+)*)"
-                m = re.search(pattern, line, flags=re.IGNORECASE)
-                if m:
-                    price_str, cur_type = m.groups()
-                    try:
-                        price_val = parse_int_price(price_str)
-                    except ValueError:
-                        price_val, cur_type = None, None
-                    else:
-                        cur_type = cur_type.lower().strip()
-                else:
-                    price_val, cur_type = None, None
-
-                note_obj = cls.Note(text=note_text, price=price_val, currency=cur_type)
-
-        # Fallback: if name empty, try first non-key line
-        if not name:
-            for line in lines:
-                if ":" not in line and not line.startswith("--------") and not line.startswith("{"):
-                    name = line
-                    break
-
-        return cls(
-            name=name,
-            basetype=basetype,
-            class_=class_,
-            rarity=rarity,
-            requirements=requirements,
-            item_level=item_level,
-            droplevel=droplevel,
-            note=note_obj,
-        )
+        item = cls(name="", basetype="")
+        names: list[str] = []
+        fallback_name = ""
+        in_header = True  # first section: class, rarity, name and basetype
+        in_names = False  # lines after "Rarity:" in the header
+        in_requirements = False
+        block: list[Item.Mod] | None = None  # mods of the `{ ... Modifier }` block being read
+
+        for raw in text.splitlines():
+            line = raw.strip()
+            if not line:
+                block = None
+                continue
+            if line[0] == "-" and line.startswith(_SEPARATOR):
+                in_header = in_names = in_requirements = False
+                block = None
+                continue
+            if line[0] == "{":
+                kind = _HEADER_KIND_RE.search(line)
+                block = item._mods_for(kind.group(1).lower() if kind is not None else "")
+                continue
+
+            if line[-1] == ")":
+                open_at = line.rfind("(")
+                tag = line[open_at + 1 : -1].lower()
+                if tag in _MOD_TAGS:
+                    item._mods_for(tag).append(_make_mod(line[:open_at].rstrip()))
+                    continue
+            if block is not None:
+                # Skip reminder text such as "(Poison deals Chaos Damage over time, ...)".
+                if line[0] != "(":
+                    block.append(_make_mod(line))
+                continue
+
+            key, sep, value = line.partition(":")
+            if not sep:
+                if in_names:
+                    names.append(line)
+                elif in_requirements:
+                    item._add_requirement(line)
+                if not fallback_name:
+                    fallback_name = line
+                continue
+            in_names = False
+            field_name = _FIELDS.get(key.lower())
+            if field_name is None:
+                if key[:7].lower() == "quality":
+                    item.quality = _first_int(value)
+                elif in_requirements:
+                    item._add_requirement(line)
+                continue
+            value = value.strip()
+            if field_name == "class":
+                item.class_ = value
+            elif field_name == "rarity":
+                item.rarity = _RARITIES.get(value.lower())
+                in_names = in_header
+            elif field_name == "item_level":
+                item.item_level = _first_int(value)
+            elif field_name == "droplevel":
+                item.droplevel = _first_int(value)
+            elif field_name == "requirements":
+                in_requirements = True
+            elif field_name == "requires":
+                item._add_requirements_line(value)
+            elif field_name == "sockets":
+                item.sockets = value
+            elif field_name == "note":
+                item.note = _parse_note(value)
+
+        if names:
+            item.name = names[0]
+            if len(names) > 1:
+                item.basetype = names[1]
+        else:
+            item.name = fallback_name
+        return item
+
+    def _mods_for(self, kind: str) -> list[Mod]:
+        """Return the mod list for a mod tag or `{ ... Modifier }` header kind."""
+        if kind == "enchant":
+            return self.enchantments
+        if kind == "implicit":
+            return self.implicit_mods
+        return self.explicit_mods
+
+    def _add_requirement(self, line: str) -> None:
+        """Record a PoE1 requirements line such as "Level: 64", "Str: 191" or "Level 4 in Any Job"."""
+        m = _REQUIREMENT_RE.match(line)
+        if m is not None:
+            self.requirements[_REQUIREMENT_KEYS[m.group(1).lower()[:3]]] = int(m.group(2))
+
+    def _add_requirements_line(self, value: str) -> None:
+        """Record a PoE2 requirements line such as "Level 65, 111 Int"."""
+        for level, amount, attribute in _REQUIRES_RE.findall(value):
+            if level:
+                self.requirements["level"] = int(level)
+            else:
+                self.requirements[_REQUIREMENT_KEYS[attribute.lower()]] = int(amount)
+
+
+# Section separator line in copied item text.
+_SEPARATOR = "--------"
+_RARITIES: dict[str, Item.Rarity] = {
+    **{rarity.value.lower(): rarity for rarity in Item.Rarity},
+    "normal": Item.Rarity.COMMON,
+}
+# Lowercased `key:` prefixes of the lines `from_text` reads, and what they set.
+_FIELDS: dict[str, str] = {
+    "item class": "class",
+    "rarity": "rarity",
+    "item level": "item_level",
+    "map tier": "droplevel",
+    "waystone tier": "droplevel",
+    "requirements": "requirements",
+    "requires": "requires",
+    "sockets": "sockets",
+    "note": "note",
+}
+_REQUIREMENT_KEYS = {"lev": "level", "str": "str", "dex": "dex", "int": "int"}
+_REQUIREMENT_RE = re.compile(r"(level|str|dex|int)\w*:?\s*(\d+)", re.IGNORECASE)
+_REQUIRES_RE = re.compile(r"level\s+(\d+)|(\d+)\s+(str|dex|int)\b", re.IGNORECASE)
+_HEADER_KIND_RE = re.compile(r"\b(implicit|enchant)\b", re.IGNORECASE)
+# Trailing `(tag)`s that mark a line as a mod.
+_MOD_TAGS = frozenset({"enchant", "implicit", "crafted", "fractured", "rune", "desecrated"})
+_NOTE_PRICE_RE = re.compile(
+    r"~\s*(?:b/o|price)\b[:\s]*([\d\.,\s]+)\s*([A-Za-z0-9]+(?:[-\s][A-Za-z0-9]+)*)", re.IGNORECASE
+)
+# A number in a mod, with the roll range advanced item copies show after it, e.g. "74(70-79)".
+_MOD_NUMBER_RE = re.compile(r"(\d+(?:\.\d+)?)(?:\([^()]*\))?")
+_INT_RE = re.compile(r"\d+")
+_UNSCALABLE = " — Unscalable Value"
+
+
+def _first_int(text: str) -> int | None:
+    """Return the first integer in `text`, or None if there is none."""
+    m = _INT_RE.search(text)
+    return int(m.group()) if m is not None else None
+
+
+def _make_mod(text: str) -> Item.Mod:
+    """Build a mod from its text without tags, e.g. "+74(70-79) to maximum Life".
+
+    Args:
+        text (str): The stripped mod line without its `(implicit)`-style tag.
+
+    Returns:
+        Item.Mod: The mod with roll ranges removed from its text, named with its numbers
+            replaced by "#" and valued with its first number.
+
+    """
+    # Splitting on numbers alternates text and numbers: ["+", "74", " to maximum Life"].
+    parts = _MOD_NUMBER_RE.split(text.removesuffix(_UNSCALABLE))
+    if len(parts) == 1:
+        return Item.Mod(name=parts[0], text=parts[0])
+    value = float(parts[1])
+    if parts[0].endswith("-"):
+        value = -value
+    return Item.Mod(name="#".join(parts[::2]), text="".join(parts), value=value)
+
+
+def _parse_note(note_text: str) -> Item.Note:
+    """Parse a trade note such as "~b/o 1,000 chaos" into its price and currency.
+
+    Args:
+        note_text (str): The text after "Note:".
+
+    Returns:
+        Item.Note: The note; price and currency are None if no price could be parsed.
+
+    """
+    m = _NOTE_PRICE_RE.search(note_text)
+    if m is None:
+        return Item.Note(text=note_text)
+    price_str, cur_type = m.groups()
+    try:
+        price_val = parse_int_price(price_str)
+    except ValueError:
+        return Item.Note(text=note_text)
+    return Item.Note(text=note_text, price=price_val, currency=cur_type.lower().strip())
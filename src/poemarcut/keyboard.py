@@ -12,13 +12,14 @@ import pyautogui
 import pyperclip
 from pynput.keyboard import Key, KeyCode, Listener
 
-from poemarcut import constants, currency, settings
+from poemarcut import constants, currency, ladder, settings
 from poemarcut.focus import is_poe_game_window
 from poemarcut.item import Item, parse_int_price
 from poemarcut.logic import (
     compute_discounted_price_and_actual,
     convert_and_compute_price,
 )
+from poemarcut.rates import RateTable
 
 # pydirectinput uses Windows-only APIs at import-time; import only on Windows
 pydirectinput: Any | None = None
@@ -46,6 +47,105 @@ _cached_key_strs: dict[str, str] = {}
 _parsed_keys: dict[str, tuple[str, Any]] = {}
 
 
+def _ladder_key(currencies: list[str], game: int, league: str) -> ladder.LadderKey:
+    """Return the price ladder key for the current logic settings.
+
+    Args:
+        currencies (list[str]): Ordered list of currencies from highest to lowest.
+        game (int): The active game.
+        league (str): The active league.
+
+    Returns:
+        ladder.LadderKey: The key.
+
+    """
+    logic_settings = settings.settings_manager.settings.logic
+    return ladder.LadderKey(
+        game=game,
+        league=league,
+        currencies=tuple(currencies),
+        discount_percent=logic_settings.discount_percent,
+        max_actual_discount=logic_settings.max_actual_discount,
+        minimum_discount=logic_settings.minimum_discount,
+        minimum_discount_currency=logic_settings.minimum_discount_currency,
+        cap=logic_settings.price_ladder_cap,
+    )
+
+
+def _current_table(game: int, league: str) -> RateTable | None:
+    """Return the active league's rate table if it is already loaded.
+
+    This runs on the keyboard listener thread, so it never reads the cache file or fetches;
+    until the league is loaded the ladder is skipped and prices are computed live.
+
+    Args:
+        game (int): The active game.
+        league (str): The active league.
+
+    Returns:
+        RateTable | None: The rate table, or None if the league is not loaded.
+
+    """
+    return currency.store.loaded_table(game, league)
+
+
+def _prepare_ladder(currencies: list[str], game: int, league: str) -> None:
+    """Start rebuilding the price ladder in the background if the settings or rates changed.
+
+    Args:
+        currencies (list[str]): Ordered list of currencies from highest to lowest.
+        game (int): The active game.
+        league (str): The active league.
+
+    Returns:
+        None
+
+    """
+    ladder.cache.get(_ladder_key(currencies, game, league), _current_table(game, league))
+
+
+def _convert_price(
+    amount_units: int, last_cur_type: str | None, currencies: list[str], game: int, league: str
+) -> tuple[int | None, str | None, float]:
+    """Return `convert_and_compute_price` for the current settings, from the price ladder when possible.
+
+    Args:
+        amount_units (int): Number of units of the original price.
+        last_cur_type (str | None): The original currency.
+        currencies (list[str]): Ordered list of currencies from highest to lowest.
+        game (int): The active game.
+        league (str): The active league.
+
+    Returns:
+        tuple[int | None, str | None, float]: The new price, its currency and the actual discount percent.
+
+    """
+    key = _ladder_key(currencies, game, league)
+    result = ladder.cache.lookup(key, _current_table(game, league), amount_units, last_cur_type)
+    if result is not None:
+        return result
+
+    def _get_rate(*, from_currency: str, to_currency: str) -> float:
+        return currency.get_exchange_rate(
+            game=game,
+            league=league,
+            from_currency=from_currency,
+            to_currency=to_currency,
+            autoupdate=settings.settings_manager.settings.currency.autoupdate,
+        )
+
+    return convert_and_compute_price(
+        original_units=amount_units,
+        last_cur_type=last_cur_type,
+        currencies=currencies,
+        discount_percent=key.discount_percent,
+        max_actual_discount=key.max_actual_discount,
+        minimum_discount=key.minimum_discount,
+        minimum_discount_currency=key.minimum_discount_currency,
+        get_exchange_rate=_get_rate,
+    )
+
+
 def _match_char(event_key: Key | KeyCode | None, char: str) -> bool:
     """Return True if the event_key matches the provided character string.
 
@@ -345,6 +445,8 @@ def on_release(  # noqa: C901, PLR0911, PLR0912, PLR0915
                 price, cur_type = None, None
             with _state_lock:
                 _last_price, _last_type = price, cur_type
+            # Build the price ladder while the user opens the price dialog, so calcprice_key is a table lookup.
+            _prepare_ladder(currencies, game, league)
 
         if (
             rightclick_key is not None
@@ -415,26 +517,8 @@ def on_release(  # noqa: C901, PLR0911, PLR0912, PLR0915
                 minimum_discount = settings_manager.settings.logic.minimum_discount
                 minimum_discount_currency = settings_manager.settings.logic.minimum_discount_currency
                 if minimum_discount is not None and minimum_discount_currency:
-                    amount_units = int(last_price or copied_price)
-
-                    def _get_rate(*, from_currency: str, to_currency: str) -> float:
-                        return currency.get_exchange_rate(
-                            game=game,
-                            league=league,
-                            from_currency=from_currency,
-                            to_currency=to_currency,
-                            autoupdate=settings_manager.settings.currency.autoupdate,
-                        )
-
-                    converted_price, converted_currency, converted_actual = convert_and_compute_price(
-                        original_units=amount_units,
-                        last_cur_type=last_cur_type,
-                        currencies=currencies,
-                        discount_percent=discount_percent,
-                        max_actual_discount=max_actual_discount,
-                        minimum_discount=minimum_discount,
-                        minimum_discount_currency=minimum_discount_currency,
-                        get_exchange_rate=_get_rate,
+                    converted_price, converted_currency, converted_actual = _convert_price(
+                        int(last_price or copied_price), last_cur_type, currencies, game, league
                     )
                     if converted_price is not None:
                         discounted_price_candidate = converted_price
@@ -453,26 +537,8 @@ def on_release(  # noqa: C901, PLR0911, PLR0912, PLR0915
                         and last_cur_type != list(currencies)[-1]
                     ):
                         # Ensure max_actual_discount is respected but apply discount_percent otherwise when possible.
-                        amount_units = int(last_price or copied_price)
-
-                        def _get_rate(*, from_currency: str, to_currency: str) -> float:
-                            return currency.get_exchange_rate(
-                                game=game,
-                                league=league,
-                                from_currency=from_currency,
-                                to_currency=to_currency,
-                                autoupdate=settings_manager.settings.currency.autoupdate,
-                            )
-
-                        converted_price, converted_currency, converted_actual = convert_and_compute_price(
-                            original_units=amount_units,
-                            last_cur_type=last_cur_type,
-                            currencies=currencies,
-                            discount_percent=discount_percent,
-                            max_actual_discount=max_actual_discount,
-                            minimum_discount=minimum_discount,
-                            minimum_discount_currency=minimum_discount_currency,
-                            get_exchange_rate=_get_rate,
+                        converted_price, converted_currency, converted_actual = _convert_price(
+                            int(last_price or copied_price), last_cur_type, currencies, game, league
                         )
 
                         if converted_price is None:
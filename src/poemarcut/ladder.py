@@ -0,0 +1,247 @@
+"""Precomputed price ladders for instant hotkey pricing.
+
+For fixed logic settings and a fixed rate table, `logic.convert_and_compute_price`
+depends only on the price and its currency. A ladder holds its results for every
+price from 1 up to a cap in each configured currency, computed in one batch per
+currency by `reprice.convert_and_compute_prices`, so the calc-price hotkey only
+indexes a table instead of looking up exchange rates.
+
+Ladders are rebuilt on a background thread whenever the settings or the league's
+rate table change. Until the new ladder is ready, and for prices above the cap,
+callers compute the price live.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+
+from poemarcut import currency, reprice
+from poemarcut.rates import RateTable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LadderKey:
+    """Everything besides the rate table that a ladder's prices depend on.
+
+    Attributes:
+        game: The game version, either 1 (PoE1) or 2 (PoE2).
+        league: The league name.
+        currencies: Configured currencies from highest to lowest.
+        discount_percent: Minimum discount percent to apply.
+        max_actual_discount: Maximum allowed actual discount percent.
+        minimum_discount: Optional minimum discount amount.
+        minimum_discount_currency: Optional currency of the minimum discount.
+        cap: Highest precomputed price; 0 disables the ladder.
+
+    """
+
+    game: int
+    league: str
+    currencies: tuple[str, ...]
+    discount_percent: int
+    max_actual_discount: int
+    minimum_discount: int | None
+    minimum_discount_currency: str | None
+    cap: int
+
+
+@dataclass(frozen=True)
+class PriceLadder:
+    """Precomputed `convert_and_compute_price` results for prices 1..cap in each currency.
+
+    Attributes:
+        key: The settings the ladder was built for.
+        table: The rate table the ladder was built from.
+        rungs: Results by original currency, indexed by price - 1.
+
+    """
+
+    key: LadderKey
+    table: RateTable
+    rungs: dict[str, reprice.PriceBatch]
+
+    def lookup(self, units: int, cur_type: str | None) -> tuple[int | None, str | None, float] | None:
+        """Return the precomputed result for a price, or None if it is not in the ladder.
+
+        Args:
+            units (int): The original price.
+            cur_type (str | None): The original currency.
+
+        Returns:
+            tuple[int | None, str | None, float] | None: The result of `logic.convert_and_compute_price`,
+                or None if the currency is not configured or the price is above the cap.
+
+        """
+        batch = self.rungs.get(cur_type) if cur_type is not None else None
+        if batch is None or not 1 <= units <= self.key.cap:
+            return None
+        return batch[units - 1]
+
+
+def build(key: LadderKey, table: RateTable) -> PriceLadder:
+    """Compute a price ladder.
+
+    Args:
+        key (LadderKey): The settings to build the ladder for.
+        table (RateTable): The league's rate table.
+
+    Returns:
+        PriceLadder: The ladder.
+
+    """
+
+    def _get_rate(*, from_currency: str, to_currency: str) -> float:
+        return currency.table_rate(table, key.league, from_currency, to_currency)
+
+    units = range(1, key.cap + 1)
+    currencies = list(key.currencies)
+    rungs = {
+        cur: reprice.convert_and_compute_prices(
+            units,
+            [cur] * key.cap,
+            currencies,
+            discount_percent=key.discount_percent,
+            max_actual_discount=key.max_actual_discount,
+            get_exchange_rate=_get_rate,
+            minimum_discount=key.minimum_discount,
+            minimum_discount_currency=key.minimum_discount_currency,
+        )
+        for cur in dict.fromkeys(currencies)
+    }
+    return PriceLadder(key=key, table=table, rungs=rungs)
+
+
+class LadderCache:
+    """Holds the current price ladder and rebuilds it on a background thread when it goes out of date."""
+
+    def __init__(self) -> None:
+        """Initialize an empty cache.
+
+        Returns:
+            None
+
+        """
+        self._lock = threading.Lock()
+        self._ladder: PriceLadder | None = None
+        self._pending: tuple[LadderKey, RateTable] | None = None
+        self._thread: threading.Thread | None = None
+        self.builds = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: LadderKey, table: RateTable | None) -> PriceLadder | None:
+        """Return the ladder for `key` and `table`, scheduling a rebuild if the current one is out of date.
+
+        Args:
+            key (LadderKey): The current settings.
+            table (RateTable | None): The league's current rate table.
+
+        Returns:
+            PriceLadder | None: The ladder, or None until an up-to-date ladder has been built.
+
+        """
+        if table is None or key.cap <= 0:
+            return None
+        with self._lock:
+            ladder = self._ladder
+            if ladder is not None and ladder.key == key and ladder.table is table:
+                return ladder
+            pending = self._pending
+            if pending is None or pending[0] != key or pending[1] is not table:
+                self._pending = (key, table)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="price-ladder", daemon=True)
+                self._thread.start()
+            return None
+
+    def lookup(
+        self, key: LadderKey, table: RateTable | None, units: int, cur_type: str | None
+    ) -> tuple[int | None, str | None, float] | None:
+        """Return the precomputed result for a price, or None if it must be computed live.
+
+        Args:
+            key (LadderKey): The current settings.
+            table (RateTable | None): The league's current rate table.
+            units (int): The original price.
+            cur_type (str | None): The original currency.
+
+        Returns:
+            tuple[int | None, str | None, float] | None: The result of `logic.convert_and_compute_price`,
+                or None on a miss.
+
+        """
+        ladder = self.get(key, table)
+        result = ladder.lookup(units, cur_type) if ladder is not None else None
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def _run(self) -> None:
+        """Build pending ladders until none is left.
+
+        Returns:
+            None
+
+        """
+        while True:
+            with self._lock:
+                job, self._pending = self._pending, None
+                if job is None:
+                    self._thread = None
+                    return
+            key, table = job
+            try:
+                ladder = build(key, table)
+            except (LookupError, ValueError, TypeError, ArithmeticError):
+                logger.exception("Failed to build price ladder for PoE%s '%s'", key.game, key.league)
+                continue
+            with self._lock:
+                self._ladder = ladder
+                self.builds += 1
+            logger.debug("Built price ladder for PoE%s '%s' up to %d", key.game, key.league, key.cap)
+
+    def join(self, timeout: float | None = None) -> None:
+        """Wait for pending rebuilds to finish.
+
+        Args:
+            timeout (float | None): Seconds to wait, or None to wait until done.
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=timeout)
+
+    def clear(self) -> None:
+        """Drop the current ladder and reset the counters.
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            self._ladder = None
+            self._pending = None
+            self.builds = self.hits = self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return build and lookup counters.
+
+        Returns:
+            dict[str, int]: `builds`, `hits` and `misses`.
+
+        """
+        with self._lock:
+            return {"builds": self.builds, "hits": self.hits, "misses": self.misses}
+
+
+# Module-level cache used by the hotkey handler.
+cache = LadderCache()
@@ -6,7 +6,16 @@ interactions and side effects.
 """
 
 import math
+import operator
+from bisect import bisect_left
 from collections.abc import Callable
+from functools import cache, reduce
+from itertools import islice
+
+# Errors a `get_exchange_rate` callback raises when a rate is unavailable.
+RATE_ERRORS = (LookupError, KeyError, ValueError, TypeError)
+# Fractional minimum-discount prices within this of an integer count as that integer.
+_PRICE_EPS = 1e-9
 
 
 def compute_discounted_price_and_actual(copied_price: int, discount_percent: int) -> tuple[int, float]:
@@ -53,18 +62,124 @@ def next_currency_if_needed(
     return None
 
 
-def _compute_minimum_price(  # noqa: PLR0911, PLR0913
+class RateChain:
+    """Exchange rates down the currency chain from one currency, looked up at most once each.
+
+    `prefix[k]` is the cumulative rate from the start currency to `currencies[k]`,
+    multiplied step by step exactly like a walk down the chain would, so prices
+    derived from it round the same way. Rates are looked up on demand and the
+    chain ends before the first rate that cannot be looked up. A chain can be
+    shared by many `convert_and_compute_price` calls with the same start currency;
+    once it is resolved, searches along it need no rate lookups at all.
+    """
+
+    def __init__(self, currencies: list[str], start: str, get_exchange_rate: Callable[..., float]) -> None:
+        """Initialize the chain without looking up any rates.
+
+        Args:
+            currencies (list[str]): Ordered list of currencies from highest to lowest.
+            start (str): The start currency; must be in `currencies`.
+            get_exchange_rate (Callable[..., float]): Rate lookup with keyword args `from_currency` and `to_currency`.
+
+        Returns:
+            None
+
+        """
+        self.currencies = list(currencies[currencies.index(start) :])
+        self._get_exchange_rate = get_exchange_rate
+        self.rates: list[float] = []
+        self.prefix: list[float] = [1.0]
+        self.failed = False
+        self.ascending = True
+
+    def reach(self, k: int) -> bool:
+        """Look up the rates down to `currencies[k]`.
+
+        Args:
+            k (int): Index into `currencies`.
+
+        Returns:
+            bool: True if `currencies[k]` exists and every rate down to it could be looked up.
+
+        """
+        while len(self.prefix) <= k:
+            i = len(self.rates)
+            if self.failed or i + 1 >= len(self.currencies):
+                return False
+            try:
+                rate = self._get_exchange_rate(from_currency=self.currencies[i], to_currency=self.currencies[i + 1])
+            except RATE_ERRORS:
+                self.failed = True
+                return False
+            rate = float(rate)
+            self.rates.append(rate)
+            self.prefix.append(self.prefix[-1] * rate)
+            self.ascending = self.ascending and rate >= 1.0
+        return True
+
+    def resolve(self) -> "RateChain":
+        """Look up every rate down the chain, stopping at the first failure.
+
+        Returns:
+            RateChain: The chain itself.
+
+        """
+        self.reach(len(self.currencies) - 1)
+        return self
+
+    @property
+    def resolved(self) -> bool:
+        """Return True if no rate is left to look up."""
+        return self.failed or len(self.prefix) == len(self.currencies)
+
+    @property
+    def complete(self) -> bool:
+        """Return True if every rate down to the last currency has been looked up."""
+        return len(self.prefix) == len(self.currencies)
+
+
+def _first_reaching(key: Callable[[int], float], threshold: float, lo: int, hi: int) -> int:
+    """Return the first index in [lo, hi) whose nondecreasing `key` is >= `threshold`, or `hi` if none is.
+
+    Gallops from `lo` before bisecting, so the cost grows with the distance to the
+    answer rather than with the length of the range.
+
+    Args:
+        key (Callable[[int], float]): Nondecreasing function of the index.
+        threshold (float): The value to reach.
+        lo (int): First index to consider.
+        hi (int): End of the range.
+
+    Returns:
+        int: The index.
+
+    """
+    size = 1
+    while lo < hi:
+        probe = min(lo + size, hi) - 1
+        if key(probe) >= threshold:
+            return bisect_left(range(lo, probe + 1), threshold, key=key) + lo
+        lo = probe + 1
+        size *= 2
+    return hi
+
+
+def _compute_minimum_price(  # noqa: C901, PLR0911, PLR0912, PLR0913, PLR0917
     original_units: int,
     current_currency: str | None,
     currencies: list[str],
     minimum_discount: int,
     minimum_discount_currency: str,
     get_exchange_rate: Callable[..., float],
+    chain: RateChain | None = None,
 ) -> tuple[int | None, str | None, float] | None:
     """Compute the adjusted price required to satisfy a minimum currency discount.
 
     Returns the discounted price in the appropriate currency and the observed
     actual discount percent relative to that currency's original price.
+    On a resolved chain whose rates never lower a price, the first currency
+    where the price after the minimum discount is at least 1 is found by
+    galloping binary search; otherwise the chain is walked one step at a time.
     """
     if minimum_discount <= 0:
         return None
@@ -74,7 +189,6 @@ def _compute_minimum_price(  # noqa: PLR0911, PLR0913
     if minimum_discount_currency not in currencies:
         return None
 
-    currencies_list = list(currencies)
     units = float(original_units)
 
     try:
@@ -85,37 +199,163 @@ def _compute_minimum_price(  # noqa: PLR0911, PLR0913
                 from_currency=minimum_discount_currency,
                 to_currency=current_currency,
             )
-    except (LookupError, KeyError, ValueError, TypeError):
+    except RATE_ERRORS:
         return None
 
-    target = units - min_amount_current
-    idx = currencies_list.index(current_currency)
-    rate_conversion = 1.0
+    if chain is None:
+        chain = RateChain(list(currencies), current_currency, get_exchange_rate)
+    threshold = 1.0 - _PRICE_EPS
+    start_target = units - min_amount_current
+    target, idx = start_target, 0
+    found = target >= threshold
+    if found or not (chain.resolved and chain.ascending):
+        while not found and chain.reach(idx + 1):
+            target *= chain.rates[idx]
+            idx += 1
+            found = target >= threshold
+    elif start_target > 0:
+
+        def _target(i: int) -> float:
+            # Price after the minimum discount in currencies[i], multiplied step by step like a walk.
+            return reduce(operator.mul, islice(chain.rates, i), start_target)
+
+        # `start_target * prefix[i]` is within a few ulps of `_target(i)` and increasing, so it
+        # locates the first currency reaching the threshold; the exact products settle it.
+        reachable = len(chain.prefix)
+        idx = _first_reaching(lambda i: start_target * chain.prefix[i], threshold, 1, reachable)
+        while idx > 1 and _target(idx - 1) >= threshold:
+            idx -= 1
+        while idx < reachable and (target := _target(idx)) < threshold:
+            idx += 1
+        found = idx < reachable
+    # Otherwise rates of at least 1 never lift a price that is not positive to 1.
+
+    if found:
+        price = max(math.floor(target + _PRICE_EPS), 1)
+        original_price_in_curr = units * chain.prefix[idx]
+        actual = (original_price_in_curr - price) * 100.0 / original_price_in_curr
+        return price, chain.currencies[idx], actual
+
+    if not chain.complete:
+        return None
+    original_price_in_curr = units * chain.prefix[-1]
+    actual = (original_price_in_curr - 1) * 100.0 / original_price_in_curr
+    return 1, chain.currencies[-1], actual
+
+
+def _discount_within_max(price: int, discount_percent: int, max_actual_discount: int) -> tuple[int, float, bool]:
+    """Discount a price by `discount_percent`, or by `max_actual_discount` if rounding overshoots the maximum.
+
+    Args:
+        price (int): The price, > 0.
+        discount_percent (int): Minimum discount percent to apply.
+        max_actual_discount (int): Maximum allowed actual discount percent.
+
+    Returns:
+        tuple[int, float, bool]: The discounted price, its actual discount percent and whether it is within the max.
+
+    """
+    discounted, actual = compute_discounted_price_and_actual(price, discount_percent)
+    if actual <= float(max_actual_discount):
+        return discounted, actual, True
+    if discount_percent != max_actual_discount:
+        discounted, actual = compute_discounted_price_and_actual(price, max_actual_discount)
+    return discounted, actual, actual <= float(max_actual_discount)
+
+
+@cache
+def _small_prices_within_max(discount_percent: int, max_actual_discount: int) -> bytes:
+    """Return which small prices can be discounted within the maximum.
+
+    Rounding the discount up adds less than one unit, so every price of at least
+    `100 // (max_actual_discount - discount_percent) + 2` can be. The result is cut
+    after the last price that cannot, so every price of at least its length fits.
 
-    while True:
-        if target >= 1.0 - 1e-9:
-            price = math.floor(target + 1e-9)
-            price = max(price, 1)
-            original_price_in_curr = units * rate_conversion
-            actual = (original_price_in_curr - price) * 100.0 / original_price_in_curr
-            return price, current_currency, actual
+    Args:
+        discount_percent (int): Minimum discount percent to apply.
+        max_actual_discount (int): Maximum allowed actual discount percent, > `discount_percent`.
+
+    Returns:
+        bytes: Non-zero at index `price` if `price` can be discounted within the maximum.
+
+    """
+    threshold = 100 // (max_actual_discount - discount_percent) + 2
+    fits = bytes(
+        price > 0 and _discount_within_max(price, discount_percent, max_actual_discount)[2]
+        for price in range(threshold)
+    )
+    return fits[: fits.rfind(0) + 1]
+
+
+def _solve_conversion(  # noqa: C901
+    units: int,
+    chain: RateChain,
+    discount_percent: int,
+    max_actual_discount: int,
+    actual: float,
+) -> tuple[int | None, str | None, float]:
+    """Find the first currency down the chain whose converted price can be discounted within the maximum.
 
-        if idx == len(currencies_list) - 1:
-            original_price_in_curr = units * rate_conversion
-            price = 1
-            actual = (original_price_in_curr - 1) * 100.0 / original_price_in_curr
-            return price, currencies_list[-1], actual
+    Whether a price fits depends only on the price: no price below the smallest
+    fitting one does, every price from a small threshold up does, and the few
+    prices in between are looked up in a precomputed table. On a resolved chain
+    whose converted prices never decrease, the currencies priced below the smallest
+    fitting price are skipped by galloping binary search and the next few are
+    checked against the table, without any rate lookups or discount calculations.
 
-        next_currency = currencies_list[idx + 1]
-        try:
-            rate = get_exchange_rate(from_currency=current_currency, to_currency=next_currency)
-        except (LookupError, KeyError, ValueError, TypeError):
-            return None
+    Args:
+        units (int): Number of units in the start currency.
+        chain (RateChain): The chain from the start currency.
+        discount_percent (int): Minimum discount percent to apply.
+        max_actual_discount (int): Maximum allowed actual discount percent.
+        actual (float): The actual discount observed in the start currency.
 
-        rate_conversion *= float(rate)
-        target *= float(rate)
-        current_currency = next_currency
-        idx += 1
+    Returns:
+        tuple[int | None, str | None, float]: As `convert_and_compute_price`.
+
+    """
+    if max_actual_discount <= discount_percent:
+        # No threshold exists; whether a price fits depends on exact divisibility.
+        k = 1
+        while chain.reach(k):
+            price = int(units * chain.prefix[k])
+            if price > 0:
+                discounted, actual, within = _discount_within_max(price, discount_percent, max_actual_discount)
+                if within:
+                    return discounted, chain.currencies[k], actual
+            k += 1
+        return None, None, actual
+
+    fits = _small_prices_within_max(discount_percent, max_actual_discount)
+    threshold = len(fits)
+    prefix = chain.prefix
+    if chain.resolved and chain.ascending and math.isfinite(units * prefix[-1]):
+
+        def _price(i: int) -> int:
+            return int(units * prefix[i])
+
+        # Skip the currencies whose price is below the smallest one that fits, then check the rest in order.
+        k = _first_reaching(_price, fits.find(1) if 1 in fits else threshold, 1, len(prefix))
+        while k < len(prefix) and (price := _price(k)) < threshold and not fits[price]:
+            k += 1
+    else:
+        k = 1
+        while chain.reach(k):
+            price = int(units * prefix[k])
+            if price >= threshold or (price > 0 and fits[price]):
+                break
+            k += 1
+
+    if k < len(prefix):
+        discounted, actual, _ = _discount_within_max(int(units * prefix[k]), discount_percent, max_actual_discount)
+        return discounted, chain.currencies[k], actual
+    # exhausted conversion chain without finding a satisfactory price; report the last observed discount
+    for i in reversed(range(1, len(prefix))):
+        price = int(units * prefix[i])
+        if price > 0:
+            _, actual, _ = _discount_within_max(price, discount_percent, max_actual_discount)
+            break
+    return None, None, actual
 
 
 def convert_and_compute_price(  # noqa: C901, PLR0911, PLR0912, PLR0913
@@ -127,6 +367,8 @@ def convert_and_compute_price(  # noqa: C901, PLR0911, PLR0912, PLR0913
     get_exchange_rate: Callable[..., float],
     minimum_discount: int | None = None,
     minimum_discount_currency: str | None = None,
+    *,
+    chain: RateChain | None = None,
 ) -> tuple[int | None, str | None, float]:
     """Convert down the currency chain to find a valid discounted price.
 
@@ -151,6 +393,8 @@ def convert_and_compute_price(  # noqa: C901, PLR0911, PLR0912, PLR0913
             return a float rate.
         minimum_discount: optional minimum discount amount to apply
         minimum_discount_currency: optional currency type for minimum discount
+        chain: optional `RateChain` from `last_cur_type` down the same `currencies`, shared
+            between calls so each rate is looked up once
 
     Returns:
         A tuple (discounted_price_or_None, final_currency_or_None, actual_percent)
@@ -172,10 +416,14 @@ def convert_and_compute_price(  # noqa: C901, PLR0911, PLR0912, PLR0913
     # Use original units when converting down the chain so rounding doesn't
     # compound across steps.
     units = int(original_units)
-    cumulative_rate = 1.0
+    # Shared by the minimum discount and the conversion search, so each rate is looked up once.
+    if chain is not None and chain.currencies[0] != current_currency:
+        chain = None
 
     min_candidate: tuple[int | None, str | None, float] | None = None
     if minimum_discount is not None and minimum_discount_currency is not None:
+        if chain is None and current_currency and current_currency in currencies_list:
+            chain = RateChain(currencies_list, current_currency, get_exchange_rate)
         min_candidate = _compute_minimum_price(
             original_units=original_units,
             current_currency=current_currency,
@@ -183,6 +431,7 @@ def convert_and_compute_price(  # noqa: C901, PLR0911, PLR0912, PLR0913
             minimum_discount=minimum_discount,
             minimum_discount_currency=minimum_discount_currency,
             get_exchange_rate=get_exchange_rate,
+            chain=chain,
         )
 
     # initial price in the same currency
@@ -217,40 +466,6 @@ def convert_and_compute_price(  # noqa: C901, PLR0911, PLR0912, PLR0913
     # currencies.
     if not current_currency or current_currency not in currencies_list:
         return None, None, actual
-
-    idx = currencies_list.index(current_currency)
-    while idx < len(currencies_list) - 1:
-        next_idx = idx + 1
-        next_currency = currencies_list[next_idx]
-        try:
-            rate = get_exchange_rate(from_currency=current_currency, to_currency=next_currency)
-        except (LookupError, KeyError, ValueError, TypeError):
-            return None, None, actual
-
-        cumulative_rate *= float(rate)
-        price = int(units * cumulative_rate)
-
-        if price <= 0:
-            current_currency = next_currency
-            idx = next_idx
-            continue
-
-        # Try preferred discount first for this converted price.
-        discounted, actual = _calc(price, discount_percent)
-
-        # If the computed actual is within the allowed maximum, we're done.
-        if actual <= float(max_actual_discount):
-            return discounted, next_currency, actual
-
-        # Otherwise, try using max allowed actual discount as fallback.
-        if discount_percent != max_actual_discount:
-            discounted, actual = _calc(price, max_actual_discount)
-            if actual <= float(max_actual_discount):
-                return discounted, next_currency, actual
-
-        # advance to next currency in chain
-        current_currency = next_currency
-        idx = next_idx
-
-    # exhausted conversion chain without finding a satisfactory price
-    return None, None, actual
+    if chain is None:
+        chain = RateChain(currencies_list, current_currency, get_exchange_rate)
+    return _solve_conversion(units, chain, discount_percent, max_actual_discount, actual)
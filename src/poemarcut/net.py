@@ -0,0 +1,494 @@
+"""Shared HTTP client for PoEMarcut.
+
+All outgoing requests go through one `requests.Session`, so connections to
+poe.ninja, GGG and GitHub are kept alive and reused instead of doing a new
+TCP+TLS handshake per request. Conditional GET helpers let callers revalidate
+cached responses with ETag / Last-Modified and skip the download on 304.
+
+Each endpoint has a circuit breaker: after repeated failures, requests to it
+fail fast with `CircuitOpenError` for a jittered, exponentially growing backoff
+instead of each waiting for a timeout. Requests are also scheduled by the
+shared `ratelimit.governor` within the limits announced in GGG's
+`X-Rate-Limit-*` response headers.
+
+The API origins can be redirected, e.g. to the offline stand-in server in
+`poemarcut.standin`, with `set_base_url` or the `POEMARCUT_API_BASE_URL`
+environment variable.
+"""
+
+import logging
+import os
+import random
+import time
+from collections.abc import Callable
+from enum import Enum
+from http import HTTPStatus
+from threading import Lock
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from poemarcut import __version__, ratelimit
+
+USER_AGENT = "poemarcut/" + __version__ + " (+https://github.com/cdrg/poemarcut)"
+
+# Default request timeout in seconds.
+DEFAULT_TIMEOUT = 5
+
+# Connection pool sizing: a handful of hosts, a few concurrent requests per host.
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 8
+
+# Origins of the APIs PoEMarcut talks to.
+POE_NINJA_ORIGIN = "https://poe.ninja"
+GGG_ORIGIN = "https://www.pathofexile.com"
+GGG_API_ORIGIN = "https://api.pathofexile.com"
+GITHUB_API_ORIGIN = "https://api.github.com"
+API_ORIGINS = (POE_NINJA_ORIGIN, GGG_ORIGIN, GGG_API_ORIGIN, GITHUB_API_ORIGIN)
+
+# If set, every API origin is redirected to this base URL.
+API_BASE_URL_ENV = "POEMARCUT_API_BASE_URL"
+
+# Circuit breaker defaults: open after this many consecutive failures, then back off
+# from BREAKER_BASE_BACKOFF_S doubling up to BREAKER_MAX_BACKOFF_S, with jitter.
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_BASE_BACKOFF_S = 10.0
+BREAKER_MAX_BACKOFF_S = 600.0
+
+logger = logging.getLogger(__name__)
+
+
+def _base_urls_from_env() -> dict[str, str]:
+    """Return origin overrides from the `POEMARCUT_API_BASE_URL` environment variable.
+
+    Returns:
+        dict[str, str]: Base URL for every API origin, or an empty dict if the variable is unset.
+
+    """
+    base_url = os.environ.get(API_BASE_URL_ENV, "").rstrip("/")
+    return dict.fromkeys(API_ORIGINS, base_url) if base_url else {}
+
+
+_base_urls: dict[str, str] = _base_urls_from_env()
+
+_session_lock = Lock()
+_session: requests.Session | None = None
+
+RateLimitedError = ratelimit.RateLimitedError
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of sending a request while the endpoint's circuit breaker is open."""
+
+
+class CircuitState(Enum):
+    """State of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Tracks failures of one endpoint and short-circuits requests while it is down.
+
+    CLOSED: requests pass. After `failure_threshold` consecutive failures the breaker
+    opens. OPEN: requests are refused until the backoff elapses. HALF_OPEN: one trial
+    request passes; success closes the breaker, failure reopens it with a doubled backoff.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        base_backoff: float = BREAKER_BASE_BACKOFF_S,
+        max_backoff: float = BREAKER_MAX_BACKOFF_S,
+        clock: Callable[[], float] = time.monotonic,
+        rng: random.Random | None = None,
+    ) -> None:
+        """Initialize the breaker in the CLOSED state.
+
+        Args:
+            name (str): Endpoint name used in logs and stats.
+            failure_threshold (int): Consecutive failures that open the breaker.
+            base_backoff (float): Seconds the breaker stays open the first time.
+            max_backoff (float): Upper bound on the backoff in seconds.
+            clock (Callable[[], float]): Monotonic clock, replaceable in tests.
+            rng (random.Random | None): Random source for jitter.
+
+        Returns:
+            None
+
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._lock = Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opens_in_row = 0
+        self._open_until = 0.0
+        self._trial_in_flight = False
+        self.opened = 0
+        self.short_circuited = 0
+        self.total_failures = 0
+        self.total_successes = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """Return the current state, moving OPEN to HALF_OPEN once the backoff has elapsed."""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> CircuitState:
+        """Return the current state. Must be called with `_lock` held."""
+        if self._state is CircuitState.OPEN and self._clock() >= self._open_until:
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: CircuitState) -> None:
+        """Change state and log the transition. Must be called with `_lock` held."""
+        if state is self._state:
+            return
+        previous, self._state = self._state, state
+        if state is CircuitState.OPEN:
+            logger.warning(
+                "Circuit for %s %s -> open after %d failure(s); retrying in %.1f s",
+                self.name,
+                previous.value,
+                self._failures,
+                self._retry_in_locked(),
+            )
+        else:
+            logger.info("Circuit for %s %s -> %s", self.name, previous.value, state.value)
+
+    def _retry_in_locked(self) -> float:
+        """Return seconds until an open breaker allows a trial request. Must be called with `_lock` held."""
+        return max(0.0, self._open_until - self._clock()) if self._state is CircuitState.OPEN else 0.0
+
+    @property
+    def retry_in(self) -> float:
+        """Return seconds until an open breaker allows a trial request, 0 if not open."""
+        with self._lock:
+            self._current_state()
+            return self._retry_in_locked()
+
+    def allow(self) -> bool:
+        """Return True if a request may be sent now.
+
+        Returns:
+            bool: False while open, and in HALF_OPEN while the trial request is in flight.
+
+        """
+        with self._lock:
+            state = self._current_state()
+            if state is CircuitState.CLOSED:
+                return True
+            if state is CircuitState.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def cancel(self) -> None:
+        """Give back a request that `allow` let through but that was never sent.
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        """Record a successful request, closing the breaker.
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            self.total_successes += 1
+            self._failures = 0
+            self._opens_in_row = 0
+            self._trial_in_flight = False
+            self._transition(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the breaker if the threshold is reached or a trial failed.
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            self.total_failures += 1
+            self._failures += 1
+            if self._state is CircuitState.OPEN:
+                # A request sent before the breaker opened; the backoff is already running.
+                return
+            trial_failed = self._state is CircuitState.HALF_OPEN
+            self._trial_in_flight = False
+            if trial_failed or self._failures >= self.failure_threshold:
+                backoff = min(self.max_backoff, self.base_backoff * 2**self._opens_in_row)
+                # Jitter into [backoff/2, backoff] so clients that failed together do not retry together.
+                self._open_until = self._clock() + backoff * self._rng.uniform(0.5, 1.0)
+                self._opens_in_row += 1
+                self.opened += 1
+                self._transition(CircuitState.OPEN)
+
+    def stats(self) -> dict[str, object]:
+        """Return the breaker state and counters.
+
+        Returns:
+            dict[str, object]: `state`, `retry_in`, `opened`, `short_circuited`, `failures` and `successes`.
+
+        """
+        with self._lock:
+            state = self._current_state()
+            return {
+                "state": state.value,
+                "retry_in": self._retry_in_locked(),
+                "opened": self.opened,
+                "short_circuited": self.short_circuited,
+                "failures": self.total_failures,
+                "successes": self.total_successes,
+            }
+
+
+_breakers_lock = Lock()
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def endpoint_key(url: str) -> str:
+    """Return the circuit breaker key of a URL: scheme, host and path, without the query.
+
+    Args:
+        url (str): An absolute URL.
+
+    Returns:
+        str: The endpoint key.
+
+    """
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}"
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    """Return the circuit breaker for the endpoint of `url`, creating it on first use.
+
+    Args:
+        url (str): An absolute URL.
+
+    Returns:
+        CircuitBreaker: The endpoint's breaker.
+
+    """
+    key = endpoint_key(url)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(key)
+        return breaker
+
+
+def breaker_stats() -> dict[str, dict[str, object]]:
+    """Return the state and counters of every circuit breaker.
+
+    Returns:
+        dict[str, dict[str, object]]: `CircuitBreaker.stats()` keyed by endpoint.
+
+    """
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
+
+
+def reset_breakers(origin: str | None = None) -> None:
+    """Forget circuit breaker state, for all endpoints or those of one origin.
+
+    Args:
+        origin (str | None): Only reset endpoints of this origin, or all if None.
+
+    Returns:
+        None
+
+    """
+    with _breakers_lock:
+        for key in list(_breakers):
+            if origin is None or key == origin or key.startswith(origin + "/"):
+                del _breakers[key]
+
+
+def _new_session() -> requests.Session:
+    """Create a session with a keep-alive connection pool and default headers.
+
+    Returns:
+        requests.Session: The configured session.
+
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"})
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the shared session, creating it on first use.
+
+    Returns:
+        requests.Session: The shared session.
+
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _new_session()
+        return _session
+
+
+def close_session() -> None:
+    """Close the shared session and its pooled connections.
+
+    A new session is created on the next request.
+
+    Returns:
+        None
+
+    """
+    global _session
+    with _session_lock:
+        session, _session = _session, None
+    if session is not None:
+        session.close()
+
+
+def set_base_url(origin: str, base_url: str | None) -> None:
+    """Redirect requests for an API origin to another base URL.
+
+    Args:
+        origin (str): One of `API_ORIGINS`, e.g. `POE_NINJA_ORIGIN`.
+        base_url (str | None): Replacement scheme, host and optional path prefix, or None to restore the origin.
+
+    Returns:
+        None
+
+    """
+    if base_url:
+        _base_urls[origin] = base_url.rstrip("/")
+    else:
+        _base_urls.pop(origin, None)
+    # The breakers tracked the previous target's health, and the governor its rate limits.
+    reset_breakers(origin)
+    ratelimit.governor.reset()
+
+
+def resolve(url: str) -> str:
+    """Return `url` with its origin replaced by the configured base URL, if any.
+
+    Args:
+        url (str): An absolute URL.
+
+    Returns:
+        str: The URL to request.
+
+    """
+    for origin, base_url in _base_urls.items():
+        if url == origin or url.startswith(origin + "/"):
+            return base_url + url[len(origin) :]
+    return url
+
+
+def get(
+    url: str,
+    *,
+    params: dict[str, str] | None = None,
+    etag: str | None = None,
+    last_modified: str | None = None,
+    headers: dict[str, str] | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> requests.Response:
+    """Issue a GET request through the shared session.
+
+    If `etag` or `last_modified` are given, the request is conditional and the
+    server may answer 304 Not Modified with an empty body.
+
+    Args:
+        url (str): The URL to fetch.
+        params (dict[str, str] | None): Optional query parameters.
+        etag (str | None): ETag of the cached response, sent as If-None-Match.
+        last_modified (str | None): Last-Modified of the cached response, sent as If-Modified-Since.
+        headers (dict[str, str] | None): Additional request headers, e.g. Authorization.
+        timeout (float): Request timeout in seconds.
+
+    Returns:
+        requests.Response: The response. Callers should check `is_not_modified` and call `raise_for_status`.
+
+    Raises:
+        RateLimitedError: Without sending a request, if the endpoint's rate limits would not allow one
+            within `ratelimit.DEFAULT_MAX_WAIT_S`.
+        CircuitOpenError: Without sending a request, if the endpoint's circuit breaker is open.
+        requests.RequestException: On connection errors or timeouts.
+
+    """
+    key = endpoint_key(url)
+    breaker = get_breaker(url)
+    if not breaker.allow():
+        msg = f"Circuit open for {breaker.name}; retrying in {breaker.retry_in:.0f} s"
+        raise CircuitOpenError(msg)
+    # Only requests that will actually be sent spend rate limit budget.
+    try:
+        ratelimit.governor.acquire(key)
+    except RateLimitedError:
+        breaker.cancel()
+        raise
+    headers = dict(headers or {})
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    try:
+        response = get_session().get(resolve(url), params=params, headers=headers, timeout=timeout)
+    except requests.RequestException:
+        breaker.record_failure()
+        raise
+    ratelimit.governor.update(key, response.headers, response.status_code)
+    # Server errors and throttling count against the endpoint; other responses mean it is up.
+    if response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR or response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+def is_not_modified(response: requests.Response) -> bool:
+    """Return True if the response is a 304 Not Modified.
+
+    Args:
+        response (requests.Response): The response to check.
+
+    Returns:
+        bool: True if the cached response is still valid.
+
+    """
+    return response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def validators(response: requests.Response) -> tuple[str | None, str | None]:
+    """Return the cache validators of a response.
+
+    Args:
+        response (requests.Response): The response.
+
+    Returns:
+        tuple[str | None, str | None]: The (ETag, Last-Modified) header values, None if absent.
+
+    """
+    return response.headers.get("ETag"), response.headers.get("Last-Modified")
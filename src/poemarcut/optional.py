@@ -0,0 +1,10 @@
+"""Optional dependencies for PoEMarcut.
+
+NumPy speeds up batch computations but is not required: `np` is None without it,
+and every module that uses it falls back to pure Python.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
@@ -0,0 +1,172 @@
+"""Background prefetching of currency data for PoEMarcut.
+
+The scheduler keeps the active league's snapshot in `currency.store` fresh by
+revalidating it shortly after GGG's hourly exchange update, or shortly before
+the snapshot expires, whichever comes first. Together with the store's
+stale-while-revalidate lookups this keeps network requests off the hotkey path.
+"""
+
+import logging
+import math
+import threading
+import time
+
+from poemarcut import currency
+from poemarcut.constants import S_IN_HOUR
+
+# Refresh this many seconds before a snapshot leaves the one-hour freshness window.
+PREFETCH_LEAD_S = 60.0
+# GGG publishes exchange data hourly; give poe.ninja this long after the hour to pick it up.
+PUBLISH_DELAY_S = 120.0
+# Wait this long before retrying after a refresh that produced no data.
+RETRY_DELAY_S = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+def next_refresh_time(
+    mtime: float, now: float, *, lead: float = PREFETCH_LEAD_S, publish_delay: float = PUBLISH_DELAY_S
+) -> float:
+    """Return when a snapshot with the given mtime should next be refreshed.
+
+    This is the first hourly GGG publication after `mtime` (plus `publish_delay`),
+    or `lead` seconds before the snapshot expires, whichever comes first.
+
+    Args:
+        mtime (float): The snapshot mtime as a Unix timestamp.
+        now (float): The current Unix timestamp.
+        lead (float): Seconds before expiry to refresh.
+        publish_delay (float): Seconds after the hour that new data is expected.
+
+    Returns:
+        float: Unix timestamp of the next refresh, never earlier than `now`.
+
+    """
+    expiry = mtime + S_IN_HOUR
+    next_publish = (math.floor((mtime - publish_delay) / S_IN_HOUR) + 1) * S_IN_HOUR + publish_delay
+    return max(now, min(expiry - lead, next_publish))
+
+
+class PrefetchScheduler:
+    """Keeps the watched league's currency snapshot fresh on a background thread."""
+
+    def __init__(self, store: currency.CurrencyStore | None = None) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            store (currency.CurrencyStore | None): The store to refresh. Defaults to `currency.store`.
+
+        Returns:
+            None
+
+        """
+        self._store = store
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._target: tuple[int, str] | None = None
+        self.refreshes: int = 0
+
+    @property
+    def store(self) -> currency.CurrencyStore:
+        """Return the store being refreshed."""
+        return self._store if self._store is not None else currency.store
+
+    def watch(self, game: int, league: str, *, autoupdate: bool = True) -> None:
+        """Set the league to keep fresh. Disabling `autoupdate` pauses prefetching.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name.
+            autoupdate (bool): Whether fetching from the API is enabled.
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            self._target = (game, league) if autoupdate and league else None
+        self._wake.set()
+
+    def start(self) -> None:
+        """Start the background thread if it is not already running.
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="currency-prefetch", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Stop the background thread.
+
+        Args:
+            timeout (float): Seconds to wait for the thread to exit.
+
+        Returns:
+            None
+
+        """
+        self._stopping.set()
+        self._wake.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+
+    def _next_due(self, target: tuple[int, str]) -> float:
+        """Load the target snapshot if needed and return when it should next be refreshed.
+
+        Args:
+            target (tuple[int, str]): The (game, league) to check.
+
+        Returns:
+            float: Unix timestamp of the next refresh.
+
+        """
+        snapshot = self.store.get_snapshot(*target, update=True)
+        now = time.time()
+        if snapshot is None:
+            return now + RETRY_DELAY_S
+        return next_refresh_time(snapshot.mtime, now)
+
+    def _run(self) -> None:
+        """Scheduler loop: sleep until the watched snapshot is due, then refresh it.
+
+        Returns:
+            None
+
+        """
+        while not self._stopping.is_set():
+            self._wake.clear()
+            with self._lock:
+                target = self._target
+            if target is None:
+                self._wake.wait()
+                continue
+
+            try:
+                due = self._next_due(target)
+                if self._wake.wait(timeout=max(0.0, due - time.time())):
+                    # Woken early by watch() or stop(); re-evaluate the target.
+                    continue
+                logger.info("Prefetching currency prices for PoE%s '%s'", *target)
+                before = self.store.get_snapshot(*target, update=False)
+                after = self.store.refresh(*target)
+                self.refreshes += 1
+                if after is None or after is before or after.stale:
+                    # Nothing new was published; back off instead of spinning on the same due time.
+                    self._wake.wait(timeout=RETRY_DELAY_S)
+            except (LookupError, ValueError, TypeError, OSError):
+                logger.exception("Currency prefetch failed for PoE%s '%s'", *target)
+                self._wake.wait(timeout=RETRY_DELAY_S)
+
+
+# Module-level singleton used by the CLI and GUI.
+scheduler = PrefetchScheduler()
@@ -0,0 +1,543 @@
+"""Pluggable economy data providers with hedged requests.
+
+A provider returns currency data in the projected poe.ninja response layout
+(`core.primary`, `core.rates`, `lines[].id`/`primaryValue`), wherever it comes
+from: poe.ninja, GGG's official currency exchange API, or a local file.
+
+`HedgedFetcher` asks the provider with the best recent latency first. If it has
+not answered within the hedge delay, the next provider is asked as well, and
+the first valid response wins. Slower requests are left to finish in the
+background so their latency still counts towards the provider ordering.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+
+import requests
+
+from poemarcut import ingest, net
+from poemarcut.constants import CURRENCY_CATEGORY
+
+# Ask the next provider if the current one has not answered within this many seconds.
+DEFAULT_HEDGE_DELAY_S = 1.5
+# Give up on providers that have not answered within this many seconds in total.
+DEFAULT_FETCH_TIMEOUT_S = 30.0
+# Weight of the newest sample in a provider's moving average latency.
+LATENCY_EWMA_ALPHA = 0.3
+# Providers that failed this many times in a row are only asked after all others.
+DEMOTE_AFTER_FAILURES = 3
+
+# GGG's official currency exchange API. Requires an OAuth token with the `service:cxapi` scope.
+GGG_CURRENCY_EXCHANGE_URL = net.GGG_API_ORIGIN + "/currency-exchange"
+GGG_TOKEN_ENV = "POEMARCUT_GGG_TOKEN"  # noqa: S105
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ProviderResponse:
+    """Currency data returned by a provider.
+
+    Attributes:
+        provider: Name of the provider that produced the response.
+        data: The projected response dict, or None if `not_modified`.
+        not_modified: True if the provider confirmed that the cached data is still current.
+        etag: Validator for the next conditional request, if the provider supports them.
+        last_modified: Validator for the next conditional request, if the provider supports them.
+
+    """
+
+    provider: str
+    data: dict | None
+    not_modified: bool = False
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class Provider(ABC):
+    """Base class of economy data providers."""
+
+    name: str = ""
+
+    @abstractmethod
+    def fetch(
+        self, game: int, league: str, category: str, *, etag: str | None = None, last_modified: str | None = None
+    ) -> ProviderResponse:
+        """Fetch currency data for a game, league and poe.ninja category.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name.
+            category (str): The poe.ninja overview type.
+            etag (str | None): ETag of the cached data; providers without conditional requests ignore it.
+            last_modified (str | None): Last-Modified of the cached data; ignored like `etag`.
+
+        Returns:
+            ProviderResponse: The response.
+
+        Raises:
+            requests.RequestException: On network errors, including `net.CircuitOpenError`.
+            LookupError: If the provider has no data for the request.
+            ValueError: If the provider's data cannot be parsed.
+            OSError: If a local source cannot be read.
+
+        """
+
+
+class PoeNinjaProvider(Provider):
+    """poe.ninja's repackaging of the GGG currency exchange, with conditional requests."""
+
+    name = "poeninja"
+
+    def __init__(self, url_for: Callable[[int], str]) -> None:
+        """Initialize the provider.
+
+        Args:
+            url_for (Callable[[int], str]): Returns the exchange overview URL for a game; resolved on every fetch.
+
+        Returns:
+            None
+
+        """
+        self._url_for = url_for
+
+    def fetch(
+        self, game: int, league: str, category: str, *, etag: str | None = None, last_modified: str | None = None
+    ) -> ProviderResponse:
+        """Fetch an exchange overview from poe.ninja. See `Provider.fetch`."""
+        response = net.get(
+            self._url_for(game), params={"league": league, "type": category}, etag=etag, last_modified=last_modified
+        )
+        response.raise_for_status()
+        if (etag or last_modified) and net.is_not_modified(response):
+            return ProviderResponse(self.name, None, not_modified=True)
+        # Keep only the fields PoEMarcut uses; item metadata and sparklines are never cached.
+        data = ingest.parse_currency_response(response.content)
+        new_etag, new_last_modified = net.validators(response)
+        return ProviderResponse(self.name, data, etag=new_etag, last_modified=new_last_modified)
+
+
+class GGGExchangeProvider(Provider):
+    """GGG's official currency exchange API.
+
+    The API reports hourly traded ratios per currency pair. Each currency's value is the
+    midpoint of the lowest and highest ratio of its market against the primary currency.
+    Only the currency category is supported, as the API does not group items like poe.ninja.
+    """
+
+    name = "ggg"
+
+    def __init__(self, token: str | None = None, *, primary: str = "divine") -> None:
+        """Initialize the provider.
+
+        Args:
+            token (str | None): OAuth bearer token, or None to read `POEMARCUT_GGG_TOKEN` on each fetch.
+            primary (str): The currency id all values are expressed in.
+
+        Returns:
+            None
+
+        """
+        self._token = token
+        self.primary = primary
+
+    def fetch(
+        self,
+        game: int,
+        league: str,
+        category: str,
+        *,
+        etag: str | None = None,  # noqa: ARG002
+        last_modified: str | None = None,  # noqa: ARG002
+    ) -> ProviderResponse:
+        """Fetch the latest hourly exchange markets from GGG. See `Provider.fetch`."""
+        if category != CURRENCY_CATEGORY:
+            msg = f"The GGG exchange provider only supports {CURRENCY_CATEGORY}"
+            raise LookupError(msg)
+        token = self._token or os.environ.get(GGG_TOKEN_ENV)
+        if not token:
+            msg = f"No GGG API token; set {GGG_TOKEN_ENV}"
+            raise LookupError(msg)
+        url = GGG_CURRENCY_EXCHANGE_URL if game == 1 else f"{GGG_CURRENCY_EXCHANGE_URL}/poe2"
+        response = net.get(url, headers={"Authorization": f"Bearer {token}"})
+        response.raise_for_status()
+        try:
+            markets = response.json().get("markets")
+        except (ValueError, AttributeError) as e:
+            raise ingest.SchemaError(str(e)) from e
+        return ProviderResponse(self.name, markets_to_response(markets, league, self.primary))
+
+
+def markets_to_response(markets: object, league: str, primary: str) -> dict:
+    """Convert GGG currency exchange markets to the projected poe.ninja response layout.
+
+    Args:
+        markets (object): The `markets` list of a GGG currency exchange response.
+        league (str): Only markets of this league are used.
+        primary (str): The currency id all values are expressed in.
+
+    Returns:
+        dict: A response with `core.primary`, `core.rates` and one line per currency traded against `primary`.
+
+    Raises:
+        SchemaError: If `markets` is not a list.
+
+    """
+    if not isinstance(markets, list):
+        msg = "GGG exchange response has no markets list"
+        raise ingest.SchemaError(msg)
+    lines = [{"id": primary, "primaryValue": 1.0}]
+    for market in markets:
+        if not isinstance(market, Mapping) or market.get("league") != league:
+            continue
+        pair = str(market.get("market_id", "")).split("|")
+        if len(pair) != 2 or primary not in pair:  # noqa: PLR2004
+            continue
+        other = pair[1] if pair[0] == primary else pair[0]
+        values = [
+            ratio[primary] / ratio[other]
+            for ratio in (market.get("lowest_ratio"), market.get("highest_ratio"))
+            if isinstance(ratio, Mapping) and ratio.get(other) and isinstance(ratio.get(primary), (int, float))
+        ]
+        if values:
+            lines.append({"id": other, "primaryValue": sum(values) / len(values)})
+    rates = {line["id"]: 1 / line["primaryValue"] for line in lines[1:] if line["primaryValue"]}
+    return {"core": {"primary": primary, "rates": rates}, "lines": lines}
+
+
+class FileProvider(Provider):
+    """Reads poe.ninja-shaped responses from local files, e.g. recorded with `poemarcut.standin --record`."""
+
+    name = "file"
+
+    def __init__(self, template: str) -> None:
+        """Initialize the provider.
+
+        Args:
+            template (str): File path with optional `{game}`, `{league}` and `{category}` placeholders.
+
+        Returns:
+            None
+
+        """
+        self.template = template
+
+    def fetch(
+        self,
+        game: int,
+        league: str,
+        category: str,
+        *,
+        etag: str | None = None,  # noqa: ARG002
+        last_modified: str | None = None,  # noqa: ARG002
+    ) -> ProviderResponse:
+        """Read and project a response file. See `Provider.fetch`."""
+        path = Path(self.template.format(game=game, league=league, category=category)).expanduser()
+        return ProviderResponse(self.name, ingest.parse_currency_response(path.read_bytes()))
+
+
+class ProviderStats:
+    """Latency and outcome counters of one provider."""
+
+    __slots__ = ("consecutive_failures", "failures", "invalid", "latency", "successes", "wins")
+
+    def __init__(self) -> None:
+        """Initialize empty counters.
+
+        Returns:
+            None
+
+        """
+        self.latency: float | None = None
+        self.successes: int = 0
+        self.failures: int = 0
+        self.consecutive_failures: int = 0
+        self.invalid: int = 0
+        self.wins: int = 0
+
+    def as_dict(self) -> dict[str, object]:
+        """Return the counters as a dict.
+
+        Returns:
+            dict[str, object]: `latency` (moving average seconds, None until a success), `successes`,
+                `failures`, `invalid` (responses rejected by validation) and `wins` (responses used).
+
+        """
+        return {
+            "latency": self.latency,
+            "successes": self.successes,
+            "failures": self.failures,
+            "invalid": self.invalid,
+            "wins": self.wins,
+        }
+
+
+class HedgedFetcher:
+    """Fetches from an ordered set of providers, hedging slow requests with the next provider."""
+
+    def __init__(
+        self,
+        providers: Iterable[Provider],
+        *,
+        hedge_delay: float = DEFAULT_HEDGE_DELAY_S,
+        timeout: float = DEFAULT_FETCH_TIMEOUT_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the fetcher.
+
+        Args:
+            providers (Iterable[Provider]): Providers in configured order of preference.
+            hedge_delay (float): Seconds to wait for a provider before also asking the next one.
+            timeout (float): Seconds to wait for all hedged providers together before giving up.
+            clock (Callable[[], float]): Monotonic time source, replaceable in tests.
+
+        Returns:
+            None
+
+        """
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._providers: tuple[Provider, ...] = ()
+        self._stats: dict[str, ProviderStats] = {}
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        self.configure(providers)
+
+    def configure(self, providers: Iterable[Provider], *, hedge_delay: float | None = None) -> None:
+        """Replace the providers and, optionally, the hedge delay. Stats of kept providers are preserved.
+
+        Args:
+            providers (Iterable[Provider]): Providers in configured order of preference.
+            hedge_delay (float | None): New hedge delay in seconds, or None to keep the current one.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If no providers are given or two share a name.
+
+        """
+        providers = tuple(providers)
+        names = [provider.name for provider in providers]
+        if not providers or len(set(names)) != len(names):
+            msg = "At least one provider is required and provider names must be unique"
+            raise ValueError(msg)
+        with self._lock:
+            self._providers = providers
+            self._stats = {name: self._stats.get(name) or ProviderStats() for name in names}
+            if hedge_delay is not None:
+                self.hedge_delay = hedge_delay
+
+    @property
+    def providers(self) -> tuple[Provider, ...]:
+        """Return the providers in configured order."""
+        return self._providers
+
+    def ordered(self) -> list[Provider]:
+        """Return the providers in the order they will be asked.
+
+        Providers are ordered by moving average latency. Providers without a latency sample
+        yet go first, so each is measured at least once, and providers that keep failing go
+        last. Ties keep the configured order.
+
+        Returns:
+            list[Provider]: The providers, first to ask first.
+
+        """
+        with self._lock:
+            stats = self._stats
+            return sorted(
+                self._providers,
+                key=lambda p: (
+                    stats[p.name].consecutive_failures >= DEMOTE_AFTER_FAILURES,
+                    stats[p.name].latency if stats[p.name].latency is not None else 0.0,
+                ),
+            )
+
+    def stats(self) -> dict[str, dict[str, object]]:
+        """Return per-provider latency and outcome counters.
+
+        Returns:
+            dict[str, dict[str, object]]: `ProviderStats.as_dict()` keyed by provider name.
+
+        """
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    def _record(self, provider: Provider, elapsed: float, *, ok: bool) -> None:
+        """Record the outcome of one request.
+
+        Args:
+            provider (Provider): The provider that was asked.
+            elapsed (float): Seconds the request took.
+            ok (bool): Whether the provider returned a response.
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            stats = self._stats.get(provider.name)
+            if stats is None:  # removed by configure() while in flight
+                return
+            if ok:
+                stats.successes += 1
+                stats.consecutive_failures = 0
+                stats.latency = (
+                    elapsed
+                    if stats.latency is None
+                    else LATENCY_EWMA_ALPHA * elapsed + (1 - LATENCY_EWMA_ALPHA) * stats.latency
+                )
+            else:
+                stats.failures += 1
+                stats.consecutive_failures += 1
+
+    def _count(self, provider: Provider, counter: str) -> None:
+        """Increment a `ProviderStats` counter."""
+        with self._lock:
+            stats = self._stats.get(provider.name)
+            if stats is not None:
+                setattr(stats, counter, getattr(stats, counter) + 1)
+
+    def _attempt(
+        self, provider: Provider, args: tuple[int, str, str], validators: tuple[str | None, str | None]
+    ) -> ProviderResponse | None:
+        """Fetch from one provider and record the outcome.
+
+        Returns:
+            ProviderResponse | None: The response, or None if the provider failed.
+
+        """
+        game, league, category = args
+        start = self._clock()
+        response: ProviderResponse | None = None
+        try:
+            response = provider.fetch(game, league, category, etag=validators[0], last_modified=validators[1])
+        except net.CircuitOpenError as e:
+            logger.info("Skipping %s for PoE%s '%s': %s", provider.name, game, league, e)
+        except requests.RequestException:
+            logger.exception("Error fetching prices from %s", provider.name)
+        except (LookupError, ValueError, OSError) as e:
+            logger.warning("Provider %s has no %s prices for PoE%s '%s': %s", provider.name, category, game, league, e)
+        except Exception:
+            # A broken provider must not take the fetch down with it; the next one is asked instead.
+            logger.exception("Unexpected error fetching prices from %s", provider.name)
+        self._record(provider, self._clock() - start, ok=response is not None)
+        return response
+
+    def _run(
+        self,
+        provider: Provider,
+        results: "queue.SimpleQueue[tuple[Provider, ProviderResponse | None]]",
+        args: tuple[int, str, str],
+        validators: tuple[str | None, str | None],
+    ) -> None:
+        """Fetch from one provider on a worker thread and put the outcome on `results`.
+
+        An outcome is always put, so the waiting caller is never left without one.
+
+        Returns:
+            None
+
+        """
+        response: ProviderResponse | None = None
+        try:
+            response = self._attempt(provider, args, validators)
+        finally:
+            results.put((provider, response))
+
+    def _accept(self, provider: Provider, response: ProviderResponse | None, validate: Callable[[dict], bool]) -> bool:
+        """Return True if a response is usable, counting it as the provider's win or as invalid."""
+        if response is None:
+            return False
+        if response.not_modified or (response.data is not None and validate(response.data)):
+            self._count(provider, "wins")
+            return True
+        self._count(provider, "invalid")
+        return False
+
+    def fetch(  # noqa: C901, PLR0913
+        self,
+        game: int,
+        league: str,
+        category: str = CURRENCY_CATEGORY,
+        *,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        validate: Callable[[dict], bool] = lambda _: True,
+    ) -> ProviderResponse | None:
+        """Fetch currency data, hedging slow providers with the next one.
+
+        A single provider is asked on the calling thread. With several, providers that have
+        not answered within `timeout` seconds are given up on.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name.
+            category (str): The poe.ninja overview type.
+            etag (str | None): ETag of the cached data, for providers with conditional requests.
+            last_modified (str | None): Last-Modified of the cached data, for providers with conditional requests.
+            validate (Callable[[dict], bool]): Returns True if response data is usable.
+
+        Returns:
+            ProviderResponse | None: The first valid response; failing that, the first invalid one so
+                callers can report it; or None if every provider failed.
+
+        """
+        order = self.ordered()
+        if len(order) == 1:
+            response = self._attempt(order[0], (game, league, category), (etag, last_modified))
+            self._accept(order[0], response, validate)
+            return response
+
+        results: queue.SimpleQueue[tuple[Provider, ProviderResponse | None]] = queue.SimpleQueue()
+        launched = 0
+        outstanding = 0
+        hedge_at = 0.0
+        deadline = self._clock() + self.timeout
+        rejected: ProviderResponse | None = None
+
+        def launch() -> None:
+            nonlocal launched, outstanding, hedge_at
+            provider = order[launched]
+            launched += 1
+            outstanding += 1
+            hedge_at = self._clock() + self.hedge_delay
+            if launched > 1:
+                logger.info("Hedging PoE%s '%s' %s request with %s", game, league, category, provider.name)
+            threading.Thread(
+                target=self._run,
+                args=(provider, results, (game, league, category), (etag, last_modified)),
+                name=f"provider-{provider.name}",
+                daemon=True,
+            ).start()
+
+        launch()
+        while outstanding:
+            now = self._clock()
+            if now >= deadline:
+                logger.warning("No price source answered for PoE%s '%s' within %.0f s", game, league, self.timeout)
+                break
+            until = min(hedge_at, deadline) if launched < len(order) else deadline
+            try:
+                provider, response = results.get(timeout=max(0.0, until - now))
+            except queue.Empty:
+                if launched < len(order) and self._clock() >= hedge_at:
+                    launch()
+                continue
+            outstanding -= 1
+            if self._accept(provider, response, validate):
+                return response
+            if response is not None:
+                rejected = rejected or response
+            # A failed provider is replaced right away instead of after the hedge delay.
+            if launched < len(order):
+                launch()
+        return rejected
@@ -0,0 +1,384 @@
+"""Client-side rate-limit governor for GGG-style `X-Rate-Limit-*` headers.
+
+GGG's APIs describe their limits in response headers instead of documenting
+them. Every response names a policy shared by one or more endpoints and lists
+its rules per rule type (e.g. per IP and per account)::
+
+    X-Rate-Limit-Policy: trade-search-request-limit
+    X-Rate-Limit-Rules: Ip,Account
+    X-Rate-Limit-Ip: 8:10:60,15:60:120         (hits:period:penalty, ...)
+    X-Rate-Limit-Ip-State: 1:10:0,1:60:0       (hits:period:restricted seconds, ...)
+
+A client that sends more than `hits` requests in any `period` seconds is
+restricted for `penalty` seconds, and repeat offenders are banned for longer.
+The governor learns each policy from the headers and holds requests back until
+every rule has budget again, so a burst of clicks or a multi-league warmup
+waits a little instead of being throttled for minutes. `Retry-After` and
+active restrictions block the policy until they expire.
+
+Each rule is a token bucket of `hits` tokens where a spent token returns
+exactly `period` seconds after it was spent. That matches the server's sliding
+window, so the governor never sends a request the server would count as over
+the limit. Requests to endpoints that never sent rate-limit headers pass freely.
+"""
+
+import logging
+import re
+import time
+from collections import deque
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from threading import Condition
+
+import requests
+
+# Never wait longer than this for budget; fail fast instead so callers can fall back to cached data.
+DEFAULT_MAX_WAIT_S = 10.0
+
+_RULE_TYPE = re.compile(r"^[A-Za-z][A-Za-z0-9-]*$")
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitedError(requests.ConnectionError):
+    """Raised instead of sending a request that would have to wait too long for rate-limit budget."""
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One rate-limit rule: at most `hits` requests in any `period` seconds, else restricted for `penalty`."""
+
+    hits: int
+    period: int
+    penalty: int
+
+
+def parse_triples(value: str) -> list[tuple[int, int, int]]:
+    """Parse a comma-separated list of "a:b:c" integer triples, as used by the rule and state headers.
+
+    Args:
+        value (str): The header value.
+
+    Returns:
+        list[tuple[int, int, int]]: The triples.
+
+    Raises:
+        ValueError: If the value is malformed.
+
+    """
+    triples: list[tuple[int, int, int]] = []
+    for part in value.split(","):
+        a, b, c = (int(field) for field in part.strip().split(":"))
+        triples.append((a, b, c))
+    return triples
+
+
+def parse_headers(headers: Mapping[str, str]) -> tuple[str, dict[str, list[tuple[Rule, int, int]]]] | None:
+    """Parse GGG rate-limit headers.
+
+    Args:
+        headers (Mapping[str, str]): Response headers; a case-insensitive mapping such as `requests`' headers.
+
+    Returns:
+        tuple[str, dict[str, list[tuple[Rule, int, int]]]] | None: The policy name and, per rule type, each
+            rule with its current hit count and active restriction in seconds; None if the response has no
+            valid rate-limit headers.
+
+    """
+    policy = headers.get("X-Rate-Limit-Policy")
+    rule_types = headers.get("X-Rate-Limit-Rules")
+    if not policy or not rule_types:
+        return None
+    parsed: dict[str, list[tuple[Rule, int, int]]] = {}
+    for rule_type in (t.strip() for t in rule_types.split(",")):
+        rules_value = headers.get(f"X-Rate-Limit-{rule_type}")
+        if not _RULE_TYPE.match(rule_type) or not rules_value:
+            continue
+        try:
+            rules = parse_triples(rules_value)
+            state_value = headers.get(f"X-Rate-Limit-{rule_type}-State")
+            states = parse_triples(state_value) if state_value else []
+        except ValueError:
+            logger.warning("Ignoring malformed %s rate-limit rules for policy '%s'", rule_type, policy)
+            continue
+        state_by_period = {period: (count, restricted) for count, period, restricted in states}
+        parsed[rule_type] = [
+            (Rule(hits=hits, period=period, penalty=penalty), *state_by_period.get(period, (0, 0)))
+            for hits, period, penalty in rules
+        ]
+    return policy, parsed
+
+
+def retry_after(headers: Mapping[str, str]) -> float:
+    """Return the `Retry-After` delay in seconds, or 0 if absent or not a number of seconds.
+
+    Args:
+        headers (Mapping[str, str]): Response headers.
+
+    Returns:
+        float: Seconds to wait.
+
+    """
+    try:
+        return max(0.0, float(headers.get("Retry-After") or 0))
+    except ValueError:
+        return 0.0
+
+
+class _Bucket:
+    """Token bucket of one rule; each spent token is returned `period` seconds after it was spent."""
+
+    __slots__ = ("rule", "spent")
+
+    def __init__(self, rule: Rule) -> None:
+        """Initialize a full bucket.
+
+        Args:
+            rule (Rule): The rule the bucket enforces.
+
+        Returns:
+            None
+
+        """
+        self.rule = rule
+        self.spent: deque[float] = deque()
+
+    def _expire(self, now: float) -> None:
+        """Return tokens spent at least one period ago."""
+        while self.spent and self.spent[0] <= now - self.rule.period:
+            self.spent.popleft()
+
+    def remaining(self, now: float) -> int:
+        """Return the number of tokens available now."""
+        self._expire(now)
+        return max(0, self.rule.hits - len(self.spent))
+
+    def wait(self, now: float) -> float:
+        """Return seconds until a token is available."""
+        self._expire(now)
+        excess = len(self.spent) - self.rule.hits
+        return 0.0 if excess < 0 else self.spent[excess] + self.rule.period - now
+
+    def spend(self, now: float) -> None:
+        """Spend one token."""
+        self.spent.append(now)
+
+    def sync(self, count: int, now: float) -> None:
+        """Account for hits the server counted but this client did not send, e.g. from another program."""
+        self._expire(now)
+        for _ in range(count - len(self.spent)):
+            self.spent.append(now)
+
+
+class _Policy:
+    """Buckets and restriction of one rate-limit policy."""
+
+    __slots__ = ("buckets", "name", "restricted_until")
+
+    def __init__(self, name: str) -> None:
+        """Initialize a policy with no known rules.
+
+        Args:
+            name (str): The policy name.
+
+        Returns:
+            None
+
+        """
+        self.name = name
+        self.buckets: dict[tuple[str, int], _Bucket] = {}
+        self.restricted_until = 0.0
+
+    def wait(self, now: float) -> float:
+        """Return seconds until a request may be sent under every rule."""
+        waits = [bucket.wait(now) for bucket in self.buckets.values()]
+        return max(0.0, self.restricted_until - now, *waits)
+
+    def spend(self, now: float) -> None:
+        """Count one request against every rule."""
+        for bucket in self.buckets.values():
+            bucket.spend(now)
+
+    def update(self, rules: Mapping[str, list[tuple[Rule, int, int]]], now: float) -> None:
+        """Apply the rules and hit counts reported by the server, keeping the tokens spent under each period."""
+        for rule_type, typed_rules in rules.items():
+            previous = {key: self.buckets.pop(key) for key in [key for key in self.buckets if key[0] == rule_type]}
+            for rule, count, _ in typed_rules:
+                key = (rule_type, rule.period)
+                bucket = self.buckets[key] = _Bucket(rule)
+                if key in previous:
+                    bucket.spent = previous[key].spent
+                bucket.sync(count, now)
+
+
+class RateLimitGovernor:
+    """Schedules outgoing requests within the rate limits their endpoints have announced.
+
+    Endpoints are mapped to the policy named in their responses; endpoints sharing a policy
+    share its budget. `acquire` is called before each request and `update` with each
+    response. The governor is safe to use from several threads.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_wait: float = DEFAULT_MAX_WAIT_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the governor with no known policies.
+
+        Args:
+            max_wait (float): Longest wait for budget before `acquire` raises `RateLimitedError`.
+            clock (Callable[[], float]): Monotonic clock, replaceable in tests.
+
+        Returns:
+            None
+
+        """
+        self.max_wait = max_wait
+        self._clock = clock
+        self._cond = Condition()
+        self._policies: dict[str, _Policy] = {}
+        self._endpoints: dict[str, str] = {}
+        self.waits = 0
+        self.waited_s = 0.0
+        self.rejected = 0
+
+    def acquire(self, endpoint: str, *, max_wait: float | None = None) -> float:
+        """Wait until a request to `endpoint` fits within its policy's limits, then count it.
+
+        Args:
+            endpoint (str): The endpoint key, e.g. from `net.endpoint_key`.
+            max_wait (float | None): Longest wait in seconds, or None for the governor's default.
+
+        Returns:
+            float: Seconds waited.
+
+        Raises:
+            RateLimitedError: If the request would have to wait longer than `max_wait`.
+
+        """
+        limit = self.max_wait if max_wait is None else max_wait
+        start = self._clock()
+        held_back = False
+        with self._cond:
+            while True:
+                now = self._clock()
+                policy = self._policies.get(self._endpoints.get(endpoint, endpoint))
+                wait = policy.wait(now) if policy is not None else 0.0
+                if wait <= 0:
+                    if policy is not None:
+                        policy.spend(now)
+                    if not held_back:
+                        return 0.0
+                    self.waits += 1
+                    self.waited_s += now - start
+                    return now - start
+                if now - start + wait > limit:
+                    self.rejected += 1
+                    msg = f"Rate limit for {policy.name if policy else endpoint}: next request allowed in {wait:.1f} s"
+                    raise RateLimitedError(msg)
+                logger.info("Waiting %.2f s for rate-limit budget of %s", wait, endpoint)
+                held_back = True
+                # Woken early if a response changes the budget.
+                self._cond.wait(timeout=wait)
+
+    def update(self, endpoint: str, headers: Mapping[str, str], status_code: int) -> None:
+        """Learn an endpoint's policy, rules and current state from a response.
+
+        Args:
+            endpoint (str): The endpoint key the request was sent to.
+            headers (Mapping[str, str]): The response headers.
+            status_code (int): The response status code; 429 restricts the policy for `Retry-After` seconds.
+
+        Returns:
+            None
+
+        """
+        parsed = parse_headers(headers)
+        delay = retry_after(headers) if status_code == 429 else 0.0  # noqa: PLR2004
+        if parsed is None and not delay:
+            return
+        now = self._clock()
+        with self._cond:
+            if parsed is not None:
+                name, rules = parsed
+                self._endpoints[endpoint] = name
+            else:
+                name, rules = self._endpoints.get(endpoint, endpoint), {}
+            policy = self._policies.get(name)
+            if policy is None:
+                policy = self._policies[name] = _Policy(name)
+            policy.update(rules, now)
+            restricted = max([delay] + [restricted for typed in rules.values() for _, _, restricted in typed])
+            if restricted > 0:
+                policy.restricted_until = max(policy.restricted_until, now + restricted)
+                logger.warning("Rate limit policy '%s' restricted for %.0f s", name, restricted)
+            self._cond.notify_all()
+
+    def remaining(self, endpoint: str) -> int | None:
+        """Return how many requests to `endpoint` can be sent right now without waiting.
+
+        Args:
+            endpoint (str): The endpoint key.
+
+        Returns:
+            int | None: The remaining budget (0 while restricted), or None if the endpoint has no known limits.
+
+        """
+        with self._cond:
+            policy = self._policies.get(self._endpoints.get(endpoint, endpoint))
+            if policy is None:
+                return None
+            now = self._clock()
+            if policy.restricted_until > now:
+                return 0
+            return min((bucket.remaining(now) for bucket in policy.buckets.values()), default=None)
+
+    def budget(self) -> dict[str, dict[str, object]]:
+        """Return the remaining budget of every known policy.
+
+        Returns:
+            dict[str, dict[str, object]]: Per policy: `remaining` requests per rule ("Type period" -> count),
+                `restricted_for` seconds and `wait` seconds until the next request may be sent.
+
+        """
+        with self._cond:
+            now = self._clock()
+            return {
+                name: {
+                    "remaining": {
+                        f"{rule_type} {period}s": bucket.remaining(now)
+                        for (rule_type, period), bucket in policy.buckets.items()
+                    },
+                    "restricted_for": max(0.0, policy.restricted_until - now),
+                    "wait": policy.wait(now),
+                }
+                for name, policy in self._policies.items()
+            }
+
+    def stats(self) -> dict[str, float]:
+        """Return wait counters.
+
+        Returns:
+            dict[str, float]: `waits` (requests that were held back), `waited_s` (total seconds) and `rejected`.
+
+        """
+        with self._cond:
+            return {"waits": self.waits, "waited_s": self.waited_s, "rejected": self.rejected}
+
+    def reset(self) -> None:
+        """Forget every learned policy.
+
+        Returns:
+            None
+
+        """
+        with self._cond:
+            self._policies.clear()
+            self._endpoints.clear()
+            self._cond.notify_all()
+
+
+# Module-level governor shared by every request sent through `net.get`.
+governor = RateLimitGovernor()
@@ -0,0 +1,386 @@
+"""Indexed currency rate tables for PoEMarcut.
+
+A `RateTable` is built once per fetched poe.ninja response and answers
+currency value and exchange rate lookups with indexed reads instead of
+scanning the response `lines` list. A `PriceIndex` merges the responses of
+several poe.ninja categories into one table keyed by item id and name.
+"""
+
+import math
+import unicodedata
+from array import array
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+
+from poemarcut.optional import np
+
+NAN = float("nan")
+
+
+def _to_float(value: object) -> float:
+    """Convert a poe.ninja `primaryValue` to float, using NaN for missing or invalid values.
+
+    Args:
+        value (object): The raw `primaryValue`.
+
+    Returns:
+        float: The value as a float, or NaN if it is missing or not numeric.
+
+    """
+    if value is None or isinstance(value, bool):
+        return NAN
+    try:
+        return float(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return NAN
+
+
+class RateTable:
+    """Immutable, indexed view of one poe.ninja currency response.
+
+    Holds a currency id -> index map and an array-backed vector of `primaryValue`s.
+    Pairwise exchange rates are materialized lazily, one matrix row per source
+    currency (or the whole matrix at once when NumPy is available).
+    """
+
+    __slots__ = ("_index", "_matrix", "_rows", "_values", "ids", "primary")
+
+    def __init__(self, primary: str, ids: Sequence[str], values: Iterable[float]) -> None:
+        """Initialize the table.
+
+        Args:
+            primary (str): The primary currency id all values are expressed in.
+            ids (Sequence[str]): Currency ids, in response order.
+            values (Iterable[float]): `primaryValue` for each id; NaN marks an invalid value.
+
+        Returns:
+            None
+
+        """
+        self.primary: str = primary
+        self.ids: tuple[str, ...] = tuple(ids)
+        self._values: array = array("d", values)
+        if len(self._values) != len(self.ids):
+            msg = "ids and values must have the same length"
+            raise ValueError(msg)
+        # Keep the first occurrence of duplicated ids, matching a linear scan of `lines`.
+        index: dict[str, int] = {}
+        for i, cur_id in enumerate(self.ids):
+            index.setdefault(cur_id, i)
+        self._index: Mapping[str, int] = index
+        self._rows: dict[int, array] = {}
+        self._matrix: Any | None = None
+
+    @classmethod
+    def from_response(cls, data: Mapping) -> "RateTable":
+        """Build a table from a poe.ninja currency API response dict.
+
+        Args:
+            data (Mapping): The response dict with `core.primary` and `lines`.
+
+        Returns:
+            RateTable: The indexed table. Empty if the response has no usable lines.
+
+        """
+        core = data.get("core")
+        primary = str(core.get("primary") or "") if isinstance(core, Mapping) else ""
+        lines = data.get("lines")
+        if not isinstance(lines, list):
+            lines = []
+        ids: list[str] = []
+        values: list[float] = []
+        for line in lines:
+            if not isinstance(line, Mapping) or not isinstance(line.get("id"), str):
+                continue
+            ids.append(line["id"])
+            values.append(_to_float(line.get("primaryValue")))
+        return cls(primary, ids, values)
+
+    def __len__(self) -> int:
+        """Return the number of currencies in the table."""
+        return len(self.ids)
+
+    def __contains__(self, currency_id: object) -> bool:
+        """Return True if the currency id is in the table."""
+        return currency_id in self._index
+
+    def index(self, currency_id: str) -> int:
+        """Return the index of a currency id.
+
+        Args:
+            currency_id (str): The currency id.
+
+        Returns:
+            int: The index into `ids` and the value vector.
+
+        Raises:
+            KeyError: If the currency is not in the table.
+
+        """
+        return self._index[currency_id]
+
+    @property
+    def values(self) -> array:
+        """Return the `primaryValue` vector, indexed like `ids`. Must not be mutated."""
+        return self._values
+
+    def primary_value(self, currency_id: str) -> float:
+        """Return the `primaryValue` of a currency, or NaN if it is invalid.
+
+        Args:
+            currency_id (str): The currency id.
+
+        Returns:
+            float: The value of one unit in the primary currency.
+
+        Raises:
+            KeyError: If the currency is not in the table.
+
+        """
+        return self._values[self._index[currency_id]]
+
+    def row(self, from_currency: str) -> Sequence[float]:
+        """Return the matrix row of rates from `from_currency` to every currency in the table.
+
+        Args:
+            from_currency (str): The source currency id.
+
+        Returns:
+            Sequence[float]: Rates indexed like `ids`; NaN where a rate is undefined.
+
+        Raises:
+            KeyError: If the currency is not in the table.
+
+        """
+        i = self._index[from_currency]
+        if self._matrix is not None:
+            return self._matrix[i]
+        row = self._rows.get(i)
+        if row is None:
+            row = self._rows[i] = self._build_row(i)
+        return row
+
+    def _build_row(self, i: int) -> array:
+        """Compute one matrix row in pure Python.
+
+        Args:
+            i (int): The source currency index.
+
+        Returns:
+            array: Rates from currency `i` to every currency.
+
+        """
+        from_value = self._values[i]
+        return array("d", (from_value / v if v != 0 and not math.isnan(v) else NAN for v in self._values))
+
+    def matrix(self) -> Any:
+        """Materialize and return the full N x N rate matrix.
+
+        `matrix[i][j]` is how many units of `ids[j]` equal one unit of `ids[i]`.
+
+        Returns:
+            Any: A NumPy 2-D array when NumPy is available, otherwise a list of `array('d')` rows.
+
+        """
+        if self._matrix is None:
+            if np is not None:
+                values = np.asarray(self._values, dtype=np.float64)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    matrix = np.divide.outer(values, values)
+                matrix[:, values == 0] = NAN
+                self._matrix = matrix
+            else:
+                rows = self._rows
+                self._matrix = [rows[k] if k in rows else self._build_row(k) for k in range(len(self.ids))]
+            self._rows.clear()
+        return self._matrix
+
+    def rate(self, from_currency: str, to_currency: str) -> float:
+        """Return how many units of `to_currency` equal one unit of `from_currency`.
+
+        Args:
+            from_currency (str): The source currency id.
+            to_currency (str): The target currency id.
+
+        Returns:
+            float: The exchange rate.
+
+        Raises:
+            ValueError: If either currency is missing, has an invalid value, or the target value is 0.
+
+        """
+        i = self._index.get(from_currency)
+        if i is None:
+            msg = f"Currency '{from_currency}' not found"
+            raise ValueError(msg)
+        j = self._index.get(to_currency)
+        if j is None:
+            msg = f"Currency '{to_currency}' not found"
+            raise ValueError(msg)
+        rate = float(self.row(from_currency)[j])
+        if math.isnan(rate):
+            if math.isnan(self._values[i]):
+                msg = f"Invalid primaryValue for {from_currency}"
+                raise ValueError(msg)
+            if math.isnan(self._values[j]):
+                msg = f"Invalid primaryValue for {to_currency}"
+                raise ValueError(msg)
+            msg = "Division by zero: target currency has primaryValue 0"
+            raise ValueError(msg)
+        return rate
+
+
+def normalize_name(name: str) -> str:
+    """Normalize an item name for lookups: Unicode-normalized, case-folded, single-spaced, plain apostrophes.
+
+    Args:
+        name (str): The item name, e.g. from an item tooltip or `core.items`.
+
+    Returns:
+        str: The normalized name.
+
+    """
+    return " ".join(unicodedata.normalize("NFKC", name).replace("\u2019", "'").casefold().split())
+
+
+class PriceIndex:
+    """Unified, immutable price index over several poe.ninja overview categories.
+
+    All values are converted to one primary currency and kept in a single array, with
+    a second byte array recording each entry's category. One dict maps both item ids
+    and normalized item names to array positions, so lookups by either are O(1) and
+    the per-category responses can be discarded once the index is built.
+    """
+
+    __slots__ = ("_category", "_index", "_values", "categories", "ids", "primary")
+
+    def __init__(self, primary: str, categories: Mapping[str, Mapping]) -> None:
+        """Build the index from projected poe.ninja responses.
+
+        Categories are indexed in the given order; an id or name that appears in several
+        categories resolves to the first. A category whose primary currency differs from
+        `primary` is converted through the value of its primary in the entries indexed so
+        far, and skipped if that value is unknown.
+
+        Args:
+            primary (str): The primary currency id all values are expressed in.
+            categories (Mapping[str, Mapping]): Response dicts keyed by poe.ninja overview type.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If there are more than 255 categories.
+
+        """
+        if len(categories) > 255:  # noqa: PLR2004
+            msg = "At most 255 categories are supported"
+            raise ValueError(msg)
+        self.primary: str = primary
+        self.categories: tuple[str, ...] = tuple(categories)
+        ids: list[str] = []
+        self._values: array = array("d")
+        self._category: array = array("B")
+        index: dict[str, int] = {}
+        for code, data in enumerate(categories.values()):
+            table = RateTable.from_response(data)
+            factor = 1.0
+            if table.primary and table.primary != primary:
+                i = index.get(table.primary)
+                factor = self._values[i] if i is not None else NAN
+                if math.isnan(factor):
+                    continue
+            names = _item_names(data)
+            for cur_id, value in zip(table.ids, table.values, strict=True):
+                if cur_id in index:
+                    continue
+                index[cur_id] = len(ids)
+                ids.append(cur_id)
+                self._values.append(value * factor)
+                self._category.append(code)
+            for cur_id, name in names:
+                i = index.get(cur_id)
+                if i is not None and self._category[i] == code:
+                    index.setdefault(normalize_name(name), i)
+        self.ids: tuple[str, ...] = tuple(ids)
+        self._index: Mapping[str, int] = index
+
+    def __len__(self) -> int:
+        """Return the number of priced entries."""
+        return len(self.ids)
+
+    def __contains__(self, key: object) -> bool:
+        """Return True if the id or item name is in the index."""
+        return isinstance(key, str) and self._lookup(key) is not None
+
+    def _lookup(self, key: str) -> int | None:
+        """Return the position of an id or item name, or None."""
+        i = self._index.get(key)
+        return i if i is not None else self._index.get(normalize_name(key))
+
+    def value(self, key: str) -> float:
+        """Return the value of one unit of an item in the primary currency, or NaN if it is invalid.
+
+        Args:
+            key (str): An item id or item name; names are matched after `normalize_name`.
+
+        Returns:
+            float: The value in the primary currency.
+
+        Raises:
+            KeyError: If the item is not in the index.
+
+        """
+        i = self._lookup(key)
+        if i is None:
+            raise KeyError(key)
+        return self._values[i]
+
+    def category(self, key: str) -> str:
+        """Return the poe.ninja category an item was priced from.
+
+        Args:
+            key (str): An item id or item name.
+
+        Returns:
+            str: The category.
+
+        Raises:
+            KeyError: If the item is not in the index.
+
+        """
+        i = self._lookup(key)
+        if i is None:
+            raise KeyError(key)
+        return self.categories[self._category[i]]
+
+    def id(self, key: str) -> str:
+        """Return the item id for an item id or name.
+
+        Args:
+            key (str): An item id or item name.
+
+        Returns:
+            str: The poe.ninja item id.
+
+        Raises:
+            KeyError: If the item is not in the index.
+
+        """
+        i = self._lookup(key)
+        if i is None:
+            raise KeyError(key)
+        return self.ids[i]
+
+
+def _item_names(data: Mapping) -> list[tuple[str, str]]:
+    """Return (id, name) pairs from a response's `core.items`."""
+    core = data.get("core")
+    items = core.get("items") if isinstance(core, Mapping) else None
+    if not isinstance(items, list):
+        return []
+    return [
+        (item["id"], item["name"])
+        for item in items
+        if isinstance(item, Mapping) and isinstance(item.get("id"), str) and isinstance(item.get("name"), str)
+    ]
@@ -0,0 +1,360 @@
+"""Batch repricing over arrays of prices.
+
+`convert_and_compute_prices` applies `logic.convert_and_compute_price` to many
+(units, currency) pairs at once, e.g. to plan a reprice of every listed item or
+to simulate a change of discount settings. Exchange rates are looked up once
+per currency pair instead of once per item and step, identical pairs are
+computed once, and with NumPy the per-item float math runs over whole arrays.
+
+Results are bit-identical to the scalar functions: the NumPy kernels perform
+the same IEEE-754 double operations in the same order (products of rates are
+accumulated as Python floats exactly like the scalar loop), and without NumPy
+each distinct pair is computed by the scalar function itself.
+"""
+
+from array import array
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from poemarcut import logic
+from poemarcut.optional import np
+
+# Integers up to 2**53 are exact as float64. Items whose prices could exceed it are
+# computed by the scalar functions, which use exact integer arithmetic there.
+_EXACT_INT_LIMIT = float(2**53)
+# `prices` value of items without a valid price.
+NO_PRICE = -1
+
+
+@dataclass(frozen=True)
+class PriceBatch:
+    """Results of `convert_and_compute_prices`, indexed like its inputs.
+
+    Attributes:
+        prices: The discounted prices, `NO_PRICE` where no satisfactory price exists.
+        currencies: The currency of each price, None where no satisfactory price exists.
+        actual: The observed actual discount percent of each item.
+
+    """
+
+    prices: Sequence[int]
+    currencies: Sequence[str | None]
+    actual: Sequence[float]
+
+    def __len__(self) -> int:
+        """Return the number of items."""
+        return len(self.currencies)
+
+    def __getitem__(self, i: int) -> tuple[int | None, str | None, float]:
+        """Return one item's result in the form returned by `logic.convert_and_compute_price`."""
+        price = int(self.prices[i])
+        return (None if price == NO_PRICE else price), self.currencies[i], float(self.actual[i])
+
+    def __iter__(self) -> Iterator[tuple[int | None, str | None, float]]:
+        """Iterate over the items' results in the form returned by `logic.convert_and_compute_price`."""
+        return (self[i] for i in range(len(self)))
+
+
+def compute_discounted_prices_and_actual(prices: Sequence[int], discount_percent: int) -> tuple[Any, Any]:
+    """Apply `logic.compute_discounted_price_and_actual` to every price.
+
+    Args:
+        prices (Sequence[int]): The prices, all > 0.
+        discount_percent (int): The minimum discount percent to apply.
+
+    Returns:
+        tuple[Any, Any]: The discounted prices and the actual discount percents, as NumPy
+            arrays when NumPy is available, otherwise as `array('q')` and `array('d')`.
+
+    Raises:
+        ValueError: If a price is not > 0.
+
+    """
+    if np is None or any(p >= _EXACT_INT_LIMIT for p in prices):
+        pairs = [logic.compute_discounted_price_and_actual(int(p), discount_percent) for p in prices]
+        return array("q", (d for d, _ in pairs)), array("d", (a for _, a in pairs))
+    values = np.asarray(prices, dtype=np.int64)
+    if values.size and values.min() <= 0:
+        msg = "copied_price must be > 0"
+        raise ValueError(msg)
+    discounted, actual = _calc(values.astype(np.float64), discount_percent)
+    return discounted.astype(np.int64), actual
+
+
+def _calc(prices: Any, percent: int) -> tuple[Any, Any]:
+    """Vectorized `logic.compute_discounted_price_and_actual` over positive integer-valued float64 prices."""
+    discounted = prices - np.ceil(prices * (float(percent) / 100.0))
+    return discounted, (prices - discounted) * 100.0 / prices
+
+
+class _Rates:
+    """Exchange rates memoized per currency pair; lookup errors are memoized too."""
+
+    def __init__(self, get_exchange_rate: Callable[..., float]) -> None:
+        """Initialize an empty memo around `get_exchange_rate`."""
+        self._get = get_exchange_rate
+        self._memo: dict[tuple[str, str], float | BaseException] = {}
+
+    def __call__(self, *, from_currency: str, to_currency: str) -> float:
+        """Return the rate, calling the wrapped function once per pair and re-raising its lookup errors."""
+        key = (from_currency, to_currency)
+        value = self._memo.get(key)
+        if value is None:
+            try:
+                value = self._get(from_currency=from_currency, to_currency=to_currency)
+            except logic.RATE_ERRORS as e:
+                value = e
+            self._memo[key] = value
+        if isinstance(value, BaseException):
+            raise value
+        return value
+
+    def get(self, from_currency: str, to_currency: str) -> float | None:
+        """Return the rate, or None if it cannot be looked up."""
+        try:
+            return self(from_currency=from_currency, to_currency=to_currency)
+        except logic.RATE_ERRORS:
+            return None
+
+
+def convert_and_compute_prices(  # noqa: PLR0913
+    units: Sequence[int],
+    cur_types: Sequence[str | None],
+    currencies: list[str],
+    discount_percent: int,
+    max_actual_discount: int,
+    get_exchange_rate: Callable[..., float],
+    minimum_discount: int | None = None,
+    minimum_discount_currency: str | None = None,
+    *,
+    use_numpy: bool | None = None,
+) -> PriceBatch:
+    """Apply `logic.convert_and_compute_price` to every (units, currency) pair.
+
+    Args:
+        units (Sequence[int]): Number of units of each item's original price, all > 0.
+        cur_types (Sequence[str | None]): Each item's original currency.
+        currencies (list[str]): Ordered list of currencies from highest to lowest.
+        discount_percent (int): Minimum discount percent to apply.
+        max_actual_discount (int): Maximum allowed actual discount percent.
+        get_exchange_rate (Callable[..., float]): Rate lookup with keyword args `from_currency` and
+            `to_currency`, as for the scalar function. It is called at most once per currency pair.
+        minimum_discount (int | None): Optional minimum discount amount to apply.
+        minimum_discount_currency (str | None): Optional currency of the minimum discount.
+        use_numpy (bool | None): Force or disable the NumPy kernels; by default they are used if available.
+
+    Returns:
+        PriceBatch: The results, indexed like the inputs.
+
+    Raises:
+        ValueError: If `units` and `cur_types` differ in length or any units value is not > 0.
+
+    """
+    if len(units) != len(cur_types):
+        msg = "units and cur_types must have the same length"
+        raise ValueError(msg)
+    if any(u <= 0 for u in units):
+        msg = "original_units must be > 0"
+        raise ValueError(msg)
+    rates = _Rates(get_exchange_rate)
+    settings = (list(currencies), discount_percent, max_actual_discount, minimum_discount, minimum_discount_currency)
+    if use_numpy is None:
+        use_numpy = np is not None
+    if not use_numpy or np is None:
+        return _convert_scalar(units, cur_types, settings, rates)
+    return _convert_numpy(units, cur_types, settings, rates)
+
+
+def _convert_scalar(
+    units: Sequence[int], cur_types: Sequence[str | None], settings: tuple, rates: _Rates
+) -> PriceBatch:
+    """Compute a batch with the scalar function, once per distinct (units, currency) pair."""
+    currencies, discount_percent, max_actual_discount, minimum_discount, minimum_discount_currency = settings
+    memo: dict[tuple[int, str | None], tuple[int | None, str | None, float]] = {}
+    # One resolved rate chain per original currency, so each item's conversion is a search, not a walk.
+    chains = {cur: logic.RateChain(currencies, cur, rates).resolve() for cur in set(cur_types) if cur in currencies}
+    prices = array("q")
+    new_currencies: list[str | None] = []
+    actual = array("d")
+    for u, cur in zip(units, cur_types, strict=True):
+        key = (int(u), cur)
+        result = memo.get(key)
+        if result is None:
+            result = memo[key] = logic.convert_and_compute_price(
+                original_units=key[0],
+                last_cur_type=cur,
+                currencies=currencies,
+                discount_percent=discount_percent,
+                max_actual_discount=max_actual_discount,
+                get_exchange_rate=rates,
+                minimum_discount=minimum_discount,
+                minimum_discount_currency=minimum_discount_currency,
+                chain=chains.get(cur),
+            )
+        prices.append(NO_PRICE if result[0] is None else result[0])
+        new_currencies.append(result[1])
+        actual.append(result[2])
+    return PriceBatch(prices=prices, currencies=new_currencies, actual=actual)
+
+
+def _convert_numpy(units: Sequence[int], cur_types: Sequence[str | None], settings: tuple, rates: _Rates) -> PriceBatch:
+    """Compute a batch with the NumPy kernels, one group of distinct units per original currency."""
+    currencies = settings[0]
+    unit_array = np.asarray(units, dtype=np.int64)
+    prices = np.full(len(unit_array), NO_PRICE, dtype=np.int64)
+    actual = np.zeros(len(unit_array), dtype=np.float64)
+    new_currencies: list[str | None] = [None] * len(unit_array)
+
+    groups: dict[str | None, list[int]] = {}
+    for i, cur in enumerate(cur_types):
+        groups.setdefault(cur, []).append(i)
+    for cur, members in groups.items():
+        index = np.asarray(members, dtype=np.intp)
+        distinct, inverse = np.unique(unit_array[index], return_inverse=True)
+        start = currencies.index(cur) if cur is not None and cur in currencies else None
+        group = _group_kernel(distinct, cur, start, settings, rates)
+        if group is None:
+            scalar = _convert_scalar(distinct.tolist(), [cur] * len(distinct), settings, rates)
+            group = (
+                np.asarray(scalar.prices, dtype=np.int64),
+                np.asarray([_label(c, cur, currencies) for c in scalar.currencies], dtype=np.intp),
+                np.asarray(scalar.actual, dtype=np.float64),
+            )
+        group_prices, group_labels, group_actual = group
+        prices[index] = group_prices[inverse]
+        actual[index] = group_actual[inverse]
+        labels = group_labels[inverse]
+        for i, label in zip(members, labels.tolist(), strict=True):
+            new_currencies[i] = None if label == -1 else (cur if label == -2 else currencies[label])  # noqa: PLR2004
+    return PriceBatch(prices=prices, currencies=new_currencies, actual=actual)
+
+
+def _label(result_currency: str | None, original: str | None, currencies: list[str]) -> int:
+    """Encode a result currency as an index into `currencies`, -2 for the original currency or -1 for None."""
+    if result_currency is None:
+        return -1
+    if result_currency in currencies:
+        return currencies.index(result_currency)
+    return -2 if result_currency == original else -1
+
+
+def _group_kernel(  # noqa: C901, PLR0912, PLR0915
+    units: Any, cur: str | None, start: int | None, settings: tuple, rates: _Rates
+) -> tuple[Any, Any, Any] | None:
+    """Vectorized `logic.convert_and_compute_price` for distinct units of one original currency.
+
+    Mirrors the scalar function branch by branch with boolean masks. Result currencies
+    are encoded as by `_label`, with the original currency as -2.
+
+    Returns:
+        tuple[Any, Any, Any] | None: Prices, currency labels and actual discounts; None if some
+            value could leave the exactly representable integer range, so the scalar path must be used.
+
+    """
+    currencies, discount_percent, max_actual_discount, minimum_discount, minimum_discount_currency = settings
+    max_actual = float(max_actual_discount)
+    n = len(units)
+    u = units.astype(np.float64)
+    if n and u.max() >= _EXACT_INT_LIMIT / 100:
+        return None
+    own_label = start if start is not None else -2
+
+    out_price = np.full(n, NO_PRICE, dtype=np.int64)
+    out_label = np.full(n, -1, dtype=np.intp)
+    out_actual = np.zeros(n, dtype=np.float64)
+    pending = np.ones(n, dtype=bool)
+
+    # Minimum discount candidate (`logic._compute_minimum_price`).
+    min_valid = np.zeros(n, dtype=bool)
+    min_price = np.zeros(n, dtype=np.int64)
+    min_label = np.full(n, -1, dtype=np.intp)
+    min_actual = np.zeros(n, dtype=np.float64)
+    if (
+        minimum_discount is not None
+        and minimum_discount_currency is not None
+        and minimum_discount > 0
+        and start is not None
+        and minimum_discount_currency in currencies
+    ):
+        if cur == minimum_discount_currency:
+            min_amount: float | None = float(minimum_discount)
+        else:
+            rate = rates.get(minimum_discount_currency, cur)  # type: ignore[arg-type]
+            min_amount = None if rate is None else float(minimum_discount) * rate
+        if min_amount is not None:
+            target = u - min_amount
+            open_ = np.ones(n, dtype=bool)
+            idx = start
+            rate_conversion = 1.0
+            while open_.any():
+                done = open_ & (target >= 1.0 - 1e-9)
+                if done.any():
+                    price = np.maximum(np.floor(target[done] + 1e-9), 1.0)
+                    original = u[done] * rate_conversion
+                    min_price[done] = price.astype(np.int64)
+                    min_actual[done] = (original - price) * 100.0 / original
+                    min_label[done] = idx
+                    min_valid[done] = True
+                    open_ &= ~done
+                if not open_.any():
+                    break
+                if idx == len(currencies) - 1:
+                    original = u[open_] * rate_conversion
+                    min_price[open_] = 1
+                    min_actual[open_] = (original - 1) * 100.0 / original
+                    min_label[open_] = idx
+                    min_valid[open_] = True
+                    break
+                rate = rates.get(currencies[idx], currencies[idx + 1])
+                if rate is None:
+                    break
+                rate_conversion *= float(rate)
+                target = target * float(rate)
+                idx += 1
+
+    def _settle(mask: Any, price: Any, label: int | Any, act: Any) -> None:
+        out_price[mask] = price
+        out_label[mask] = label
+        out_actual[mask] = act
+        pending[mask] = False
+
+    # Percentage discount in the original currency, then the maximum allowed discount.
+    stages = [discount_percent] if discount_percent == max_actual_discount else [discount_percent, max_actual_discount]
+    last_actual = np.zeros(n, dtype=np.float64)
+    for percent in stages:
+        discounted, act = _calc(u, percent)
+        last_actual = np.where(pending, act, last_actual)
+        ok = pending & (act <= max_actual)
+        use_min = ok & min_valid & (min_actual > act)
+        _settle(use_min, min_price[use_min], min_label[use_min], min_actual[use_min])
+        plain = ok & ~use_min
+        _settle(plain, discounted[plain].astype(np.int64), own_label, act[plain])
+
+    fallback = pending & min_valid
+    _settle(fallback, min_price[fallback], min_label[fallback], min_actual[fallback])
+    out_actual[pending] = last_actual[pending]
+    if start is None:
+        return out_price, out_label, out_actual
+
+    # Convert down the currency chain.
+    cumulative_rate = 1.0
+    for idx in range(start, len(currencies) - 1):
+        if not pending.any():
+            break
+        rate = rates.get(currencies[idx], currencies[idx + 1])
+        if rate is None:
+            break
+        cumulative_rate *= float(rate)
+        scaled = u * cumulative_rate
+        if not np.isfinite(scaled).all() or scaled.max(initial=0.0) >= _EXACT_INT_LIMIT / 100:
+            return None
+        price = np.trunc(scaled)
+        active = pending & (price > 0)
+        for percent in stages:
+            discounted, act = _calc(np.where(active, price, 1.0), percent)
+            out_actual[active] = act[active]
+            ok = active & (act <= max_actual)
+            _settle(ok, discounted[ok].astype(np.int64), idx + 1, act[ok])
+            active &= ~ok
+    return out_price, out_label, out_actual
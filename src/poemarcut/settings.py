@@ -108,6 +108,12 @@ class LogicSettings(BaseModel):
         le=5.0,
         description="Delay in seconds between opening the price dialog and pasting new price",
     )
+    price_ladder_cap: int = Field(
+        default=1000,
+        ge=0,
+        le=100000,
+        description="Precompute new prices up to this price in each currency for instant hotkey pricing. 0: disabled",
+    )
 
 
 class WindowPosition(BaseModel):
@@ -167,6 +173,65 @@ class CurrencySettings(BaseModel):
         description="The active game for currency values. 1 for PoE1, 2 for PoE2",
     )
     active_league: str = Field(default="tmpstandard", description="The active league to fetch currency values for")
+    cache_dir: str = Field(
+        default="",
+        description="Directory for cache files, kept in its 'poemarcut' subdirectory. Empty: the current working directory",
+    )
+    poe1categories: list[str] = Field(
+        default_factory=lambda: [constants.CURRENCY_CATEGORY],
+        description="poe.ninja PoE1 exchange categories to price, e.g. Fragment, Essence, Scarab, Omen",
+    )
+    poe2categories: list[str] = Field(
+        default_factory=lambda: [constants.CURRENCY_CATEGORY],
+        description="poe.ninja PoE2 exchange categories to price, e.g. Fragments, Essences, Omens",
+    )
+    providers: list[str] = Field(
+        default_factory=lambda: ["poeninja"],
+        description="Price sources in order of preference: poeninja, ggg (needs POEMARCUT_GGG_TOKEN), file:<path>",
+    )
+    share_snapshots: bool = Field(
+        default=False, description="Share fetched currency data with other PoEMarcut processes running at the same time"
+    )
+    hedge_delay: float = Field(
+        default=1.5, ge=0, description="Seconds to wait for a price source before also asking the next one"
+    )
+
+    @field_validator("poe1categories", "poe2categories")
+    @classmethod
+    def validate_categories(cls, categories: list[str]) -> list[str]:
+        """Validate poe.ninja category names and put currency first.
+
+        Args:
+            categories (list[str]): Candidate category names.
+
+        Returns:
+            list[str]: The categories without duplicates, starting with currency.
+
+        """
+        for category in categories:
+            if not category.isalnum():
+                msg = f"Invalid poe.ninja category '{category}'"
+                raise ValueError(msg)
+        return list(dict.fromkeys([constants.CURRENCY_CATEGORY, *categories]))
+
+    @field_validator("providers")
+    @classmethod
+    def validate_providers(cls, specs: list[str]) -> list[str]:
+        """Validate price provider specs.
+
+        Args:
+            specs (list[str]): Candidate provider specs.
+
+        Returns:
+            list[str]: The specs without duplicates.
+
+        """
+        if not specs:
+            msg = "At least one price provider is required"
+            raise ValueError(msg)
+        for spec in specs:
+            currency.provider_from_spec(spec)
+        return list(dict.fromkeys(specs))
 
     @field_serializer("poe1leagues", "poe2leagues", mode="plain")
     def _serialize_leagues(self, v: object) -> object:
@@ -625,6 +690,42 @@ class SettingsManager(QObject):
         setattr(new_settings.currency, setting_field, new_mapping)
         self.set_settings(new_settings)
 
+    def replace_leagues_and_persist(self, *, game: int, leagues: set[str] | None) -> bool:
+        """Replace a game's league list and persist it, but only if the set of leagues changed.
+
+        If the active league of that game is no longer available, the first league in sorted
+        order becomes active.
+
+        Args:
+            game (int): Game id (1 or 2) whose league list to replace.
+            leagues (set[str] | None): The new leagues. None or empty (e.g. a failed fetch) changes nothing.
+
+        Returns:
+            bool: True if the settings were changed and persisted.
+
+        """
+        setting_field = "poe1leagues" if game == 1 else "poe2leagues"
+        new_leagues = set(leagues or ())
+        current = self.settings
+        if not new_leagues or new_leagues == set(getattr(current.currency, setting_field)):
+            return False
+
+        new_settings = PoEMSettings(
+            keys=KeySettings(**current.keys.model_dump()),
+            logic=LogicSettings(**current.logic.model_dump()),
+            currency=CurrencySettings(**current.currency.model_dump()),
+            gui=GuiSettings(**current.gui.model_dump()),
+        )
+        # Batch the update so validators run against the final consistent state
+        with new_settings.currency.delay_validation():
+            setattr(new_settings.currency, setting_field, new_leagues)
+            # If active_game matches and the active_league would become invalid,
+            # pick a sensible default from the new list to avoid transient warnings.
+            if new_settings.currency.active_game == game and new_settings.currency.active_league not in new_leagues:
+                new_settings.currency.active_league = sorted(new_leagues)[0]
+        self.set_settings(new_settings)
+        return True
+
 
 # Module-level shared SettingsManager instance for easy access by other modules.
 # Use this singleton to ensure signals and state are centralized.
@@ -0,0 +1,357 @@
+"""Cross-process shared currency snapshots for PoEMarcut.
+
+When several PoEMarcut processes run at once (the CLI and the GUI, or one GUI
+per game), each would otherwise fetch, parse and index the same league data.
+Instead, the process that fetches publishes the parsed rate table as a binary
+snapshot file next to the JSON cache, and the others map it read-only and copy
+the value vector out without any JSON parsing.
+
+Snapshot files are immutable: a new snapshot replaces the file atomically, with
+a generation counter one higher than the one it replaces and a CRC over the
+body, so readers never see a torn write. A per-league writer lock file makes
+fetching single-flight across processes: a process that waited for the lock
+finds the snapshot the lock holder just published and does not fetch again.
+The wait is kept short, since loads may run on the hotkey path; a process that
+cannot get the lock in time fetches privately instead.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from math import isnan
+from pathlib import Path
+from typing import BinaryIO
+
+from poemarcut import cache
+from poemarcut.rates import RateTable
+
+# File locking is platform specific; without either module the writer lock is a no-op.
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # type: ignore[assignment]
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None  # type: ignore[assignment]
+
+MAGIC = b"PMSS"
+VERSION = 1
+# magic, version, flags, generation, mtime, line count, rate count, item count, string bytes, body CRC32
+_HEADER = struct.Struct("<4sHHQdIIIII20x")
+HEADER_SIZE = _HEADER.size
+# Give up waiting for another process's fetch after this many seconds and fetch privately.
+DEFAULT_LOCK_TIMEOUT_S = 0.25
+LOCK_POLL_S = 0.02
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SharedSnapshot:
+    """Currency data read from a shared snapshot file.
+
+    Attributes:
+        generation: Incremented each time the league's snapshot is replaced.
+        mtime: The data mtime, equal to the JSON cache file mtime when it was published.
+        data: The projected response dict rebuilt from the snapshot, including `mtime`.
+        table: The rate table, built directly from the mapped value vector.
+
+    """
+
+    generation: int
+    mtime: float
+    data: dict
+    table: RateTable
+
+
+def _floats(values: array) -> bytes:
+    """Return float64 values as little-endian bytes."""
+    if sys.byteorder != "little":
+        values = array("d", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_floats(payload: memoryview) -> array:
+    """Return little-endian float64 bytes as an array."""
+    values = array("d")
+    values.frombytes(payload)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def encode(data: Mapping, *, mtime: float, generation: int) -> bytes:
+    """Encode projected currency data as a snapshot file.
+
+    Args:
+        data (Mapping): The projected poe.ninja response.
+        mtime (float): The data mtime.
+        generation (int): The snapshot generation.
+
+    Returns:
+        bytes: The snapshot file contents.
+
+    Raises:
+        ValueError: If an id or name contains a NUL character.
+
+    """
+    core = data.get("core")
+    core = core if isinstance(core, Mapping) else {}
+    table = RateTable.from_response(data)
+    rates = {
+        key: float(value)
+        for key, value in (core.get("rates") or {}).items()
+        if isinstance(key, str) and isinstance(value, (int, float))
+    }
+    items = [
+        (item["id"], item["name"])
+        for item in core.get("items") or []
+        if isinstance(item, Mapping) and isinstance(item.get("id"), str) and isinstance(item.get("name"), str)
+    ]
+    strings = [
+        str(core.get("primary") or ""),
+        str(core.get("secondary") or ""),
+        *table.ids,
+        *rates,
+        *(item_id for item_id, _ in items),
+        *(name for _, name in items),
+    ]
+    if any("\0" in s for s in strings):
+        msg = "Currency ids and names must not contain NUL characters"
+        raise ValueError(msg)
+    blob = "\0".join(strings).encode("utf-8")
+    body = _floats(table.values) + _floats(array("d", rates.values())) + blob
+    header = _HEADER.pack(
+        MAGIC, VERSION, 0, generation, mtime, len(table), len(rates), len(items), len(blob), zlib.crc32(body)
+    )
+    return header + body
+
+
+def read_generation(buffer: bytes | mmap.mmap) -> int | None:
+    """Return the generation of an encoded snapshot without decoding it, or None if the header is invalid."""
+    if len(buffer) < HEADER_SIZE:
+        return None
+    magic, version, _, generation, *_ = _HEADER.unpack_from(buffer)
+    return generation if magic == MAGIC and version == VERSION else None
+
+
+def decode(buffer: bytes | mmap.mmap) -> SharedSnapshot | None:
+    """Decode a snapshot file.
+
+    Args:
+        buffer (bytes | mmap.mmap): The snapshot file contents or a read-only mapping of it.
+
+    Returns:
+        SharedSnapshot | None: The snapshot, or None if the header, size or checksum is invalid.
+
+    """
+    if read_generation(buffer) is None:
+        return None
+    _, _, _, generation, mtime, n_lines, n_rates, n_items, n_bytes, crc = _HEADER.unpack_from(buffer)
+    floats_end = 8 * (n_lines + n_rates)
+    body = memoryview(buffer)[HEADER_SIZE:]
+    try:
+        if len(body) != floats_end + n_bytes or zlib.crc32(body) != crc:
+            return None
+        values = _from_floats(body[: 8 * n_lines])
+        rate_values = _from_floats(body[8 * n_lines : floats_end])
+        strings = str(body[floats_end:], "utf-8").split("\0")
+    finally:
+        body.release()
+    if len(strings) != 2 + n_lines + n_rates + 2 * n_items:
+        return None
+
+    primary, secondary = strings[0], strings[1]
+    ids = strings[2 : 2 + n_lines]
+    rate_keys = strings[2 + n_lines : 2 + n_lines + n_rates]
+    item_ids = strings[2 + n_lines + n_rates : 2 + n_lines + n_rates + n_items]
+    item_names = strings[2 + n_lines + n_rates + n_items :]
+    core: dict = {"primary": primary, "rates": dict(zip(rate_keys, rate_values, strict=True))}
+    if secondary:
+        core["secondary"] = secondary
+    if n_items:
+        core["items"] = [{"id": i, "name": n} for i, n in zip(item_ids, item_names, strict=True)]
+    lines = [
+        {"id": cur_id} if isnan(value) else {"id": cur_id, "primaryValue": value}
+        for cur_id, value in zip(ids, values, strict=True)
+    ]
+    return SharedSnapshot(
+        generation=generation,
+        mtime=mtime,
+        data={"core": core, "lines": lines, "mtime": mtime},
+        table=RateTable(primary, ids, values),
+    )
+
+
+class SharedSnapshotCache:
+    """Shared snapshot files in the cache directory, one per game and league."""
+
+    def path(self, game: int, league: str) -> Path:
+        """Return the snapshot file path for a game and league.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name.
+
+        Returns:
+            Path: The snapshot file path.
+
+        """
+        return cache.manager.file(f"{league}-{game}.snap")
+
+    def _lock_path(self, game: int, league: str) -> Path:
+        """Return the writer lock file path for a game and league."""
+        return cache.manager.file(f"{league}-{game}.lock")
+
+    def read(self, game: int, league: str) -> SharedSnapshot | None:
+        """Map a league's snapshot file read-only and decode it.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name.
+
+        Returns:
+            SharedSnapshot | None: The snapshot, or None if there is none or it is invalid.
+
+        Raises:
+            OSError: If the file exists but cannot be read.
+
+        """
+        try:
+            f = self.path(game, league).open("rb")
+        except FileNotFoundError:
+            return None
+        with f:
+            if os.fstat(f.fileno()).st_size < HEADER_SIZE:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                snapshot = decode(mapped)
+        if snapshot is None:
+            logger.warning("Ignoring invalid shared snapshot for PoE%s '%s'", game, league)
+        return snapshot
+
+    def generation(self, game: int, league: str) -> int:
+        """Return the generation of a league's snapshot file, or 0 if there is none.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name.
+
+        Returns:
+            int: The generation.
+
+        """
+        try:
+            with self.path(game, league).open("rb") as f:
+                return read_generation(f.read(HEADER_SIZE)) or 0
+        except OSError:
+            return 0
+
+    def publish(self, game: int, league: str, data: Mapping, *, mtime: float) -> int:
+        """Atomically replace a league's snapshot file with new data.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name.
+            data (Mapping): The projected poe.ninja response.
+            mtime (float): The data mtime.
+
+        Returns:
+            int: The generation of the published snapshot.
+
+        Raises:
+            OSError: If the file cannot be written.
+            ValueError: If the data cannot be encoded.
+
+        """
+        generation = self.generation(game, league) + 1
+        cache.atomic_write_bytes(self.path(game, league), encode(data, mtime=mtime, generation=generation))
+        return generation
+
+    @contextmanager
+    def writer_lock(self, game: int, league: str, *, timeout: float = DEFAULT_LOCK_TIMEOUT_S) -> Iterator[bool]:
+        """Hold the cross-process writer lock for a league while fetching and publishing.
+
+        Args:
+            game (int): The game version, either 1 (PoE1) or 2 (PoE2).
+            league (str): The league name.
+            timeout (float): Seconds to wait for another process before continuing without the lock.
+
+        Yields:
+            bool: True if the lock is held, False if it could not be acquired in time or locking is unsupported.
+
+        """
+        path = self._lock_path(game, league)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            f = path.open("a+b")
+        except OSError:
+            logger.warning("Could not open snapshot lock file '%s'", path)
+            yield False
+            return
+        with f:
+            locked = acquire_file_lock(f, timeout)
+            if locked:
+                # Lock files are evicted like snapshots, so keep the mtime at the last use.
+                try:
+                    os.utime(path)
+                except OSError:
+                    logger.debug("Could not touch snapshot lock file '%s'", path)
+            else:
+                logger.info("Another process is fetching PoE%s '%s'; fetching privately", game, league)
+            try:
+                yield locked
+            finally:
+                if locked:
+                    release_file_lock(f)
+
+
+def acquire_file_lock(f: BinaryIO, timeout: float) -> bool:
+    """Take an exclusive lock on an open file, polling until `timeout`.
+
+    Returns:
+        bool: True if the lock was taken.
+
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                return False
+        except OSError:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(LOCK_POLL_S)
+        else:
+            return True
+
+
+def release_file_lock(f: BinaryIO) -> None:
+    """Release a lock taken with `acquire_file_lock`."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        elif msvcrt is not None:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    except OSError:
+        logger.debug("Could not release snapshot lock", exc_info=True)
+
+
+# Module-level shared snapshot cache used by `currency.CurrencyStore`.
+snapshots = SharedSnapshotCache()
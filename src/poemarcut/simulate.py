@@ -0,0 +1,433 @@
+"""Markdown simulation for PoEMarcut.
+
+Listed items are repriced once per login with the calc-price hotkey: the result of
+`logic.convert_and_compute_price` for an item's current price becomes its next
+price, until the price stops changing at the end of the currency chain. `simulate`
+replays that policy for a whole inventory, cycle by cycle, against a fixed rate
+table or one table per cycle taken from the rate history, and reports each item's
+price trajectory and how many cycles it takes to reach its floor. `sweep` runs it
+for every combination in a grid of discount settings.
+
+Items quickly converge on the same prices (every item that reaches 1 divine
+continues identically), so each cycle reprices only the distinct (price, currency)
+states of the inventory, in one `reprice.convert_and_compute_prices` batch, and
+transitions are memoized per rate table.
+"""
+
+import itertools
+import math
+from bisect import bisect_right
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from poemarcut import currency, reprice
+from poemarcut.history import RateHistory
+from poemarcut.optional import np
+from poemarcut.rates import RateTable
+
+# `cycles_to_floor` of items whose price was still changing after the last cycle.
+NO_FLOOR = -1
+DEFAULT_CYCLES = 1000
+
+# Transition of a state whose price cannot be computed; the item keeps its price.
+_STUCK = -1
+_MISSING = -2
+# State codes are `units * len(labels) + label` and must fit in an int64.
+_MAX_CODE = 2**62
+
+
+@dataclass(frozen=True)
+class Policy:
+    """The logic settings applied at every cycle.
+
+    Attributes:
+        discount_percent: Minimum discount percent to apply.
+        max_actual_discount: Maximum allowed actual discount percent.
+        minimum_discount: Optional minimum discount amount.
+        minimum_discount_currency: Optional currency of the minimum discount.
+
+    """
+
+    discount_percent: int
+    max_actual_discount: int
+    minimum_discount: int | None = None
+    minimum_discount_currency: str | None = None
+
+
+@dataclass(frozen=True)
+class Simulation:
+    """Results of `simulate`, indexed by item.
+
+    Attributes:
+        labels: Currency of each label index; the configured currencies come first.
+        prices: Price of each item after each cycle, one row per item; column 0 is the listed price.
+            None if trajectories were not kept.
+        currencies: Label index of each item's currency after each cycle, shaped like `prices`.
+        final_prices: Price of each item after the last cycle.
+        final_currencies: Label index of each item's currency after the last cycle.
+        cycles_to_floor: Number of price changes before each item's price stopped changing,
+            or `NO_FLOOR` if it was still changing after the last cycle.
+        cycles: Number of simulated cycles.
+
+    """
+
+    labels: tuple[str | None, ...]
+    prices: Any | None
+    currencies: Any | None
+    final_prices: Sequence[int]
+    final_currencies: Sequence[int]
+    cycles_to_floor: Sequence[int]
+    cycles: int
+
+    def __len__(self) -> int:
+        """Return the number of items."""
+        return len(self.cycles_to_floor)
+
+    def trajectory(self, i: int) -> list[tuple[int, str | None]]:
+        """Return one item's prices from its listed price up to its floor.
+
+        Args:
+            i (int): The item index.
+
+        Returns:
+            list[tuple[int, str | None]]: (price, currency) after each cycle, without repeats of the floor.
+
+        Raises:
+            ValueError: If the simulation did not keep trajectories.
+
+        """
+        if self.prices is None or self.currencies is None:
+            msg = "Trajectories were not kept"
+            raise ValueError(msg)
+        steps = int(self.cycles_to_floor[i])
+        end = self.cycles if steps == NO_FLOOR else steps
+        prices, labels = self.prices[i], self.currencies[i]
+        return [(int(prices[c]), self.labels[int(labels[c])]) for c in range(end + 1)]
+
+    def distribution(self) -> dict[int, int]:
+        """Return how many items reached their floor after each number of cycles.
+
+        Returns:
+            dict[int, int]: Item counts keyed by cycles to floor, in ascending order; `NO_FLOOR` counts
+                the items that did not reach it.
+
+        """
+        counts = Counter(int(c) for c in self.cycles_to_floor)
+        return dict(sorted(counts.items()))
+
+    def summary(self) -> dict[str, float]:
+        """Summarize cycles to floor over the items that reached it.
+
+        Returns:
+            dict[str, float]: `floored` (fraction of items), `mean`, `p50`, `p90` and `max` cycles;
+                the statistics are NaN if no item reached its floor.
+
+        """
+        floored = sorted(int(c) for c in self.cycles_to_floor if c != NO_FLOOR)
+        if not floored:
+            return {"floored": 0.0, "mean": math.nan, "p50": math.nan, "p90": math.nan, "max": math.nan}
+        return {
+            "floored": len(floored) / len(self),
+            "mean": sum(floored) / len(floored),
+            "p50": float(_percentile(floored, 50)),
+            "p90": float(_percentile(floored, 90)),
+            "max": float(floored[-1]),
+        }
+
+
+def _percentile(ordered: Sequence[int], q: float) -> int:
+    """Return the nearest-rank percentile of a sorted, non-empty sequence."""
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def history_tables(
+    history: RateHistory, currencies: Sequence[str], start: float, cycle_s: float, cycles: int
+) -> list[RateTable]:
+    """Return one rate table per cycle from the rate history.
+
+    Each table holds the latest recorded value of every currency at the cycle's time,
+    `start + cycle * cycle_s`. Currencies without a recorded value yet are NaN, so
+    conversions through them fail like with an invalid API value.
+
+    Args:
+        history (RateHistory): The league's rate history.
+        currencies (Sequence[str]): Currency ids to include.
+        start (float): Time of the first cycle as a Unix timestamp.
+        cycle_s (float): Seconds between cycles, e.g. one day for a daily login.
+        cycles (int): Number of tables to return.
+
+    Returns:
+        list[RateTable]: The tables. Consecutive cycles with the same values share one table.
+
+    """
+    end = start + cycle_s * max(cycles - 1, 0)
+    series = [history.values(cur, 0.0, end) for cur in currencies]
+    times = [[t for t, _ in rows] for rows in series]
+    tables: list[RateTable] = []
+    previous: list[float] | None = None
+    for c in range(cycles):
+        t = start + c * cycle_s
+        values = []
+        for rows, row_times in zip(series, times, strict=True):
+            k = bisect_right(row_times, t) - 1
+            values.append(rows[k][1] if k >= 0 else math.nan)
+        if tables and values == previous:
+            tables.append(tables[-1])
+            continue
+        previous = values
+        tables.append(RateTable("", currencies, values))
+    return tables
+
+
+def simulate(  # noqa: PLR0913
+    units: Sequence[int],
+    cur_types: Sequence[str | None],
+    currencies: list[str],
+    policy: Policy,
+    rates: RateTable | Sequence[RateTable],
+    *,
+    cycles: int = DEFAULT_CYCLES,
+    keep_trajectories: bool = True,
+    use_numpy: bool | None = None,
+) -> Simulation:
+    """Apply the pricing policy to every item once per cycle until its price stops changing.
+
+    An item reaches its floor when `logic.convert_and_compute_price` returns no price or
+    the same price and currency.
+
+    Args:
+        units (Sequence[int]): Listed price of each item, all > 0.
+        cur_types (Sequence[str | None]): Currency of each item's listed price.
+        currencies (list[str]): Ordered list of currencies from highest to lowest.
+        policy (Policy): The logic settings.
+        rates (RateTable | Sequence[RateTable]): A fixed rate table, or one table per cycle; the last
+            table is reused when there are more cycles than tables.
+        cycles (int): Maximum number of cycles to simulate.
+        keep_trajectories (bool): Keep every item's price after every cycle.
+        use_numpy (bool | None): Force or disable NumPy; by default it is used if available.
+
+    Returns:
+        Simulation: The results, indexed like the inputs.
+
+    Raises:
+        ValueError: If the inputs differ in length, any units value is not > 0, `cycles` is negative
+            or `rates` is an empty sequence.
+
+    """
+    if len(units) != len(cur_types):
+        msg = "units and cur_types must have the same length"
+        raise ValueError(msg)
+    if any(u <= 0 for u in units):
+        msg = "original_units must be > 0"
+        raise ValueError(msg)
+    if cycles < 0:
+        msg = "cycles must be >= 0"
+        raise ValueError(msg)
+    tables = [rates] if isinstance(rates, RateTable) else list(rates)
+    if not tables:
+        msg = "rates must contain at least one table"
+        raise ValueError(msg)
+
+    labels: list[str | None] = list(dict.fromkeys([*currencies, *cur_types]))
+    if use_numpy is None:
+        use_numpy = np is not None
+    use_numpy = use_numpy and np is not None
+    engine = _Engine(labels, currencies, policy, tables, use_numpy=use_numpy)
+    if use_numpy and max(units, default=0) < _MAX_CODE // len(labels):
+        return engine.run_numpy(units, cur_types, cycles, keep=keep_trajectories)
+    return engine.run_scalar(units, cur_types, cycles, keep=keep_trajectories)
+
+
+class _Engine:
+    """Per-table memoized state transitions shared by both simulation loops."""
+
+    def __init__(
+        self,
+        labels: list[str | None],
+        currencies: list[str],
+        policy: Policy,
+        tables: list[RateTable],
+        *,
+        use_numpy: bool,
+    ) -> None:
+        self.labels = labels
+        self.label_index = {label: i for i, label in enumerate(labels)}
+        self.currencies = list(currencies)
+        self.policy = policy
+        self.tables = tables
+        self.use_numpy = use_numpy
+        self._memos: dict[int, dict[int, int]] = {}
+
+    def table(self, cycle: int) -> RateTable:
+        """Return the rate table of a cycle."""
+        return self.tables[min(cycle, len(self.tables) - 1)]
+
+    def memo(self, table: RateTable) -> dict[int, int]:
+        """Return the next state of every state repriced so far with a table."""
+        return self._memos.setdefault(id(table), {})
+
+    def transitions(self, codes: list[int], table: RateTable) -> list[int]:
+        """Reprice states not yet in the table's memo in one batch and return their next states."""
+        width = len(self.labels)
+
+        def _get_rate(*, from_currency: str, to_currency: str) -> float:
+            return currency.table_rate(table, "", from_currency, to_currency)
+
+        policy = self.policy
+        batch = reprice.convert_and_compute_prices(
+            [code // width for code in codes],
+            [self.labels[code % width] for code in codes],
+            self.currencies,
+            discount_percent=policy.discount_percent,
+            max_actual_discount=policy.max_actual_discount,
+            get_exchange_rate=_get_rate,
+            minimum_discount=policy.minimum_discount,
+            minimum_discount_currency=policy.minimum_discount_currency,
+            use_numpy=self.use_numpy,
+        )
+        label_index = self.label_index
+        # Both the NumPy and the array-backed batches convert to a list of ints.
+        prices = batch.prices.tolist()  # type: ignore[attr-defined]
+        nxt = [
+            # A price that rounded to zero cannot be listed, so the item stays where it is.
+            _STUCK if price == reprice.NO_PRICE or price < 1 else price * width + label_index[cur]
+            for price, cur in zip(prices, batch.currencies, strict=True)
+        ]
+        self.memo(table).update(zip(codes, nxt, strict=True))
+        return nxt
+
+    def run_scalar(
+        self, units: Sequence[int], cur_types: Sequence[str | None], cycles: int, *, keep: bool
+    ) -> Simulation:
+        """Simulate with one Python int state code per item."""
+        width = len(self.labels)
+        codes = [int(u) * width + self.label_index[cur] for u, cur in zip(units, cur_types, strict=True)]
+        steps = [NO_FLOOR] * len(codes)
+        history = [list(codes)] if keep else []
+        active = list(range(len(codes)))
+        done = 0
+        for cycle in range(cycles):
+            if not active:
+                break
+            table = self.table(cycle)
+            memo = self.memo(table)
+            missing = [code for code in dict.fromkeys(codes[i] for i in active) if code not in memo]
+            if missing:
+                self.transitions(missing, table)
+            still: list[int] = []
+            for i in active:
+                nxt = memo[codes[i]]
+                if nxt in (_STUCK, codes[i]):
+                    steps[i] = cycle
+                else:
+                    codes[i] = nxt
+                    still.append(i)
+            active = still
+            done = cycle + 1
+            if keep:
+                history.append(list(codes))
+        rows = [list(row) for row in zip(*history, strict=True)] if keep else []
+        return Simulation(
+            labels=tuple(self.labels),
+            prices=[[c // width for c in row] for row in rows] if keep else None,
+            currencies=[[c % width for c in row] for row in rows] if keep else None,
+            final_prices=[c // width for c in codes],
+            final_currencies=[c % width for c in codes],
+            cycles_to_floor=steps,
+            cycles=done,
+        )
+
+    def run_numpy(
+        self, units: Sequence[int], cur_types: Sequence[str | None], cycles: int, *, keep: bool
+    ) -> Simulation:
+        """Simulate with an int64 state code array, repricing each cycle's distinct states."""
+        width = len(self.labels)
+        label_ids = np.fromiter((self.label_index[cur] for cur in cur_types), dtype=np.int64, count=len(cur_types))
+        codes = np.asarray(units, dtype=np.int64) * width + label_ids
+        steps = np.full(len(codes), NO_FLOOR, dtype=np.int64)
+        history = [codes.copy()] if keep else []
+        active = np.arange(len(codes))
+        done = 0
+        for cycle in range(cycles):
+            if not len(active):
+                break
+            table = self.table(cycle)
+            memo = self.memo(table)
+            current = codes[active]
+            distinct, inverse = np.unique(current, return_inverse=True)
+            distinct_list = distinct.tolist()
+            nxt = np.fromiter(
+                (memo.get(code, _MISSING) for code in distinct_list), dtype=np.int64, count=len(distinct_list)
+            )
+            missing = nxt == _MISSING
+            if missing.any():
+                nxt[missing] = self.transitions(distinct[missing].tolist(), table)
+            item_next = nxt[inverse]
+            floored = (item_next == _STUCK) | (item_next == current)
+            steps[active[floored]] = cycle
+            moving = ~floored
+            codes[active[moving]] = item_next[moving]
+            active = active[moving]
+            done = cycle + 1
+            if keep:
+                history.append(codes.copy())
+        trajectories = np.stack(history, axis=1) if keep else None
+        return Simulation(
+            labels=tuple(self.labels),
+            prices=trajectories // width if trajectories is not None else None,
+            currencies=trajectories % width if trajectories is not None else None,
+            final_prices=codes // width,
+            final_currencies=codes % width,
+            cycles_to_floor=steps,
+            cycles=done,
+        )
+
+
+def sweep(  # noqa: PLR0913
+    units: Sequence[int],
+    cur_types: Sequence[str | None],
+    currencies: list[str],
+    rates: RateTable | Sequence[RateTable],
+    discount_percents: Sequence[int],
+    max_actual_discounts: Sequence[int],
+    minimum_discount: int | None = None,
+    minimum_discount_currency: str | None = None,
+    *,
+    cycles: int = DEFAULT_CYCLES,
+    use_numpy: bool | None = None,
+) -> dict[tuple[int, int], Simulation]:
+    """Simulate every combination of discount percent and maximum actual discount.
+
+    Trajectories are not kept; use `Simulation.distribution` and `Simulation.summary`.
+
+    Args:
+        units (Sequence[int]): Listed price of each item, all > 0.
+        cur_types (Sequence[str | None]): Currency of each item's listed price.
+        currencies (list[str]): Ordered list of currencies from highest to lowest.
+        rates (RateTable | Sequence[RateTable]): A fixed rate table, or one table per cycle.
+        discount_percents (Sequence[int]): Discount percents to try.
+        max_actual_discounts (Sequence[int]): Maximum actual discounts to try.
+        minimum_discount (int | None): Optional minimum discount amount.
+        minimum_discount_currency (str | None): Optional currency of the minimum discount.
+        cycles (int): Maximum number of cycles to simulate.
+        use_numpy (bool | None): Force or disable NumPy; by default it is used if available.
+
+    Returns:
+        dict[tuple[int, int], Simulation]: Results keyed by (discount_percent, max_actual_discount).
+
+    """
+    return {
+        (dp, m): simulate(
+            units,
+            cur_types,
+            currencies,
+            Policy(dp, m, minimum_discount, minimum_discount_currency),
+            rates,
+            cycles=cycles,
+            keep_trajectories=False,
+            use_numpy=use_numpy,
+        )
+        for dp, m in itertools.product(discount_percents, max_actual_discounts)
+    }
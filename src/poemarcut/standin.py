@@ -0,0 +1,551 @@
+"""Offline stand-in for the poe.ninja, GGG league and GitHub release APIs.
+
+`StandinServer` serves recorded (or synthetic) payloads on the same paths as
+the real APIs and can inject latency, errors, empty market responses,
+conditional-request 304s and GGG-style rate-limit headers. Point PoEMarcut at
+it with `StandinServer.redirect()` in code, or run it standalone and set
+`POEMARCUT_API_BASE_URL`:
+
+    python -m poemarcut.standin --port 8765 --latency 0.2
+    POEMARCUT_API_BASE_URL=http://127.0.0.1:8765 python -m poemarcut_cli
+"""
+
+import argparse
+import copy
+import gzip
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from email.utils import formatdate
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+
+from poemarcut import __version__, constants, currency, net, update
+
+# Route name -> request path, taken from the real API URLs.
+ROUTES = {
+    "poe1_currency": urlsplit(currency.POE1_CURRENCY_API_URL).path,
+    "poe2_currency": urlsplit(currency.POE2_CURRENCY_API_URL).path,
+    "poe1_leagues": urlsplit(currency.POE1_LEAGUES_API_URL).path,
+    "poe2_leagues": urlsplit(currency.POE2_LEAGUES_API_URL).path,
+    "github_release": urlsplit(update.GITHUB_RELEASES_API_URL).path,
+}
+CURRENCY_ROUTES = frozenset({"poe1_currency", "poe2_currency"})
+
+# Query parameters used when recording live payloads.
+_RECORD_PARAMS = {
+    "poe1_currency": {"league": "Standard", "type": "Currency"},
+    "poe2_currency": {"league": "Standard", "type": "Currency"},
+}
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Faults:
+    """Faults injected into stand-in responses.
+
+    Attributes:
+        latency: Seconds to wait before answering.
+        jitter: Up to this many extra seconds of random latency.
+        error_rate: Fraction of requests answered with `error_status`.
+        error_status: HTTP status for injected errors.
+        empty_lines: Serve currency responses with an empty `lines` list.
+        not_modified: Answer 304 when If-None-Match matches the payload ETag.
+        rate_limit: GGG-style rules "hits:period:penalty", comma-separated, e.g. "5:10:60,20:60:120".
+            When set, every response carries X-Rate-Limit headers and requests over any rule get 429.
+
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = HTTPStatus.SERVICE_UNAVAILABLE
+    empty_lines: bool = False
+    not_modified: bool = True
+    rate_limit: str | None = None
+
+
+@dataclass(frozen=True)
+class RequestRecord:
+    """A request handled by the stand-in server."""
+
+    route: str | None
+    path: str
+    status: int
+    query: str = ""
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+def currency_response(n_lines: int = 120, *, game: int = 1, seed: int = 0) -> dict:
+    """Build a poe.ninja exchange overview response with `n_lines` lines.
+
+    The layout follows the real `/economy/exchange/current/overview` response:
+    a `core` block with item metadata, rates and primary/secondary currency ids,
+    and `lines` with values, volumes and a 7-point sparkline. The merchant tab
+    currencies for `game` come first so lookups by their ids succeed.
+
+    Args:
+        n_lines (int): Number of currency lines to generate.
+        game (int): The game whose merchant currency ids to include, 1 or 2.
+        seed (int): Random seed, so fixtures are reproducible.
+
+    Returns:
+        dict: The synthetic response dict.
+
+    """
+    rng = random.Random(seed)
+    merchant = constants.POE1_MERCHANT_CURRENCIES if game == 1 else constants.POE2_MERCHANT_CURRENCIES
+    ids = [cur_id for cur_id in merchant if cur_id != "divine"]
+    ids.extend(f"currency-{i}" for i in range(max(0, n_lines - 1 - len(ids))))
+    ids = ["divine", *ids[: n_lines - 1]]
+
+    items = []
+    lines = []
+    for i, cur_id in enumerate(ids):
+        name = merchant.get(cur_id, cur_id.replace("-", " ").title())
+        items.append(
+            {
+                "id": cur_id,
+                "name": name,
+                "image": f"/gen/image/WzI1LDE0LHsiZiI6IjJESXRlbXMvQ3VycmVuY3kv{i:06d}/currency.png",
+                "category": "Currency",
+                "detailsId": cur_id if "-" in cur_id else name.lower().replace(" ", "-").replace("'", ""),
+            }
+        )
+        value = 1.0 if i == 0 else 10 ** rng.uniform(-5, 1)
+        lines.append(
+            {
+                "id": cur_id,
+                "primaryValue": value,
+                "volumePrimaryValue": rng.uniform(0, 50_000),
+                "maxVolumeCurrency": "chaos" if i else "divine",
+                "maxVolumeRate": rng.uniform(0.01, 500),
+                "sparkline": {
+                    "totalChange": rng.uniform(-30, 30),
+                    "data": [rng.uniform(-30, 30) for _ in range(7)],
+                },
+            }
+        )
+    chaos_value = next((line["primaryValue"] for line in lines if line["id"] == "chaos"), 0.005)
+    return {
+        "core": {
+            "items": items,
+            "rates": {"chaos": 1 / chaos_value, "exalted": rng.uniform(100, 400)},
+            "primary": "divine",
+            "secondary": "chaos",
+        },
+        "lines": lines,
+        "items": items,
+    }
+
+
+def default_payloads() -> dict[str, object]:
+    """Return synthetic payloads shaped like the real API responses.
+
+    Returns:
+        dict[str, object]: Payload per route name.
+
+    """
+    return {
+        "poe1_currency": currency_response(120, game=1),
+        "poe2_currency": currency_response(80, game=2, seed=1),
+        "poe1_leagues": {
+            "result": [
+                {"id": "Standard", "realm": "pc", "text": "Standard"},
+                {"id": "Hardcore", "realm": "pc", "text": "Hardcore"},
+                {"id": "Mercenaries", "realm": "pc", "text": "Mercenaries"},
+                {"id": "Standard", "realm": "xbox", "text": "Standard"},
+            ]
+        },
+        "poe2_leagues": {
+            "result": [
+                {"id": "Standard", "realm": "poe2", "text": "Standard"},
+                {"id": "Dawn of the Hunt", "realm": "poe2", "text": "Dawn of the Hunt"},
+            ]
+        },
+        "github_release": {"tag_name": f"v{__version__}", "name": f"v{__version__}"},
+    }
+
+
+def load_payloads(directory: Path) -> dict[str, object]:
+    """Load recorded payloads from `{route}.json` files, falling back to synthetic ones.
+
+    Args:
+        directory (Path): Directory written by `record_payloads`.
+
+    Returns:
+        dict[str, object]: Payload per route name.
+
+    """
+    payloads = default_payloads()
+    for route in ROUTES:
+        path = directory / f"{route}.json"
+        try:
+            payloads[route] = json.loads(path.read_bytes())
+        except FileNotFoundError:
+            logger.info("No recorded payload for '%s'; using synthetic data", route)
+        except (OSError, ValueError):
+            logger.exception("Error reading recorded payload '%s'", path)
+    return payloads
+
+
+def record_payloads(directory: Path) -> list[str]:
+    """Fetch every API once and save the responses as `{route}.json` files.
+
+    Args:
+        directory (Path): Directory to write payloads to.
+
+    Returns:
+        list[str]: The routes that were recorded.
+
+    """
+    urls = {
+        "poe1_currency": currency.POE1_CURRENCY_API_URL,
+        "poe2_currency": currency.POE2_CURRENCY_API_URL,
+        "poe1_leagues": currency.POE1_LEAGUES_API_URL,
+        "poe2_leagues": currency.POE2_LEAGUES_API_URL,
+        "github_release": update.GITHUB_RELEASES_API_URL,
+    }
+    directory.mkdir(parents=True, exist_ok=True)
+    recorded: list[str] = []
+    for route, url in urls.items():
+        try:
+            response = net.get(url, params=_RECORD_PARAMS.get(route))
+            response.raise_for_status()
+            payload = response.json()
+        except (requests.RequestException, ValueError):
+            logger.exception("Error recording '%s'", route)
+            continue
+        (directory / f"{route}.json").write_text(json.dumps(payload, ensure_ascii=False, indent=1), encoding="utf-8")
+        recorded.append(route)
+    return recorded
+
+
+def _parse_rules(rules: str) -> list[tuple[int, int, int]]:
+    """Parse comma-separated "hits:period:penalty" rate-limit rules.
+
+    Raises:
+        ValueError: If a rule is malformed.
+
+    """
+    parsed: list[tuple[int, int, int]] = []
+    for rule in rules.split(","):
+        hits, period, penalty = (int(part) for part in rule.split(":"))
+        parsed.append((hits, period, penalty))
+    return parsed
+
+
+class StandinServer:
+    """Threaded local HTTP server that stands in for the external APIs."""
+
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        payloads: dict[str, object] | None = None,
+        faults: Faults | None = None,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the server. It does not listen until `start` is called.
+
+        Args:
+            host (str): Interface to bind.
+            port (int): Port to bind, 0 for any free port.
+            payloads (dict[str, object] | None): Payload per route name. Defaults to `default_payloads()`.
+            faults (Faults | None): Faults applied to every route without an entry in `route_faults`.
+            seed (int): Seed for injected errors and jitter, so runs are reproducible.
+
+        Returns:
+            None
+
+        """
+        self.host = host
+        self.port = port
+        self.payloads: dict[str, object] = payloads if payloads is not None else default_payloads()
+        self.faults = faults or Faults()
+        self.route_faults: dict[str, Faults] = {}
+        self.requests: list[RequestRecord] = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._hits: deque[float] = deque()
+        self._blocked_until: dict[int, float] = {}
+        self._started = time.time()
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Return the base URL of the running server."""
+        return f"http://{self.host}:{self.port}"
+
+    def set_faults(self, route: str | None = None, **changes: object) -> None:
+        """Change injected faults for one route, or for all routes if `route` is None.
+
+        Args:
+            route (str | None): A key of `ROUTES`, or None for the default faults.
+            **changes (object): `Faults` fields to change.
+
+        Returns:
+            None
+
+        """
+        with self._lock:
+            if route is None:
+                self.faults = replace(self.faults, **changes)  # type: ignore[arg-type]
+            else:
+                base = self.route_faults.get(route, self.faults)
+                self.route_faults[route] = replace(base, **changes)  # type: ignore[arg-type]
+
+    def statuses(self, route: str | None = None) -> list[int]:
+        """Return the response statuses sent so far, optionally for one route only.
+
+        Args:
+            route (str | None): A key of `ROUTES`, or None for all requests.
+
+        Returns:
+            list[int]: Statuses in request order.
+
+        """
+        with self._lock:
+            return [r.status for r in self.requests if route is None or r.route == route]
+
+    def start(self) -> "StandinServer":
+        """Start serving on a background thread.
+
+        Returns:
+            StandinServer: This server.
+
+        """
+        server = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        server.daemon_threads = True
+        self.port = server.server_address[1]
+        self._server = server
+        self._thread = threading.Thread(target=server.serve_forever, name="standin-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket.
+
+        Returns:
+            None
+
+        """
+        server, self._server = self._server, None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def __enter__(self) -> "StandinServer":
+        """Start the server."""
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop the server."""
+        self.stop()
+
+    @contextmanager
+    def redirect(self) -> Iterator["StandinServer"]:
+        """Route all PoEMarcut API requests to this server while the context is active.
+
+        Yields:
+            StandinServer: This server.
+
+        """
+        previous = {origin: net.resolve(origin) for origin in net.API_ORIGINS}
+        net.close_session()
+        for origin in net.API_ORIGINS:
+            net.set_base_url(origin, self.url)
+        try:
+            yield self
+        finally:
+            for origin, base_url in previous.items():
+                net.set_base_url(origin, base_url if base_url != origin else None)
+            net.close_session()
+
+    def _faults_for(self, route: str | None) -> Faults:
+        """Return the faults that apply to a route."""
+        with self._lock:
+            return self.route_faults.get(route, self.faults) if route is not None else self.faults
+
+    def _rate_limit_state(self, rules: str, now: float) -> tuple[dict[str, str], float]:
+        """Count a request against the rate-limit rules, like GGG's sliding windows.
+
+        Returns:
+            tuple[dict[str, str], float]: Headers to send, and seconds to retry after (0 if allowed).
+
+        """
+        parsed = _parse_rules(rules)
+        longest = max(period for _, period, _ in parsed)
+        states: list[str] = []
+        retry_after = 0.0
+        with self._lock:
+            while self._hits and self._hits[0] <= now - longest:
+                self._hits.popleft()
+            self._hits.append(now)
+            for i, (hits, period, penalty) in enumerate(parsed):
+                count = sum(1 for hit in self._hits if hit > now - period)
+                blocked_until = self._blocked_until.get(i, 0.0)
+                if now >= blocked_until and count > hits:
+                    blocked_until = self._blocked_until[i] = now + penalty
+                restriction = max(0.0, blocked_until - now)
+                retry_after = max(retry_after, restriction)
+                states.append(f"{count}:{period}:{int(restriction + 0.999)}")
+        headers = {
+            "X-Rate-Limit-Policy": "standin",
+            "X-Rate-Limit-Rules": "Ip",
+            "X-Rate-Limit-Ip": rules,
+            "X-Rate-Limit-Ip-State": ",".join(states),
+        }
+        return headers, retry_after
+
+    def _record(self, record: RequestRecord) -> None:
+        """Remember a handled request."""
+        with self._lock:
+            self.requests.append(record)
+
+    def _random(self) -> float:
+        """Return the next number from the seeded random generator."""
+        with self._lock:
+            return self._rng.random()
+
+    def _body(self, route: str, faults: Faults) -> bytes:
+        """Return the encoded payload for a route, with `lines` emptied if requested."""
+        payload = self.payloads[route]
+        if faults.empty_lines and route in CURRENCY_ROUTES and isinstance(payload, dict):
+            payload = copy.copy(payload)
+            payload["lines"] = []
+        return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _make_handler(standin: StandinServer) -> type[BaseHTTPRequestHandler]:
+    """Return a request handler class bound to `standin`."""
+    paths = {path: route for route, path in ROUTES.items()}
+
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # noqa: N802
+            """Answer a GET request, applying the configured faults."""
+            split = urlsplit(self.path)
+            route = paths.get(split.path)
+            faults = standin._faults_for(route)  # noqa: SLF001
+
+            delay = faults.latency + (faults.jitter * standin._random() if faults.jitter else 0.0)  # noqa: SLF001
+            if delay > 0:
+                time.sleep(delay)
+
+            headers: dict[str, str] = {}
+            if faults.rate_limit:
+                headers, retry_after = standin._rate_limit_state(faults.rate_limit, time.time())  # noqa: SLF001
+                if retry_after > 0:
+                    headers["Retry-After"] = str(int(retry_after + 0.999))
+                    self._send(route, HTTPStatus.TOO_MANY_REQUESTS, b'{"error":"rate limited"}', headers, split.query)
+                    return
+
+            if route is None:
+                self._send(route, HTTPStatus.NOT_FOUND, b'{"error":"not found"}', headers, split.query)
+                return
+            if faults.error_rate and standin._random() < faults.error_rate:  # noqa: SLF001
+                self._send(route, faults.error_status, b'{"error":"injected"}', headers, split.query)
+                return
+
+            body = standin._body(route, faults)  # noqa: SLF001
+            etag = '"' + hashlib.sha1(body, usedforsecurity=False).hexdigest()[:16] + '"'
+            headers["ETag"] = etag
+            headers["Last-Modified"] = formatdate(standin._started, usegmt=True)  # noqa: SLF001
+            if faults.not_modified and self.headers.get("If-None-Match") == etag:
+                self._send(route, HTTPStatus.NOT_MODIFIED, b"", headers, split.query)
+                return
+            headers["Content-Type"] = "application/json"
+            if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                body = gzip.compress(body)
+                headers["Content-Encoding"] = "gzip"
+            self._send(route, HTTPStatus.OK, body, headers, split.query)
+
+        def _send(self, route: str | None, status: int, body: bytes, headers: dict[str, str], query: str) -> None:
+            """Record and send a response."""
+            standin._record(  # noqa: SLF001
+                RequestRecord(route=route, path=self.path, status=int(status), query=query, headers=dict(self.headers))
+            )
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+            logger.debug(format, *args)
+
+    return _Handler
+
+
+def main() -> None:
+    """Run the stand-in server from the command line.
+
+    Returns:
+        None
+
+    """
+    parser = argparse.ArgumentParser(description="Offline stand-in for the APIs used by PoEMarcut.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--payloads", type=Path, help="directory of recorded {route}.json payloads")
+    parser.add_argument("--record", type=Path, help="fetch the live APIs into this directory and exit")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=HTTPStatus.SERVICE_UNAVAILABLE)
+    parser.add_argument("--empty-lines", action="store_true", help="serve currency responses without lines")
+    parser.add_argument("--no-304", action="store_true", help="ignore If-None-Match")
+    parser.add_argument("--rate-limit", help='GGG-style rules "hits:period:penalty,...", e.g. 5:10:60,20:60:120')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    if args.record:
+        recorded = record_payloads(args.record)
+        print(f"Recorded {len(recorded)} payload(s) to {args.record}: {', '.join(recorded)}")  # noqa: T201
+        return
+
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        empty_lines=args.empty_lines,
+        not_modified=not args.no_304,
+        rate_limit=args.rate_limit,
+    )
+    if args.rate_limit:
+        _parse_rules(args.rate_limit)
+    payloads = load_payloads(args.payloads) if args.payloads else None
+    server = StandinServer(host=args.host, port=args.port, payloads=payloads, faults=faults).start()
+    print(f"Serving on {server.url}. Use: {net.API_BASE_URL_ENV}={server.url}")  # noqa: T201
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
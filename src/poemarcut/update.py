@@ -5,7 +5,7 @@ import re
 
 import requests
 
-from poemarcut import __version__
+from poemarcut import __version__, net
 
 GITHUB_RELEASE_URL = "https://github.com/cdrg/poemarcut/releases/latest"
 GITHUB_RELEASES_API_URL = "https://api.github.com/repos/cdrg/poemarcut/releases/latest"
@@ -43,7 +43,7 @@ def get_github_version() -> str | None:
 
     """
     try:
-        response = requests.get(GITHUB_RELEASES_API_URL, timeout=5)
+        response = net.get(GITHUB_RELEASES_API_URL)
         response.raise_for_status()
     except requests.RequestException:
         logger.exception("Error fetching current GitHub version number")
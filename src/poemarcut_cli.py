@@ -4,15 +4,25 @@
 Also works for stash tab items, but you'll have to select the price text yourself.
 
 On start, prints a list of suggested new prices for 1-unit currency items based on current poe.ninja currency prices.
+
+Currency data can be exported to a bundle file with `--export-bundle` and loaded again with `--bundle`,
+which starts without network requests and keeps the bundle's prices for the whole session.
+
+`poemarcut_cli.py bench` runs the benchmark suites instead; see `poemarcut.bench.runner`.
 """
 
+import argparse
 import logging
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-from poemarcut import currency, keyboard, settings, update
+from poemarcut import bundle, cache, currency, keyboard, prefetch, settings, update
 from poemarcut.__init__ import __version__
+from poemarcut.bench import runner as bench_runner
 from poemarcut.constants import BOLD, RESET, S_IN_HOUR
+from poemarcut.rates import RateTable
 
 
 def print_last_updated(game: int, league: str, file_mtime: float) -> None:
@@ -46,15 +56,14 @@ def print_poe1_currency_suggestions(discount_percent: int, data: dict) -> None:
         None
 
     """
+    table = RateTable.from_response(data)
     if "lines" in data and "core" in data and data["core"].get("primary"):
         if data["core"]["primary"] == "chaos" and data["core"].get("rates") and data["core"]["rates"].get("divine"):
             chaos_div_val: float = data["core"]["rates"]["divine"]
         elif data["core"]["primary"] == "divine" and data["core"].get("rates") and data["core"]["rates"].get("chaos"):
             chaos_div_val: float = 1 / data["core"]["rates"]["chaos"]
-        elif any((item.get("id") == "chaos") for item in data.get("lines", [])):
-            chaos_div_val: float = next(item for item in data.get("lines", []) if item.get("id") == "chaos")[
-                "primaryValue"
-            ]
+        elif "chaos" in table:
+            chaos_div_val: float = table.primary_value("chaos")
         else:
             print("Error: Invalid data, could not determine currency suggestions for PoE1.", file=sys.stderr)
             return
@@ -82,19 +91,18 @@ def print_poe2_currency_suggestions(discount_percent: int, data: dict) -> None:
         None
 
     """  # Compute multiplier from discount_percent inline where needed
+    table = RateTable.from_response(data)
     if (
         "lines" in data
         and "core" in data
         and data["core"].get("primary")
-        and any((item.get("id") == "annul") for item in data.get("lines", []))
-        and any((item.get("id") == "chaos") for item in data.get("lines", []))
-        and any((item.get("id") == "exalted") for item in data.get("lines", []))
+        and "annul" in table
+        and "chaos" in table
+        and "exalted" in table
     ):
-        annul_div_val: float = next(item for item in data.get("lines", []) if item.get("id") == "annul")["primaryValue"]
-        chaos_div_val: float = next(item for item in data.get("lines", []) if item.get("id") == "chaos")["primaryValue"]
-        exalt_div_val: float = next(item for item in data.get("lines", []) if item.get("id") == "exalted")[
-            "primaryValue"
-        ]
+        annul_div_val: float = table.primary_value("annul")
+        chaos_div_val: float = table.primary_value("chaos")
+        exalt_div_val: float = table.primary_value("exalted")
 
         div_annul_adj: float = 1 / annul_div_val * (1.0 - (discount_percent / 100.0))
         div_chaos_adj: float = 1 / chaos_div_val * (1.0 - (discount_percent / 100.0))
@@ -122,13 +130,44 @@ def print_poe2_currency_suggestions(discount_percent: int, data: dict) -> None:
         print("Error: Invalid data, could not determine currency suggestions for PoE2.", file=sys.stderr)
 
 
-def main() -> int:  # noqa: C901, PLR0915
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Args:
+        argv (list[str] | None): The arguments, or None to use `sys.argv`.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+
+    """
+    parser = argparse.ArgumentParser(description="Quickly reprice Path of Exile 1/2 merchant tab items.")
+    parser.add_argument(
+        "--bundle", type=Path, help="load currency data from this bundle file and use it for the whole session"
+    )
+    parser.add_argument(
+        "--export-bundle", type=Path, help="export currency data for all configured leagues to this file and exit"
+    )
+    parser.add_argument("--pin", action="store_true", help="keep the prices loaded at startup for the whole session")
+    subparsers = parser.add_subparsers(dest="command")
+    bench_runner.add_arguments(
+        subparsers.add_parser("bench", help="run benchmarks, optionally saving or comparing against a baseline")
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:  # noqa: C901, PLR0915
     """Read settings from file, fetch and print currency values, then start keyboard listener.
 
+    Args:
+        argv (list[str] | None): Command line arguments, or None to use `sys.argv`.
+
     Returns:
         int: Process exit code (0 for success).
 
     """
+    args = parse_args(argv)
+    if args.command == "bench":
+        return bench_runner.run_from_args(args)
     logging.basicConfig(
         level=logging.WARNING,
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -138,6 +177,35 @@ def main() -> int:  # noqa: C901, PLR0915
     )
 
     settings_man: settings.SettingsManager = settings.settings_manager
+    currency_settings = settings_man.settings.currency
+    cache.manager.configure(currency_settings.cache_dir)
+    currency.store.set_categories(1, currency_settings.poe1categories)
+    currency.store.set_categories(2, currency_settings.poe2categories)
+    currency.store.shared = currency_settings.share_snapshots
+    currency.configure_providers(currency_settings.providers, hedge_delay=currency_settings.hedge_delay)
+    targets = currency.configured_targets(currency_settings.poe1leagues, currency_settings.poe2leagues)
+
+    if args.export_bundle is not None:
+        try:
+            exported = bundle.export(args.export_bundle, targets, update=currency_settings.autoupdate)
+        except OSError as e:
+            print(f"Error: Could not write bundle '{args.export_bundle}': {e}", file=sys.stderr)
+            return 1
+        print(f"Exported {len(exported.snapshots)} of {len(targets)} league(s) to '{args.export_bundle}'.")
+        return 0
+    if args.bundle is not None:
+        try:
+            loaded = bundle.load(args.bundle)
+        except (OSError, bundle.BundleError) as e:
+            print(f"Error: Could not load bundle '{args.bundle}': {e}", file=sys.stderr)
+            return 1
+        print(f"Using {len(loaded.snapshots)} league(s) from bundle exported {time.ctime(loaded.created)}.")
+        # Only the bundle's leagues are warmed, so starting from a bundle never fetches.
+        missing = [f"PoE{game} '{league}'" for game, league in targets if (game, league) not in loaded.snapshots]
+        if missing:
+            print(f"Not in bundle, not loaded: {', '.join(missing)}.", file=sys.stderr)
+        targets = [target for target in targets if target in loaded.snapshots]
+
     # Parsed binding tuples from keyboard.keyorkeycode_from_str
     keys: dict[str, tuple[str, object]] = {
         k: keyboard.keyorkeycode_from_str(key_str=v) for k, v in settings_man.settings.keys.model_dump().items()
@@ -196,34 +264,41 @@ def main() -> int:  # noqa: C901, PLR0915
             None
 
         """
-        games: list[int] = [1, 2]
-        for game in games:
-            league = (
-                next(iter(settings_man.settings.currency.poe1leagues))
-                if game == 1
-                else next(iter(settings_man.settings.currency.poe2leagues))
-            )
-            try:
-                data = currency.store.get_data(
-                    game=game, league=league, update=settings_man.settings.currency.autoupdate
+        currency_settings = settings_man.settings.currency
+        # Warm every configured league of both games in parallel, alongside the GitHub update check,
+        # so startup costs roughly the slowest single request instead of the sum of all of them.
+        # A loaded bundle is meant to work offline, so the update check is skipped then.
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="update-check") as update_pool:
+            update_future = update_pool.submit(update.is_github_update_available) if args.bundle is None else None
+            results = currency.store.warm(targets, update=currency_settings.autoupdate)
+            if args.pin and args.bundle is None:
+                currency.store.pin(result.snapshot for result in results.values() if result.snapshot is not None)
+
+            games: list[int] = [1, 2]
+            for game in games:
+                league = (
+                    next(iter(currency_settings.poe1leagues))
+                    if game == 1
+                    else next(iter(currency_settings.poe2leagues))
                 )
-            except (LookupError, ValueError, OSError):
-                print(f"Error: Could not retrieve currency data for PoE{game} ({league}).", file=sys.stderr)
-                data = {}
-            print_last_updated(game=game, league=league, file_mtime=data.get("mtime", 0))
-
-            # If data object is valid, print suggested currency values for case where current price is 1
-            if game == 1 and "lines" in data and "core" in data and data["core"].get("primary"):
-                print_poe1_currency_suggestions(discount_percent=discount_percent, data=data)
-                print()
-            elif game == 2 and "lines" in data and "core" in data and data["core"].get("primary"):  # noqa: PLR2004
-                print_poe2_currency_suggestions(discount_percent=discount_percent, data=data)
-                print()
-            else:
-                print(f"Error: Could not retrieve currency suggestions for PoE{game}.", file=sys.stderr)
-                print()
-
-        update_available, github_version = update.is_github_update_available()
+                result = results.get((game, league))
+                if result is None or result.error is not None:
+                    print(f"Error: Could not retrieve currency data for PoE{game} ({league}).", file=sys.stderr)
+                data = result.snapshot.data if result is not None and result.snapshot is not None else {}
+                print_last_updated(game=game, league=league, file_mtime=data.get("mtime", 0))
+
+                # If data object is valid, print suggested currency values for case where current price is 1
+                if game == 1 and "lines" in data and "core" in data and data["core"].get("primary"):
+                    print_poe1_currency_suggestions(discount_percent=discount_percent, data=data)
+                    print()
+                elif game == 2 and "lines" in data and "core" in data and data["core"].get("primary"):  # noqa: PLR2004
+                    print_poe2_currency_suggestions(discount_percent=discount_percent, data=data)
+                    print()
+                else:
+                    print(f"Error: Could not retrieve currency suggestions for PoE{game}.", file=sys.stderr)
+                    print()
+
+            update_available, github_version = update_future.result() if update_future is not None else (False, None)
         if update_available and github_version:
             print(
                 f"{BOLD}A newer version of PoEMarcut is available{RESET} at https://github.com/cdrg/poemarcut: {github_version} (you have {__version__})"
@@ -231,7 +306,16 @@ def main() -> int:  # noqa: C901, PLR0915
 
     _print_currency_suggestions(discount_percent=settings_man.settings.logic.discount_percent)
 
+    # Keep the active league's rates fresh in the background so repricing never waits on a fetch.
+    # Pinned prices never change, so there is nothing to prefetch.
+    if args.bundle is None and not args.pin:
+        prefetch.scheduler.watch(
+            currency_settings.active_game, currency_settings.active_league, autoupdate=currency_settings.autoupdate
+        )
+        prefetch.scheduler.start()
+
     keyboard.start_listener(blocking=True)
+    prefetch.scheduler.stop()
 
     # Ensure singleton-managed listener is stopped/cleaned up (no-op if already stopped)
     try:
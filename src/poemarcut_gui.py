@@ -46,7 +46,7 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
-from poemarcut import __version__, constants, currency, keyboard, logic, settings, update
+from poemarcut import __version__, cache, constants, currency, keyboard, logic, prefetch, settings, update
 
 logger = logging.getLogger(__name__)
 
@@ -186,6 +186,12 @@ class PoEMarcutGUI(QMainWindow):
         super().__init__()
         # Use the shared SettingsManager singleton
         self.settings_manager: settings.SettingsManager = settings.settings_manager
+        currency_settings = self.settings_manager.settings.currency
+        cache.manager.configure(currency_settings.cache_dir)
+        currency.store.set_categories(1, currency_settings.poe1categories)
+        currency.store.set_categories(2, currency_settings.poe2categories)
+        currency.store.shared = currency_settings.share_snapshots
+        currency.configure_providers(currency_settings.providers, hedge_delay=currency_settings.hedge_delay)
         self.setWindowTitle("PoE Marcut")
         # Initialize window geometry from saved settings
         try:
@@ -367,11 +373,29 @@ class PoEMarcutGUI(QMainWindow):
     def _run_deferred_startup(self) -> None:
         """Refresh market data and check for updates after the first display."""
         self.populate_currency_mappings()
+        self._watch_active_league()
+        prefetch.scheduler.start()
+        try:
+            currency.refresh_leagues_in_background(self.leagues_ready.emit)
+        except RuntimeError:
+            logger.exception("Failed to start background league refresh")
         try:
             threading.Thread(target=self._check_github_update, daemon=True).start()
         except (RuntimeError, TypeError):
             logger.exception("Failed to start background thread for github update check")
 
+    def _watch_active_league(self) -> None:
+        """Point the background currency prefetcher at the active game and league.
+
+        Returns:
+            None
+
+        """
+        currency_settings = self.settings_manager.settings.currency
+        prefetch.scheduler.watch(
+            currency_settings.active_game, currency_settings.active_league, autoupdate=currency_settings.autoupdate
+        )
+
     def moveEvent(self, event: QMoveEvent) -> None:  # type: ignore[override]  # noqa: N802
         """Track window moves and persist position to settings (debounced)."""
         try:
@@ -1323,6 +1347,7 @@ class PoEMarcutGUI(QMainWindow):
                 self.active_game_le.setText(str(value))
             self._populate_minimum_discount_currency_options()
             self.populate_currency_mappings()
+            self._watch_active_league()
         elif setting == "active_league":
             with QSignalBlocker(self.active_league_le):
                 self.active_league_le.setText(str(value))
@@ -1330,9 +1355,11 @@ class PoEMarcutGUI(QMainWindow):
                 self.populate_league_combo()
             self._populate_minimum_discount_currency_options()
             self.populate_currency_mappings()
+            self._watch_active_league()
         elif setting == "autoupdate":
             with QSignalBlocker(self.autoupdate_cb):
                 self.autoupdate_cb.setChecked(bool(value))
+            self._watch_active_league()
         elif setting == "poe1leagues":
             with QSignalBlocker(self.p1l_list_widget):
                 val = value or []
@@ -1579,6 +1606,7 @@ class PoEMarcutGUI(QMainWindow):
                     self.settings_window.close()
         except (AttributeError, RuntimeError):
             logger.exception("Error while closing settings window during main window shutdown")
+        prefetch.scheduler.stop()
         # Quit the QApplication so the process exits even if other windows were open
         app = QApplication.instance()
         if app is not None:
@@ -2299,7 +2327,7 @@ class PoEMarcutGUI(QMainWindow):
                 self.get_poe1_leagues_button.setEnabled(False)
         except (AttributeError, TypeError, ValueError, settings.ValidationError, RuntimeError, OSError):
             # Fallback to synchronous behavior if threading fails
-            self._update_leagues_and_ui(game=1, setting_attr="poe1leagues")
+            self._update_leagues_and_ui(game=1)
 
     def get_poe2_leagues(self) -> None:
         """Get PoE2 leagues, update settings, then update UI.
@@ -2316,51 +2344,46 @@ class PoEMarcutGUI(QMainWindow):
                 self.get_poe2_leagues_button.setEnabled(False)
         except (AttributeError, TypeError, ValueError, settings.ValidationError, RuntimeError, OSError):
             # Fallback to synchronous behavior if threading fails
-            self._update_leagues_and_ui(game=2, setting_attr="poe2leagues")
+            self._update_leagues_and_ui(game=2)
 
-    def _update_leagues_and_ui(self, *, game: int, setting_attr: str) -> None:
+    def _update_leagues_and_ui(self, *, game: int) -> None:
         """Shared logic for updating leagues from the API and refreshing UI.
 
         Args:
             game (int): Game id (1 or 2).
-            setting_attr (str): Attribute name on currency settings to update.
 
         Returns:
             None
 
         """
         leagues: set[str] | None = currency.get_leagues(game=game)
+        self._apply_leagues(game, leagues)
+
+    def _apply_leagues(self, game: int, leagues: set[str] | None) -> None:
+        """Persist a fetched league list and refresh the league widgets if it differs from the settings.
+
+        Args:
+            game (int): Game id (1 or 2).
+            leagues (set[str] | None): The fetched leagues, or None if the fetch failed.
+
+        Returns:
+            None
+
+        """
         try:
-            current = self.settings_manager.settings
-            new_settings = settings.PoEMSettings(
-                keys=settings.KeySettings(**current.keys.model_dump()),
-                logic=settings.LogicSettings(**current.logic.model_dump()),
-                currency=settings.CurrencySettings(**current.currency.model_dump()),
-                gui=settings.GuiSettings(**current.gui.model_dump()),
-            )
-            new_leagues = set(leagues or [])
-            try:
-                # Batch the update so validators run against the final consistent state
-                with new_settings.currency.delay_validation():
-                    setattr(new_settings.currency, setting_attr, new_leagues)
-                    # If active_game matches and the active_league would become invalid,
-                    # pick a sensible default from the new list to avoid transient warnings.
-                    if new_settings.currency.active_game == game and (
-                        new_settings.currency.active_league not in new_leagues and new_leagues
-                    ):
-                        new_settings.currency.active_league = sorted(new_leagues)[0]
-                self.settings_manager.set_settings(new_settings)
-                self._refresh_settings_cache()
-            except (AttributeError, TypeError, ValueError):
-                # Fallback to previous behavior if delay_validation isn't available or fails
-                setattr(new_settings.currency, setting_attr, new_leagues)
-                self.settings_manager.set_settings(new_settings)
-                self._refresh_settings_cache()
+            changed = self.settings_manager.replace_leagues_and_persist(game=game, leagues=leagues)
         except (AttributeError, TypeError, ValueError, settings.ValidationError, RuntimeError, OSError):
-            logger.exception("Failed to update %s from get_poe%d_leagues", setting_attr, game)
-        # Always refresh UI widgets afterwards
-        self.populate_league_combo()
-        self.populate_league_settings()
+            logger.exception("Failed to persist PoE%d leagues", game)
+            return
+        if not changed:
+            logger.debug("PoE%d leagues unchanged; not persisting", game)
+            return
+        self._refresh_settings_cache()
+        try:
+            self.populate_league_combo()
+            self.populate_league_settings()
+        except (AttributeError, TypeError, ValueError, settings.ValidationError, RuntimeError, OSError):
+            logger.exception("Failed to refresh UI after league fetch")
 
     def _fetch_leagues_bg(self, game: int) -> None:
         """Background helper: fetch leagues and emit `leagues_ready` on completion.
@@ -2379,41 +2402,10 @@ class PoEMarcutGUI(QMainWindow):
     def _on_leagues_ready(self, game: int, leagues: set | None) -> None:
         """Slot run on GUI thread when background league fetch completes.
 
-        Persists updated leagues via settings and refreshes UI. Also re-enables
-        the Get buttons that were disabled while fetching.
+        Persists updated leagues via settings and refreshes UI if the list changed. Also
+        re-enables the Get buttons that were disabled while fetching.
         """
-        setting_attr = "poe1leagues" if game == 1 else "poe2leagues"
-        try:
-            current = self.settings_manager.settings
-            new_settings = settings.PoEMSettings(
-                keys=settings.KeySettings(**current.keys.model_dump()),
-                logic=settings.LogicSettings(**current.logic.model_dump()),
-                currency=settings.CurrencySettings(**current.currency.model_dump()),
-                gui=settings.GuiSettings(**current.gui.model_dump()),
-            )
-            new_leagues = set(leagues or [])
-            try:
-                with new_settings.currency.delay_validation():
-                    setattr(new_settings.currency, setting_attr, new_leagues)
-                    if new_settings.currency.active_game == game and (
-                        new_settings.currency.active_league not in new_leagues and new_leagues
-                    ):
-                        new_settings.currency.active_league = sorted(new_leagues)[0]
-                self.settings_manager.set_settings(new_settings)
-                self._refresh_settings_cache()
-            except (AttributeError, TypeError, ValueError):
-                setattr(new_settings.currency, setting_attr, new_leagues)
-                self.settings_manager.set_settings(new_settings)
-                self._refresh_settings_cache()
-        except (AttributeError, TypeError, ValueError, settings.ValidationError, RuntimeError, OSError):
-            logger.exception("Failed to persist %s from background league fetch", setting_attr)
-
-        # Refresh UI regardless of persistence result
-        try:
-            self.populate_league_combo()
-            self.populate_league_settings()
-        except (AttributeError, TypeError, ValueError, settings.ValidationError, RuntimeError, OSError):
-            logger.exception("Failed to refresh UI after league fetch")
+        self._apply_leagues(game, leagues)
 
         # Re-enable the appropriate button
         try:
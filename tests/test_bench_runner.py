@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+
+from poemarcut.bench import runner
+
+
+def _stats(p50: float) -> runner.Stats:
+    return runner.Stats(min=p50 / 2, p50=p50, p90=p50 * 2, p99=p50 * 3, mean=p50, samples=10, number=100)
+
+
+def test_stats_percentiles_from_samples() -> None:
+    stats = runner.Stats.from_samples([float(i) for i in range(1, 102)], number=7)
+
+    assert (stats.min, stats.p50, stats.p90, stats.p99) == (1.0, 51.0, 91.0, 100.0)
+    assert stats.mean == 51.0
+    assert (stats.samples, stats.number) == (101, 7)
+    assert runner.Stats.from_samples([2.0], number=1).p99 == 2.0
+
+
+def test_time_case_calibrates_calls_per_sample() -> None:
+    calls = []
+
+    stats = runner.time_case(lambda: calls.append(1), samples=5, min_sample_s=0.001)
+
+    assert stats.samples == 5
+    assert stats.number > 1
+    assert len(calls) >= 5 * stats.number
+    assert 0 < stats.min <= stats.p50 <= stats.p90 <= stats.p99
+
+
+def test_baseline_round_trip_and_compare(tmp_path: Path) -> None:
+    path = tmp_path / "baseline.json"
+    runner.save_baseline(path, {"a/fast": _stats(1e-6), "a/slow": _stats(1e-3)})
+
+    baseline = runner.load_baseline(path)
+    assert baseline == {"a/fast": _stats(1e-6), "a/slow": _stats(1e-3)}
+
+    current = {"a/fast": _stats(1.05e-6), "a/slow": _stats(1.5e-3), "a/new": _stats(1.0)}
+    comparisons = runner.compare(baseline, current, threshold=0.1)
+    assert [(c.name, c.regressed) for c in comparisons] == [("a/fast", False), ("a/slow", True)]
+    assert comparisons[1].ratio == pytest.approx(1.5)
+    assert not runner.compare(baseline, current, threshold=0.6)[1].regressed
+    assert runner.compare(baseline, current, metric="min")[1].regressed
+    with pytest.raises(ValueError, match="Unknown metric"):
+        runner.compare(baseline, current, metric="p75")
+
+
+def test_load_baseline_rejects_invalid_files(tmp_path: Path) -> None:
+    path = tmp_path / "baseline.json"
+    invalid = ("not json", '{"format": 99, "results": {}}', '{"format": 1}', '{"format": 1, "results": {"a": {}}}')
+    for payload in invalid:
+        path.write_text(payload, encoding="utf-8")
+        with pytest.raises(runner.BaselineError):
+            runner.load_baseline(path)
+
+
+def test_main_saves_and_flags_regressions(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    path = tmp_path / "baseline.json"
+    args = ["logic", "--samples", "3", "--min-sample-ms", "0.5"]
+
+    assert runner.main([*args, "--save", str(path)]) == 0
+    baseline = runner.load_baseline(path)
+    assert "logic/convert_and_compute_price (1 divine)" in baseline
+
+    # Against a baseline 1000x faster than reality every case regresses.
+    runner.save_baseline(path, {name: _stats(stats.p50 / 1000) for name, stats in baseline.items()})
+    assert runner.main([*args, "--compare", str(path)]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
+
+    assert runner.main(["nosuchsuite"]) == 2
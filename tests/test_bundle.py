@@ -0,0 +1,99 @@
+from pathlib import Path
+
+import pytest
+import requests
+
+from poemarcut import bundle, cache, currency, net
+
+DATA = {
+    "core": {"primary": "divine", "rates": {"chaos": 150.0}, "items": [{"id": "chaos", "name": "Chaos Orb"}]},
+    "lines": [{"id": "divine", "primaryValue": 1.0}, {"id": "chaos", "primaryValue": 1 / 150}],
+}
+
+
+@pytest.fixture
+def store(monkeypatch: pytest.MonkeyPatch) -> currency.CurrencyStore:
+    store = currency.CurrencyStore(shared=False)
+    monkeypatch.setattr(currency, "store", store)
+    return store
+
+
+def _fail(*args: object, **kwargs: object) -> dict:  # noqa: ARG001
+    msg = "network access"
+    raise AssertionError(msg)
+
+
+def test_bundle_round_trip_and_corruption() -> None:
+    snapshot = currency.CurrencySnapshot(1, "Standard", DATA, 100.0, currency.RateTable.from_response(DATA))
+    original = bundle.Bundle(123.0, "1.0", {(1, "Standard"): snapshot}, {1: frozenset({"Standard", "Mercenaries"})})
+    payload = bundle.encode(original)
+
+    decoded = bundle.decode(payload)
+
+    assert (decoded.created, decoded.app_version, decoded.leagues) == (123.0, "1.0", original.leagues)
+    loaded = decoded.snapshots[(1, "Standard")]
+    assert loaded.mtime == 100.0
+    assert loaded.data["lines"] == DATA["lines"]
+    assert loaded.table.rate("divine", "chaos") == pytest.approx(150.0)
+
+    with pytest.raises(bundle.BundleError):
+        bundle.decode(payload[:-1])
+    with pytest.raises(bundle.BundleError):
+        bundle.decode(b"PMEB" + payload[4:20] + b"x" + payload[21:])
+    with pytest.raises(bundle.BundleError):
+        bundle.decode(b"not a bundle")
+
+
+def test_export_then_load_pins_prices_without_network(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, store: currency.CurrencyStore
+) -> None:
+    monkeypatch.chdir(tmp_path)
+
+    def fake_retrieve(game: int, league: str, *, update: bool = True, force: bool = False) -> dict:  # noqa: ARG001
+        return {**DATA, "mtime": 100.0} if game == 1 else {}
+
+    def offline(*args: object, **kwargs: object) -> None:  # noqa: ARG001
+        raise requests.ConnectionError
+
+    monkeypatch.setattr(currency, "_retrieve_currency_prices", fake_retrieve)
+    monkeypatch.setattr(net, "get", offline)
+    cache.write_cache(cache.league_cache_path(1), {"result": [{"id": "Standard", "realm": "pc"}]})
+    exported = bundle.export(tmp_path / "economy.pmb", [(1, "Standard"), (2, "Standard")])
+    assert set(exported.snapshots) == {(1, "Standard")}
+    assert exported.leagues == {1: frozenset({"Standard"})}
+
+    # A new session without cache files or network, with old data and autoupdate on.
+    session = tmp_path / "session"
+    session.mkdir()
+    monkeypatch.chdir(session)
+    pinned = currency.CurrencyStore(shared=False)
+    monkeypatch.setattr(currency, "store", pinned)
+    monkeypatch.setattr(currency, "_retrieve_currency_prices", _fail)
+    monkeypatch.setattr(net, "get", _fail)
+
+    bundle.load(tmp_path / "economy.pmb")
+
+    assert currency.get_exchange_rate(1, "Standard", "divine", "chaos", autoupdate=True) == pytest.approx(150.0)
+    assert pinned.refresh(1, "Standard") is pinned.get_snapshot(1, "Standard", update=True)
+    assert currency.get_leagues(1) == {"Standard"}
+    index = pinned.get_price_index(1, "Standard", update=True)
+    assert index is not None
+    assert index.value("Chaos Orb") == pytest.approx(1 / 150)
+    assert pinned.stats()["pinned"] == 1
+
+    pinned.unpin()
+    assert pinned.pinned() == []
+    with pytest.raises(AssertionError, match="network access"):
+        pinned.get_snapshot(1, "Standard", update=True)
+
+
+def test_pinned_snapshot_survives_cache_file_changes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, store: currency.CurrencyStore
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    snapshot = currency.CurrencySnapshot(1, "Standard", DATA, 100.0, currency.RateTable.from_response(DATA))
+    store.pin([snapshot])
+    cache.write_cache(cache.cache_path(1, "Standard"), {**DATA, "lines": [{"id": "divine", "primaryValue": 2.0}]})
+    store.invalidate()
+
+    assert store.get_snapshot(1, "Standard", update=False) is snapshot
@@ -0,0 +1,81 @@
+import os
+import time
+from pathlib import Path
+
+from poemarcut import cache
+from poemarcut.constants import S_IN_HOUR
+
+
+def _make(path: Path, size: int, mtime: float) -> None:
+    path.write_bytes(b"x" * size)
+    os.utime(path, (mtime, mtime))
+
+
+def test_manager_uses_configured_directory(tmp_path: Path) -> None:
+    manager = cache.CacheManager(tmp_path / "nested" / "cache")
+    path = manager.path(2, "Dawn")
+
+    cache.write_cache(path, {"lines": []})
+
+    assert path == tmp_path / "nested" / "cache" / "poemarcut" / "pmc-Dawn-2.json"
+    assert cache.read_cache(path) == {"lines": []}
+    assert not list(path.parent.glob(".*.tmp"))
+
+
+def test_evict_removes_old_files_then_oldest_until_under_size(tmp_path: Path) -> None:
+    now = time.time()
+    manager = cache.CacheManager(tmp_path, max_age=S_IN_HOUR * 24, max_bytes=250)
+    manager.directory.mkdir()
+    _make(manager.path(1, "Ancient"), 10, now - S_IN_HOUR * 48)
+    _make(manager.path(1, "Old"), 100, now - 300)
+    _make(manager.path(2, "Mid"), 100, now - 200)
+    _make(manager.path(2, "New"), 100, now - 100)
+    _make(manager.directory / "notes.json", 1000, now - S_IN_HOUR * 48)
+    _make(manager.directory / ".pmc-Old-1.json.abc.tmp", 5, now - S_IN_HOUR * 2)
+
+    removed = manager.evict(now=now)
+
+    assert {p.name for p in removed} == {"pmc-Ancient-1.json", "pmc-Old-1.json", ".pmc-Old-1.json.abc.tmp"}
+    assert sorted(p.name for p in manager.directory.iterdir()) == ["notes.json", "pmc-Mid-2.json", "pmc-New-2.json"]
+
+
+def test_evict_ignores_files_it_did_not_write(tmp_path: Path) -> None:
+    now = time.time()
+    manager = cache.CacheManager(tmp_path, max_age=0, max_bytes=0)
+    foreign = [tmp_path / "Report-1.json", tmp_path / "Backup-2.snap", tmp_path / ".draft.tmp"]
+    for path in foreign:
+        _make(path, 100, now - S_IN_HOUR * 48)
+    manager.directory.mkdir()
+    _make(manager.path(1, "Standard"), 100, now - S_IN_HOUR * 48)
+
+    assert manager.evict(now=now) == [manager.path(1, "Standard")]
+    assert all(path.exists() for path in foreign)
+
+
+def test_evict_never_removes_kept_files(tmp_path: Path) -> None:
+    now = time.time()
+    manager = cache.CacheManager(tmp_path, max_age=60, max_bytes=0)
+    manager.directory.mkdir()
+    active = manager.path(1, "Active")
+    _make(active, 100, now - S_IN_HOUR)
+    _make(manager.path(1, "Other"), 100, now)
+
+    manager.evict(keep={active}, now=now)
+
+    assert active.exists()
+    assert not manager.path(1, "Other").exists()
+
+
+def test_category_cache_files_are_evicted_like_currency_files(tmp_path: Path) -> None:
+    manager = cache.CacheManager(tmp_path, max_age=S_IN_HOUR)
+    currency_path = manager.path(1, "Standard")
+    fragment_path = manager.path(1, "Standard", "Fragment")
+    assert currency_path.name == "pmc-Standard-1.json"
+    assert fragment_path.name == "pmc-Standard.fragment-1.json"
+
+    now = time.time()
+    manager.directory.mkdir()
+    _make(currency_path, 10, now)
+    _make(fragment_path, 10, now - 2 * S_IN_HOUR)
+
+    assert manager.evict(now=now) == [fragment_path]
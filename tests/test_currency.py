@@ -1,15 +1,21 @@
 import importlib
 import logging
+import os
+import random
 import sys
+import threading
+import time
+from math import ceil, isnan
 from pathlib import Path
 
 import pytest
 from _pytest.monkeypatch import MonkeyPatch
 from PyQt6.QtWidgets import QApplication
 
-from poemarcut import currency
+from poemarcut import cache, currency, rates
 
 tmp_yaml = "tmpstandard-1.yaml"
+tmp_json = "tmpstandard-1.json"
 
 
 def test_empty_market_response_detected(
@@ -44,6 +50,9 @@ def test_gui_shows_warning_for_empty_market_response(
         def get_data(self, game: int, league: str, *, update: bool) -> dict:  # noqa: ARG002
             return empty_data
 
+        def get_table(self, game: int, league: str, *, update: bool) -> rates.RateTable:  # noqa: ARG002
+            return rates.RateTable.from_response(empty_data)
+
     monkeypatch.chdir(tmp_path)
     for module_name in ["poemarcut.settings", "poemarcut_gui"]:
         if module_name in sys.modules:
@@ -62,3 +71,322 @@ def test_gui_shows_warning_for_empty_market_response(
     item = window.currency_list.item(0)
     assert item is not None
     assert item.text() == "No currency data was returned for league tmpstandard."
+
+
+def _write_cache(path: Path, primary_value: float, mtime: float) -> None:
+    data = {
+        "core": {"primary": "divine", "rates": {}},
+        "lines": [{"id": "divine", "primaryValue": 1.0}, {"id": "chaos", "primaryValue": primary_value}],
+    }
+    cache.write_cache(path, data)
+    os.utime(path, (mtime, mtime))
+
+
+def test_store_serves_repeat_lookups_from_memory(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    _write_cache(cache.cache_path(1, "tmpstandard"), 0.01, time.time())
+    store = currency.CurrencyStore()
+    monkeypatch.setattr(currency, "store", store)
+
+    for _ in range(5):
+        assert currency.get_exchange_rate(1, "tmpstandard", "divine", "chaos", autoupdate=False) == 100.0
+
+    assert store.misses == 1
+    assert store.hits == 4
+
+
+def test_store_reloads_when_cache_file_changes(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    now = time.time()
+    _write_cache(cache.cache_path(1, "tmpstandard"), 0.01, now - 60)
+    store = currency.CurrencyStore()
+
+    first = store.get_data(1, "tmpstandard", update=False)
+    _write_cache(cache.cache_path(1, "tmpstandard"), 0.02, now)
+    second = store.get_data(1, "tmpstandard", update=False)
+
+    assert first["lines"][1]["primaryValue"] == 0.01
+    assert second["lines"][1]["primaryValue"] == 0.02
+    assert store.stats() == {
+        "hits": 0,
+        "misses": 2,
+        "stale_hits": 0,
+        "coalesced": 0,
+        "evictions": 0,
+        "shared_hits": 0,
+        "snapshots": 1,
+        "indexes": 0,
+        "pinned": 0,
+    }
+
+
+def test_legacy_yaml_cache_is_migrated_to_json(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    legacy = tmp_path / tmp_yaml
+    legacy.write_text("core:\n  primary: chaos\nlines:\n- id: chaos\n  primaryValue: 1.0\n", encoding="utf-8")
+    os.utime(legacy, (1_000_000.0, 1_000_000.0))
+
+    result = currency._retrieve_currency_prices(game=1, league="tmpstandard", update=False)
+
+    assert result["lines"] == [{"id": "chaos", "primaryValue": 1.0}]
+    assert result["mtime"] == 1_000_000.0
+    assert not legacy.exists()
+    assert cache.read_cache(cache.cache_path(1, "tmpstandard")) == {
+        "core": {"primary": "chaos"},
+        "lines": result["lines"],
+    }
+
+
+def test_cache_rejects_unknown_version(tmp_path: Path) -> None:
+    path = tmp_path / tmp_json
+    path.write_bytes(b'{"format": "poemarcut-currency-cache", "version": 999, "data": {}}')
+
+    assert cache.read_cache(path) is None
+
+
+def test_warm_fetches_leagues_concurrently_and_isolates_errors(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    delay = 0.2
+
+    def slow_retrieve(game: int, league: str, *, update: bool = True, force: bool = False) -> dict:  # noqa: ARG001
+        time.sleep(delay)
+        if league == "broken":
+            msg = "boom"
+            raise ValueError(msg)
+        return {
+            "core": {"primary": "divine", "rates": {}},
+            "lines": [{"id": "divine", "primaryValue": 1.0}],
+            "mtime": time.time(),
+        }
+
+    monkeypatch.setattr(currency, "_retrieve_currency_prices", slow_retrieve)
+    store = currency.CurrencyStore()
+    targets = currency.configured_targets({"a", "b", "broken"}, {"c"})
+
+    start = time.perf_counter()
+    results = store.warm(targets, update=True, max_workers=4)
+    elapsed = time.perf_counter() - start
+
+    assert list(results) == [(1, "a"), (1, "b"), (1, "broken"), (2, "c")]
+    assert elapsed < delay * 2.5
+    assert results[(1, "a")].ok
+    assert results[(2, "c")].snapshot is not None
+    assert not results[(1, "broken")].ok
+    assert isinstance(results[(1, "broken")].error, ValueError)
+    assert store.get_table(1, "a", update=False) is not None
+
+
+def test_store_coalesces_concurrent_loads_under_stress(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    fetches: dict[tuple[int, str], int] = {}
+    fetch_lock = threading.Lock()
+
+    def slow_retrieve(game: int, league: str, *, update: bool = True, force: bool = False) -> dict:  # noqa: ARG001
+        with fetch_lock:
+            fetches[(game, league)] = fetches.get((game, league), 0) + 1
+        time.sleep(0.05)
+        return {
+            "core": {"primary": "divine", "rates": {}},
+            "lines": [{"id": "divine", "primaryValue": 1.0}, {"id": "chaos", "primaryValue": 0.01}],
+            "mtime": time.time(),
+        }
+
+    monkeypatch.setattr(currency, "_retrieve_currency_prices", slow_retrieve)
+    store = currency.CurrencyStore()
+    leagues = ["a", "b", "c"]
+    n_threads = 32
+    rounds = 50
+    barrier = threading.Barrier(n_threads)
+    errors: list[BaseException] = []
+
+    def worker(i: int) -> None:
+        try:
+            barrier.wait()
+            for r in range(rounds):
+                league = leagues[(i + r) % len(leagues)]
+                table = store.get_table(1 + (i % 2), league, update=True)
+                assert table is not None
+                assert table.rate("divine", "chaos") == 100.0
+                if r % 10 == 0 and i == 0:
+                    store.invalidate(league=league)
+        except BaseException as e:  # noqa: BLE001
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=30)
+
+    assert not errors
+    stats = store.stats()
+    assert stats["hits"] + stats["misses"] + stats["coalesced"] == n_threads * rounds
+    assert stats["coalesced"] > 0
+    # Without invalidation every league would be fetched once; invalidations add a bounded number of loads.
+    assert sum(fetches.values()) == stats["misses"]
+    assert stats["misses"] <= 2 * len(leagues) + rounds // 10 * 2
+
+
+def test_store_evicts_least_recently_used_snapshots(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    now = time.time()
+    for league in ("a", "b", "c"):
+        _write_cache(cache.cache_path(1, league), 0.01, now)
+    store = currency.CurrencyStore(max_snapshots=2)
+
+    store.get_data(1, "a", update=False)
+    store.get_data(1, "b", update=False)
+    store.get_data(1, "a", update=False)
+    store.get_data(1, "c", update=False)
+
+    stats = store.stats()
+    assert stats["snapshots"] == 2
+    assert stats["evictions"] == 1
+    # "b" was least recently used, so it is reloaded; "a" is still in memory.
+    store.get_data(1, "a", update=False)
+    assert store.stats()["hits"] == 2
+    store.get_data(1, "b", update=False)
+    assert store.stats()["misses"] == 4
+
+
+def test_store_drops_idle_snapshots(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    now = time.time()
+    for league in ("a", "b"):
+        _write_cache(cache.cache_path(1, league), 0.01, now)
+    store = currency.CurrencyStore(max_idle=0)
+
+    store.get_data(1, "a", update=False)
+    store.get_data(1, "b", update=False)
+
+    assert store.stats()["snapshots"] == 1
+
+
+def _linear_new_order(table: rates.RateTable, order: list[str], chosen: str) -> list[str]:
+    for i, existing in enumerate(order):
+        try:
+            if currency.table_rate(table, "x", chosen, existing) > 1.0:
+                return [*order[:i], chosen, *order[i:]]
+        except (LookupError, ValueError):
+            continue
+    return [*order, chosen]
+
+
+def _linear_mapping(table: rates.RateTable, ordered: list[str], existing: dict[str, int]) -> dict[str, int]:
+    mapping: dict[str, int] = {}
+    cumulative = 1.0
+    for i, name in enumerate(ordered):
+        if i == 0:
+            mapping[name] = 1
+            continue
+        try:
+            cumulative *= currency.table_rate(table, "x", ordered[i - 1], name)
+            mapping[name] = max(1, ceil(cumulative))
+        except (LookupError, ValueError):
+            mapping[name] = existing.get(name, 1)
+    return mapping
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_order_and_mapping_match_pairwise_rate_scan(monkeypatch: MonkeyPatch, seed: int) -> None:
+    rng = random.Random(seed)
+    ids = [f"c{i}" for i in range(24)]
+    values = [10 ** rng.uniform(-4, 1) for _ in ids]
+    for i in rng.sample(range(len(ids)), 3):
+        values[i] = rng.choice([0.0, float("nan")])
+    table = rates.RateTable("c0", ids, values)
+    monkeypatch.setattr(currency, "_pinned_table", lambda *_a, **_k: table)
+
+    # Value-sorted chains exercise the binary search; shuffled ones the fallback scan.
+    ordered = sorted(ids[1:], key=lambda k: 0.0 if isnan(table.primary_value(k)) else -table.primary_value(k))
+    if seed % 2:
+        rng.shuffle(ordered)
+    ordered.append("unknown")
+    for chosen in [ids[0], "unknown", *rng.sample(ids, 4)]:
+        assert currency.compute_new_order(1, "x", ordered, chosen) == _linear_new_order(
+            table, [k for k in ordered if k != chosen], chosen
+        )
+    existing = {k: 7 for k in ordered}
+    assert currency.compute_mapping_from_order(1, "x", ordered, existing) == _linear_mapping(table, ordered, existing)
+
+
+def test_price_index_merges_categories_in_parallel(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    calls: list[str] = []
+    calls_lock = threading.Lock()
+    delay = 0.2
+    responses = {
+        "Currency": {
+            "core": {"primary": "divine", "items": [{"id": "chaos", "name": "Chaos Orb"}]},
+            "lines": [{"id": "divine", "primaryValue": 1.0}, {"id": "chaos", "primaryValue": 0.01}],
+        },
+        "Fragment": {
+            "core": {"primary": "chaos", "items": [{"id": "offer", "name": "Offering to the Goddess"}]},
+            "lines": [{"id": "offer", "primaryValue": 5.0}],
+        },
+        "Essence": {
+            "core": {"primary": "divine", "items": [{"id": "greed", "name": "Deafening Essence of Greed"}]},
+            "lines": [{"id": "greed", "primaryValue": 0.02}],
+        },
+    }
+
+    def fake_retrieve(
+        game: int,  # noqa: ARG001
+        league: str,
+        *,
+        update: bool = True,  # noqa: ARG001
+        force: bool = False,  # noqa: ARG001
+        category: str = "Currency",
+    ) -> dict:
+        with calls_lock:
+            calls.append(category)
+        if category != "Currency":
+            time.sleep(delay)
+        if league == "broken" and category == "Essence":
+            msg = "boom"
+            raise ValueError(msg)
+        return {**responses[category], "mtime": time.time()}
+
+    monkeypatch.setattr(currency, "_retrieve_currency_prices", fake_retrieve)
+    store = currency.CurrencyStore()
+    store.set_categories(1, ["Fragment", "Essence", "Fragment"])
+    assert store.categories(1) == ("Currency", "Fragment", "Essence")
+
+    start = time.perf_counter()
+    index = store.get_price_index(1, "a", update=True)
+    assert time.perf_counter() - start < delay * 1.8
+    assert index is not None
+    assert sorted(calls) == ["Currency", "Essence", "Fragment"]
+    assert index.value("offering to the  GODDESS") == pytest.approx(0.05)
+    assert index.category("offer") == "Fragment"
+    assert index.id("Chaos Orb") == "chaos"
+    assert index.value("greed") == pytest.approx(0.02)
+
+    # Served from memory until the currency snapshot changes or the categories are reconfigured.
+    assert store.get_price_index(1, "a", update=True) is index
+    assert len(calls) == 3
+    store.set_categories(1, [])
+    rebuilt = store.get_price_index(1, "a", update=True)
+    assert rebuilt is not None
+    assert "offer" not in rebuilt
+    assert store.stats()["indexes"] == 1
+
+    # A failing category is left out instead of failing the whole index.
+    store.set_categories(1, ["Fragment", "Essence"])
+    partial = store.get_price_index(1, "broken", update=True)
+    assert partial is not None
+    assert "offer" in partial
+    assert "greed" not in partial
+
+
+def test_loaded_table_never_loads(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    _write_cache(cache.cache_path(1, "tmpstandard"), 0.01, time.time())
+    store = currency.CurrencyStore()
+
+    assert store.loaded_table(1, "tmpstandard") is None
+    assert store.stats()["misses"] == 0
+
+    table = store.get_table(1, "tmpstandard", update=False)
+    assert table is not None
+    assert store.loaded_table(1, "tmpstandard") is table
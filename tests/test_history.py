@@ -0,0 +1,130 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from poemarcut import cache, history, sharedcache
+from poemarcut.constants import S_IN_HOUR
+from poemarcut.rates import RateTable
+
+
+def _table(chaos: float, extra: dict[str, float] | None = None) -> RateTable:
+    ids = ["divine", "chaos", *(extra or {})]
+    return RateTable("divine", ids, [1.0, chaos, *(extra or {}).values()])
+
+
+def test_append_and_query_across_segments(tmp_path: Path) -> None:
+    h = history.RateHistory(tmp_path, rows_per_segment=4)
+    start = 1_700_000_000.0
+    for hour in range(10):
+        assert h.append(start + hour * S_IN_HOUR, _table(1 / (100 + hour)))
+
+    assert len(h) == 10
+    # Two full segments were compacted, the third is still open.
+    assert sorted(p.name for p in tmp_path.glob("seg-*")) == ["seg-000000.z", "seg-000001.z", "seg-000002.bin"]
+
+    rates = h.rates("divine", "chaos", start + 2 * S_IN_HOUR, start + 8 * S_IN_HOUR)
+    assert [t for t, _ in rates] == [start + hour * S_IN_HOUR for hour in range(2, 9)]
+    assert [r for _, r in rates] == pytest.approx([100 + hour for hour in range(2, 9)])
+
+
+def test_reopened_history_continues_delta_chain(tmp_path: Path) -> None:
+    start = 1_700_000_000.0
+    h = history.RateHistory(tmp_path, rows_per_segment=8)
+    for hour in range(3):
+        h.append(start + hour * S_IN_HOUR, _table(0.01 * (hour + 1)))
+
+    reopened = history.RateHistory(tmp_path, rows_per_segment=8)
+    assert not reopened.append(start + S_IN_HOUR, _table(1.0))
+    reopened.append(start + 3 * S_IN_HOUR, _table(0.04))
+
+    values = reopened.values("chaos", start, start + 10 * S_IN_HOUR)
+    assert [v for _, v in values] == pytest.approx([0.01, 0.02, 0.03, 0.04])
+
+
+def test_new_currency_starts_new_segment_and_missing_values_are_skipped(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    monkeypatch.setattr(history, "np", None)
+    start = 1_700_000_000.0
+    h = history.RateHistory(tmp_path)
+    h.append(start, _table(0.01))
+    h.append(start + S_IN_HOUR, _table(0.01, {"exalted": 0.002}))
+    h.append(start + 2 * S_IN_HOUR, _table(0.01, {"exalted": 0.004}))
+
+    assert h.columns == ("divine", "chaos", "exalted")
+    assert len(list(tmp_path.glob("seg-*.bin"))) == 2
+    assert [r for _, r in h.rates("chaos", "exalted", start, start + 3 * S_IN_HOUR)] == pytest.approx([5.0, 2.5])
+
+
+def test_compact_drops_segments_past_retention(tmp_path: Path) -> None:
+    start = 1_700_000_000.0
+    h = history.RateHistory(tmp_path, rows_per_segment=2, retention=24 * S_IN_HOUR)
+    for hour in range(5):
+        h.append(start + hour * S_IN_HOUR, _table(0.01))
+
+    assert h.compact(now=start + 3 * S_IN_HOUR + 24 * S_IN_HOUR + 1) == 2
+    assert len(h) == 1
+
+
+@pytest.mark.skipif(sharedcache.fcntl is None and sharedcache.msvcrt is None, reason="no file locking")
+def test_concurrent_processes_append_without_corrupting_each_other(tmp_path: Path) -> None:
+    code = (
+        "import sys, time\n"
+        "from pathlib import Path\n"
+        "from poemarcut import history\n"
+        "from poemarcut.rates import RateTable\n"
+        "name = sys.argv[1]\n"
+        "h = history.RateHistory(Path('history'), rows_per_segment=16)\n"
+        "while not Path('go').exists():\n"
+        "    time.sleep(0.01)\n"
+        "appended = 0\n"
+        "for i in range(200):\n"
+        "    table = RateTable('divine', ['divine', 'chaos', name], [1.0, 1 / 150, 1 / (200 + i)])\n"
+        "    appended += h.append(time.time(), table)\n"
+        "    time.sleep(0.001)\n"
+        "print(appended)\n"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    procs = [
+        subprocess.Popen(  # noqa: S603
+            [sys.executable, "-c", code, name], cwd=tmp_path, env=env, stdout=subprocess.PIPE, text=True
+        )
+        for name in ("first", "second")
+    ]
+    (tmp_path / "go").touch()
+    appended = [int(proc.communicate(timeout=60)[0]) for proc in procs]
+    assert all(proc.returncode == 0 for proc in procs)
+
+    h = history.RateHistory(tmp_path / "history")
+    assert set(h.columns) == {"divine", "chaos", "first", "second"}
+    assert len(h) == sum(appended)
+    rates = h.rates("divine", "chaos", 0, time.time())
+    assert len(rates) == len(h)
+    assert [r for _, r in rates] == pytest.approx([150.0] * len(h))
+    # Every row was written whole by one process, so it has exactly one of the two extra columns.
+    for name, count in zip(("first", "second"), appended, strict=True):
+        values = [r for _, r in h.rates("divine", name, 0, time.time())]
+        assert len(values) == count
+        assert values == sorted(values)
+        assert values == pytest.approx([round(r) for r in values])
+
+
+def test_exchange_rate_history_uses_cache_directory(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(cache, "manager", cache.CacheManager(tmp_path))
+    monkeypatch.setattr(history, "_histories", {})
+    now = time.time()
+    data = {
+        "core": {"primary": "divine"},
+        "lines": [{"id": "divine", "primaryValue": 1}, {"id": "chaos", "primaryValue": 0.005}],
+    }
+
+    assert history.record(2, "Dawn", data, timestamp=now - S_IN_HOUR)
+    assert history.exchange_rate_history(2, "Dawn", "divine", "chaos", days=1, now=now) == [
+        (now - S_IN_HOUR, pytest.approx(200.0))
+    ]
+    assert (tmp_path / "poemarcut" / "history" / "Dawn-2" / "columns.json").exists()
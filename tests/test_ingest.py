@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from poemarcut import ingest
+from poemarcut.rates import RateTable
+from poemarcut.standin import currency_response
+
+
+def test_projection_keeps_only_used_fields() -> None:
+    full = currency_response(200)
+    data = ingest.parse_currency_response(json.dumps(full, indent=2).encode())
+
+    assert data == ingest.project(full)
+    assert set(data) == {"core", "lines"}
+    assert set(data["core"]) == {"primary", "secondary", "rates", "items"}
+    assert data["core"]["items"][1] == {"id": full["core"]["items"][1]["id"], "name": full["core"]["items"][1]["name"]}
+    assert data["core"]["rates"] == full["core"]["rates"]
+    assert all(set(line) == {"id", "primaryValue"} for line in data["lines"])
+    assert RateTable.from_response(data).values == RateTable.from_response(full).values
+
+
+def test_projection_validates_fields() -> None:
+    payload = {
+        "extra": [{"nested": [1, 2, {"x": None}]}, 'text with "quotes" and ] brackets'],
+        "core": {
+            "primary": "divine",
+            "rates": {"chaos": 150, "bogus": "x", "flag": True},
+            "items": [{"id": "divine", "name": "Divine Orb", "image": "/d.png"}, {"id": "nameless"}],
+        },
+        "lines": [
+            {"id": "divine", "primaryValue": 1},
+            {"id": "chaos", "primaryValue": "0.1"},
+            {"name": "no id"},
+            7,
+        ],
+    }
+    data = ingest.parse_currency_response(json.dumps(payload))
+    assert data == {
+        "core": {"primary": "divine", "rates": {"chaos": 150}, "items": [{"id": "divine", "name": "Divine Orb"}]},
+        "lines": [{"id": "divine", "primaryValue": 1}, {"id": "chaos"}],
+    }
+    assert data == ingest.project(payload)
+
+
+def test_missing_sections_are_left_out() -> None:
+    assert ingest.parse_currency_response(b'{"error": "not found"}') == {}
+    assert ingest.parse_currency_response(b' {"core": {}, "lines": []} \n') == {"core": {}, "lines": []}
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [b"", b"[]", b'{"lines": [1, 2', b'{"core": {"primary": "divine"},}', b'{"lines": []} trailing', b"\xff"],
+)
+def test_malformed_payloads_raise(payload: bytes) -> None:
+    with pytest.raises(ingest.SchemaError):
+        ingest.parse_currency_response(payload)
@@ -3,6 +3,7 @@
 Verifies parsing of various price formats and edge cases.
 """
 
+from poemarcut.bench.fixtures import ITEM_TEXTS
 from poemarcut.item import Item
 
 
@@ -143,3 +144,75 @@ def test_no_price_found() -> None:
     assert item.note is not None
     assert item.note.price is None
     assert item.note.currency is None
+
+
+def test_parse_sections_and_mods_poe1() -> None:
+    """Test extraction of requirements, sockets and mods with values from an advanced PoE1 copy."""
+    item = Item.from_text(ITEM_TEXTS["unique"])
+    assert (item.name, item.basetype, item.class_) == ("Kaom's Heart", "Glorious Plate", "Body Armours")
+    assert item.rarity is Item.Rarity.UNIQUE
+    assert item.requirements == {"level": 68, "str": 191}
+    assert item.sockets == "R-R-R-R"
+    assert item.item_level == 86
+    assert item.explicit_mods == [
+        Item.Mod(name="+# to maximum Life", text="+1000 to maximum Life", value=1000.0),
+        Item.Mod(name="#% increased Fire Damage", text="40% increased Fire Damage", value=40.0),
+    ]
+
+    item = Item.from_text(ITEM_TEXTS["rare map"])
+    assert (item.droplevel, item.quality, item.item_level) == (16, 20, 82)
+    assert [m.text for m in item.enchantments] == [
+        "Delirium Reward Type: Harbinger Items",
+        "Players in Area are 20% Delirious",
+    ]
+    shaper = "Area is influenced by The Shaper"
+    assert item.implicit_mods == [Item.Mod(name=shaper, text=shaper)]
+    # Roll ranges are dropped and reminder text is skipped.
+    assert [m.name for m in item.explicit_mods] == [
+        "Area has increased monster variety",
+        "Monsters deal #% extra Physical Damage as Lightning",
+        "Monsters Poison on Hit",
+    ]
+    assert item.explicit_mods[1].value == 107.0
+
+    item = Item.from_text(ITEM_TEXTS["heist"])
+    assert item.requirements == {"level": 4}
+    assert item.implicit_mods == [
+        Item.Mod(name="#% increased Spell Damage", text="23% increased Spell Damage", value=23.0)
+    ]
+    assert len(item.explicit_mods) == 4  # one hybrid mod contributes two lines
+
+
+def test_parse_sections_and_mods_poe2() -> None:
+    """Test extraction of the single-line requirements, rune mods and waystone tier of PoE2 copies."""
+    item = Item.from_text(ITEM_TEXTS["poe2 rare"])
+    assert item.requirements == {"level": 65, "int": 111}
+    assert (item.quality, item.sockets, item.item_level) == (20, "S S", 81)
+    assert [m.name for m in item.explicit_mods] == [
+        "+#% to Cold Resistance",
+        "+#% to Cold Resistance",
+        "+# to maximum Energy Shield",
+        "#% increased Energy Shield",
+        "+#% to Cold Resistance",
+        "+#% to Lightning Resistance",
+    ]
+    assert item.to_dict()["explicit_mods"][-1] == {
+        "name": "+#% to Lightning Resistance",
+        "text": "+41% to Lightning Resistance",
+        "value": 41.0,
+    }
+
+    item = Item.from_text(ITEM_TEXTS["poe2 waystone"])
+    assert item.rarity is Item.Rarity.MAGIC
+    assert (item.name, item.basetype, item.droplevel) == ("Mysterious Waystone of the Tempest", "", 15)
+    assert item.note is not None
+    assert (item.note.price, item.note.currency) == (12, "exalted")
+
+
+def test_negative_and_decimal_mod_values() -> None:
+    """Test that mod values keep their sign and decimals."""
+    item = Item.from_text("{ Prefix Modifier }\n-10(-15--10)% to Fire Resistance\n0.5(0.4-0.6)% of Life Regenerated")
+    assert [(m.name, m.value) for m in item.explicit_mods] == [
+        ("-#% to Fire Resistance", -10.0),
+        ("#% of Life Regenerated", 0.5),
+    ]
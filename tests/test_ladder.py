@@ -0,0 +1,80 @@
+import pytest
+
+from poemarcut import currency, ladder, logic
+from poemarcut.rates import RateTable
+
+CURRENCIES = ["divine", "exalted", "chaos"]
+
+
+def _table(divine_in_chaos: float = 160.0) -> RateTable:
+    return RateTable("chaos", CURRENCIES, [divine_in_chaos, 9.5 / 160.0 * divine_in_chaos, 1.0])
+
+
+def _key(**overrides: object) -> ladder.LadderKey:
+    values = {
+        "game": 1,
+        "league": "Standard",
+        "currencies": tuple(CURRENCIES),
+        "discount_percent": 10,
+        "max_actual_discount": 20,
+        "minimum_discount": 1,
+        "minimum_discount_currency": "chaos",
+        "cap": 300,
+    }
+    values.update(overrides)
+    return ladder.LadderKey(**values)  # type: ignore[arg-type]
+
+
+def test_ladder_matches_scalar_results() -> None:
+    table = _table()
+    key = _key()
+    built = ladder.build(key, table)
+
+    def get_rate(*, from_currency: str, to_currency: str) -> float:
+        return currency.table_rate(table, key.league, from_currency, to_currency)
+
+    for cur in CURRENCIES:
+        for units in range(1, key.cap + 1):
+            assert built.lookup(units, cur) == logic.convert_and_compute_price(
+                units,
+                cur,
+                CURRENCIES,
+                discount_percent=key.discount_percent,
+                max_actual_discount=key.max_actual_discount,
+                get_exchange_rate=get_rate,
+                minimum_discount=key.minimum_discount,
+                minimum_discount_currency=key.minimum_discount_currency,
+            )
+    assert built.lookup(key.cap + 1, "chaos") is None
+    assert built.lookup(1, "mirror") is None
+    assert built.lookup(1, None) is None
+
+
+def test_cache_rebuilds_in_background_when_settings_or_rates_change() -> None:
+    cache = ladder.LadderCache()
+    table = _table()
+
+    assert cache.lookup(_key(), table, 5, "divine") is None
+    cache.join(timeout=5)
+    assert cache.lookup(_key(), table, 5, "divine") == ladder.build(_key(), table).lookup(5, "divine")
+    assert cache.stats() == {"builds": 1, "hits": 1, "misses": 1}
+
+    # A changed setting or a new rate table makes the ladder out of date until rebuilt.
+    assert cache.get(_key(discount_percent=15), table) is None
+    cache.join(timeout=5)
+    assert cache.get(_key(discount_percent=15), table) is not None
+    new_table = _table(200.0)
+    assert cache.get(_key(discount_percent=15), new_table) is None
+    cache.join(timeout=5)
+    rebuilt = cache.get(_key(discount_percent=15), new_table)
+    assert rebuilt is not None
+    assert rebuilt.table is new_table
+    assert cache.stats()["builds"] == 3
+
+
+@pytest.mark.parametrize(("cap", "table"), [(0, _table()), (300, None)])
+def test_cache_disabled_without_cap_or_rates(cap: int, table: RateTable | None) -> None:
+    cache = ladder.LadderCache()
+    assert cache.lookup(_key(cap=cap), table, 5, "divine") is None
+    cache.join(timeout=5)
+    assert cache.stats()["builds"] == 0
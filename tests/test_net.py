@@ -0,0 +1,192 @@
+import gzip
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from poemarcut import cache, currency, net, ratelimit
+from poemarcut.standin import Faults, StandinServer
+
+PAYLOAD = {
+    "core": {"primary": "divine", "rates": {"chaos": 100.0}},
+    "lines": [{"id": "divine", "primaryValue": 1.0}, {"id": "chaos", "primaryValue": 0.01}],
+}
+ETAG = '"v1"'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests_seen: list[tuple[int, str | None]] = []  # noqa: RUF012
+    client_ports: set[int] = set()  # noqa: RUF012
+
+    def do_GET(self) -> None:  # noqa: N802
+        type(self).client_ports.add(self.client_address[1])
+        if self.headers.get("If-None-Match") == ETAG:
+            type(self).requests_seen.append((304, self.headers.get("Accept-Encoding")))
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = gzip.compress(json.dumps(PAYLOAD).encode())
+        type(self).requests_seen.append((200, self.headers.get("Accept-Encoding")))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+
+@pytest.fixture
+def server_url(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    _Handler.requests_seen = []
+    _Handler.client_ports = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/overview"
+    monkeypatch.setattr(currency, "POE1_CURRENCY_API_URL", url)
+    net.close_session()
+    yield url
+    net.close_session()
+    server.shutdown()
+    server.server_close()
+
+
+def test_not_modified_refreshes_cache_timestamp(
+    server_url: str,  # noqa: ARG001
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+
+    first = currency._retrieve_currency_prices(game=1, league="tmpstandard", update=True)
+    cache_file = cache.cache_path(1, "tmpstandard")
+    assert first["lines"] == PAYLOAD["lines"]
+    assert cache.read_entry(cache_file).etag == ETAG
+
+    # Age the cache file past the one-hour freshness window.
+    old = time.time() - 2 * 3600
+    os.utime(cache_file, (old, old))
+
+    second = currency._retrieve_currency_prices(game=1, league="tmpstandard", update=True)
+
+    assert second["lines"] == PAYLOAD["lines"]
+    assert second["mtime"] > old + 3600
+    assert cache_file.stat().st_mtime == second["mtime"]
+    assert [status for status, _ in _Handler.requests_seen] == [200, 304]
+
+
+def test_session_reuses_connection_and_requests_gzip(server_url: str) -> None:
+    for _ in range(3):
+        response = net.get(server_url, params={"league": "tmpstandard"})
+        response.raise_for_status()
+        assert response.json() == PAYLOAD
+
+    assert len(_Handler.client_ports) == 1
+    assert all("gzip" in (encoding or "") for _, encoding in _Handler.requests_seen)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_circuit_breaker_opens_backs_off_and_recovers() -> None:
+    clock = _Clock()
+    breaker = net.CircuitBreaker("test", failure_threshold=2, base_backoff=10, max_backoff=25, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state is net.CircuitState.OPEN
+    assert 5 <= breaker.retry_in <= 10
+    assert not breaker.allow()
+
+    clock.now += 10
+    assert breaker.state is net.CircuitState.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial request at a time
+    breaker.record_failure()
+    assert breaker.state is net.CircuitState.OPEN
+    assert 10 <= breaker.retry_in <= 20  # backoff doubled
+
+    clock.now += 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state is net.CircuitState.CLOSED
+    assert breaker.stats() == {
+        "state": "closed",
+        "retry_in": 0.0,
+        "opened": 2,
+        "short_circuited": 2,
+        "failures": 3,
+        "successes": 1,
+    }
+
+
+def test_open_circuit_serves_stale_cache_without_requests(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    cache_file = cache.cache_path(1, "tmpstandard")
+    cache.write_cache(cache_file, PAYLOAD)
+    old = time.time() - 2 * 3600
+    os.utime(cache_file, (old, old))
+    store = currency.CurrencyStore(stale_while_revalidate=False)
+
+    with StandinServer(faults=Faults(error_rate=1.0)) as server, server.redirect():
+        for _ in range(net.BREAKER_FAILURE_THRESHOLD + 3):
+            start = time.perf_counter()
+            snapshot = store.get_snapshot(1, "tmpstandard", update=True)
+            assert snapshot is not None
+            assert snapshot.stale
+            assert snapshot.mtime == old
+            assert time.perf_counter() - start < 1
+        assert server.statuses() == [503] * net.BREAKER_FAILURE_THRESHOLD
+        stats = net.breaker_stats()[net.endpoint_key(currency.POE1_CURRENCY_API_URL)]
+        assert stats["state"] == "open"
+        assert stats["short_circuited"] == 3
+
+
+def test_rejected_requests_do_not_spend_rate_limit_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    url = "https://breaker.test/api"
+    monkeypatch.setattr(net, "_breakers", {net.endpoint_key(url): net.CircuitBreaker("test", failure_threshold=1)})
+    acquired: list[str] = []
+    monkeypatch.setattr(ratelimit.governor, "acquire", lambda key, **_: acquired.append(key))
+    net.get_breaker(url).record_failure()
+
+    with pytest.raises(net.CircuitOpenError):
+        net.get(url)
+    assert acquired == []
+
+
+def test_rate_limited_trial_request_is_given_back(monkeypatch: pytest.MonkeyPatch) -> None:
+    url = "https://breaker.test/api"
+    clock = _Clock()
+    breaker = net.CircuitBreaker("test", failure_threshold=1, base_backoff=10, clock=clock)
+    monkeypatch.setattr(net, "_breakers", {net.endpoint_key(url): breaker})
+
+    def _reject(key: str, **_: object) -> float:
+        msg = f"{key} is rate limited"
+        raise net.RateLimitedError(msg)
+
+    monkeypatch.setattr(ratelimit.governor, "acquire", _reject)
+    breaker.record_failure()
+    clock.now += 10
+
+    with pytest.raises(net.RateLimitedError):
+        net.get(url)
+    # The half-open trial was never sent, so the next request may still try.
+    assert breaker.allow()
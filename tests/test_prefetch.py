@@ -0,0 +1,101 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from poemarcut import currency, prefetch
+from poemarcut.constants import S_IN_HOUR
+
+HOUR = 1_700_000_000 // S_IN_HOUR * S_IN_HOUR
+
+
+def _data(value: float, mtime: float) -> dict:
+    return {
+        "core": {"primary": "divine"},
+        "lines": [{"id": "divine", "primaryValue": 1.0}, {"id": "chaos", "primaryValue": value}],
+        "mtime": mtime,
+    }
+
+
+def test_next_refresh_time_aligns_to_hourly_publication() -> None:
+    # Fetched at :40, refresh just after the next hourly publication.
+    assert prefetch.next_refresh_time(HOUR + 40 * 60, now=HOUR + 41 * 60) == HOUR + S_IN_HOUR + 120
+    # Fetched before poe.ninja picked up this hour's data, refresh once it has.
+    assert prefetch.next_refresh_time(HOUR + 60, now=HOUR + 61) == HOUR + 120
+    # Never schedule in the past.
+    assert prefetch.next_refresh_time(HOUR, now=HOUR + 2 * S_IN_HOUR) == HOUR + 2 * S_IN_HOUR
+
+
+def test_next_refresh_time_refreshes_before_expiry() -> None:
+    mtime = HOUR + 30
+    assert prefetch.next_refresh_time(mtime, now=mtime, publish_delay=0, lead=60) == mtime + S_IN_HOUR - 60
+
+
+def test_expired_snapshot_is_served_while_refreshing(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    release = threading.Event()
+    calls: list[bool] = []
+    old = time.time() - 2 * S_IN_HOUR
+
+    def fake_retrieve(game: int, league: str, *, update: bool, force: bool = False) -> dict:  # noqa: ARG001
+        calls.append(update)
+        if len(calls) == 1:
+            return _data(0.01, old)
+        release.wait(timeout=5)
+        return _data(0.02, time.time())
+
+    monkeypatch.setattr(currency, "_retrieve_currency_prices", fake_retrieve)
+    store = currency.CurrencyStore()
+    store.get_snapshot(1, "tmpstandard", update=False)
+
+    stale = store.get_table(1, "tmpstandard", update=True)
+    assert stale is not None
+    assert stale.primary_value("chaos") == 0.01
+    assert store.stale_hits == 1
+
+    release.set()
+    deadline = time.time() + 5
+    while store.get_table(1, "tmpstandard", update=False).primary_value("chaos") != 0.02:
+        assert time.time() < deadline
+        time.sleep(0.01)
+    assert calls == [False, True]
+
+
+def test_scheduler_refreshes_watched_league(monkeypatch: pytest.MonkeyPatch) -> None:
+    refreshed = threading.Event()
+
+    class FakeStore:
+        def __init__(self) -> None:
+            self.snapshot = currency.CurrencySnapshot(
+                game=2,
+                league="Dawn",
+                data={},
+                mtime=time.time() - S_IN_HOUR,
+                table=None,  # type: ignore[arg-type]
+            )
+
+        def get_snapshot(self, game: int, league: str, *, update: bool) -> currency.CurrencySnapshot:  # noqa: ARG002
+            return self.snapshot
+
+        def refresh(self, game: int, league: str) -> currency.CurrencySnapshot:
+            assert (game, league) == (2, "Dawn")
+            self.snapshot = currency.CurrencySnapshot(
+                game=game,
+                league=league,
+                data={},
+                mtime=time.time(),
+                table=None,  # type: ignore[arg-type]
+            )
+            refreshed.set()
+            return self.snapshot
+
+    monkeypatch.setattr(prefetch, "RETRY_DELAY_S", 0.01)
+    scheduler = prefetch.PrefetchScheduler(FakeStore())  # type: ignore[arg-type]
+    scheduler.watch(2, "Dawn")
+    scheduler.start()
+    try:
+        assert refreshed.wait(timeout=5)
+    finally:
+        scheduler.stop()
+    assert scheduler.refreshes >= 1
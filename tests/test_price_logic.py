@@ -1,6 +1,11 @@
+import random
+import struct
+from collections.abc import Callable
+
 import pytest
 
 from poemarcut import item, logic
+from poemarcut.bench.solver import stepwise_convert_and_compute_price
 
 
 def test_parse_int_price_valid() -> None:
@@ -250,3 +255,66 @@ def test_convert_and_compute_handles_lookuperror_from_get_rate() -> None:
     assert cur is None
     # initial actual for 2 units with 50% should be 50.0
     assert pytest.approx(actual, rel=1e-9) == 50.0
+
+
+def _random_chain(rng: random.Random) -> tuple[list[str], Callable[..., float]]:
+    names = [f"c{i}" for i in range(rng.randint(1, 14))]
+    values: dict[str, float] = {}
+    value = 1.0
+    for name in names:
+        values[name] = value
+        value /= rng.choice([rng.uniform(1.0, 200.0), rng.uniform(1.0, 1.3), rng.uniform(0.3, 1.0), 1.0, 9.5, 160.0])
+    missing = rng.choice([None, None, None, *names])
+
+    def get_rate(*, from_currency: str, to_currency: str) -> float:
+        if to_currency == missing:
+            msg = "no data"
+            raise LookupError(msg)
+        return values[from_currency] / values[to_currency]
+
+    return names, get_rate
+
+
+@pytest.mark.parametrize("shared", [False, True])
+def test_chain_solver_matches_step_by_step_walk(shared: bool) -> None:  # noqa: FBT001
+    rng = random.Random(3)
+    for _ in range(2000):
+        names, get_rate = _random_chain(rng)
+        discount_percent = rng.randint(1, 99)
+        max_actual_discount = rng.choice([discount_percent, rng.randint(1, 99), min(99, discount_percent + 3)])
+        minimum = rng.choice([None, 1, 5, 50])
+        minimum_currency = rng.choice([None, *names])
+        start = rng.choice([*names, None])
+        chain = logic.RateChain(names, start, get_rate).resolve() if shared and start is not None else None
+        for units in (1, 2, 7, rng.randint(1, 10**6), 2**60 + 3):
+            args = (units, start, names, discount_percent, max_actual_discount, get_rate, minimum, minimum_currency)
+            expected = stepwise_convert_and_compute_price(*args)
+            result = logic.convert_and_compute_price(*args, chain=chain)
+            # Compare bit for bit, not approximately.
+            assert result[:2] == expected[:2]
+            assert struct.pack("<d", result[2]) == struct.pack("<d", expected[2])
+
+
+def test_chain_solver_looks_up_each_rate_once() -> None:
+    calls: list[tuple[str, str]] = []
+    names = [f"c{i}" for i in range(30)]
+
+    def get_rate(*, from_currency: str, to_currency: str) -> float:
+        calls.append((from_currency, to_currency))
+        if to_currency == "c25":
+            msg = "no data"
+            raise LookupError(msg)
+        return 1.1
+
+    # The minimum discount search walks down to the missing rate and gives up, then the
+    # conversion search reuses the rates it looked up.
+    args = (1, "c0", names, 10, 11, get_rate, 10**9, "c0")
+    expected = stepwise_convert_and_compute_price(*args)
+    calls.clear()
+    assert logic.convert_and_compute_price(*args) == expected
+    assert len(calls) == len(set(calls)) == 25
+
+    chain = logic.RateChain(names, "c0", get_rate).resolve()
+    calls.clear()
+    assert logic.convert_and_compute_price(*args, chain=chain) == expected
+    assert calls == []
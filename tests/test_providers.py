@@ -0,0 +1,170 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+import requests
+
+from poemarcut import cache, currency, providers
+
+VALID = {"core": {"primary": "divine", "rates": {}}, "lines": [{"id": "divine", "primaryValue": 1.0}]}
+
+
+class _Fake(providers.Provider):
+    def __init__(
+        self, name: str, *, delay: float = 0.0, data: dict | None = None, error: type[Exception] | bool = False
+    ) -> None:
+        self.name = name
+        self.delay = delay
+        self.data = VALID if data is None else data
+        self.error = requests.ConnectionError if error is True else error
+        self.calls = 0
+
+    def fetch(
+        self,
+        game: int,  # noqa: ARG002
+        league: str,  # noqa: ARG002
+        category: str,  # noqa: ARG002
+        *,
+        etag: str | None = None,  # noqa: ARG002
+        last_modified: str | None = None,  # noqa: ARG002
+    ) -> providers.ProviderResponse:
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            msg = "down"
+            raise self.error(msg)
+        return providers.ProviderResponse(self.name, self.data)
+
+
+def _valid(data: dict) -> bool:
+    return bool(data.get("lines"))
+
+
+def test_provider_without_fetch_cannot_be_instantiated() -> None:
+    class _Incomplete(providers.Provider):
+        name = "incomplete"
+
+    with pytest.raises(TypeError, match="fetch"):
+        _Incomplete()
+
+
+def test_slow_provider_is_hedged_and_fastest_is_tried_first() -> None:
+    slow, fast = _Fake("slow", delay=0.5), _Fake("fast", delay=0.01)
+    fetcher = providers.HedgedFetcher([slow, fast], hedge_delay=0.05)
+
+    start = time.perf_counter()
+    response = fetcher.fetch(1, "Standard", validate=_valid)
+    assert time.perf_counter() - start < 0.3
+    assert response is not None
+    assert response.provider == "fast"
+
+    # The slow request finishes in the background and its latency is recorded.
+    time.sleep(0.6)
+    stats = fetcher.stats()
+    assert stats["fast"]["wins"] == 1
+    assert stats["slow"]["successes"] == 1
+    assert [p.name for p in fetcher.ordered()] == ["fast", "slow"]
+
+    assert fetcher.fetch(1, "Standard", validate=_valid).provider == "fast"
+    assert slow.calls == 1
+
+
+def test_failed_or_invalid_provider_is_replaced_without_waiting() -> None:
+    broken = _Fake("broken", error=True)
+    empty = _Fake("empty", data={"core": {"primary": "divine"}, "lines": []})
+    good = _Fake("good")
+    fetcher = providers.HedgedFetcher([broken, empty, good], hedge_delay=5.0)
+
+    start = time.perf_counter()
+    response = fetcher.fetch(1, "Standard", validate=_valid)
+    assert time.perf_counter() - start < 1.0
+    assert response is not None
+    assert response.provider == "good"
+    assert fetcher.stats()["broken"]["failures"] == 1
+    assert fetcher.stats()["empty"]["invalid"] == 1
+
+
+def test_all_providers_failing_returns_rejected_response_or_none() -> None:
+    empty = _Fake("empty", data={"lines": []})
+    fetcher = providers.HedgedFetcher([_Fake("broken", error=True), empty], hedge_delay=0.01)
+    response = fetcher.fetch(1, "Standard", validate=_valid)
+    assert response is not None
+    assert response.data == {"lines": []}
+
+    assert providers.HedgedFetcher([_Fake("broken", error=True)]).fetch(1, "Standard") is None
+
+
+def test_unexpected_provider_errors_never_block_the_caller() -> None:
+    # e.g. `markets_to_response` on a GGG ratio that is a string.
+    crashing = _Fake("crashing", error=TypeError)
+    single = providers.HedgedFetcher([crashing])
+    assert single.fetch(1, "Standard") is None
+    assert single.stats()["crashing"]["failures"] == 1
+
+    fetcher = providers.HedgedFetcher([_Fake("crashing", error=TypeError), _Fake("good", delay=0.05)], hedge_delay=5.0)
+    start = time.perf_counter()
+    response = fetcher.fetch(1, "Standard")
+    assert time.perf_counter() - start < 1.0
+    assert response is not None
+    assert response.provider == "good"
+
+
+def test_hedged_fetch_gives_up_after_timeout() -> None:
+    fetcher = providers.HedgedFetcher([_Fake("slow", delay=2.0), _Fake("slower", delay=2.0)], hedge_delay=0.01)
+    fetcher.timeout = 0.2
+    start = time.perf_counter()
+    assert fetcher.fetch(1, "Standard") is None
+    assert time.perf_counter() - start < 1.0
+
+
+def test_repeatedly_failing_provider_is_demoted() -> None:
+    flaky, backup = _Fake("flaky", error=True), _Fake("backup", delay=0.05)
+    fetcher = providers.HedgedFetcher([flaky, backup], hedge_delay=1.0)
+    for _ in range(providers.DEMOTE_AFTER_FAILURES):
+        assert fetcher.fetch(1, "Standard") is not None
+    assert [p.name for p in fetcher.ordered()] == ["backup", "flaky"]
+
+
+def test_markets_to_response_uses_midpoint_ratios() -> None:
+    markets = [
+        {
+            "league": "Standard",
+            "market_id": "chaos|divine",
+            "lowest_ratio": {"chaos": 200, "divine": 1},
+            "highest_ratio": {"chaos": 100, "divine": 1},
+        },
+        {"league": "Hardcore", "market_id": "exalted|divine", "lowest_ratio": {"exalted": 1, "divine": 1}},
+        {"league": "Standard", "market_id": "chaos|exalted", "lowest_ratio": {"chaos": 1, "exalted": 1}},
+    ]
+    data = providers.markets_to_response(markets, "Standard", "divine")
+    assert data["lines"] == [{"id": "divine", "primaryValue": 1.0}, {"id": "chaos", "primaryValue": 0.0075}]
+    assert data["core"]["rates"]["chaos"] == pytest.approx(1 / 0.0075)
+    with pytest.raises(ValueError, match="markets"):
+        providers.markets_to_response(None, "Standard", "divine")
+
+
+def test_file_provider_feeds_currency_retrieval(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "Standard-1-Currency.json").write_text(
+        json.dumps({**VALID, "lines": [*VALID["lines"], {"id": "chaos", "primaryValue": 0.01, "sparkline": {}}]}),
+        encoding="utf-8",
+    )
+    spec = f"file:{tmp_path}/{{league}}-{{game}}-{{category}}.json"
+    fetcher = providers.HedgedFetcher([currency.provider_from_spec(spec)])
+    monkeypatch.setattr(currency, "fetcher", fetcher)
+
+    data = currency._retrieve_currency_prices(1, "Standard")
+
+    assert data["lines"][1] == {"id": "chaos", "primaryValue": 0.01}
+    assert cache.cache_path(1, "Standard").exists()
+    assert currency._retrieve_currency_prices(1, "Hardcore") == {}
+
+
+def test_provider_specs() -> None:
+    assert isinstance(currency.provider_from_spec("poeninja"), providers.PoeNinjaProvider)
+    assert isinstance(currency.provider_from_spec("ggg"), providers.GGGExchangeProvider)
+    with pytest.raises(ValueError, match="Unknown"):
+        currency.provider_from_spec("file:")
+    with pytest.raises(ValueError, match="unique"):
+        providers.HedgedFetcher([_Fake("a"), _Fake("a")])
@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+from poemarcut import currency, net, ratelimit
+from poemarcut.standin import Faults, StandinServer
+
+HEADERS = {
+    "X-Rate-Limit-Policy": "trade-leagues",
+    "X-Rate-Limit-Rules": "Ip,Account",
+    "X-Rate-Limit-Ip": "3:10:60,5:60:120",
+    "X-Rate-Limit-Ip-State": "1:10:0,1:60:0",
+    "X-Rate-Limit-Account": "4:5:30",
+    "X-Rate-Limit-Account-State": "1:5:0",
+}
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_parse_headers_reads_every_rule_type() -> None:
+    parsed = ratelimit.parse_headers(HEADERS)
+    assert parsed is not None
+    policy, rules = parsed
+
+    assert policy == "trade-leagues"
+    assert rules["Ip"] == [(ratelimit.Rule(3, 10, 60), 1, 0), (ratelimit.Rule(5, 60, 120), 1, 0)]
+    assert rules["Account"] == [(ratelimit.Rule(4, 5, 30), 1, 0)]
+    assert ratelimit.parse_headers({"ETag": '"x"'}) is None
+    malformed = ratelimit.parse_headers({**HEADERS, "X-Rate-Limit-Ip": "garbage"})
+    assert malformed is not None
+    assert malformed[1].keys() == {"Account"}
+
+
+def test_governor_waits_for_the_tightest_rule() -> None:
+    clock = FakeClock()
+    governor = ratelimit.RateLimitGovernor(max_wait=5.0, clock=clock)
+    endpoint = "https://www.pathofexile.com/api/trade/data/leagues"
+
+    assert governor.remaining(endpoint) is None
+    governor.acquire(endpoint)
+    governor.update(endpoint, HEADERS, 200)
+    assert governor.remaining(endpoint) == 2
+    governor.acquire(endpoint)
+    clock.now += 1
+    governor.acquire(endpoint)
+    assert governor.remaining(endpoint) == 0
+    assert governor.budget()["trade-leagues"]["remaining"] == {"Ip 10s": 0, "Ip 60s": 2, "Account 5s": 1}
+
+    # The first token returns 10 s after it was spent, 9 s from now: longer than max_wait.
+    with pytest.raises(ratelimit.RateLimitedError):
+        governor.acquire(endpoint)
+    clock.now += 9
+    assert governor.acquire(endpoint) == 0.0
+    assert governor.stats()["rejected"] == 1
+
+
+def test_governor_honors_retry_after_and_restrictions() -> None:
+    clock = FakeClock()
+    governor = ratelimit.RateLimitGovernor(max_wait=60.0, clock=clock)
+    endpoint = "https://poe.ninja/api"
+
+    governor.update(endpoint, {"Retry-After": "30"}, 429)
+    assert governor.remaining(endpoint) == 0
+    assert governor.budget()[endpoint]["restricted_for"] == 30.0
+
+    governor.update("other", {**HEADERS, "X-Rate-Limit-Ip-State": "4:10:45,4:60:0"}, 200)
+    assert governor.budget()["trade-leagues"]["restricted_for"] == 45.0
+
+
+def test_waiting_request_is_sent_once_budget_returns() -> None:
+    governor = ratelimit.RateLimitGovernor(max_wait=5.0)
+    headers = {"X-Rate-Limit-Policy": "p", "X-Rate-Limit-Rules": "Ip", "X-Rate-Limit-Ip": "1:1:60"}
+    governor.acquire("e")
+    governor.update("e", {**headers, "X-Rate-Limit-Ip-State": "1:1:0"}, 200)
+
+    waited: list[float] = []
+    thread = threading.Thread(target=lambda: waited.append(governor.acquire("e")))
+    thread.start()
+    thread.join(5)
+
+    assert 0.5 < waited[0] <= 1.5
+    assert governor.stats()["waits"] == 1
+
+
+def test_net_get_stays_within_standin_limits(monkeypatch: pytest.MonkeyPatch) -> None:
+    with StandinServer(faults=Faults(rate_limit="2:1:30,4:60:60")) as server, server.redirect():
+        monkeypatch.setattr(ratelimit.governor, "max_wait", 5.0)
+        responses = [net.get(currency.POE1_LEAGUES_API_URL) for _ in range(4)]
+        budget = ratelimit.governor.budget()["standin"]
+
+        assert [r.status_code for r in responses] == [200, 200, 200, 200]
+        assert budget["remaining"]["Ip 60s"] == 0
+        assert ratelimit.governor.stats()["waits"] >= 1
+        with pytest.raises(net.RateLimitedError):
+            net.get(currency.POE1_LEAGUES_API_URL)
+        assert len(server.requests) == 4
@@ -0,0 +1,102 @@
+import math
+
+import pytest
+
+from poemarcut import rates
+
+RESPONSE = {
+    "core": {"primary": "divine", "rates": {"chaos": 100.0}},
+    "lines": [
+        {"id": "divine", "primaryValue": 1.0},
+        {"id": "chaos", "primaryValue": 0.01},
+        {"id": "exalted", "primaryValue": 0.002},
+        {"id": "broken", "primaryValue": None},
+        {"id": "worthless", "primaryValue": 0},
+        {"id": "chaos", "primaryValue": 0.5},
+    ],
+}
+
+
+def test_rate_table_indexes_first_occurrence() -> None:
+    table = rates.RateTable.from_response(RESPONSE)
+
+    assert len(table) == 6
+    assert table.primary == "divine"
+    assert table.index("chaos") == 1
+    assert table.primary_value("chaos") == 0.01
+    assert "mirror" not in table
+
+
+def test_rate_table_rate_matches_primary_value_ratio() -> None:
+    table = rates.RateTable.from_response(RESPONSE)
+
+    assert table.rate("divine", "chaos") == 1.0 / 0.01
+    assert table.rate("chaos", "exalted") == 0.01 / 0.002
+    assert table.rate("worthless", "chaos") == 0.0
+
+
+@pytest.mark.parametrize(
+    ("from_currency", "to_currency", "message"),
+    [
+        ("mirror", "chaos", "Currency 'mirror' not found"),
+        ("chaos", "mirror", "Currency 'mirror' not found"),
+        ("broken", "chaos", "Invalid primaryValue for broken"),
+        ("chaos", "broken", "Invalid primaryValue for broken"),
+        ("chaos", "worthless", "Division by zero"),
+    ],
+)
+def test_rate_table_rate_errors(from_currency: str, to_currency: str, message: str) -> None:
+    table = rates.RateTable.from_response(RESPONSE)
+
+    with pytest.raises(ValueError, match=message):
+        table.rate(from_currency, to_currency)
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_rate_table_matrix_matches_rate(monkeypatch: pytest.MonkeyPatch, *, use_numpy: bool) -> None:
+    if use_numpy and rates.np is None:
+        pytest.skip("numpy not installed")
+    if not use_numpy:
+        monkeypatch.setattr(rates, "np", None)
+    table = rates.RateTable.from_response(RESPONSE)
+    # Materialize one row first to make sure the matrix reuses or replaces it consistently.
+    table.row("divine")
+
+    matrix = table.matrix()
+
+    assert matrix[0][1] == table.rate("divine", "chaos")
+    assert matrix[1][2] == table.rate("chaos", "exalted")
+    assert math.isnan(matrix[1][3])
+    assert math.isnan(matrix[1][4])
+
+
+def test_price_index_looks_up_ids_and_normalized_names() -> None:
+    index = rates.PriceIndex(
+        "divine",
+        {
+            "Currency": {
+                "core": {"primary": "divine", "items": [{"id": "chaos", "name": "Chaos Orb"}]},
+                "lines": [{"id": "divine", "primaryValue": 1.0}, {"id": "chaos", "primaryValue": 0.01}],
+            },
+            "Fragment": {
+                "core": {"primary": "chaos", "items": [{"id": "chaos", "name": "Duplicate"}]},
+                "lines": [{"id": "offer", "primaryValue": 3.0}, {"id": "chaos", "primaryValue": 1.0}],
+            },
+            "Omen": {"core": {"primary": "unknown"}, "lines": [{"id": "omen", "primaryValue": 1.0}]},
+        },
+    )
+
+    assert len(index) == 3
+    assert index.value("chaos") == 0.01
+    assert index.value("  chaos\u00a0ORB ") == 0.01
+    assert index.value("offer") == pytest.approx(0.03)
+    assert index.category("offer") == "Fragment"
+    assert index.category("chaos") == "Currency"
+    assert "duplicate" not in index
+    assert "omen" not in index
+    with pytest.raises(KeyError):
+        index.value("mirror")
+
+
+def test_normalize_name() -> None:
+    assert rates.normalize_name("  Jeweller\u2019s   ORB ") == "jeweller's orb"
@@ -0,0 +1,132 @@
+import random
+import struct
+
+import pytest
+
+from poemarcut import logic, reprice
+
+CURRENCIES = ["divine", "exalted", "chaos", "alch"]
+VALUES = {"divine": 1.0, "exalted": 1 / 9.5, "chaos": 1 / 160.0, "alch": 1 / 1400.0}
+BACKENDS = [False, True] if reprice.np is not None else [False]
+
+
+def _rate(*, from_currency: str, to_currency: str) -> float:
+    return VALUES[from_currency] / VALUES[to_currency]
+
+
+def _bits(result: tuple[int | None, str | None, float]) -> tuple[int | None, str | None, bytes]:
+    # Compare actual discounts bit for bit, not approximately.
+    units, cur, actual = result
+    return units, cur, struct.pack("<d", actual)
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_batch_matches_scalar_bit_for_bit(use_numpy: bool) -> None:  # noqa: FBT001
+    rng = random.Random(1)
+    for _ in range(200):
+        n = rng.randint(1, 40)
+        units = [rng.choice((1, 2, 3, 7, 10, rng.randint(1, 5000))) for _ in range(n)]
+        cur_types = [rng.choice([*CURRENCIES, "mirror", None]) for _ in range(n)]
+        settings = {
+            "discount_percent": rng.randint(0, 60),
+            "max_actual_discount": rng.randint(0, 100),
+            "minimum_discount": rng.choice((None, 0, 1, 3)),
+            "minimum_discount_currency": rng.choice((None, *CURRENCIES)),
+        }
+        batch = reprice.convert_and_compute_prices(
+            units, cur_types, CURRENCIES, get_exchange_rate=_rate, use_numpy=use_numpy, **settings
+        )
+        expected = [
+            logic.convert_and_compute_price(u, c, CURRENCIES, get_exchange_rate=_rate, **settings)
+            for u, c in zip(units, cur_types, strict=True)
+        ]
+        assert [_bits(r) for r in batch] == [_bits(r) for r in expected]
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_batch_matches_scalar_over_random_rate_tables(use_numpy: bool) -> None:  # noqa: FBT001
+    # The batch walks the conversion chain separately from `logic`, so pin it across chain shapes and rates too.
+    rng = random.Random(2)
+    for _ in range(300):
+        currencies = rng.sample(CURRENCIES, rng.randint(1, len(CURRENCIES)))
+        values = {"mirror": 1.0}
+        value = 1.0
+        for cur in currencies:
+            value /= rng.choice((1.0, 2.0, 3.0, 7.5, 9.5, 10.0, rng.uniform(1.0, 400.0)))
+            values[cur] = value
+
+        def rate(*, from_currency: str, to_currency: str, values: dict[str, float] = values) -> float:
+            return values[from_currency] / values[to_currency]
+
+        n = rng.randint(1, 40)
+        units = [rng.choice((1, 2, 9, 10, 11, 99, 100, rng.randint(1, 100_000))) for _ in range(n)]
+        cur_types = [rng.choice([*currencies, "mirror", None]) for _ in range(n)]
+        settings = {
+            "discount_percent": rng.randint(0, 99),
+            "max_actual_discount": rng.randint(0, 100),
+            "minimum_discount": rng.choice((None, 0, 1, 2, 5)),
+            "minimum_discount_currency": rng.choice((None, *currencies)),
+        }
+        batch = reprice.convert_and_compute_prices(
+            units, cur_types, currencies, get_exchange_rate=rate, use_numpy=use_numpy, **settings
+        )
+        expected = [
+            logic.convert_and_compute_price(u, c, currencies, get_exchange_rate=rate, **settings)
+            for u, c in zip(units, cur_types, strict=True)
+        ]
+        assert [_bits(r) for r in batch] == [_bits(r) for r in expected]
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_batch_rate_failures_match_scalar(use_numpy: bool) -> None:  # noqa: FBT001
+    def flaky_rate(*, from_currency: str, to_currency: str) -> float:
+        if to_currency == "chaos":
+            msg = "no rate"
+            raise ValueError(msg)
+        return _rate(from_currency=from_currency, to_currency=to_currency)
+
+    units, cur_types = [1, 1, 2, 5], ["exalted", "divine", "chaos", "alch"]
+    kwargs = {"discount_percent": 10, "max_actual_discount": 20, "minimum_discount": 1}
+    batch = reprice.convert_and_compute_prices(
+        units, cur_types, CURRENCIES, get_exchange_rate=flaky_rate, use_numpy=use_numpy, **kwargs
+    )
+    expected = [
+        logic.convert_and_compute_price(u, c, CURRENCIES, get_exchange_rate=flaky_rate, **kwargs)
+        for u, c in zip(units, cur_types, strict=True)
+    ]
+    assert list(batch) == expected
+
+
+def test_batch_calls_rate_once_per_pair() -> None:
+    calls: list[tuple[str, str]] = []
+
+    def counting_rate(*, from_currency: str, to_currency: str) -> float:
+        calls.append((from_currency, to_currency))
+        return _rate(from_currency=from_currency, to_currency=to_currency)
+
+    reprice.convert_and_compute_prices(
+        [1] * 500,
+        ["divine", "exalted"] * 250,
+        CURRENCIES,
+        10,
+        20,
+        counting_rate,
+        minimum_discount=1,
+        minimum_discount_currency="chaos",
+    )
+    assert calls
+    assert len(calls) == len(set(calls))
+
+
+def test_compute_discounted_prices_and_actual_matches_scalar() -> None:
+    prices = [1, 2, 12, 99, 100, 12345, 2**40]
+    discounted, actual = reprice.compute_discounted_prices_and_actual(prices, 10)
+    for i, price in enumerate(prices):
+        assert (int(discounted[i]), float(actual[i])) == logic.compute_discounted_price_and_actual(price, 10)
+
+
+def test_batch_rejects_invalid_input() -> None:
+    with pytest.raises(ValueError, match="same length"):
+        reprice.convert_and_compute_prices([1, 2], ["chaos"], CURRENCIES, 10, 20, _rate)
+    with pytest.raises(ValueError, match="> 0"):
+        reprice.convert_and_compute_prices([1, 0], ["chaos", "chaos"], CURRENCIES, 10, 20, _rate)
@@ -70,3 +70,24 @@ def test_load_corrects_empty_leagues_from_file(tmp_path: Path, monkeypatch: pyte
     assert s.currency.active_league in s.currency.poe1leagues
     # poe2leagues should also be non-empty (defaults)
     assert s.currency.poe2leagues
+
+
+def test_replace_leagues_persists_only_changes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    settings_file = tmp_path / "settings.yaml"
+    monkeypatch.setattr(settings_mod, "SETTINGS_FILE", settings_file)
+    mgr = settings_mod.SettingsManager()
+    changes: list[str] = []
+    mgr.settings_changed.connect(lambda name, _value: changes.append(name))
+
+    assert mgr.replace_leagues_and_persist(game=1, leagues={"Standard", "Mercenaries"})
+    assert mgr.settings.currency.poe1leagues == {"Standard", "Mercenaries"}
+    # The previous active league is gone, so the first remaining one becomes active.
+    assert mgr.settings.currency.active_league == "Mercenaries"
+    mtime = settings_file.stat().st_mtime_ns
+    changes.clear()
+
+    assert not mgr.replace_leagues_and_persist(game=1, leagues={"Mercenaries", "Standard"})
+    assert not mgr.replace_leagues_and_persist(game=1, leagues=None)
+    assert not mgr.replace_leagues_and_persist(game=1, leagues=set())
+    assert settings_file.stat().st_mtime_ns == mtime
+    assert changes == []
@@ -0,0 +1,164 @@
+import math
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from poemarcut import cache, currency, sharedcache
+
+DATA = {
+    "core": {
+        "primary": "divine",
+        "secondary": "chaos",
+        "rates": {"chaos": 150.0},
+        "items": [{"id": "chaos", "name": "Chaos Orb"}],
+    },
+    "lines": [{"id": "divine", "primaryValue": 1.0}, {"id": "chaos", "primaryValue": 1 / 150}, {"id": "broken"}],
+}
+
+
+def test_encode_decode_round_trip_and_checksum() -> None:
+    payload = sharedcache.encode(DATA, mtime=123.5, generation=7)
+    snapshot = sharedcache.decode(payload)
+
+    assert snapshot is not None
+    assert snapshot.generation == 7
+    assert snapshot.data == {**DATA, "mtime": 123.5}
+    assert snapshot.table.rate("divine", "chaos") == pytest.approx(150.0)
+    assert math.isnan(snapshot.table.primary_value("broken"))
+
+    corrupted = bytearray(payload)
+    corrupted[-1] ^= 0xFF
+    assert sharedcache.decode(bytes(corrupted)) is None
+    assert sharedcache.decode(payload[:-1]) is None
+    assert sharedcache.decode(b"not a snapshot") is None
+
+
+def test_publish_increments_generation(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    snapshots = sharedcache.SharedSnapshotCache()
+    assert snapshots.read(1, "Standard") is None
+    assert snapshots.publish(1, "Standard", DATA, mtime=1.0) == 1
+    assert snapshots.publish(1, "Standard", DATA, mtime=2.0) == 2
+    shared = snapshots.read(1, "Standard")
+    assert shared is not None
+    assert (shared.generation, shared.mtime) == (2, 2.0)
+
+
+def test_second_store_uses_shared_snapshot_without_fetching(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    fetches: list[str] = []
+
+    def fake_retrieve(game: int, league: str, *, update: bool = True, force: bool = False) -> dict:  # noqa: ARG001
+        fetches.append(league)
+        path = cache.cache_path(game, league)
+        cache.write_cache(path, DATA)
+        return {**DATA, "mtime": path.stat().st_mtime}
+
+    monkeypatch.setattr(currency, "_retrieve_currency_prices", fake_retrieve)
+    first, second = currency.CurrencyStore(shared=True), currency.CurrencyStore(shared=True)
+
+    assert first.get_table(1, "Standard", update=True) is not None
+    table = second.get_table(1, "Standard", update=True)
+
+    assert fetches == ["Standard"]
+    assert table is not None
+    assert table.rate("divine", "chaos") == pytest.approx(150.0)
+    assert second.stats()["shared_hits"] == 1
+
+    # A forced refresh always fetches and publishes a new generation.
+    second.refresh(1, "Standard")
+    assert fetches == ["Standard", "Standard"]
+    assert sharedcache.snapshots.generation(1, "Standard") == 2
+
+
+def test_snapshot_published_by_another_process_is_read(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    code = (
+        "from poemarcut import cache, sharedcache\n"
+        f"data = {DATA!r}\n"
+        "path = cache.cache_path(1, 'Standard')\n"
+        "cache.write_cache(path, data)\n"
+        "sharedcache.snapshots.publish(1, 'Standard', data, mtime=path.stat().st_mtime)\n"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, check=True, timeout=60)
+
+    store = currency.CurrencyStore(shared=True)
+    snapshot = store.get_snapshot(1, "Standard", update=True)
+
+    assert snapshot is not None
+    assert snapshot.data["lines"][:2] == DATA["lines"][:2]
+    assert store.stats()["shared_hits"] == 1
+
+
+@pytest.mark.skipif(sharedcache.fcntl is None and sharedcache.msvcrt is None, reason="no file locking")
+def test_writer_lock_serializes_and_times_out(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    snapshots = sharedcache.SharedSnapshotCache()
+    held = threading.Event()
+    release = threading.Event()
+
+    def holder() -> None:
+        with snapshots.writer_lock(1, "Standard") as locked:
+            assert locked
+            held.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    held.wait(5)
+    with snapshots.writer_lock(1, "Standard", timeout=0.1) as locked:
+        assert not locked
+
+    threading.Timer(0.2, release.set).start()
+    start = time.monotonic()
+    with snapshots.writer_lock(1, "Standard", timeout=5) as locked:
+        assert locked
+        assert time.monotonic() - start >= 0.15
+    thread.join()
+    assert snapshots._lock_path(1, "Standard") == cache.manager.directory / "pmc-Standard-1.lock"
+
+
+@pytest.mark.skipif(sharedcache.fcntl is None and sharedcache.msvcrt is None, reason="no file locking")
+def test_store_fetches_privately_while_another_process_holds_the_lock(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    fetches: list[str] = []
+
+    def fake_retrieve(game: int, league: str, *, update: bool = True, force: bool = False) -> dict:  # noqa: ARG001
+        fetches.append(league)
+        path = cache.cache_path(game, league)
+        cache.write_cache(path, DATA)
+        return {**DATA, "mtime": path.stat().st_mtime}
+
+    monkeypatch.setattr(currency, "_retrieve_currency_prices", fake_retrieve)
+    held = threading.Event()
+    release = threading.Event()
+
+    def holder() -> None:
+        with sharedcache.snapshots.writer_lock(1, "Standard"):
+            held.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    held.wait(5)
+    try:
+        start = time.monotonic()
+        table = currency.CurrencyStore(shared=True).get_table(1, "Standard", update=True)
+        elapsed = time.monotonic() - start
+    finally:
+        release.set()
+        thread.join()
+
+    assert table is not None
+    assert fetches == ["Standard"]
+    assert elapsed < 5
+    # Only the lock holder publishes.
+    assert sharedcache.snapshots.generation(1, "Standard") == 0
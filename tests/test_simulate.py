@@ -0,0 +1,121 @@
+import math
+import random
+from pathlib import Path
+
+import pytest
+
+from poemarcut import currency, history, logic, simulate
+from poemarcut.constants import S_IN_HOUR
+from poemarcut.rates import RateTable
+
+CURRENCIES = ["divine", "exalted", "chaos"]
+
+
+def _table(divine_in_chaos: float = 160.0) -> RateTable:
+    return RateTable("chaos", CURRENCIES, [divine_in_chaos, 9.5 / 160.0 * divine_in_chaos, 1.0])
+
+
+def _walk(units: int, cur: str | None, table: RateTable, policy: simulate.Policy) -> list[tuple[int, str | None]]:
+    """Apply the scalar function until the price stops changing, like repeated hotkey presses."""
+
+    def get_rate(*, from_currency: str, to_currency: str) -> float:
+        return currency.table_rate(table, "", from_currency, to_currency)
+
+    steps = [(units, cur)]
+    while True:
+        price, new_cur, _ = logic.convert_and_compute_price(
+            units,
+            cur,
+            CURRENCIES,
+            discount_percent=policy.discount_percent,
+            max_actual_discount=policy.max_actual_discount,
+            get_exchange_rate=get_rate,
+            minimum_discount=policy.minimum_discount,
+            minimum_discount_currency=policy.minimum_discount_currency,
+        )
+        if price is None or (price, new_cur) == (units, cur):
+            return steps
+        units, cur = price, new_cur
+        steps.append((units, cur))
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+@pytest.mark.parametrize(
+    "policy", [simulate.Policy(10, 20), simulate.Policy(10, 20, 1, "chaos"), simulate.Policy(25, 40, 2, "exalted")]
+)
+def test_simulation_matches_repeated_scalar_pricing(policy: simulate.Policy, use_numpy: bool) -> None:  # noqa: FBT001
+    if use_numpy and simulate.np is None:
+        pytest.skip("NumPy is not installed")
+    rng = random.Random(7)
+    units = [rng.randint(1, 400) for _ in range(300)]
+    cur_types = [rng.choice([*CURRENCIES, "mirror", None]) for _ in range(300)]
+    table = _table()
+
+    sim = simulate.simulate(units, cur_types, CURRENCIES, policy, table, use_numpy=use_numpy)
+
+    for i, (u, cur) in enumerate(zip(units, cur_types, strict=True)):
+        expected = _walk(u, cur, table, policy)
+        assert sim.trajectory(i) == expected
+        assert sim.cycles_to_floor[i] == len(expected) - 1
+        assert (int(sim.final_prices[i]), sim.labels[int(sim.final_currencies[i])]) == expected[-1]
+    assert sum(sim.distribution().values()) == len(units)
+    assert sim.summary()["floored"] == 1.0
+
+
+def test_items_still_moving_after_last_cycle_have_no_floor() -> None:
+    sim = simulate.simulate([100, 1], ["chaos", "chaos"], CURRENCIES, simulate.Policy(10, 20), _table(), cycles=3)
+
+    assert list(sim.cycles_to_floor) == [simulate.NO_FLOOR, 0]
+    assert sim.trajectory(0) == [(100, "chaos"), (90, "chaos"), (81, "chaos"), (72, "chaos")]
+    assert sim.distribution() == {simulate.NO_FLOOR: 1, 0: 1}
+    assert sim.summary()["floored"] == 0.5
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_item_floors_before_its_price_rounds_to_zero(use_numpy: bool) -> None:  # noqa: FBT001
+    if use_numpy and simulate.np is None:
+        pytest.skip("NumPy is not installed")
+    sim = simulate.simulate([3], ["chaos"], CURRENCIES, simulate.Policy(10, 100), _table(), use_numpy=use_numpy)
+
+    assert sim.trajectory(0) == [(3, "chaos"), (2, "chaos"), (1, "chaos")]
+    assert list(sim.cycles_to_floor) == [2]
+
+
+def test_sweep_covers_grid_without_trajectories() -> None:
+    results = simulate.sweep([50, 5], ["divine", "exalted"], CURRENCIES, _table(), [10, 20], [20, 40])
+
+    assert list(results) == [(10, 20), (10, 40), (20, 20), (20, 40)]
+    for (dp, m), sim in results.items():
+        policy = simulate.Policy(dp, m)
+        assert sim.prices is None
+        expected = [len(_walk(u, cur, _table(), policy)) - 1 for u, cur in [(50, "divine"), (5, "exalted")]]
+        assert list(sim.cycles_to_floor) == expected
+        with pytest.raises(ValueError, match="not kept"):
+            sim.trajectory(0)
+
+
+def test_history_tables_follow_recorded_rates(tmp_path: Path) -> None:
+    start = 1_700_000_000.0
+    h = history.RateHistory(tmp_path)
+    h.append(start, _table(100.0))
+    h.append(start + 2 * S_IN_HOUR, _table(200.0))
+
+    tables = simulate.history_tables(h, CURRENCIES, start - S_IN_HOUR, S_IN_HOUR, 5)
+
+    assert math.isnan(tables[0].primary_value("divine"))
+    assert [t.rate("divine", "chaos") for t in tables[1:]] == [100.0, 100.0, 200.0, 200.0]
+    assert tables[1] is tables[2]
+    assert tables[3] is tables[4]
+
+    policy = simulate.Policy(10, 20)
+    sim = simulate.simulate([1], ["divine"], CURRENCIES, policy, tables[1:])
+    assert sim.trajectory(0)[:2] == _walk(1, "divine", tables[1], policy)[:2]
+
+
+def test_simulate_rejects_invalid_input() -> None:
+    with pytest.raises(ValueError, match="same length"):
+        simulate.simulate([1], [], CURRENCIES, simulate.Policy(10, 20), _table())
+    with pytest.raises(ValueError, match="must be > 0"):
+        simulate.simulate([0], ["chaos"], CURRENCIES, simulate.Policy(10, 20), _table())
+    with pytest.raises(ValueError, match="at least one table"):
+        simulate.simulate([1], ["chaos"], CURRENCIES, simulate.Policy(10, 20), [])
@@ -0,0 +1,86 @@
+import os
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+import requests
+
+from poemarcut import cache, currency, net, update
+from poemarcut.standin import ROUTES, Faults, StandinServer
+
+
+@pytest.fixture
+def standin(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[StandinServer]:
+    monkeypatch.chdir(tmp_path)
+    with StandinServer() as server, server.redirect():
+        yield server
+
+
+def test_serves_all_apis_on_their_real_paths(standin: StandinServer) -> None:
+    data = currency._retrieve_currency_prices(1, "Standard")
+    assert currency._has_primary_price_line(data)
+    assert currency.get_leagues(1) == {"Standard", "Hardcore", "Mercenaries"}
+    assert currency.get_leagues(2) == {"Standard", "Dawn of the Hunt"}
+    assert update.get_github_version() is not None
+    assert [r.route for r in standin.requests] == ["poe1_currency", "poe1_leagues", "poe2_leagues", "github_release"]
+    assert "league=Standard" in standin.requests[0].query
+
+
+def test_redirect_is_undone_on_exit() -> None:
+    url = currency.POE1_CURRENCY_API_URL
+    with StandinServer() as server, server.redirect():
+        assert net.resolve(url) == server.url + ROUTES["poe1_currency"]
+    assert net.resolve(url) == url
+
+
+def test_conditional_requests_get_304(standin: StandinServer) -> None:
+    currency._retrieve_currency_prices(1, "Standard")
+    old = time.time() - 7200
+    os.utime(cache.cache_path(1, "Standard"), (old, old))
+
+    currency._retrieve_currency_prices(1, "Standard")
+
+    assert standin.statuses("poe1_currency") == [200, 304]
+
+
+def test_injected_errors_and_empty_lines(standin: StandinServer) -> None:
+    standin.set_faults("poe1_currency", error_rate=1.0, error_status=502)
+    assert currency._retrieve_currency_prices(1, "Standard") == {}
+    assert standin.statuses() == [502]
+
+    standin.set_faults("poe1_currency", error_rate=0.0, empty_lines=True)
+    data = currency._retrieve_currency_prices(1, "Standard")
+    assert currency._is_empty_market_response(data)
+
+
+def test_latency_past_timeout_raises(standin: StandinServer) -> None:
+    standin.set_faults(latency=0.3)
+    with pytest.raises(requests.Timeout):
+        net.get(currency.POE1_LEAGUES_API_URL, timeout=0.05)
+
+
+def test_rate_limit_headers_and_429() -> None:
+    # Bypass the rate-limit governor in net.get, which would not send the third request.
+    with StandinServer(faults=Faults(rate_limit="2:60:30")) as server, server.redirect():
+        responses = [net.get_session().get(net.resolve(currency.POE1_LEAGUES_API_URL)) for _ in range(3)]
+
+    assert [r.status_code for r in responses] == [200, 200, 429]
+    assert responses[0].headers["X-Rate-Limit-Ip"] == "2:60:30"
+    assert responses[1].headers["X-Rate-Limit-Ip-State"] == "2:60:0"
+    assert responses[2].headers["Retry-After"] == "30"
+
+
+def test_league_list_is_cached_and_revalidated(standin: StandinServer) -> None:
+    assert currency.get_leagues(1) == {"Standard", "Hardcore", "Mercenaries"}
+    assert currency.get_leagues(1) == {"Standard", "Hardcore", "Mercenaries"}
+    assert standin.statuses("poe1_leagues") == [200]
+
+    old = time.time() - currency.LEAGUES_TTL_S - 60
+    os.utime(cache.league_cache_path(1), (old, old))
+    assert currency.get_leagues(1) == {"Standard", "Hardcore", "Mercenaries"}
+    assert standin.statuses("poe1_leagues") == [200, 304]
+
+    standin.set_faults("poe1_leagues", error_rate=1.0)
+    assert currency.get_leagues(1, max_age=0) == {"Standard", "Hardcore", "Mercenaries"}
+    assert standin.statuses("poe1_leagues") == [200, 304, 503]